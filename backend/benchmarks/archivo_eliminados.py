@@ -0,0 +1,192 @@
+"""
+Benchmark de índices parciales y archivado en frío sobre una tabla con 50% de eliminados.
+
+Siembra N músicos (la mitad eliminados hace más de un año) con dos instrumentos
+cada uno en un esquema desechable y mide las lecturas calientes en tres etapas:
+- completos: índices de email y estado sobre todas las filas (antes de la migración 004);
+- parciales: los mismos índices con WHERE eliminado_en IS NULL;
+- archivados: además, los eliminados movidos a `musicos_archivo` con
+  ArchivoMusicosRepository (y VACUUM; con --compactar, VACUUM FULL).
+
+Para cada etapa informa p50/p95 de cada consulta y el tamaño de la tabla y sus
+índices; al final, el costo del archivado por lote y de restaurar un músico.
+
+Uso (desde la raíz del repositorio, con el .env del servicio de músicos):
+    DATABASE_URL=postgresql://... SECRET_KEY=x \\
+        python backend/benchmarks/archivo_eliminados.py [--musicos 200000] [--lote 1000] [--compactar]
+"""
+import argparse
+import itertools
+import sys
+import time
+
+from comun import CATALOGOS_MUSICOS, crear_esquema, eliminar_esquema, guardar_resultados, medir, usar_servicio, vacuum
+
+ESQUEMA = "bench_archivo"
+
+usar_servicio("musicos", ESQUEMA)
+
+from sqlalchemy import func, text  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import catalogos, outbox  # noqa: E402,F401
+from app.models.musicos import Musico  # noqa: E402
+from app.repositories.archivo_repository import ArchivoMusicosRepository  # noqa: E402
+from app.repositories.musicos_repository import MusicosRepository  # noqa: E402
+
+# Índices de músicos parciales desde las migraciones 004 y 005: (nombre, tipo, expresión)
+INDICES = (("uk_musicos_email", "UNIQUE INDEX", "lower(email)"), ("idx_musicos_estado", "INDEX", "estado_id"))
+
+
+def preparar(total: int) -> None:
+    crear_esquema(engine, Base.metadata, ESQUEMA, CATALOGOS_MUSICOS)
+    with engine.connect() as conn:
+        # Pares eliminados hace más de un año, intercalados con los vivos en el heap
+        conn.execute(text("""
+            INSERT INTO musicos (id, email, nombre, telefono, estado_id, fecha_ingreso,
+                                 creado_en, actualizado_en, eliminado_en)
+            SELECT md5('musico' || i)::uuid,
+                   'musico' || i || '@ensamble.test',
+                   'Músico ' || (i % 1000) || ' ' || i,
+                   '555-' || lpad((i % 10000)::text, 4, '0'),
+                   1 + (i % 3),
+                   now() - (i % 2000) * interval '1 day',
+                   now(), now(),
+                   CASE WHEN i % 2 = 0 THEN now() - interval '400 days' - (i % 300) * interval '1 day' END
+            FROM generate_series(1, :total) AS i
+        """), {"total": total})
+        conn.execute(text("""
+            INSERT INTO instrumentos_musico (id, musico_id, instrumento_id, nivel_id, es_principal)
+            SELECT md5('instrumento' || i || '-' || j)::uuid,
+                   md5('musico' || i)::uuid,
+                   1 + ((i + j) % 5),
+                   1 + (i % 3),
+                   j = 0
+            FROM generate_series(1, :total) AS i, generate_series(0, 1) AS j
+        """), {"total": total})
+        conn.commit()
+
+
+def usar_indices(parciales: bool) -> None:
+    condicion = "WHERE eliminado_en IS NULL" if parciales else ""
+    with engine.connect() as conn:
+        for nombre, tipo, expresion in INDICES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {nombre}"))
+            conn.execute(text(f"CREATE {tipo} {nombre} ON musicos ({expresion}) {condicion}"))
+        conn.commit()
+    vacuum(engine, "musicos")
+    vacuum(engine, "instrumentos_musico")
+
+
+def tamanos() -> dict:
+    """Tamaño en MB de la tabla de músicos y de cada uno de sus índices"""
+    with engine.connect() as conn:
+        filas = conn.execute(text("""
+            SELECT 'musicos (heap)' AS nombre, pg_relation_size(to_regclass(:tabla)) AS bytes
+            UNION ALL
+            SELECT indexrelname, pg_relation_size(indexrelid)
+            FROM pg_stat_user_indexes WHERE schemaname = :esquema AND relname = 'musicos'
+            ORDER BY 1
+        """), {"tabla": f"{ESQUEMA}.musicos", "esquema": ESQUEMA}).all()
+    return {nombre: round(bytes_ / 2**20, 2) for nombre, bytes_ in filas}
+
+
+def con_sesion(llamada):
+    def medida():
+        db = SessionLocal()
+        try:
+            return llamada(db)
+        finally:
+            db.close()
+    return medida
+
+
+def medir_etapa(total: int, repeticiones: int) -> dict:
+    # Músicos vivos (impares) repartidos por toda la tabla
+    vivos = itertools.cycle(1 + 2 * ((i * 7919) % (total // 2)) for i in range(500))
+    return {
+        "get_by_email": medir(con_sesion(
+            lambda db: MusicosRepository(db).get_by_email(f"musico{next(vivos)}@ensamble.test")), repeticiones),
+        "conteo activos por estado": medir(con_sesion(
+            lambda db: db.query(func.count(Musico.id)).filter(
+                Musico.estado_id == 2, Musico.eliminado_en.is_(None)
+            ).scalar()), repeticiones),
+        "get_all_with_relationships(skip=N/4, 20)": medir(con_sesion(
+            lambda db: MusicosRepository(db).get_all_with_relationships(skip=total // 4, limit=20)), repeticiones),
+    }
+
+
+def archivar(lote: int) -> dict:
+    db = SessionLocal()
+    try:
+        repo = ArchivoMusicosRepository(db)
+        antes_de = db.execute(text("SELECT now() - interval '365 days'")).scalar()
+        tiempos = []
+        while True:
+            inicio = time.perf_counter()
+            archivados = repo.archivar_lote(antes_de, lote)
+            if not archivados:
+                break
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        restaurar = db.execute(text("SELECT id FROM musicos_archivo LIMIT 1")).scalar()
+        inicio = time.perf_counter()
+        repo.restaurar(restaurar)
+        restauracion_ms = (time.perf_counter() - inicio) * 1000
+    finally:
+        db.close()
+    return {
+        "lotes": len(tiempos),
+        "ms_por_lote": round(sum(tiempos) / len(tiempos), 2) if tiempos else 0.0,
+        "restaurar_ms": round(restauracion_ms, 2),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--musicos", type=int, default=200_000, help="Músicos sembrados (la mitad eliminados)")
+    parser.add_argument("--lote", type=int, default=1000, help="Músicos por lote de archivado")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--compactar", action="store_true", help="VACUUM FULL tras archivar (devuelve el espacio)")
+    parser.add_argument("--salida", help="Guardar los resultados en JSON")
+    parser.add_argument("--conservar", action="store_true", help="No borrar el esquema al terminar")
+    args = parser.parse_args(argv)
+
+    print(f"Preparando {args.musicos} músicos (50% eliminados) en {ESQUEMA}...")
+    preparar(args.musicos)
+    etapas = {}
+    try:
+        usar_indices(parciales=False)
+        etapas["completos"] = {"consultas": medir_etapa(args.musicos, args.repeticiones), "mb": tamanos()}
+
+        usar_indices(parciales=True)
+        etapas["parciales"] = {"consultas": medir_etapa(args.musicos, args.repeticiones), "mb": tamanos()}
+
+        archivado = archivar(args.lote)
+        if args.compactar:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM FULL musicos"))
+                conn.execute(text("VACUUM FULL instrumentos_musico"))
+        vacuum(engine, "musicos")
+        vacuum(engine, "instrumentos_musico")
+        etapas["archivados"] = {"consultas": medir_etapa(args.musicos, args.repeticiones), "mb": tamanos()}
+    finally:
+        if not args.conservar:
+            eliminar_esquema(engine, ESQUEMA)
+
+    print(f"\n{'consulta':<44} " + " ".join(f"{etapa + ' p50/p95':>24}" for etapa in etapas))
+    for consulta in etapas["completos"]["consultas"]:
+        valores = [etapas[etapa]["consultas"][consulta] for etapa in etapas]
+        print(f"{consulta:<44} " + " ".join(f"{v['p50_ms']:>11.3f} /{v['p95_ms']:>10.3f}" for v in valores))
+    print(f"\n{'tamaño (MB)':<44} " + " ".join(f"{etapa:>24}" for etapa in etapas))
+    for relacion in etapas["completos"]["mb"]:
+        print(f"{relacion:<44} " + " ".join(f"{etapas[etapa]['mb'].get(relacion, 0):>24.2f}" for etapa in etapas))
+    print(f"\nArchivado: {archivado['lotes']} lotes de {args.lote}, {archivado['ms_por_lote']:.2f} ms por lote; "
+          f"restaurar un músico: {archivado['restaurar_ms']:.2f} ms")
+
+    if args.salida:
+        guardar_resultados(args.salida, {"musicos": args.musicos, "etapas": etapas, "archivado": archivado})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Bytes en el cable y latencia de respuestas grandes según la negociación de contenido.
+
+Siembra músicos como suite_musicos.py y pide una página de 100 músicos
+(`GET /musicos?limit=100`) y un lote de 100 ids (`GET /musicos/lote`) con cada
+combinación disponible de formato (JSON; MessagePack si está instalado `msgpack`)
+y codificación (identity, gzip; br y zstd si están instalados `brotli` y
+`zstandard`). Por combinación informa:
+- bytes del cuerpo tal como salen del servicio (sin descomprimir);
+- percentiles de latencia en proceso, incluida la descompresión y el parseo del cliente;
+- p50 estimado de punta a punta para los enlaces de --enlaces-mbps: latencia en
+  proceso + bytes / ancho de banda (el transporte ASGI no tiene red).
+
+Uso (desde la raíz del repositorio, con el .env del servicio de músicos):
+    DATABASE_URL=postgresql://... SECRET_KEY=x \\
+        python backend/benchmarks/compresion.py [--escala 10000] [--enlaces-mbps 10 100] [--salida compresion.json]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import time
+import uuid
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from comun import eliminar_esquema, guardar_resultados, percentiles
+from suite_musicos import ESQUEMA, preparar
+
+from app.core.database import engine
+from app.main import app
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _codificaciones() -> Dict[str, Callable[[bytes], bytes]]:
+    """Codificación -> descompresión del lado del cliente"""
+    codificaciones = {"identity": lambda datos: datos, "gzip": lambda datos: zlib.decompress(datos, 16 + zlib.MAX_WBITS)}
+    if brotli is not None:
+        codificaciones["br"] = brotli.decompress
+    if zstandard is not None:
+        codificaciones["zstd"] = lambda datos: zstandard.ZstdDecompressor().decompressobj().decompress(datos)
+    return codificaciones
+
+
+def _formatos() -> Dict[str, Tuple[str, Callable[[bytes], object]]]:
+    """Formato -> (Accept, parseo del lado del cliente)"""
+    formatos = {"json": ("application/json", json.loads)}
+    if msgpack is not None:
+        formatos["msgpack"] = ("application/msgpack", lambda datos: msgpack.unpackb(datos, raw=False))
+    return formatos
+
+
+def rutas(escala: int) -> Dict[str, str]:
+    ids = [uuid.UUID(hashlib.md5(f"musico{i}".encode()).hexdigest()) for i in range(1, min(escala, 100) + 1)]
+    return {
+        "pagina_100": "/api/v1/musicos/?limit=100&total_mode=none",
+        "lote_100": "/api/v1/musicos/lote?" + "&".join(f"ids={musico_id}" for musico_id in ids),
+    }
+
+
+async def medir_combinacion(cliente, url: str, accept: str, codificacion: str, parsear, descomprimir,
+                            repeticiones: int) -> Dict:
+    encabezados = {"accept": accept, "accept-encoding": codificacion}
+    tiempos: List[float] = []
+    tamano: Optional[int] = None
+    for i in range(repeticiones + 5):
+        inicio = time.perf_counter()
+        async with cliente.stream("GET", url, headers=encabezados) as respuesta:
+            crudo = b"".join([parte async for parte in respuesta.aiter_raw()])
+        if respuesta.status_code != 200:
+            raise RuntimeError(f"{url} respondió {respuesta.status_code}: {crudo[:200]!r}")
+        recibida = respuesta.headers.get("content-encoding", "identity")
+        if recibida != codificacion and codificacion != "identity":
+            raise RuntimeError(f"Se pidió {codificacion} y se recibió {recibida}")
+        parsear(descomprimir(crudo) if recibida != "identity" else crudo)
+        if i >= 5:  # las primeras son de calentamiento
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        tamano = len(crudo)
+    resultado = percentiles(tiempos)
+    resultado["bytes"] = tamano
+    return resultado
+
+
+async def medir_todo(escala: int, repeticiones: int) -> Dict[str, Dict]:
+    import httpx
+
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        for nombre_ruta, url in rutas(escala).items():
+            for formato, (accept, parsear) in _formatos().items():
+                for codificacion, descomprimir in _codificaciones().items():
+                    resultados[f"{nombre_ruta}.{formato}.{codificacion}"] = await medir_combinacion(
+                        cliente, url, accept, codificacion, parsear, descomprimir, repeticiones
+                    )
+    return resultados
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", type=int, default=10_000, help="Músicos sembrados")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--enlaces-mbps", type=float, nargs="+", default=[10.0, 100.0],
+                        help="Anchos de banda para estimar la latencia de punta a punta")
+    parser.add_argument("--salida", help="Guardar los resultados en JSON")
+    parser.add_argument("--conservar", action="store_true", help="No borrar el esquema al terminar")
+    args = parser.parse_args(argv)
+
+    print(f"[compresion] sembrando {args.escala} músicos en {ESQUEMA}...")
+    preparar(args.escala)
+    try:
+        resultados = asyncio.run(medir_todo(args.escala, args.repeticiones))
+    finally:
+        if not args.conservar:
+            eliminar_esquema(engine, ESQUEMA)
+
+    enlaces = " ".join(f"{f'p50@{mbps:g}Mbps':>14}" for mbps in args.enlaces_mbps)
+    print(f"{'caso':<32} {'bytes':>9} {'p50 ms':>8} {'p95 ms':>8} {enlaces}")
+    for caso, r in resultados.items():
+        r["p50_enlace_ms"] = {
+            f"{mbps:g}": round(r["p50_ms"] + r["bytes"] * 8 / (mbps * 1e6) * 1000, 3) for mbps in args.enlaces_mbps
+        }
+        estimados = " ".join(f"{ms:>14.2f}" for ms in r["p50_enlace_ms"].values())
+        print(f"{caso:<32} {r['bytes']:>9} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {estimados}")
+
+    if args.salida:
+        guardar_resultados(args.salida, {"servicio": "musicos", "escala": args.escala, "resultados": resultados})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Cada servicio toma el esquema de `DATABASE_SCHEMA` al leer su configuración,
+así que `usar_servicio` debe llamarse antes de importar cualquier módulo `app.*`.
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+SERVICIOS = Path(__file__).resolve().parents[1] / "services"
+
+CATALOGOS_EVENTOS = """
+    INSERT INTO cat_tipos_evento (codigo, nombre, orden) VALUES
+        ('concierto', 'Concierto', 1), ('ensayo', 'Ensayo', 2),
+        ('grabacion', 'Grabación', 3), ('otro', 'Otro', 4);
+    INSERT INTO cat_estados_evento (codigo, nombre, orden) VALUES
+        ('planificacion', 'En Planificación', 1), ('ensayando', 'Ensayando', 2),
+        ('completado', 'Completado', 3), ('cancelado', 'Cancelado', 4);
+    INSERT INTO cat_estados_participante (codigo, nombre, orden) VALUES
+        ('invitado', 'Invitado', 1), ('confirmado', 'Confirmado', 2),
+        ('rechazado', 'Rechazado', 3);
+"""
+
+CATALOGOS_MUSICOS = """
+    INSERT INTO cat_estados_musico (codigo, nombre, orden) VALUES
+        ('activo', 'Activo', 1), ('inactivo', 'Inactivo', 2), ('retirado', 'Retirado', 3);
+    INSERT INTO cat_instrumentos (codigo, nombre, familia, orden) VALUES
+        ('voz_principal', 'Voz Principal', 'vocal', 1), ('guitarra_principal', 'Guitarra Principal', 'cuerda', 2),
+        ('bajo', 'Bajo', 'cuerda', 3), ('bateria', 'Batería', 'percusion', 4), ('teclado', 'Teclado', 'teclas', 5);
+"""
+
+
+def usar_servicio(servicio: str, esquema: str) -> None:
+    """Hacer importable el paquete `app` del servicio apuntando a un esquema desechable"""
+    os.environ["DATABASE_SCHEMA"] = esquema
+    # Con DEBUG el engine de músicos hace echo de cada sentencia y distorsiona los tiempos
+    os.environ["DEBUG"] = "false"
+    sys.path.insert(0, str(SERVICIOS / servicio))
+
+
+def crear_esquema(engine, metadata, esquema: str, catalogos: str = "") -> None:
+    """(Re)crear el esquema con las tablas de los modelos y sus catálogos"""
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {esquema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {esquema}"))
+        conn.commit()
+        metadata.create_all(conn)
+        if catalogos:
+            conn.execute(text(catalogos))
+        conn.commit()
+
+
+def eliminar_esquema(engine, esquema: str) -> None:
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {esquema} CASCADE"))
+        conn.commit()
+
+
+def vacuum(engine, tabla: str) -> None:
+    """VACUUM no admite transacciones; deja el mapa de visibilidad listo para index-only scans"""
+    from sqlalchemy import text
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"VACUUM (ANALYZE) {tabla}"))
+
+
+class ContadorConsultas:
+    """Cuenta sentencias y filas devueltas por un engine mientras está activo"""
+
+    def __init__(self):
+        self.sentencias = []
+
+    @property
+    def filas(self) -> int:
+        return sum(filas for _, filas in self.sentencias)
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.sentencias.append((statement, max(cursor.rowcount, 0)))
+
+    @contextmanager
+    def midiendo(self, engine):
+        from sqlalchemy import event
+
+        self.sentencias = []
+        event.listen(engine, "after_cursor_execute", self._despues)
+        try:
+            yield self
+        finally:
+            event.remove(engine, "after_cursor_execute", self._despues)
+
+
+# ==================== TIEMPOS ====================
+
+def percentiles(tiempos_ms: Sequence[float]) -> Dict[str, float]:
+    """Resumen de una serie de tiempos en milisegundos"""
+    ordenados = sorted(tiempos_ms)
+
+    def p(q: float) -> float:
+        return round(ordenados[min(len(ordenados) - 1, round(q * (len(ordenados) - 1)))], 3)
+
+    return {
+        "n": len(ordenados),
+        "media_ms": round(statistics.fmean(ordenados), 3),
+        "p50_ms": p(0.50),
+        "p95_ms": p(0.95),
+        "p99_ms": p(0.99),
+        "max_ms": round(ordenados[-1], 3),
+    }
+
+
+def medir(funcion: Callable[[], object], repeticiones: int, calentamiento: int = 5) -> Dict[str, float]:
+    """Percentiles de `repeticiones` llamadas secuenciales tras un calentamiento"""
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return percentiles(tiempos)
+
+
+def cargar(app, solicitudes: List[Tuple[str, str]], total: int, concurrencia: int) -> Dict[str, float]:
+    """
+    Prueba de carga en proceso sobre una app ASGI (sin red ni servidor).
+
+    `concurrencia` clientes toman solicitudes de la lista en rueda hasta sumar
+    `total`; devuelve percentiles de latencia, solicitudes por segundo y errores.
+    """
+    import asyncio
+    import httpx
+
+    async def correr():
+        tiempos: List[float] = []
+        errores = 0
+        pendientes = iter(range(total))
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+            async def cliente_carga():
+                nonlocal errores
+                for i in pendientes:
+                    metodo, url = solicitudes[i % len(solicitudes)]
+                    inicio = time.perf_counter()
+                    respuesta = await cliente.request(metodo, url)
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                    if respuesta.status_code >= 400:
+                        errores += 1
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(cliente_carga() for _ in range(concurrencia)))
+            duracion = time.perf_counter() - inicio
+
+        resultado = percentiles(tiempos)
+        resultado["rps"] = round(total / duracion, 1)
+        resultado["errores"] = errores
+        return resultado
+
+    return asyncio.run(correr())
+
+
+def guardar_resultados(ruta: str, datos: dict) -> None:
+    Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(datos, archivo, indent=2, ensure_ascii=False, default=str)
+        archivo.write("\n")
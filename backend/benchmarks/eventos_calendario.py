@@ -0,0 +1,150 @@
+"""
+Benchmark de consultas por rango de fechas de eventos (GET /eventos?desde=&hasta=).
+
+Crea un esquema desechable con las tablas del servicio de eventos, lo llena con
+N eventos (100k por defecto), ejecuta las consultas de EventosRepository con
+EXPLAIN (ANALYZE, BUFFERS) y verifica que los rangos se resuelvan sobre
+idx_eventos_fecha_presentacion sin Seq Scan ni Sort, y el conteo como Index Only
+Scan sin lecturas del heap. Compara con la paginación por offset anterior.
+
+Uso (desde la raíz del repositorio, con el .env del servicio de eventos):
+    DATABASE_URL=postgresql://... SECRET_KEY=x \\
+        python backend/benchmarks/eventos_calendario.py [--eventos 100000] [--conservar]
+
+Termina con código 1 si algún plan no cumple lo esperado.
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+ESQUEMA = "bench_calendario"
+
+from comun import CATALOGOS_EVENTOS, crear_esquema, eliminar_esquema, usar_servicio, vacuum
+
+usar_servicio("eventos", ESQUEMA)
+
+from sqlalchemy import func, text  # noqa: E402
+from sqlalchemy.orm import Query  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import catalogs, outbox  # noqa: E402,F401
+from app.models.eventos import Evento  # noqa: E402
+from app.repositories.eventos_repository import EventosRepository  # noqa: E402
+
+
+def preparar(total: int) -> None:
+    crear_esquema(engine, Base.metadata, ESQUEMA, CATALOGOS_EVENTOS)
+    with engine.connect() as conn:
+        # Fechas repartidas en ±2 años alrededor de hoy; 2% eliminados
+        conn.execute(text("""
+            INSERT INTO eventos (id, nombre, tipo_id, lugar, fecha_presentacion, estado_id,
+                                 creado_por, eliminado_en)
+            SELECT md5('evento' || i)::uuid,
+                   'Evento ' || i,
+                   1 + (i % 4),
+                   'Lugar ' || (i % 50),
+                   now() - interval '730 days' + (i * interval '1461 days' / :total),
+                   1 + ((i / 7) % 4),
+                   md5('usuario' || (i % 25))::uuid,
+                   CASE WHEN i % 50 = 0 THEN now() END
+            FROM generate_series(1, :total) AS i
+        """), {"total": total})
+        conn.commit()
+    vacuum(engine, "eventos")
+
+
+def explicar(db, consulta: Query, repeticiones: int) -> dict:
+    """Plan con ANALYZE y mediana de tiempo de ejecución de una consulta ORM"""
+    compilada = consulta.statement.compile(dialect=engine.dialect)
+    conn = db.connection()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conn.exec_driver_sql(compilada.string, compilada.params).all()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    plan = conn.exec_driver_sql(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + compilada.string, compilada.params
+    ).scalar()[0]
+    return {"plan": plan["Plan"], "ms": statistics.median(tiempos)}
+
+
+def nodos(plan: dict):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from nodos(hijo)
+
+
+def resumir(nombre: str, resultado: dict, esperar_index_only: bool) -> list:
+    errores = []
+    tipos = []
+    for nodo in nodos(resultado["plan"]):
+        tipo = nodo["Node Type"]
+        if nodo.get("Index Name"):
+            tipo += f" ({nodo['Index Name']}, heap fetches={nodo.get('Heap Fetches', '-')})"
+        tipos.append(tipo)
+        if nodo["Node Type"] == "Seq Scan" and nodo.get("Relation Name") == "eventos":
+            errores.append(f"{nombre}: Seq Scan sobre eventos")
+        if nodo["Node Type"] in ("Sort", "Incremental Sort"):
+            errores.append(f"{nombre}: ordenamiento explícito ({nodo['Node Type']})")
+    if esperar_index_only:
+        index_only = [n for n in nodos(resultado["plan"]) if n["Node Type"] == "Index Only Scan"]
+        if not index_only:
+            errores.append(f"{nombre}: se esperaba Index Only Scan")
+        elif any(n.get("Heap Fetches", 0) for n in index_only):
+            errores.append(f"{nombre}: el Index Only Scan consultó el heap")
+
+    print(f"{nombre:<36} {resultado['ms']:>9.2f} ms  buffers={resultado['plan'].get('Shared Hit Blocks', 0)}")
+    print(f"{'':<36} {' -> '.join(tipos)}")
+    return errores
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eventos", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--conservar", action="store_true", help="No borrar el esquema al terminar")
+    args = parser.parse_args(argv)
+
+    print(f"Preparando {args.eventos} eventos en {ESQUEMA}...")
+    preparar(args.eventos)
+
+    ahora = datetime.now(timezone.utc)
+    db = SessionLocal()
+    errores = []
+    try:
+        repo = EventosRepository(db)
+        mitad = repo.search_query(ahora).offset(args.eventos // 4).first()
+        despues_de = (mitad.fecha_presentacion, mitad.id)
+        mes = (ahora, ahora + timedelta(days=30))
+
+        casos = [
+            ("rango 30 días", repo.search_query(*mes).limit(20), False),
+            ("rango 30 días + tipo + estado", repo.search_query(*mes, tipo_id=1, estado_id=2).limit(20), False),
+            ("continuación keyset", repo.search_query(ahora, despues_de=despues_de).limit(20), False),
+            ("conteo rango 30 días", repo.search_query(*mes).order_by(None).with_entities(
+                func.count(Evento.id)), True),
+            ("claves rango 1 año", repo.search_query(ahora, ahora + timedelta(days=365)).with_entities(
+                Evento.fecha_presentacion, Evento.id), True),
+        ]
+        for nombre, consulta, index_only in casos:
+            errores += resumir(nombre, explicar(db, consulta, args.repeticiones), index_only)
+
+        # Referencia: paginación por offset sin filtros (comportamiento previo del listado)
+        offset = db.query(Evento).filter(
+            Evento.eliminado_en.is_(None)
+        ).offset(args.eventos // 2).limit(20)
+        resumir("referencia: offset a mitad de tabla", explicar(db, offset, args.repeticiones), False)
+    finally:
+        db.close()
+        if not args.conservar:
+            eliminar_esquema(engine, ESQUEMA)
+
+    for error in errores:
+        print(f"ERROR: {error}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
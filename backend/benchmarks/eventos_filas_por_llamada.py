@@ -0,0 +1,95 @@
+"""
+Regresión de filas leídas por llamada en las rutas de participantes de eventos.
+
+Crea un evento con N participantes (300 por defecto) en un esquema desechable y
+mide, para cada método de EventosService que solo necesita saber si el evento
+existe, cuántas filas devuelven sus SELECT. Verificar la existencia no debe
+cargar el evento con todos sus participantes.
+
+Uso (desde la raíz del repositorio, con el .env del servicio de eventos):
+    DATABASE_URL=postgresql://... SECRET_KEY=x \\
+        python backend/benchmarks/eventos_filas_por_llamada.py [--participantes 300]
+
+Termina con código 1 si alguna llamada supera su presupuesto de filas.
+"""
+import argparse
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from comun import CATALOGOS_EVENTOS, ContadorConsultas, crear_esquema, eliminar_esquema, usar_servicio
+
+ESQUEMA = "bench_filas_eventos"
+
+usar_servicio("eventos", ESQUEMA)
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import catalogs, outbox  # noqa: E402,F401
+from app.repositories.eventos_repository import EventosRepository  # noqa: E402
+from app.schemas.eventos import EventoCreate, ParticipanteEventoCreate, ParticipantesLoteCreate  # noqa: E402
+from app.services.eventos_service import EventosService  # noqa: E402
+
+
+def preparar(participantes: int):
+    crear_esquema(engine, Base.metadata, ESQUEMA, CATALOGOS_EVENTOS)
+    db = SessionLocal()
+    try:
+        evento = EventosRepository(db).create(EventoCreate(
+            nombre="Evento grande",
+            fecha_presentacion=datetime.now(timezone.utc) + timedelta(days=10),
+            tipo_codigo="concierto",
+            creado_por=uuid.uuid4()
+        ))
+        musicos = [uuid.uuid4() for _ in range(participantes)]
+        EventosService(db).add_participantes_lote(evento.id, ParticipantesLoteCreate(musico_ids=musicos))
+        return evento.id, musicos
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participantes", type=int, default=300)
+    parser.add_argument("--conservar", action="store_true", help="No borrar el esquema al terminar")
+    args = parser.parse_args(argv)
+
+    evento_id, musicos = preparar(args.participantes)
+    nuevo = uuid.uuid4()
+
+    # (nombre, llamada, filas máximas permitidas en SELECT)
+    casos = [
+        ("add_participante", lambda s: s.add_participante(
+            evento_id, ParticipanteEventoCreate(musico_id=nuevo)), 10),
+        ("get_participante_detail", lambda s: s.get_participante_detail(evento_id, musicos[0]), 2),
+        ("remove_participante", lambda s: s.remove_participante(evento_id, nuevo), 5),
+        ("get_participantes_evento", lambda s: s.get_participantes_evento(evento_id),
+         args.participantes + 1),
+    ]
+
+    errores = []
+    contador = ContadorConsultas()
+    try:
+        for nombre, llamada, presupuesto in casos:
+            db = SessionLocal()
+            try:
+                servicio = EventosService(db)
+                with contador.midiendo(engine):
+                    llamada(servicio)
+            finally:
+                db.close()
+            estado = "ok" if contador.filas <= presupuesto else "EXCEDE"
+            print(f"{nombre:<26} selects={len(contador.sentencias):>3} filas={contador.filas:>5} "
+                  f"presupuesto={presupuesto:>5}  {estado}")
+            if contador.filas > presupuesto:
+                errores.append(f"{nombre}: {contador.filas} filas (máximo {presupuesto})")
+    finally:
+        if not args.conservar:
+            eliminar_esquema(engine, ESQUEMA)
+
+    for error in errores:
+        print(f"ERROR: {error}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,463 @@
+"""
+Generador determinista de datos de volumen para pruebas de rendimiento.
+
+Llena las tablas de músicos y eventos de una base ya creada con schema.sql y
+las migraciones (catálogos incluidos) con datos realistas:
+
+- músicos con 1-5 instrumentos distintos (uk_musico_instrumento, máximo
+  ValidationService.MAX_INSTRUMENTOS_TOTAL, hasta 2 principales) y estados
+  sesgados (mayoría activos, pocos retirados, ~2% eliminados);
+- eventos en los 3 años anteriores y el año siguiente a --fecha-referencia, con
+  tipos y estados coherentes con la fecha (los pasados casi todos completados);
+- participaciones con tamaños de roster de cola larga (Pareto) y estados
+  sesgados, sin repetir músico dentro de un evento (uk_evento_musico).
+
+Los mismos --semilla, volúmenes y --fecha-referencia producen exactamente los
+mismos datos (también los UUID): cada fila se deriva de la semilla y su índice,
+no del orden en que la generan los procesos. Cada tabla se carga con COPY en
+bloques de BLOQUE filas repartidos entre --procesos procesos; los IDs de los
+catálogos se leen de la base, así que las FK de catálogo siempre son válidas.
+
+Uso (desde la raíz del repositorio):
+    DATABASE_URL=postgresql://... python backend/benchmarks/generar_datos.py \\
+        [--musicos 1000000] [--eventos 100000] [--participaciones 5000000] \\
+        [--semilla 42] [--procesos 8] [--truncar]
+
+Al terminar reconstruye resumen_participantes_evento con
+app.commands.resumen_participantes y ejecuta ANALYZE. La carga no pasa por el
+outbox: no genera cambios para el change feed.
+"""
+import argparse
+import hashlib
+import io
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+import unicodedata
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from comun import SERVICIOS
+
+# Filas por COPY; fijo para que el reparto en bloques no dependa de la máquina
+BLOQUE = 50_000
+
+# Reglas de negocio de app/core/validation_service.py (servicio de músicos)
+MAX_INSTRUMENTOS_TOTAL = 5
+MAX_INSTRUMENTOS_PRINCIPALES = 2
+DOMINIOS_EMAIL = ("gmail.com", "hotmail.com", "outlook.com", "yahoo.com")
+
+NOMBRES = (
+    "Ana", "Carlos", "Lucía", "Miguel", "Sofía", "Javier", "Valeria", "Diego", "Camila", "Andrés",
+    "Isabel", "Fernando", "Daniela", "Jorge", "Paula", "Ricardo", "Mariana", "Luis", "Gabriela", "Pablo",
+    "Elena", "Raúl", "Natalia", "Héctor", "Regina", "Tomás", "Renata", "Emilio", "Ximena", "Óscar",
+)
+APELLIDOS = (
+    "García", "Martínez", "López", "Hernández", "González", "Pérez", "Rodríguez", "Sánchez", "Ramírez",
+    "Torres", "Flores", "Rivera", "Gómez", "Díaz", "Cruz", "Morales", "Reyes", "Gutiérrez", "Ortiz",
+    "Castillo", "Jiménez", "Ruiz", "Vargas", "Mendoza", "Aguilar", "Romero", "Herrera", "Medina",
+)
+LUGARES = (
+    "Auditorio Nacional", "Teatro de la Ciudad", "Foro Sol", "Sala Nezahualcóyotl", "Estudio A",
+    "Estudio B", "Sala de ensayo 1", "Sala de ensayo 2", "Plaza Principal", "Centro Cultural",
+)
+
+# (código, peso): distribuciones sesgadas por catálogo
+ESTADOS_MUSICO = (("activo", 85), ("inactivo", 12), ("retirado", 3))
+TIPOS_EVENTO = (("ensayo", 50), ("concierto", 30), ("grabacion", 15), ("otro", 5))
+ESTADOS_EVENTO_PASADO = (("completado", 92), ("cancelado", 8))
+ESTADOS_EVENTO_FUTURO = (("planificacion", 60), ("ensayando", 35), ("cancelado", 5))
+ESTADOS_PARTICIPANTE_PASADO = (("confirmado", 80), ("rechazado", 15), ("invitado", 5))
+ESTADOS_PARTICIPANTE_FUTURO = (("invitado", 50), ("confirmado", 40), ("rechazado", 10))
+INSTRUMENTOS_POR_MUSICO = ((1, 40), (2, 30), (3, 15), (4, 10), (5, 5))
+NIVELES = (("principiante", 30), ("intermedio", 45), ("avanzado", 25))
+
+# Espacios de la semilla por tabla, para que cada una tenga su propia secuencia
+_MUSICOS, _INSTRUMENTOS, _EVENTOS, _PARTICIPANTES, _TAMANOS = range(5)
+
+
+# ==================== DETERMINISMO ====================
+
+def identificador(semilla: int, tabla: str, indice: int) -> str:
+    """UUID (v4) derivado de la semilla y el índice de la fila"""
+    return str(uuid.UUID(bytes=hashlib.md5(f"{semilla}:{tabla}:{indice}".encode()).digest(), version=4))
+
+
+def _rng(semilla: int, espacio: int, indice: int) -> random.Random:
+    return random.Random((semilla * 8 + espacio) * 10 ** 10 + indice)
+
+
+class _Eleccion:
+    """Elección ponderada rápida sobre una distribución fija"""
+
+    def __init__(self, opciones: Sequence[Tuple[object, int]]):
+        self.valores = [valor for valor, _ in opciones]
+        acumulado, self.acumulados = 0, []
+        for _, peso in opciones:
+            acumulado += peso
+            self.acumulados.append(acumulado)
+
+    def __call__(self, rng: random.Random):
+        return rng.choices(self.valores, cum_weights=self.acumulados)[0]
+
+
+def _ascii(texto: str) -> str:
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode().lower()
+
+
+def _copy_texto(valor) -> str:
+    if valor is None:
+        return "\\N"
+    if isinstance(valor, bool):
+        return "t" if valor else "f"
+    texto = str(valor)
+    if "\\" in texto or "\t" in texto or "\n" in texto:
+        texto = texto.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+    return texto
+
+
+# ==================== PLAN ====================
+
+@dataclass
+class Plan:
+    """Parámetros compartidos con los procesos de carga"""
+    url: str
+    semilla: int
+    musicos: int
+    eventos: int
+    esquema_musicos: str
+    esquema_eventos: str
+    referencia: datetime
+    catalogos: Dict[str, Dict[str, int]]
+    instrumentos: List[int]
+    tamanos_roster: List[int] = field(default_factory=list)
+
+
+def tamanos_roster(semilla: int, eventos: int, participaciones: int, musicos: int) -> List[int]:
+    """Participantes por evento: cola larga (Pareto) escalada al total pedido"""
+    rng = _rng(semilla, _TAMANOS, 0)
+    pesos = [rng.paretovariate(1.6) for _ in range(eventos)]
+    escala = participaciones / sum(pesos) if pesos else 0
+    return [min(musicos, max(1, int(peso * escala + 0.5))) for peso in pesos]
+
+
+# ==================== FILAS ====================
+
+def filas_musicos(plan: Plan, inicio: int, fin: int) -> Iterator[tuple]:
+    estado = _Eleccion([(plan.catalogos["estados_musico"][c], p) for c, p in ESTADOS_MUSICO])
+    for i in range(inicio, fin):
+        rng = _rng(plan.semilla, _MUSICOS, i)
+        nombre, apellido, segundo = rng.choice(NOMBRES), rng.choice(APELLIDOS), rng.choice(APELLIDOS)
+        ingreso = plan.referencia - timedelta(days=rng.randrange(3650), seconds=rng.randrange(86400))
+        eliminado = ingreso + timedelta(days=rng.randrange(1, 365)) if rng.random() < 0.02 else None
+        yield (
+            identificador(plan.semilla, "musico", i),
+            # El índice garantiza unicidad del email
+            f"{_ascii(nombre)}.{_ascii(apellido)}.{i}@{DOMINIOS_EMAIL[i % len(DOMINIOS_EMAIL)]}",
+            f"{nombre} {apellido} {segundo}",
+            f"55{rng.randrange(10 ** 8):08d}",
+            ingreso,
+            estado(rng),
+            None,
+            ingreso,
+            eliminado or ingreso,
+            eliminado,
+        )
+
+
+def filas_instrumentos(plan: Plan, inicio: int, fin: int) -> Iterator[tuple]:
+    cantidad = _Eleccion(INSTRUMENTOS_POR_MUSICO)
+    nivel = _Eleccion([(plan.catalogos["niveles_habilidad"][c], p) for c, p in NIVELES])
+    # Popularidad sesgada: los primeros del catálogo (voz, guitarras, bajo, batería) son más comunes
+    pesos = [1.0 / (posicion + 1) ** 0.8 for posicion in range(len(plan.instrumentos))]
+    limite = min(MAX_INSTRUMENTOS_TOTAL, len(plan.instrumentos))
+    for i in range(inicio, fin):
+        rng = _rng(plan.semilla, _INSTRUMENTOS, i)
+        elegidos: List[int] = []
+        objetivo = min(cantidad(rng), limite)
+        while len(elegidos) < objetivo:
+            instrumento = rng.choices(plan.instrumentos, weights=pesos)[0]
+            if instrumento not in elegidos:  # uk_musico_instrumento
+                elegidos.append(instrumento)
+        principales = 2 if objetivo > 1 and rng.random() < 0.2 else 1
+        musico_id = identificador(plan.semilla, "musico", i)
+        for j, instrumento in enumerate(elegidos):
+            yield (
+                identificador(plan.semilla, "instrumento_musico", i * MAX_INSTRUMENTOS_TOTAL + j),
+                musico_id,
+                instrumento,
+                nivel(rng),
+                j < min(principales, MAX_INSTRUMENTOS_PRINCIPALES),
+                (plan.referencia - timedelta(days=rng.randrange(7300))).date(),
+                None,
+            )
+
+
+def _fecha_evento(plan: Plan, i: int, rng: random.Random) -> datetime:
+    # Repartidos uniformemente de -3 años a +1 año, a horas de función (10:00 a 22:00)
+    dias = -1095 + (i * 1460) // max(plan.eventos, 1)
+    return (plan.referencia + timedelta(days=dias)).replace(hour=10 + rng.randrange(13), minute=0, second=0)
+
+
+def filas_eventos(plan: Plan, inicio: int, fin: int) -> Iterator[tuple]:
+    tipos = plan.catalogos["tipos_evento"]
+    estados = plan.catalogos["estados_evento"]
+    tipo = _Eleccion([(tipos[c], p) for c, p in TIPOS_EVENTO])
+    pasado = _Eleccion([(estados[c], p) for c, p in ESTADOS_EVENTO_PASADO])
+    futuro = _Eleccion([(estados[c], p) for c, p in ESTADOS_EVENTO_FUTURO])
+    for i in range(inicio, fin):
+        rng = _rng(plan.semilla, _EVENTOS, i)
+        fecha = _fecha_evento(plan, i, rng)
+        creado = fecha - timedelta(days=7 + rng.randrange(120))
+        eliminado = creado + timedelta(days=1) if rng.random() < 0.01 else None
+        yield (
+            identificador(plan.semilla, "evento", i),
+            f"Evento {i + 1}",
+            None,
+            tipo(rng),
+            rng.choice(LUGARES),
+            fecha,
+            (pasado if fecha < plan.referencia else futuro)(rng),
+            identificador(plan.semilla, "musico", rng.randrange(plan.musicos)),
+            creado,
+            creado,
+            eliminado,
+        )
+
+
+def filas_participantes(plan: Plan, inicio: int, fin: int) -> Iterator[tuple]:
+    estados = plan.catalogos["estados_participante"]
+    pasado = _Eleccion([(estados[c], p) for c, p in ESTADOS_PARTICIPANTE_PASADO])
+    futuro = _Eleccion([(estados[c], p) for c, p in ESTADOS_PARTICIPANTE_FUTURO])
+    for e in range(inicio, fin):
+        rng = _rng(plan.semilla, _PARTICIPANTES, e)
+        fecha = _fecha_evento(plan, e, _rng(plan.semilla, _EVENTOS, e))
+        estado = pasado if fecha < plan.referencia else futuro
+        evento_id = identificador(plan.semilla, "evento", e)
+        # sample sobre range no materializa la lista: músicos distintos por evento (uk_evento_musico)
+        for m in rng.sample(range(plan.musicos), plan.tamanos_roster[e]):
+            yield (
+                identificador(plan.semilla, "participante", e * plan.musicos + m),
+                evento_id,
+                identificador(plan.semilla, "musico", m),
+                estado(rng),
+                fecha - timedelta(days=rng.randrange(1, 60)),
+            )
+
+
+TABLAS = {
+    # tabla: (esquema del plan, columnas, generador)
+    "musicos": ("esquema_musicos", (
+        "id", "email", "nombre", "telefono", "fecha_ingreso", "estado_id", "url_foto_perfil",
+        "creado_en", "actualizado_en", "eliminado_en"), filas_musicos),
+    "instrumentos_musico": ("esquema_musicos", (
+        "id", "musico_id", "instrumento_id", "nivel_id", "es_principal", "fecha_inicio", "notas"),
+        filas_instrumentos),
+    "eventos": ("esquema_eventos", (
+        "id", "nombre", "descripcion", "tipo_id", "lugar", "fecha_presentacion", "estado_id", "creado_por",
+        "creado_en", "actualizado_en", "eliminado_en"), filas_eventos),
+    "participantes_evento": ("esquema_eventos", (
+        "id", "evento_id", "musico_id", "estado_id", "unido_en"), filas_participantes),
+}
+
+
+# ==================== CARGA ====================
+
+_plan: Optional[Plan] = None
+
+
+def _inicializar(plan: Plan) -> None:
+    global _plan
+    _plan = plan
+
+
+def _conectar(url: str):
+    import psycopg2
+
+    # La URL de SQLAlchemy puede traer el driver (postgresql+psycopg2://)
+    return psycopg2.connect(url.replace("+psycopg2", "", 1))
+
+
+def _cargar_bloque(tarea: Tuple[str, int, int]) -> Tuple[str, int, float]:
+    tabla, inicio, fin = tarea
+    esquema_attr, columnas, generador = TABLAS[tabla]
+    inicio_t = time.perf_counter()
+    buffer = io.StringIO()
+    filas = 0
+    for fila in generador(_plan, inicio, fin):
+        buffer.write("\t".join(map(_copy_texto, fila)))
+        buffer.write("\n")
+        filas += 1
+    buffer.seek(0)
+    conn = _conectar(_plan.url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET synchronous_commit = off")
+            cursor.copy_expert(
+                f"COPY {getattr(_plan, esquema_attr)}.{tabla} ({', '.join(columnas)}) FROM STDIN", buffer
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    return tabla, filas, time.perf_counter() - inicio_t
+
+
+def _bloques(total: int) -> Iterable[Tuple[int, int]]:
+    for inicio in range(0, total, BLOQUE):
+        yield inicio, min(inicio + BLOQUE, total)
+
+
+def _bloques_participantes(tamanos: List[int]) -> Iterable[Tuple[int, int]]:
+    """Rangos de eventos con ~BLOQUE participaciones cada uno"""
+    inicio, acumulado = 0, 0
+    for e, tamano in enumerate(tamanos):
+        acumulado += tamano
+        if acumulado >= BLOQUE:
+            yield inicio, e + 1
+            inicio, acumulado = e + 1, 0
+    if inicio < len(tamanos):
+        yield inicio, len(tamanos)
+
+
+def _ejecutar_fase(pool, tareas: List[Tuple[str, int, int]]) -> None:
+    inicio = time.perf_counter()
+    por_tabla: Dict[str, int] = {}
+    for tabla, filas, _ in pool.imap_unordered(_cargar_bloque, tareas):
+        por_tabla[tabla] = por_tabla.get(tabla, 0) + filas
+    duracion = time.perf_counter() - inicio
+    for tabla, filas in por_tabla.items():
+        print(f"  {tabla:<22} {filas:>10,} filas")
+    total = sum(por_tabla.values())
+    print(f"  {'':<22} {total:>10,} filas en {duracion:.1f} s ({total / max(duracion, 1e-9):,.0f} filas/s)")
+
+
+def leer_catalogos(
+    url: str, esquema_musicos: str, esquema_eventos: str, esquema_canciones: str
+) -> Tuple[Dict[str, Dict[str, int]], List[int]]:
+    requeridos = {
+        "estados_musico": (f"{esquema_musicos}.cat_estados_musico", ESTADOS_MUSICO),
+        "tipos_evento": (f"{esquema_eventos}.cat_tipos_evento", TIPOS_EVENTO),
+        "estados_evento": (f"{esquema_eventos}.cat_estados_evento",
+                           ESTADOS_EVENTO_PASADO + ESTADOS_EVENTO_FUTURO),
+        "estados_participante": (f"{esquema_eventos}.cat_estados_participante",
+                                 ESTADOS_PARTICIPANTE_PASADO + ESTADOS_PARTICIPANTE_FUTURO),
+        # instrumentos_musico.nivel_id referencia el catálogo compartido de niveles
+        "niveles_habilidad": (f"{esquema_canciones}.cat_niveles_habilidad", NIVELES),
+    }
+    catalogos: Dict[str, Dict[str, int]] = {}
+    conn = _conectar(url)
+    try:
+        with conn.cursor() as cursor:
+            for nombre, (tabla, distribucion) in requeridos.items():
+                cursor.execute(f"SELECT codigo, id FROM {tabla}")
+                catalogos[nombre] = dict(cursor.fetchall())
+                faltantes = {codigo for codigo, _ in distribucion} - set(catalogos[nombre])
+                if faltantes:
+                    raise SystemExit(f"Faltan códigos en {tabla}: {', '.join(sorted(faltantes))}")
+            cursor.execute(f"SELECT id FROM {esquema_musicos}.cat_instrumentos WHERE activo ORDER BY orden, id")
+            instrumentos = [fila[0] for fila in cursor.fetchall()]
+            if not instrumentos:
+                raise SystemExit(f"{esquema_musicos}.cat_instrumentos está vacío")
+    finally:
+        conn.close()
+    return catalogos, instrumentos
+
+
+def preparar_tablas(url: str, esquema_musicos: str, esquema_eventos: str, truncar: bool) -> None:
+    tablas = [f"{esquema_musicos}.musicos", f"{esquema_musicos}.instrumentos_musico",
+              f"{esquema_eventos}.eventos", f"{esquema_eventos}.participantes_evento"]
+    conn = _conectar(url)
+    try:
+        with conn.cursor() as cursor:
+            if truncar:
+                cursor.execute(f"TRUNCATE {', '.join(tablas)}, "
+                               f"{esquema_eventos}.resumen_participantes_evento CASCADE")
+            else:
+                for tabla in tablas:
+                    cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {tabla})")
+                    if cursor.fetchone()[0]:
+                        raise SystemExit(f"{tabla} ya tiene datos; use --truncar para reemplazarlos")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def finalizar(url: str, esquema_musicos: str, esquema_eventos: str) -> None:
+    entorno = {**os.environ, "DATABASE_URL": url, "DATABASE_SCHEMA": esquema_eventos}
+    subprocess.run(
+        [sys.executable, "-m", "app.commands.resumen_participantes", "rebuild"],
+        cwd=SERVICIOS / "eventos", env=entorno, check=True
+    )
+    conn = _conectar(url)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            for tabla in (f"{esquema_musicos}.musicos", f"{esquema_musicos}.instrumentos_musico",
+                          f"{esquema_eventos}.eventos", f"{esquema_eventos}.participantes_evento",
+                          f"{esquema_eventos}.resumen_participantes_evento"):
+                cursor.execute(f"VACUUM (ANALYZE) {tabla}")
+    finally:
+        conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--musicos", type=int, default=1_000_000)
+    parser.add_argument("--eventos", type=int, default=100_000)
+    parser.add_argument("--participaciones", type=int, default=5_000_000, help="Total aproximado")
+    parser.add_argument("--fecha-referencia", type=date.fromisoformat, default=date(2026, 1, 1),
+                        help="'Hoy' de los datos generados (YYYY-MM-DD); fija para que la salida sea reproducible")
+    parser.add_argument("--esquema-musicos", default="servicio_musicos")
+    parser.add_argument("--esquema-eventos", default="servicio_eventos")
+    parser.add_argument("--esquema-canciones", default="servicio_canciones", help="Catálogo de niveles de habilidad")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--truncar", action="store_true", help="Vaciar las tablas antes de cargar")
+    args = parser.parse_args(argv)
+
+    if not args.database_url:
+        parser.error("DATABASE_URL o --database-url es obligatorio")
+    if args.musicos < 1 or args.eventos < 1:
+        parser.error("--musicos y --eventos deben ser al menos 1")
+
+    preparar_tablas(args.database_url, args.esquema_musicos, args.esquema_eventos, args.truncar)
+    catalogos, instrumentos = leer_catalogos(
+        args.database_url, args.esquema_musicos, args.esquema_eventos, args.esquema_canciones
+    )
+    plan = Plan(
+        url=args.database_url,
+        semilla=args.semilla,
+        musicos=args.musicos,
+        eventos=args.eventos,
+        esquema_musicos=args.esquema_musicos,
+        esquema_eventos=args.esquema_eventos,
+        referencia=datetime.combine(args.fecha_referencia, datetime.min.time(), tzinfo=timezone.utc),
+        catalogos=catalogos,
+        instrumentos=instrumentos,
+        tamanos_roster=tamanos_roster(args.semilla, args.eventos, args.participaciones, args.musicos),
+    )
+
+    inicio = time.perf_counter()
+    with multiprocessing.Pool(args.procesos, initializer=_inicializar, initargs=(plan,)) as pool:
+        # Las FK van de instrumentos_musico a musicos y de participantes_evento a eventos
+        print("Fase 1: musicos y eventos")
+        _ejecutar_fase(pool, [("musicos", *b) for b in _bloques(plan.musicos)]
+                       + [("eventos", *b) for b in _bloques(plan.eventos)])
+        print("Fase 2: instrumentos_musico y participantes_evento")
+        _ejecutar_fase(pool, [("instrumentos_musico", *b) for b in _bloques(plan.musicos)]
+                       + [("participantes_evento", *b) for b in _bloques_participantes(plan.tamanos_roster)])
+
+    print("Reconstruyendo resumen_participantes_evento y ejecutando ANALYZE...")
+    finalizar(args.database_url, args.esquema_musicos, args.esquema_eventos)
+    print(f"Listo en {time.perf_counter() - inicio:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
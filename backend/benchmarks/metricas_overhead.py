@@ -0,0 +1,106 @@
+"""
+Costo por solicitud de las métricas de Prometheus (app/core/metricas.py).
+
+Mide, sin base de datos, lo que agregan al camino caliente de una solicitud:
+el MetricasMiddleware (solicitudes en curso + histograma de latencia por ruta),
+el etiquetado de métodos de repositorio y la observación de cada sentencia SQL.
+El total se estima para una solicitud típica con --sentencias consultas.
+
+Uso (desde la raíz del repositorio; no necesita PostgreSQL):
+    python backend/benchmarks/metricas_overhead.py [--servicio musicos] [--sentencias 5]
+
+Termina con código 1 si el costo por solicitud supera --presupuesto-us (20 µs).
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from comun import usar_servicio
+
+
+class _Ruta:
+    path = "/api/v1/musicos/{musico_id}"
+
+
+async def _app_vacia(scope, receive, send):
+    scope["route"] = _Ruta
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _recibir():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _enviar(message):
+    pass
+
+
+def medir_app(app, solicitudes: int) -> float:
+    """Microsegundos por solicitud de una app ASGI"""
+    async def correr():
+        inicio = time.perf_counter()
+        for _ in range(solicitudes):
+            await app({"type": "http", "method": "GET", "path": "/api/v1/musicos/1"}, _recibir, _enviar)
+        return time.perf_counter() - inicio
+    return asyncio.run(correr()) / solicitudes * 1e6
+
+
+def medir_llamada(funcion, veces: int) -> float:
+    """Microsegundos por llamada"""
+    inicio = time.perf_counter()
+    for _ in range(veces):
+        funcion()
+    return (time.perf_counter() - inicio) / veces * 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servicio", choices=("eventos", "musicos"), default="musicos")
+    parser.add_argument("--solicitudes", type=int, default=100_000)
+    parser.add_argument("--sentencias", type=int, default=5, help="Consultas SQL por solicitud típica")
+    parser.add_argument("--rondas", type=int, default=5)
+    parser.add_argument("--presupuesto-us", type=float, default=20.0)
+    args = parser.parse_args(argv)
+
+    usar_servicio(args.servicio, "public")
+    from app.core import metricas
+
+    @metricas.medir_repositorio
+    class Repositorio:
+        def get_by_id(self):
+            metricas._observar_sentencia("SELECT 1", {}, 0.0004)
+
+    repo = Repositorio()
+    middleware = metricas.MetricasMiddleware(_app_vacia)
+
+    middleware_us, sentencia_us = [], []
+    for _ in range(args.rondas):
+        base = medir_app(_app_vacia, args.solicitudes)
+        middleware_us.append(medir_app(middleware, args.solicitudes) - base)
+        sentencia_us.append(medir_llamada(repo.get_by_id, args.solicitudes))
+
+    middleware_med = statistics.median(middleware_us)
+    sentencia_med = statistics.median(sentencia_us)
+    total = middleware_med + args.sentencias * sentencia_med
+    print(f"middleware por solicitud              {middleware_med:>7.2f} µs")
+    print(f"método de repositorio + sentencia     {sentencia_med:>7.2f} µs")
+    print(f"solicitud con {args.sentencias} sentencias             {total:>7.2f} µs  "
+          f"(presupuesto {args.presupuesto_us:.0f} µs)")
+
+    # La exposición no está en el camino caliente, pero no debería crecer con el tráfico
+    inicio = time.perf_counter()
+    texto = metricas.registro.exponer()
+    print(f"scrape de /metrics                    {(time.perf_counter() - inicio) * 1000:>7.2f} ms  "
+          f"({len(texto.splitlines())} líneas)")
+
+    if total > args.presupuesto_us:
+        print(f"ERROR: {total:.2f} µs por solicitud (máximo {args.presupuesto_us:.0f} µs)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
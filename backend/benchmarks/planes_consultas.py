@@ -0,0 +1,317 @@
+"""
+Regresión de planes de las consultas calientes de los repositorios.
+
+Ejecuta cada método de repositorio contra una base ya sembrada (por ejemplo con
+generar_datos.py), captura las SELECT que emite el ORM tal cual y las pasa por
+EXPLAIN (FORMAT JSON). Para cada caso verifica que:
+- las tablas indicadas se lean con alguno de los índices esperados, nunca con
+  Seq Scan (envolver `email` en lower() rompería `musicos.get_by_email`);
+- no haya Sort cuando el índice ya da el orden;
+- la estimación de filas del nodo raíz no supere la cota del caso.
+
+Solo usa EXPLAIN sin ANALYZE y revierte la sesión: no modifica datos.
+
+Uso (desde la raíz del repositorio):
+    DATABASE_URL=postgresql://... python backend/benchmarks/planes_consultas.py \\
+        [--servicio musicos|eventos] [--markdown planes.md]
+
+Sin --servicio revisa ambos servicios, cada uno en su propio proceso. Termina
+con código 1 si algún plan no cumple lo esperado.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from comun import SERVICIOS, usar_servicio
+
+ESQUEMAS = {"musicos": "servicio_musicos", "eventos": "servicio_eventos"}
+
+# Con menos filas el planner prefiere Seq Scan aunque el índice sirva
+FILAS_MINIMAS = 10_000
+
+
+@dataclass
+class Caso:
+    nombre: str
+    llamada: Callable  # (db) -> resultado del repositorio
+    # tabla -> índices aceptables; la tabla no puede leerse con Seq Scan
+    indices: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    sin_sort: bool = False
+    max_filas: Optional[float] = None
+    nota: str = ""
+
+
+@dataclass
+class Resultado:
+    caso: Caso
+    planes: List[dict] = field(default_factory=list)
+    errores: List[str] = field(default_factory=list)
+
+
+def nodos(plan: dict):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from nodos(hijo)
+
+
+def describir(plan: dict, nivel: int = 0) -> List[str]:
+    """Árbol compacto del plan: tipo de nodo, tabla, índice y filas estimadas"""
+    texto = plan["Node Type"]
+    if plan.get("Relation Name"):
+        texto += f" on {plan['Relation Name']}"
+    if plan.get("Index Name"):
+        texto += f" using {plan['Index Name']}"
+    lineas = [f"{'  ' * nivel}-> {texto}  (filas≈{plan.get('Plan Rows', 0):g})"]
+    for hijo in plan.get("Plans", []):
+        lineas += describir(hijo, nivel + 1)
+    return lineas
+
+
+def verificar(caso: Caso, planes: List[dict]) -> List[str]:
+    errores = []
+    todos = [nodo for plan in planes for nodo in nodos(plan)]
+    for tabla, aceptables in caso.indices.items():
+        lecturas = [n for n in todos if n.get("Relation Name") == tabla]
+        if not lecturas:
+            errores.append(f"{tabla} no aparece en el plan")
+            continue
+        for nodo in lecturas:
+            if nodo["Node Type"] == "Seq Scan":
+                errores.append(f"Seq Scan sobre {tabla} (se esperaba {' | '.join(aceptables)})")
+            elif nodo.get("Index Name") and nodo["Index Name"] not in aceptables:
+                errores.append(f"{tabla} usa {nodo['Index Name']} (se esperaba {' | '.join(aceptables)})")
+    if caso.sin_sort:
+        for nodo in todos:
+            if nodo["Node Type"] in ("Sort", "Incremental Sort"):
+                errores.append(f"ordenamiento explícito ({nodo['Node Type']}) en lugar del orden del índice")
+    if caso.max_filas is not None:
+        for plan in planes:
+            if plan.get("Plan Rows", 0) > caso.max_filas:
+                errores.append(f"estimación de {plan['Plan Rows']:g} filas (máximo {caso.max_filas:g})")
+    return errores
+
+
+class CapturaSentencias:
+    """Registra las SELECT que emite el engine mientras está activa"""
+
+    def __init__(self):
+        self.sentencias: List[Tuple[str, object]] = []
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.sentencias.append((statement, parameters))
+
+    @contextmanager
+    def capturando(self, engine):
+        from sqlalchemy import event
+
+        self.sentencias = []
+        event.listen(engine, "before_cursor_execute", self._antes)
+        try:
+            yield self
+        finally:
+            event.remove(engine, "before_cursor_execute", self._antes)
+
+
+def explicar_caso(caso: Caso, engine, SessionLocal) -> Resultado:
+    resultado = Resultado(caso)
+    captura = CapturaSentencias()
+    db = SessionLocal()
+    try:
+        with captura.capturando(engine):
+            caso.llamada(db)
+        db.rollback()
+        conn = db.connection()
+        for sql, parametros in captura.sentencias:
+            plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, parametros).scalar()[0]["Plan"]
+            resultado.planes.append(plan)
+    finally:
+        db.rollback()
+        db.close()
+    if not resultado.planes:
+        resultado.errores.append("el método no emitió ninguna SELECT")
+    else:
+        resultado.errores = verificar(caso, resultado.planes)
+    return resultado
+
+
+# ==================== CASOS ====================
+
+def casos_musicos(db) -> List[Caso]:
+    from sqlalchemy import text
+    from app.repositories.instrumentos_musico_repository import InstrumentosMusicoRepository
+    from app.repositories.musicos_repository import MusicosRepository
+
+    # Un músico vivo con instrumentos, a mitad de la tabla
+    musico_id, email, nombre, instrumento_id = db.execute(text("""
+        SELECT m.id, m.email, split_part(m.nombre, ' ', 2), im.instrumento_id
+        FROM musicos m JOIN instrumentos_musico im ON im.musico_id = m.id
+        WHERE m.eliminado_en IS NULL
+        ORDER BY m.id OFFSET (SELECT count(*) / 2 FROM musicos) LIMIT 1
+    """)).one()
+
+    indices_musico = ("musicos_pkey",)
+    indices_email = ("uk_musicos_email",)
+    indices_instrumentos = ("idx_instrumentos_musico", "uk_musico_instrumento")
+    return [
+        Caso("MusicosRepository.get_by_email", lambda db: MusicosRepository(db).get_by_email(email),
+             indices={"musicos": indices_email}, max_filas=1),
+        Caso("MusicosRepository.get_by_id", lambda db: MusicosRepository(db).get_by_id(musico_id),
+             indices={"musicos": indices_musico}, max_filas=1),
+        Caso("MusicosRepository.get_by_id_with_relationships",
+             lambda db: MusicosRepository(db).get_by_id_with_relationships(musico_id),
+             indices={"musicos": indices_musico, "instrumentos_musico": indices_instrumentos}, max_filas=50),
+        Caso("MusicosRepository.get_all_with_relationships",
+             lambda db: MusicosRepository(db).get_all_with_relationships(limit=20),
+             indices={"instrumentos_musico": indices_instrumentos}, max_filas=500,
+             nota="La página de músicos se lee en orden físico; los instrumentos deben venir por índice"),
+        Caso("MusicosRepository.search_by_name",
+             lambda db: MusicosRepository(db).search_by_name(nombre, limit=20),
+             indices={"instrumentos_musico": indices_instrumentos}, max_filas=500,
+             nota="ILIKE '%...%' no puede usar un índice btree: Seq Scan de musicos conocido"),
+        Caso("InstrumentosMusicoRepository.get_by_musico",
+             lambda db: InstrumentosMusicoRepository(db).get_by_musico(musico_id),
+             indices={"instrumentos_musico": indices_instrumentos}, max_filas=50),
+        Caso("InstrumentosMusicoRepository.count_by_musico",
+             lambda db: InstrumentosMusicoRepository(db).count_by_musico(musico_id),
+             indices={"instrumentos_musico": indices_instrumentos}, max_filas=1),
+        Caso("InstrumentosMusicoRepository.get_by_musico_and_instrumento",
+             lambda db: InstrumentosMusicoRepository(db).get_by_musico_and_instrumento(musico_id, instrumento_id),
+             indices={"instrumentos_musico": indices_instrumentos}, max_filas=1),
+    ]
+
+
+def casos_eventos(db) -> List[Caso]:
+    from datetime import timedelta
+    from sqlalchemy import text
+    from app.repositories.eventos_repository import EventosRepository
+    from app.repositories.participantes_evento_repository import ParticipantesEventoRepository
+
+    # Un evento con participantes y uno de sus músicos, a mitad de la tabla
+    evento_id, musico_id, fecha = db.execute(text("""
+        SELECT e.id, pe.musico_id, e.fecha_presentacion
+        FROM eventos e JOIN participantes_evento pe ON pe.evento_id = e.id
+        WHERE e.eliminado_en IS NULL
+        ORDER BY e.fecha_presentacion OFFSET (SELECT count(*) / 2 FROM participantes_evento) LIMIT 1
+    """)).one()
+
+    indices_evento = ("eventos_pkey",)
+    indices_participantes = ("idx_participantes_evento_evento", "uk_evento_musico")
+    return [
+        Caso("EventosRepository.get_by_id", lambda db: EventosRepository(db).get_by_id(evento_id),
+             indices={"eventos": indices_evento, "participantes_evento": indices_participantes}),
+        Caso("EventosRepository.exists", lambda db: EventosRepository(db).exists(evento_id),
+             indices={"eventos": indices_evento}, max_filas=1),
+        Caso("EventosRepository.search (30 días)",
+             lambda db: EventosRepository(db).search(fecha, fecha + timedelta(days=30), limit=20),
+             indices={"eventos": ("idx_eventos_fecha_presentacion",)}, sin_sort=True, max_filas=20),
+        Caso("EventosRepository.count_search (30 días)",
+             lambda db: EventosRepository(db).count_search(fecha, fecha + timedelta(days=30)),
+             indices={"eventos": ("idx_eventos_fecha_presentacion",)}, max_filas=1),
+        Caso("ParticipantesEventoRepository.get_by_evento",
+             lambda db: ParticipantesEventoRepository(db).get_by_evento(evento_id),
+             indices={"participantes_evento": indices_participantes}),
+        Caso("ParticipantesEventoRepository.get_by_evento_and_musico",
+             lambda db: ParticipantesEventoRepository(db).get_by_evento_and_musico(evento_id, musico_id),
+             indices={"participantes_evento": indices_participantes + ("idx_participantes_evento_musico",)},
+             max_filas=1),
+        Caso("ParticipantesEventoRepository.count_by_evento",
+             lambda db: ParticipantesEventoRepository(db).count_by_evento(evento_id),
+             indices={"participantes_evento": indices_participantes}, max_filas=1),
+        Caso("ParticipantesEventoRepository.get_agenda",
+             lambda db: ParticipantesEventoRepository(db).get_agenda([musico_id]),
+             indices={"participantes_evento": ("idx_participantes_evento_musico",),
+                      "eventos": indices_evento}),
+    ]
+
+
+CASOS = {"musicos": casos_musicos, "eventos": casos_eventos}
+TABLAS_PRINCIPALES = {"musicos": ("musicos", "instrumentos_musico"), "eventos": ("eventos", "participantes_evento")}
+
+
+# ==================== SALIDA ====================
+
+def imprimir(servicio: str, resultados: List[Resultado]) -> None:
+    print(f"\n== {servicio} ==")
+    for resultado in resultados:
+        estado = "ok " if not resultado.errores else "FALLA"
+        print(f"[{estado}] {resultado.caso.nombre}")
+        if resultado.caso.nota:
+            print(f"        nota: {resultado.caso.nota}")
+        for plan in resultado.planes:
+            for linea in describir(plan):
+                print(f"        {linea}")
+        for error in resultado.errores:
+            print(f"        ERROR: {error}")
+
+
+def markdown(servicio: str, resultados: List[Resultado]) -> str:
+    lineas = [f"### {servicio}", "", "| Consulta | Resultado | Lecturas | Filas est. |", "|---|---|---|---|"]
+    for resultado in resultados:
+        lecturas = sorted({
+            f"{n['Node Type']} `{n.get('Index Name') or n['Relation Name']}`"
+            for plan in resultado.planes for n in nodos(plan) if n.get("Relation Name")
+        })
+        filas = ", ".join(f"{plan.get('Plan Rows', 0):g}" for plan in resultado.planes)
+        estado = "✅" if not resultado.errores else "❌ " + "; ".join(resultado.errores)
+        lineas.append(f"| `{resultado.caso.nombre}` | {estado} | {'<br>'.join(lecturas)} | {filas} |")
+    return "\n".join(lineas) + "\n"
+
+
+def revisar_servicio(servicio: str, esquema: str, archivo_markdown: Optional[str]) -> int:
+    usar_servicio(servicio, esquema)
+    from sqlalchemy import text
+    from app.core.database import SessionLocal, engine
+
+    db = SessionLocal()
+    try:
+        for tabla in TABLAS_PRINCIPALES[servicio]:
+            filas = db.execute(text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:t)"),
+                               {"t": f"{esquema}.{tabla}"}).scalar() or 0
+            if filas < FILAS_MINIMAS:
+                print(f"ERROR: {esquema}.{tabla} tiene ~{filas:g} filas; siembre la base con generar_datos.py "
+                      f"(los planes sobre tablas chicas no son representativos)")
+                return 1
+        casos = CASOS[servicio](db)
+    finally:
+        db.close()
+
+    resultados = [explicar_caso(caso, engine, SessionLocal) for caso in casos]
+    imprimir(servicio, resultados)
+    if archivo_markdown:
+        with open(archivo_markdown, "a", encoding="utf-8") as archivo:
+            archivo.write(markdown(servicio, resultados) + "\n")
+    fallas = sum(1 for r in resultados if r.errores)
+    print(f"\n{servicio}: {len(resultados) - fallas}/{len(resultados)} planes como se esperaba")
+    return 1 if fallas else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servicio", choices=tuple(CASOS))
+    parser.add_argument("--esquema", help="Esquema a revisar (por defecto el del servicio)")
+    parser.add_argument("--markdown", help="Agregar una tabla Markdown con los resultados (para PRs)")
+    args = parser.parse_args(argv)
+
+    if args.servicio:
+        return revisar_servicio(args.servicio, args.esquema or ESQUEMAS[args.servicio], args.markdown)
+
+    if args.markdown:
+        Path(args.markdown).write_text("## Planes de consultas\n\n", encoding="utf-8")
+    codigo = 0
+    for servicio in CASOS:
+        comando = [sys.executable, os.path.abspath(__file__), "--servicio", servicio]
+        if args.markdown:
+            comando += ["--markdown", os.path.abspath(args.markdown)]
+        # Desde el directorio del servicio para que tome su .env
+        codigo |= subprocess.run(comando, cwd=SERVICIOS / servicio).returncode
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Viabilidad del repertorio (app/services/repertorio.py) sobre un catálogo sintético.
+
+Genera --canciones canciones con 1-6 requisitos sobre --instrumentos instrumentos
+(80% requeridos, nivel mínimo 0-3) y planteles de --musicos músicos con 2-4
+instrumentos cada uno, con semilla fija. Mide, sin base de datos:
+- compilar el catálogo en bits (una vez por TTL);
+- `evaluar` un plantel contra todo el catálogo (columnas de bits + emparejamiento
+  por combinación de roles);
+- la misma evaluación canción por canción, como referencia, verificando que ambas
+  coincidan;
+- un acierto de la caché por (evento, versión del plantel).
+
+Uso (desde la raíz del repositorio, con el .env del servicio de eventos; no necesita PostgreSQL):
+    DATABASE_URL=postgresql://... SECRET_KEY=x \\
+        python backend/benchmarks/repertorio_viabilidad.py [--canciones 5000] [--musicos 12] [--salida viabilidad.json]
+
+Termina con código 1 si el p95 de `evaluar` supera --presupuesto-ms (50 ms).
+"""
+import argparse
+import random
+import sys
+import uuid
+from types import SimpleNamespace
+from typing import Dict, List
+
+from comun import guardar_resultados, medir, usar_servicio
+
+
+def catalogo_sintetico(canciones: int, instrumentos: int, azar: random.Random) -> List[SimpleNamespace]:
+    filas = []
+    for i in range(canciones):
+        cancion_id = uuid.UUID(int=azar.getrandbits(128))
+        for instrumento_id in azar.sample(range(1, instrumentos + 1), azar.randint(1, 6)):
+            filas.append(SimpleNamespace(
+                cancion_id=cancion_id, titulo=f"Canción {i}", instrumento_id=instrumento_id,
+                es_requerido=azar.random() < 0.8, nivel=azar.randint(0, 3),
+                instrumento=f"instrumento_{instrumento_id}", nivel_minimo=None
+            ))
+    return filas
+
+
+def plantel_sintetico(musicos: int, instrumentos: int, azar: random.Random) -> Dict[uuid.UUID, Dict[int, int]]:
+    return {
+        uuid.UUID(int=azar.getrandbits(128)): {
+            instrumento_id: azar.randint(1, 3)
+            for instrumento_id in azar.sample(range(1, instrumentos + 1), azar.randint(2, 4))
+        }
+        for _ in range(musicos)
+    }
+
+
+def viable_por_cancion(catalogo, plantel: Dict[uuid.UUID, Dict[int, int]], indice: int) -> bool:
+    """Referencia: asignar un músico distinto a cada rol requerido probando combinaciones"""
+    roles = [rol for bit, rol in enumerate(catalogo.roles) if catalogo.requeridos[indice] >> bit & 1]
+    musicos = list(plantel.values())
+
+    def asignar(k: int, usados: frozenset) -> bool:
+        if k == len(roles):
+            return True
+        rol = roles[k]
+        return any(
+            j not in usados and tocados.get(rol.instrumento_id, -1) >= rol.nivel and asignar(k + 1, usados | {j})
+            for j, tocados in enumerate(musicos)
+        )
+
+    return asignar(0, frozenset())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--canciones", type=int, default=5_000)
+    parser.add_argument("--instrumentos", type=int, default=30)
+    parser.add_argument("--musicos", type=int, default=12, help="Músicos confirmados por plantel")
+    parser.add_argument("--planteles", type=int, default=20, help="Planteles distintos a evaluar")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--presupuesto-ms", type=float, default=50.0)
+    parser.add_argument("--salida", help="Guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    usar_servicio("eventos", "public")
+    from app.services.repertorio import CatalogoRequisitos, ViabilidadCache, evaluar
+
+    azar = random.Random(42)
+    filas = catalogo_sintetico(args.canciones, args.instrumentos, azar)
+    planteles = [plantel_sintetico(args.musicos, args.instrumentos, azar) for _ in range(args.planteles)]
+
+    catalogo = CatalogoRequisitos(filas)
+    print(f"[viabilidad] {len(catalogo.canciones)} canciones, {len(catalogo.roles)} roles, "
+          f"{len(catalogo.combinaciones)} combinaciones de varios roles")
+
+    resultados = {"compilar": medir(lambda: CatalogoRequisitos(filas), max(5, args.repeticiones // 10), calentamiento=1)}
+
+    ronda = iter(range(10 ** 9))
+    resultados["evaluar"] = medir(
+        lambda: evaluar(catalogo, planteles[next(ronda) % len(planteles)]), args.repeticiones
+    )
+    resultados["por_cancion"] = medir(
+        lambda: [viable_por_cancion(catalogo, planteles[0], i) for i in range(len(catalogo.canciones))],
+        max(3, args.repeticiones // 10), calentamiento=1
+    )
+
+    cache = ViabilidadCache()
+    cache.catalogo(lambda: filas)
+    evento_id = uuid.uuid4()
+    cache.guardar(evento_id, 1, evaluar(cache.catalogo(lambda: filas), planteles[0]))
+    resultados["cache_hit"] = medir(lambda: cache.obtener(evento_id, 1, cache.catalogo(lambda: filas)), args.repeticiones)
+
+    # Ambas evaluaciones deben coincidir canción por canción
+    diferencias = 0
+    for plantel in planteles[:3]:
+        viabilidad = evaluar(catalogo, plantel)
+        diferencias += sum(
+            viabilidad.es_viable(i) != viable_por_cancion(catalogo, plantel, i) for i in range(len(catalogo.canciones))
+        )
+    viables = bin(evaluar(catalogo, planteles[0]).viables).count("1")
+
+    print(f"{'caso':<14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for caso, r in resultados.items():
+        print(f"{caso:<14} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}")
+    print(f"viables con el primer plantel: {viables}/{len(catalogo.canciones)}; diferencias con la referencia: {diferencias}")
+
+    if args.salida:
+        guardar_resultados(args.salida, {
+            "servicio": "eventos", "canciones": args.canciones, "musicos": args.musicos, "resultados": resultados
+        })
+    if diferencias:
+        print(f"ERROR: {diferencias} canciones con resultado distinto al de la referencia")
+        return 1
+    if resultados["evaluar"]["p95_ms"] > args.presupuesto_ms:
+        print(f"ERROR: evaluar p95 {resultados['evaluar']['p95_ms']:.2f} ms (máximo {args.presupuesto_ms:.0f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
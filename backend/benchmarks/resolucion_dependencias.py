@@ -0,0 +1,129 @@
+"""
+Costo de resolver las dependencias de servicio de una solicitud.
+
+Mide, sin base de datos, lo que hace `get_musicos_service`/`get_Eventos_service`
+antes de cualquier consulta: construir el servicio con la sesión de la solicitud
+y obtener los componentes que usa la ruta (repositorios, validación,
+transacciones). Para cada ruta informa microsegundos por resolución y los bloques
+y bytes de memoria que quedan asignados mientras vive el servicio (tracemalloc).
+
+Uso (desde la raíz del repositorio; no necesita PostgreSQL):
+    DATABASE_URL=postgresql://u:p@localhost/x SECRET_KEY=x \\
+        python backend/benchmarks/resolucion_dependencias.py [--servicio musicos] [--salida res.json]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from comun import guardar_resultados, usar_servicio
+
+# Componentes que toca cada ruta tras resolver la dependencia (ruta -> atributos del servicio)
+RUTAS = {
+    "musicos": {
+        "GET /musicos/{id}": ("musicos_repo",),
+        "PUT /musicos/{id}": ("validation_service", "transaction_manager", "musicos_repo"),
+        "POST /musicos/{id}/instrumentos": ("instrumentos_service",),
+        "GET /musicos/catalogs/instrumentos": ("catalogo_instrumentos_repo",),
+    },
+    "eventos": {
+        "GET /eventos/{id}": ("eventos_repo",),
+        "PUT /eventos/{id}": ("eventos_repo",),
+        "POST /eventos/{id}/participantes": ("eventos_repo", "participantes_repo", "estados_participante_repo"),
+    },
+}
+
+
+def resolucion(dependencia, db, atributos):
+    def resolver():
+        servicio = dependencia(db)
+        for atributo in atributos:
+            getattr(servicio, atributo)
+        return servicio
+    return resolver
+
+
+def medir_latencia(resolver, veces: int, rondas: int) -> float:
+    """Mediana entre rondas de microsegundos por resolución"""
+    por_ronda = []
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for _ in range(veces):
+            resolver()
+        por_ronda.append((time.perf_counter() - inicio) / veces * 1e6)
+    return statistics.median(por_ronda)
+
+
+def medir_memoria(resolver, veces: int):
+    """Bloques y bytes asignados por resolución, con los servicios aún vivos"""
+    resolver()
+    vivos = []
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    for _ in range(veces):
+        vivos.append(resolver())
+    despues = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diferencias = despues.compare_to(antes, "filename")
+    # La lista que retiene los servicios no es parte de la resolución
+    bloques = sum(d.count_diff for d in diferencias) - 1
+    tamano = sum(d.size_diff for d in diferencias) - sys.getsizeof(vivos)
+    return bloques / veces, tamano / veces
+
+
+def medir_servicio(servicio: str, veces: int, rondas: int) -> dict:
+    usar_servicio(servicio, "public")
+    from sqlalchemy.orm import Session
+
+    if servicio == "musicos":
+        from app.api.v1.musicos import get_musicos_service as dependencia
+    else:
+        from app.api.v1.eventos import get_Eventos_service as dependencia
+
+    db = Session()
+    resultados = {}
+    for ruta, atributos in RUTAS[servicio].items():
+        resolver = resolucion(dependencia, db, atributos)
+        bloques, tamano = medir_memoria(resolver, 1000)
+        resultados[ruta] = {
+            "us": round(medir_latencia(resolver, veces, rondas), 2),
+            "bloques": round(bloques, 1),
+            "bytes": round(tamano),
+        }
+    return resultados
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servicio", choices=("eventos", "musicos"), help="Por defecto, ambos")
+    parser.add_argument("--veces", type=int, default=20_000, help="Resoluciones por ronda")
+    parser.add_argument("--rondas", type=int, default=5)
+    parser.add_argument("--salida", help="Guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    if args.servicio is None:
+        # Cada servicio tiene su propio paquete `app`: un proceso por servicio
+        codigo = 0
+        for servicio in RUTAS:
+            comando = [sys.executable, str(Path(__file__)), "--servicio", servicio,
+                       "--veces", str(args.veces), "--rondas", str(args.rondas)]
+            if args.salida:
+                comando += ["--salida", str(Path(args.salida).with_suffix(f".{servicio}.json"))]
+            codigo = max(codigo, subprocess.call(comando))
+        return codigo
+
+    resultados = medir_servicio(args.servicio, args.veces, args.rondas)
+    print(f"{'ruta (' + args.servicio + ')':<40} {'µs':>8} {'bloques':>9} {'bytes':>8}")
+    for ruta, valores in resultados.items():
+        print(f"{ruta:<40} {valores['us']:>8.2f} {valores['bloques']:>9.1f} {valores['bytes']:>8}")
+
+    if args.salida:
+        guardar_resultados(args.salida, {"servicio": args.servicio, "rutas": resultados})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Suite de rendimiento de los servicios de músicos y eventos.
+
+    ejecutar   Corre suite_musicos.py y suite_eventos.py (cada uno en su propio
+               proceso: ambos servicios definen el paquete `app`) y guarda un
+               único JSON con micro-benchmarks y pruebas de carga.
+    comparar   Compara dos JSON y termina con código 1 si el p95 de algún caso
+               empeoró más que el presupuesto.
+
+Uso (desde la raíz del repositorio; cada servicio lee su propio .env, o bien
+DATABASE_URL/SECRET_KEY del entorno):
+    python backend/benchmarks/suite.py ejecutar [--escala 10000] [--salida base.json]
+    python backend/benchmarks/suite.py comparar base.json nuevo.json [--presupuesto 10]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from comun import SERVICIOS, guardar_resultados
+
+DIRECTORIO = Path(__file__).resolve().parent
+SERVICIOS_SUITE = ("musicos", "eventos")
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=DIRECTORIO, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def ejecutar(args) -> int:
+    resultados = {}
+    servicios = {}
+    for servicio in args.servicios:
+        with tempfile.TemporaryDirectory() as temporal:
+            salida = os.path.join(temporal, f"{servicio}.json")
+            comando = [
+                sys.executable, str(DIRECTORIO / f"suite_{servicio}.py"),
+                "--salida", salida,
+                "--escala", str(args.escala),
+                "--repeticiones", str(args.repeticiones),
+                "--solicitudes", str(args.solicitudes),
+                "--concurrencia", str(args.concurrencia),
+            ]
+            if servicio == "eventos":
+                comando += ["--roster", str(args.roster)]
+            if args.solo:
+                comando += ["--solo", args.solo]
+            # Desde el directorio del servicio para que tome su .env
+            proceso = subprocess.run(comando, cwd=SERVICIOS / servicio)
+            if proceso.returncode != 0:
+                print(f"ERROR: la suite de {servicio} terminó con código {proceso.returncode}")
+                return proceso.returncode
+            with open(salida, encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+        servicios[servicio] = {k: v for k, v in datos.items() if k != "resultados"}
+        for nombre, valor in datos["resultados"].items():
+            resultados[f"{servicio}.{nombre}"] = valor
+
+    ahora = datetime.now(timezone.utc)
+    salida = args.salida or str(DIRECTORIO / "resultados" / f"{ahora:%Y%m%d-%H%M%S}-{_commit()}.json")
+    guardar_resultados(salida, {
+        "fecha": ahora.isoformat(),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "maquina": platform.node(),
+        "parametros": {
+            "escala": args.escala, "roster": args.roster, "repeticiones": args.repeticiones,
+            "solicitudes": args.solicitudes, "concurrencia": args.concurrencia,
+        },
+        "servicios": servicios,
+        "resultados": resultados,
+    })
+
+    print(f"\n{'caso':<58} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for nombre, valor in resultados.items():
+        print(f"{nombre:<58} {valor['p50_ms']:>9.2f} {valor['p95_ms']:>9.2f} {valor['p99_ms']:>9.2f}")
+    print(f"\nResultados en {salida}")
+    return 0
+
+
+def comparar(args) -> int:
+    with open(args.base, encoding="utf-8") as archivo:
+        base = json.load(archivo)["resultados"]
+    with open(args.nuevo, encoding="utf-8") as archivo:
+        nuevo = json.load(archivo)["resultados"]
+
+    regresiones = []
+    print(f"{'caso':<58} {'p95 base':>10} {'p95 nuevo':>10} {'cambio':>8}")
+    for nombre in sorted(set(base) | set(nuevo)):
+        if nombre not in base or nombre not in nuevo:
+            print(f"{nombre:<58} {'solo en ' + ('base' if nombre in base else 'nuevo'):>30}")
+            continue
+        antes, despues = base[nombre]["p95_ms"], nuevo[nombre]["p95_ms"]
+        cambio = (despues - antes) / antes * 100 if antes else 0.0
+        # Diferencias menores a --minimo-ms son ruido de medición aunque superen el porcentaje
+        regresion = cambio > args.presupuesto and despues - antes > args.minimo_ms
+        marca = "  REGRESIÓN" if regresion else ""
+        print(f"{nombre:<58} {antes:>10.2f} {despues:>10.2f} {cambio:>+7.1f}%{marca}")
+        if regresion:
+            regresiones.append(nombre)
+
+    if regresiones:
+        print(f"\nERROR: {len(regresiones)} caso(s) con p95 más de {args.presupuesto:g}% peor que la base")
+        return 1
+    print(f"\nSin regresiones de p95 por encima del {args.presupuesto:g}%")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_ejecutar = comandos.add_parser("ejecutar", help="Sembrar, medir y guardar resultados")
+    p_ejecutar.add_argument("--servicios", nargs="+", choices=SERVICIOS_SUITE, default=list(SERVICIOS_SUITE))
+    p_ejecutar.add_argument("--escala", type=int, default=10_000, help="Músicos y eventos sembrados")
+    p_ejecutar.add_argument("--roster", type=int, default=500, help="Participantes del evento grande")
+    p_ejecutar.add_argument("--repeticiones", type=int, default=200, help="Llamadas por micro-benchmark")
+    p_ejecutar.add_argument("--solicitudes", type=int, default=500, help="Solicitudes por escenario de carga")
+    p_ejecutar.add_argument("--concurrencia", type=int, default=8, help="Clientes concurrentes en la carga")
+    p_ejecutar.add_argument("--solo", choices=("micro", "carga"))
+    p_ejecutar.add_argument("--salida", help="JSON de resultados (por defecto resultados/<fecha>-<commit>.json)")
+    p_ejecutar.set_defaults(funcion=ejecutar)
+
+    p_comparar = comandos.add_parser("comparar", help="Fallar si el p95 empeoró más que el presupuesto")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("nuevo")
+    p_comparar.add_argument("--presupuesto", type=float, default=10.0, help="Empeoramiento máximo de p95 en %%")
+    p_comparar.add_argument("--minimo-ms", type=float, default=0.5, help="Diferencia absoluta mínima en ms")
+    p_comparar.set_defaults(funcion=comparar)
+
+    args = parser.parse_args(argv)
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
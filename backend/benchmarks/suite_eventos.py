@@ -0,0 +1,166 @@
+"""
+Suite de rendimiento del servicio de eventos (la ejecuta suite.py).
+
+Siembra N eventos repartidos en ±2 años y un evento con un roster grande en un
+esquema desechable y mide:
+- micro: EventosRepository.get_by_id (roster grande y evento normal), la
+  construcción de la respuesta (`_evento_to_response`) y una página por rango
+  de fechas, cada llamada con su propia sesión;
+- carga: endpoints de la app ASGI en proceso con varios clientes concurrentes.
+
+Uso directo (desde la raíz del repositorio, con el .env del servicio de eventos):
+    DATABASE_URL=postgresql://... SECRET_KEY=x \\
+        python backend/benchmarks/suite_eventos.py --salida eventos.json [--escala 10000] [--roster 500]
+"""
+import argparse
+import hashlib
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from comun import (
+    CATALOGOS_EVENTOS, cargar, crear_esquema, eliminar_esquema, guardar_resultados, medir, usar_servicio, vacuum
+)
+
+ESQUEMA = "bench_suite_eventos"
+
+usar_servicio("eventos", ESQUEMA)
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import catalogs, outbox  # noqa: E402,F401
+from app.repositories.eventos_repository import EventosRepository  # noqa: E402
+from app.repositories.resumen_participantes_repository import ResumenParticipantesRepository  # noqa: E402
+from app.services.eventos_service import EventosService  # noqa: E402
+
+
+def evento_id(indice: int) -> uuid.UUID:
+    # Igual que md5('evento' || i)::uuid en preparar()
+    return uuid.UUID(hashlib.md5(f"evento{indice}".encode()).hexdigest())
+
+
+# El evento 1 lleva el roster grande; el 2, los participantes de un evento normal
+EVENTO_GRANDE = evento_id(1)
+EVENTO_NORMAL = evento_id(2)
+
+
+def preparar(escala: int, roster: int) -> None:
+    crear_esquema(engine, Base.metadata, ESQUEMA, CATALOGOS_EVENTOS)
+    with engine.connect() as conn:
+        conn.execute(text("""
+            INSERT INTO eventos (id, nombre, tipo_id, lugar, fecha_presentacion, estado_id, creado_por)
+            SELECT md5('evento' || i)::uuid,
+                   'Evento ' || i,
+                   1 + (i % 4),
+                   'Lugar ' || (i % 50),
+                   now() - interval '730 days' + (i * interval '1461 days' / :escala),
+                   1 + ((i / 7) % 3),
+                   md5('usuario' || (i % 25))::uuid
+            FROM generate_series(1, :escala) AS i
+        """), {"escala": escala})
+        conn.execute(text("""
+            INSERT INTO participantes_evento (id, evento_id, musico_id, estado_id)
+            SELECT md5('participante' || e || '-' || i)::uuid,
+                   md5('evento' || e)::uuid,
+                   md5('musico' || i)::uuid,
+                   1 + (i % 3)
+            FROM (VALUES (1, :roster), (2, 12)) AS r(e, n), generate_series(1, r.n) AS i
+        """), {"roster": roster})
+        conn.commit()
+    db = SessionLocal()
+    try:
+        ResumenParticipantesRepository(db).rebuild()
+    finally:
+        db.close()
+    vacuum(engine, "eventos")
+    vacuum(engine, "participantes_evento")
+
+
+def con_sesion(llamada):
+    def medida():
+        db = SessionLocal()
+        try:
+            return llamada(db)
+        finally:
+            db.close()
+    return medida
+
+
+def micro(repeticiones: int) -> dict:
+    ahora = datetime.now(timezone.utc)
+
+    db = SessionLocal()
+    try:
+        servicio = EventosService(db)
+        grande = servicio.eventos_repo.get_by_id(EVENTO_GRANDE)
+        conversion = medir(lambda: servicio._evento_to_response(grande), repeticiones)
+    finally:
+        db.close()
+
+    return {
+        "get_by_id(roster grande)": medir(
+            con_sesion(lambda db: EventosRepository(db).get_by_id(EVENTO_GRANDE)), repeticiones),
+        "get_by_id(evento normal)": medir(
+            con_sesion(lambda db: EventosRepository(db).get_by_id(EVENTO_NORMAL)), repeticiones),
+        "_evento_to_response(roster grande)": conversion,
+        "search(30 días, 20)": medir(
+            con_sesion(lambda db: EventosRepository(db).search(ahora, ahora + timedelta(days=30), limit=20)),
+            repeticiones),
+    }
+
+
+def carga(solicitudes: int, concurrencia: int) -> dict:
+    from app.main import app
+
+    hoy = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    dias = [(hoy + timedelta(days=i)).strftime("%Y-%m-%dT%H:%M:%SZ") for i in range(80)]
+    escenarios = {
+        "GET /eventos/": [("GET", f"/api/v1/eventos/?skip={(i * 20) % 1000}&limit=20") for i in range(50)],
+        "GET /eventos/?desde=&hasta=": [
+            ("GET", f"/api/v1/eventos/?desde={dias[i]}&hasta={dias[i + 30]}") for i in range(50)
+        ],
+        "GET /eventos/{evento_id}": [("GET", f"/api/v1/eventos/{evento_id(i)}") for i in range(2, 52)],
+        "GET /eventos/{evento_id} (roster grande)": [("GET", f"/api/v1/eventos/{EVENTO_GRANDE}")],
+        "GET /eventos/{evento_id}/participantes": [("GET", f"/api/v1/eventos/{EVENTO_GRANDE}/participantes")],
+    }
+    return {
+        nombre: cargar(app, lista, solicitudes, concurrencia)
+        for nombre, lista in escenarios.items()
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--salida", required=True, help="Archivo JSON de resultados")
+    parser.add_argument("--escala", type=int, default=10_000, help="Eventos sembrados")
+    parser.add_argument("--roster", type=int, default=500, help="Participantes del evento grande")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--solicitudes", type=int, default=500, help="Solicitudes por escenario de carga")
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--solo", choices=("micro", "carga"))
+    parser.add_argument("--conservar", action="store_true", help="No borrar el esquema al terminar")
+    args = parser.parse_args(argv)
+
+    print(f"[eventos] sembrando {args.escala} eventos (roster grande: {args.roster}) en {ESQUEMA}...")
+    preparar(args.escala, args.roster)
+    resultados = {}
+    try:
+        if args.solo in (None, "micro"):
+            for nombre, valor in micro(args.repeticiones).items():
+                resultados[f"micro.{nombre}"] = valor
+        if args.solo in (None, "carga"):
+            for nombre, valor in carga(args.solicitudes, args.concurrencia).items():
+                resultados[f"carga.{nombre}"] = valor
+    finally:
+        if not args.conservar:
+            eliminar_esquema(engine, ESQUEMA)
+
+    guardar_resultados(args.salida, {
+        "servicio": "eventos", "escala": args.escala, "roster": args.roster, "resultados": resultados
+    })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
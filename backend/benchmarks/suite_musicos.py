@@ -0,0 +1,153 @@
+"""
+Suite de rendimiento del servicio de músicos (la ejecuta suite.py).
+
+Siembra N músicos con dos instrumentos cada uno en un esquema desechable y mide:
+- micro: métodos de MusicosRepository y la construcción de respuestas
+  (`_musico_to_response`), cada llamada con su propia sesión;
+- carga: endpoints de la app ASGI en proceso con varios clientes concurrentes.
+
+Uso directo (desde la raíz del repositorio, con el .env del servicio de músicos):
+    DATABASE_URL=postgresql://... SECRET_KEY=x \\
+        python backend/benchmarks/suite_musicos.py --salida musicos.json [--escala 10000]
+"""
+import argparse
+import hashlib
+import itertools
+import sys
+import uuid
+
+from sqlalchemy import text
+
+from comun import (
+    CATALOGOS_MUSICOS, cargar, crear_esquema, eliminar_esquema, guardar_resultados, medir, usar_servicio, vacuum
+)
+
+ESQUEMA = "bench_suite_musicos"
+
+usar_servicio("musicos", ESQUEMA)
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import catalogos, musicos, outbox  # noqa: E402,F401
+from app.repositories.musicos_repository import MusicosRepository  # noqa: E402
+from app.services.musicos_service import MusicosService  # noqa: E402
+
+
+def preparar(escala: int) -> None:
+    crear_esquema(engine, Base.metadata, ESQUEMA, CATALOGOS_MUSICOS)
+    with engine.connect() as conn:
+        # 10% inactivos; 1% eliminados; nombres repetidos cada 1000 para que la búsqueda devuelva varias filas
+        conn.execute(text("""
+            INSERT INTO musicos (id, email, nombre, telefono, estado_id, fecha_ingreso,
+                                 creado_en, actualizado_en, eliminado_en)
+            SELECT md5('musico' || i)::uuid,
+                   'musico' || i || '@ensamble.test',
+                   'Músico ' || (i % 1000) || ' ' || i,
+                   '555-' || lpad((i % 10000)::text, 4, '0'),
+                   CASE WHEN i % 10 = 0 THEN 2 ELSE 1 END,
+                   now() - (i % 2000) * interval '1 day',
+                   now(), now(),
+                   CASE WHEN i % 100 = 0 THEN now() END
+            FROM generate_series(1, :escala) AS i
+        """), {"escala": escala})
+        conn.execute(text("""
+            INSERT INTO instrumentos_musico (id, musico_id, instrumento_id, nivel_id, es_principal)
+            SELECT md5('instrumento' || i || '-' || j)::uuid,
+                   md5('musico' || i)::uuid,
+                   1 + ((i + j) % 5),
+                   1 + (i % 3),
+                   j = 0
+            FROM generate_series(1, :escala) AS i, generate_series(0, 1) AS j
+        """), {"escala": escala})
+        conn.commit()
+    vacuum(engine, "musicos")
+    vacuum(engine, "instrumentos_musico")
+
+
+def muestra(escala: int, cantidad: int):
+    """Índices de músicos no eliminados repartidos por toda la tabla"""
+    indices = (1 + (i * 7919) % escala for i in itertools.count())
+    return [k for k in itertools.islice((k for k in indices if k % 100), cantidad)]
+
+
+def musico_id(indice: int) -> uuid.UUID:
+    # Igual que md5('musico' || i)::uuid en preparar()
+    return uuid.UUID(hashlib.md5(f"musico{indice}".encode()).hexdigest())
+
+
+def con_sesion(llamada):
+    def medida():
+        db = SessionLocal()
+        try:
+            return llamada(db)
+        finally:
+            db.close()
+    return medida
+
+
+def micro(escala: int, repeticiones: int) -> dict:
+    emails = itertools.cycle([f"musico{k}@ensamble.test" for k in muestra(escala, 500)])
+
+    db = SessionLocal()
+    try:
+        pagina = MusicosRepository(db).get_all_with_relationships(limit=100)
+        servicio = MusicosService(db)
+        conversion = medir(lambda: [servicio._musico_to_response(m) for m in pagina], repeticiones)
+    finally:
+        db.close()
+
+    return {
+        "get_by_email": medir(con_sesion(lambda db: MusicosRepository(db).get_by_email(next(emails))), repeticiones),
+        "get_all_with_relationships(100)": medir(
+            con_sesion(lambda db: MusicosRepository(db).get_all_with_relationships(limit=100)), repeticiones),
+        "search_by_name": medir(
+            con_sesion(lambda db: MusicosRepository(db).search_by_name("Músico 42 ", limit=20)), repeticiones),
+        "_musico_to_response(100)": conversion,
+    }
+
+
+def carga(escala: int, solicitudes: int, concurrencia: int) -> dict:
+    from app.main import app
+
+    ids = [musico_id(k) for k in muestra(escala, 50)]
+    escenarios = {
+        "GET /musicos/": [("GET", f"/api/v1/musicos/?skip={(i * 20) % 1000}&limit=20") for i in range(50)],
+        "GET /musicos/{musico_id}": [("GET", f"/api/v1/musicos/{musico_id}") for musico_id in ids],
+        "GET /musicos/search": [("GET", f"/api/v1/musicos/search?nombre=M%C3%BAsico%20{i}%20") for i in range(50)],
+    }
+    return {
+        nombre: cargar(app, lista, solicitudes, concurrencia)
+        for nombre, lista in escenarios.items()
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--salida", required=True, help="Archivo JSON de resultados")
+    parser.add_argument("--escala", type=int, default=10_000, help="Músicos sembrados")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--solicitudes", type=int, default=500, help="Solicitudes por escenario de carga")
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--solo", choices=("micro", "carga"))
+    parser.add_argument("--conservar", action="store_true", help="No borrar el esquema al terminar")
+    args = parser.parse_args(argv)
+
+    print(f"[musicos] sembrando {args.escala} músicos en {ESQUEMA}...")
+    preparar(args.escala)
+    resultados = {}
+    try:
+        if args.solo in (None, "micro"):
+            for nombre, valor in micro(args.escala, args.repeticiones).items():
+                resultados[f"micro.{nombre}"] = valor
+        if args.solo in (None, "carga"):
+            for nombre, valor in carga(args.escala, args.solicitudes, args.concurrencia).items():
+                resultados[f"carga.{nombre}"] = valor
+    finally:
+        if not args.conservar:
+            eliminar_esquema(engine, ESQUEMA)
+
+    guardar_resultados(args.salida, {"servicio": "musicos", "escala": args.escala, "resultados": resultados})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
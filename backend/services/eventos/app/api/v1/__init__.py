@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from .eventos import router as Eventos_router
+from .admin import router as admin_router
 
 api_router = APIRouter()
 
@@ -7,4 +8,10 @@ api_router.include_router(
     Eventos_router, 
     prefix="/eventos", 
     tags=["Eventos"]
+)
+
+api_router.include_router(
+    admin_router, 
+    prefix="/admin", 
+    tags=["Administración"]
 )
\ No newline at end of file
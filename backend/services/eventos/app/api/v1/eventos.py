@@ -1,18 +1,28 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query, status
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.concurrencia import etag
 from app.core.database import get_db
+from app.core.paginacion import TotalMode
+from app.core.proyeccion import Proyeccion, proyeccion, responder
 from app.services.eventos_service import EventosService
+from app.services.calendario import generar_ics
 from app.schemas.eventos import (
     EventoCreate, EventoUpdate, EventoResponse, EventosListResponse,
     ParticipanteEventoCreate, ParticipanteEventoUpdate, ParticipanteEventoResponse,
-    TipoEventoResponse
+    ParticipantesLoteCreate, ParticipantesLoteResponse, AgendaMusicoResponse,
+    TipoEventoResponse, ViabilidadRepertorioResponse
 )
 
 router = APIRouter()
 
+# fields= y expand= en listado y detalle; sin ellos, la forma completa de EventoResponse
+proyeccion_evento = proyeccion(EventoResponse, relaciones=("tipo", "estado", "resumen_participantes"))
+
 def get_Eventos_service(db: Session = Depends(get_db)) -> EventosService:
     return EventosService(db)
 
@@ -30,34 +40,97 @@ async def create_evento(
 async def get_eventos(
     skip: int = Query(0, ge=0, description="Elementos a omitir"),
     limit: int = Query(20, ge=1, le=100, description="Elementos por página"),
+    desde: Optional[datetime] = Query(None, description="Fecha de presentación mínima (inclusive)"),
+    hasta: Optional[datetime] = Query(None, description="Fecha de presentación máxima (exclusiva)"),
+    tipo: Optional[str] = Query(None, description="Código de tipo de evento"),
+    estado: Optional[str] = Query(None, description="Código de estado de evento"),
+    cursor: Optional[str] = Query(None, description="siguiente_cursor de la página anterior"),
+    total_mode: TotalMode = Query(TotalMode.exact, description="exact, estimate (estadísticas del planner) o none"),
+    campos: Proyeccion = Depends(proyeccion_evento),
+    service: EventosService = Depends(get_Eventos_service)
+):
+    """
+    Obtener lista de eventos con paginación.
+    
+    Con filtros de fecha, tipo o estado los eventos se devuelven en orden
+    cronológico y se pagina con `cursor` en lugar de `skip`. Con `fields` o
+    `expand` cada evento trae solo esos campos.
+    """
+    if any(valor is not None for valor in (desde, hasta, tipo, estado, cursor)):
+        eventos, total, siguiente_cursor = service.buscar_eventos(
+            desde=desde, hasta=hasta, tipo_codigo=tipo, estado_codigo=estado,
+            cursor=cursor, limit=limit, total_mode=total_mode, proyeccion=campos
+        )
+        pagina = dict(
+            eventos=eventos,
+            total=total,
+            page=1 if cursor is None else None,  # La posición no se conoce al paginar por cursor
+            size=len(eventos),
+            siguiente_cursor=siguiente_cursor
+        )
+    else:
+        eventos, total = service.get_eventos(skip=skip, limit=limit, total_mode=total_mode, proyeccion=campos)
+        pagina = dict(eventos=eventos, total=total, page=(skip // limit) + 1, size=len(eventos))
+    
+    if not campos.completa:
+        return responder(pagina)
+    return EventosListResponse(**pagina)
+
+@router.get("/calendario.ics", response_class=StreamingResponse)
+async def get_calendario_ics(
+    desde: Optional[datetime] = Query(None, description="Inicio de la ventana (por defecto, ahora)"),
+    hasta: Optional[datetime] = Query(None, description="Fin de la ventana (por defecto, 90 días después)"),
+    tipo: Optional[str] = Query(None, description="Código de tipo de evento"),
+    estado: Optional[str] = Query(None, description="Código de estado de evento"),
     service: EventosService = Depends(get_Eventos_service)
 ):
-    """Obtener lista de eventos con paginación"""
-    eventos, total = service.get_eventos(skip=skip, limit=limit)
+    """Feed iCalendar (.ics) de los eventos de una ventana de fechas"""
+    desde = desde or datetime.now(timezone.utc)
+    hasta = hasta or desde + timedelta(days=90)
+    tipo_id, estado_id = service.resolver_filtros(desde, hasta, tipo, estado)
     
-    return EventosListResponse(
-        eventos=eventos,
-        total=total,
-        page=(skip // limit) + 1,
-        size=len(eventos)
+    return StreamingResponse(
+        generar_ics(desde, hasta, tipo_id, estado_id),
+        media_type="text/calendar; charset=utf-8",
+        headers={"Content-Disposition": 'inline; filename="eventos.ics"'}
     )
 
+@router.get("/por-musico/{musico_id}", response_model=AgendaMusicoResponse)
+async def get_agenda_musico(
+    musico_id: UUID,
+    desde: Optional[datetime] = Query(None, description="Desde esta fecha (por defecto, ahora)"),
+    limit: int = Query(50, ge=1, le=100, description="Máximo de eventos"),
+    service: EventosService = Depends(get_Eventos_service)
+):
+    """Obtener los próximos eventos de un músico y sus conflictos de agenda"""
+    return service.get_agenda_musico(musico_id, desde=desde, limit=limit)
+
 @router.get("/{evento_id}", response_model=EventoResponse)
 async def get_evento(
     evento_id: UUID,
+    response: Response,
+    campos: Proyeccion = Depends(proyeccion_evento),
     service: EventosService = Depends(get_Eventos_service)
 ):
-    """Obtener un evento específico por ID"""
-    return service.get_evento(evento_id)
+    """Obtener un evento específico por ID (ETag con su versión; con `fields`/`expand`, solo esos campos)"""
+    evento = service.get_evento(evento_id, proyeccion=campos)
+    if not campos.completa:
+        return responder(evento, {"ETag": etag(evento["version"])})
+    response.headers["ETag"] = etag(evento.version)
+    return evento
 
 @router.put("/{evento_id}", response_model=EventoResponse)
 async def update_evento(
     evento_id: UUID,
     evento_data: EventoUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag leído; 412 si el evento cambió desde entonces"),
     service: EventosService = Depends(get_Eventos_service)
 ):
     """Actualizar un evento existente"""
-    return service.update_evento(evento_id, evento_data)
+    evento = service.update_evento(evento_id, evento_data, if_match)
+    response.headers["ETag"] = etag(evento.version)
+    return evento
 
 @router.delete("/{evento_id}", status_code=status.HTTP_200_OK)
 async def delete_evento(
@@ -78,6 +151,15 @@ async def add_participante(
     """Agregar un músico como participante del evento"""
     return service.add_participante(evento_id, participante_data)
 
+@router.post("/{evento_id}/participantes/lote", response_model=ParticipantesLoteResponse, status_code=status.HTTP_201_CREATED)
+async def add_participantes_lote(
+    evento_id: UUID,
+    lote: ParticipantesLoteCreate,
+    service: EventosService = Depends(get_Eventos_service)
+):
+    """Invitar varios músicos al evento; los conflictos de agenda se informan por participante"""
+    return service.add_participantes_lote(evento_id, lote)
+
 @router.get("/{evento_id}/participantes", response_model=List[ParticipanteEventoResponse])
 async def get_participantes_evento(
     evento_id: UUID,
@@ -96,6 +178,19 @@ async def update_participante(
     """Actualizar estado de participación de un músico"""
     return service.update_participante(evento_id, musico_id, participante_data)
 
+@router.get("/{evento_id}/repertorio/viabilidad", response_model=ViabilidadRepertorioResponse)
+async def get_viabilidad_repertorio(
+    evento_id: UUID,
+    solo_repertorio: bool = Query(False, description="Solo las canciones asignadas al evento, en orden de repertorio"),
+    solo_viables: bool = Query(False, description="Omitir las canciones que el plantel no puede tocar"),
+    service: EventosService = Depends(get_Eventos_service)
+):
+    """
+    Canciones que pueden tocar los participantes confirmados del evento según sus
+    instrumentos y niveles, con los roles que faltan en cada una
+    """
+    return service.get_viabilidad_repertorio(evento_id, solo_repertorio=solo_repertorio, solo_viables=solo_viables)
+
 # ==================== ENDPOINTS DE CATÁLOGOS ====================
 
 @router.get("/catalogs/tipos-evento", response_model=List[TipoEventoResponse])
@@ -0,0 +1,59 @@
+"""
+Archivado en frío de eventos eliminados.
+
+Uso (desde backend/services/eventos):
+    python -m app.commands.archivo archivar [--dias 90] [--lote 1000] [--max-lotes N]
+    python -m app.commands.archivo pendientes [--dias 90]
+
+`archivar` mueve a `eventos_archivo` los eventos eliminados hace más de --dias días,
+con sus participantes, en lotes de --lote filas (una transacción por lote). Un evento
+archivado se restaura con POST /api/v1/admin/archivo/eventos/{evento_id}/restaurar.
+POST /api/v1/admin/archivo/archivar hace lo mismo como trabajo en segundo plano
+(un lote por trabajo).
+"""
+import argparse
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.archivo_repository import ArchivoEventosRepository
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archivado en frío de eventos eliminados")
+    parser.add_argument("accion", choices=["archivar", "pendientes"])
+    parser.add_argument("--dias", type=int, default=settings.archivo_dias, help="Antigüedad mínima de la eliminación")
+    parser.add_argument("--lote", type=int, default=settings.archivo_lote, help="Eventos por transacción")
+    parser.add_argument("--max-lotes", type=int, default=None, help="Detenerse tras N lotes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    antes_de = datetime.now(timezone.utc) - timedelta(days=args.dias)
+    db = SessionLocal()
+    try:
+        repo = ArchivoEventosRepository(db)
+        if args.accion == "pendientes":
+            logger.info(f"{repo.contar_pendientes(antes_de)} eventos eliminados antes de {antes_de:%Y-%m-%d} por archivar")
+            return 0
+
+        total = lotes = 0
+        while args.max_lotes is None or lotes < args.max_lotes:
+            archivados = repo.archivar_lote(antes_de, args.lote)
+            if not archivados:
+                break
+            total += archivados
+            lotes += 1
+            logger.info(f"Lote {lotes}: {archivados} eventos archivados ({total} en total)")
+        logger.info(f"Archivado terminado: {total} eventos eliminados antes de {antes_de:%Y-%m-%d}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Purga de respuestas guardadas por Idempotency-Key que ya vencieron.
+
+Uso (desde backend/services/eventos):
+    python -m app.commands.idempotencia [--lote 1000]
+
+Borra en lotes (una transacción por lote) las filas de `idempotencia` con
+`expira_en` vencido. Pensado para correr periódicamente (cron).
+"""
+import argparse
+import logging
+import sys
+
+from app.core.idempotencia import purgar_vencidas
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Purga de respuestas de Idempotency-Key vencidas")
+    parser.add_argument("--lote", type=int, default=1000, help="Filas por transacción")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    total = 0
+    while True:
+        borradas = purgar_vencidas(args.lote)
+        total += borradas
+        if borradas < args.lote:
+            break
+    logger.info(f"Purga terminada: {total} respuestas de Idempotency-Key vencidas borradas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
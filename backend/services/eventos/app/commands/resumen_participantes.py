@@ -0,0 +1,53 @@
+"""
+Mantenimiento del read model `resumen_participantes_evento`.
+
+Uso (desde backend/services/eventos):
+    python -m app.commands.resumen_participantes rebuild [--evento UUID]
+    python -m app.commands.resumen_participantes check [--evento UUID]
+
+`check` termina con código 1 si encuentra eventos cuyo resumen no coincide con
+los participantes reales; `rebuild` los recalcula.
+"""
+import argparse
+import logging
+import sys
+from uuid import UUID
+
+from app.core.database import SessionLocal
+from app.repositories.resumen_participantes_repository import ResumenParticipantesRepository
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Resumen de participantes por evento")
+    parser.add_argument("accion", choices=["rebuild", "check"])
+    parser.add_argument("--evento", type=UUID, default=None, help="Limitar a un evento")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    db = SessionLocal()
+    try:
+        repo = ResumenParticipantesRepository(db)
+        if args.accion == "rebuild":
+            actualizados = repo.rebuild(args.evento)
+            logger.info(f"Resumen reconstruido: {actualizados} eventos actualizados")
+            return 0
+
+        inconsistencias = repo.verificar(args.evento)
+        for item in inconsistencias:
+            logger.warning(
+                f"Evento {item.evento_id}: resumen={item.conteos_resumen} reales={item.conteos_reales}"
+            )
+        if inconsistencias:
+            logger.error(f"{len(inconsistencias)} eventos con resumen inconsistente")
+            return 1
+        logger.info("Resumen de participantes consistente")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Control de admisión y descarte de carga.
+
+Cada solicitud se clasifica por método y ruta (listados y exportaciones
+pesados, lecturas puntuales, escrituras) y pasa por la compuerta de su clase:
+hasta `limite` solicitudes en curso y hasta `cola` esperando turno. Con la
+cola llena, o tras esperar más de `espera_max` segundos, se responde 503 con
+`Retry-After` en lugar de dejar que la solicitud se acumule en el threadpool y
+en el pool de conexiones hasta vencer por timeout.
+
+En modo adaptativo los límites se reducen en proporción a la latencia de las
+sentencias SQL (promedio móvil) cuando supera la latencia objetivo. Las rutas
+de `rutas_limitadas` además pasan por un token bucket en memoria por cliente.
+"""
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Sequence, Tuple
+import asyncio
+import json
+import math
+import re
+import time
+
+from app.core import instrumentacion
+from app.core.metricas import Contador, registro
+
+PESADA = "pesada"
+LECTURA = "lectura"
+ESCRITURA = "escritura"
+
+_METODOS_LECTURA = frozenset(("GET", "HEAD"))
+
+rechazos_admision = registro.registrar(Contador(
+    "admission_rejected_total", "Solicitudes rechazadas con 503/429 por control de admisión", ("clase", "motivo")
+))
+
+
+class Compuerta:
+    """Límite de concurrencia con cola FIFO acotada; vive en el event loop del worker"""
+
+    def __init__(self, limite: int, cola: int, espera_max: float):
+        self.limite = limite
+        self.cola = cola
+        self.espera_max = espera_max
+        self.en_curso = 0
+        self._turnos: Deque[asyncio.Future] = deque()
+
+    async def entrar(self, limite: int) -> bool:
+        """Ocupar un lugar; False si la cola está llena o se agotó la espera"""
+        # Si el límite volvió a subir, los lugares libres son primero de los que esperan
+        self._despertar(limite)
+        if self.en_curso < limite:
+            self.en_curso += 1
+            return True
+        if len(self._turnos) >= self.cola:
+            return False
+        turno = asyncio.get_running_loop().create_future()
+        self._turnos.append(turno)
+        try:
+            # _despertar() ocupa el lugar en nombre del turno antes de resolverlo
+            await asyncio.wait_for(turno, self.espera_max)
+            return True
+        except asyncio.TimeoutError:
+            # El lugar pudo cederse justo al vencer la espera
+            return turno.done() and not turno.cancelled()
+        except asyncio.CancelledError:
+            if turno.done() and not turno.cancelled():
+                self.salir(limite)
+            raise
+        finally:
+            if not turno.done() or turno.cancelled():
+                try:
+                    self._turnos.remove(turno)
+                except ValueError:
+                    pass
+
+    def salir(self, limite: int) -> None:
+        # Si el límite bajó (modo adaptativo) el lugar se libera en vez de cederse;
+        # si subió, se despiertan turnos hasta cubrir el límite vigente
+        self.en_curso -= 1
+        self._despertar(limite)
+
+    def _despertar(self, limite: int) -> None:
+        """Ceder lugares libres a los turnos pendientes, en orden, hasta `limite`"""
+        while self.en_curso < limite and self._turnos:
+            turno = self._turnos.popleft()
+            if not turno.done():
+                turno.set_result(None)
+                self.en_curso += 1
+
+    @property
+    def esperando(self) -> int:
+        return len(self._turnos)
+
+
+class LatenciaDB:
+    """Promedio móvil exponencial de la duración de las sentencias SQL"""
+
+    def __init__(self, alfa: float = 0.05):
+        self.alfa = alfa
+        self.ms = 0.0
+
+    def observar(self, sql: str, parametros, duracion: float) -> None:
+        # Se llama desde los hilos del threadpool; una actualización perdida no importa
+        self.ms += self.alfa * (duracion * 1000 - self.ms)
+
+
+class CuboTokens:
+    """Token bucket por cliente, en memoria del worker"""
+
+    MAX_CLIENTES = 10_000
+
+    def __init__(self, tasa: float, rafaga: int):
+        self.tasa = tasa
+        self.rafaga = rafaga
+        self._clientes: Dict[str, Tuple[float, float]] = {}
+
+    def tomar(self, cliente: str) -> float:
+        """0 si hay token; si no, segundos hasta el próximo"""
+        ahora = time.monotonic()
+        tokens, ultima = self._clientes.get(cliente, (self.rafaga, ahora))
+        tokens = min(self.rafaga, tokens + (ahora - ultima) * self.tasa)
+        if tokens < 1:
+            self._clientes[cliente] = (tokens, ahora)
+            return (1 - tokens) / self.tasa
+        if len(self._clientes) >= self.MAX_CLIENTES and cliente not in self._clientes:
+            self._purgar(ahora)
+        self._clientes[cliente] = (tokens - 1, ahora)
+        return 0.0
+
+    def _purgar(self, ahora: float) -> None:
+        # Un cliente con el cubo ya lleno de nuevo no necesita estado
+        lleno = self.rafaga / self.tasa
+        self._clientes = {c: v for c, v in self._clientes.items() if ahora - v[1] < lleno}
+        if len(self._clientes) >= self.MAX_CLIENTES:
+            self._clientes.clear()
+
+
+class AdmisionMiddleware:
+    """Middleware ASGI de control de admisión por clase de ruta (ver el docstring del módulo)"""
+
+    def __init__(
+        self,
+        app,
+        limites: Dict[str, int],
+        cola: int = 64,
+        espera_max: float = 2.0,
+        retry_after: int = 1,
+        rutas_pesadas: Sequence[str] = (),
+        exentas: Sequence[str] = ("/health", "/metrics"),
+        adaptativo: bool = False,
+        latencia_objetivo_ms: float = 50.0,
+        rutas_limitadas: Sequence[str] = (),
+        tasa_por_cliente: Optional[float] = None,
+        rafaga_por_cliente: int = 20,
+    ):
+        self.app = app
+        self.compuertas = {clase: Compuerta(limite, cola, espera_max) for clase, limite in limites.items()}
+        self.retry_after = retry_after
+        self._pesadas = re.compile("|".join(rutas_pesadas)) if rutas_pesadas else None
+        self._exentas = tuple(exentas)
+        self.latencia = LatenciaDB() if adaptativo else None
+        self.latencia_objetivo_ms = latencia_objetivo_ms
+        if self.latencia is not None:
+            instrumentacion.al_ejecutar(self.latencia.observar)
+        self._limitadas = re.compile("|".join(rutas_limitadas)) if rutas_limitadas and tasa_por_cliente else None
+        self.cubo = CuboTokens(tasa_por_cliente, rafaga_por_cliente) if self._limitadas else None
+        registro.colector(self._colector)
+
+    def clasificar(self, metodo: str, ruta: str) -> str:
+        if metodo not in _METODOS_LECTURA:
+            return ESCRITURA
+        if self._pesadas is not None and self._pesadas.search(ruta):
+            return PESADA
+        return LECTURA
+
+    def limite(self, clase: str) -> int:
+        """Límite efectivo de la clase: reducido si la base de datos responde más lento que el objetivo"""
+        limite = self.compuertas[clase].limite
+        if self.latencia is None or self.latencia.ms <= self.latencia_objetivo_ms:
+            return limite
+        return max(1, int(limite * self.latencia_objetivo_ms / self.latencia.ms))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self._exentas):
+            await self.app(scope, receive, send)
+            return
+
+        ruta = scope["path"]
+        clase = self.clasificar(scope["method"], ruta)
+        if self.cubo is not None and self._limitadas.search(ruta):
+            cliente = scope["client"][0] if scope.get("client") else "desconocido"
+            espera = self.cubo.tomar(cliente)
+            if espera:
+                rechazos_admision.labels(clase, "tasa").inc()
+                await self._rechazar(send, 429, "Demasiadas solicitudes, reintentar más tarde", math.ceil(espera))
+                return
+
+        compuerta = self.compuertas[clase]
+        limite = self.limite(clase)
+        if not await compuerta.entrar(limite):
+            rechazos_admision.labels(clase, "saturado").inc()
+            await self._rechazar(send, 503, "Servicio saturado, reintentar más tarde", self.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            compuerta.salir(self.limite(clase))
+
+    @staticmethod
+    async def _rechazar(send, codigo: int, detalle: str, retry_after: int) -> None:
+        cuerpo = json.dumps({"detail": detalle}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": codigo,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(cuerpo)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": cuerpo})
+
+    def _colector(self) -> Iterable:
+        clases = list(self.compuertas.items())
+        muestras = [
+            ("admission_in_flight", "gauge", "Solicitudes admitidas en curso por clase",
+             [({"clase": c}, g.en_curso) for c, g in clases]),
+            ("admission_queued", "gauge", "Solicitudes esperando turno por clase",
+             [({"clase": c}, g.esperando) for c, g in clases]),
+            ("admission_limit", "gauge", "Límite de concurrencia efectivo por clase",
+             [({"clase": c}, self.limite(c)) for c, _ in clases]),
+        ]
+        if self.latencia is not None:
+            muestras.append(("admission_db_latency_ms", "gauge", "Promedio móvil de latencia SQL usado por el modo adaptativo",
+                             [({}, self.latencia.ms)]))
+        return muestras
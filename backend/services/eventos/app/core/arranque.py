@@ -0,0 +1,32 @@
+from typing import Dict
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Arranque:
+    """
+    Tiempo de cada fase del arranque de un worker (importación, calentamiento,
+    change feed...), medido desde que se importa este módulo. `main.py` lo importa
+    antes que cualquier otra cosa para que la primera fase incluya FastAPI y SQLAlchemy.
+    """
+
+    def __init__(self):
+        self.inicio = self._ultima = time.perf_counter()
+        self.fases: Dict[str, float] = {}
+
+    def marcar(self, fase: str) -> None:
+        """Cerrar la fase en curso y registrar su duración"""
+        ahora = time.perf_counter()
+        self.fases[fase] = (ahora - self._ultima) * 1000
+        self._ultima = ahora
+        logger.info(f"Arranque: {fase} en {self.fases[fase]:.0f} ms")
+
+    def listo(self) -> None:
+        """Registrar el total al quedar listo para recibir tráfico"""
+        detalle = ", ".join(f"{fase} {ms:.0f}" for fase, ms in self.fases.items())
+        logger.info(f"Listo para recibir tráfico en {(time.perf_counter() - self.inicio) * 1000:.0f} ms ({detalle})")
+
+
+arranque = Arranque()
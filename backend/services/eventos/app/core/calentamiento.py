@@ -0,0 +1,54 @@
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from .config import settings
+from .database import SessionLocal, get_engine
+
+logger = logging.getLogger(__name__)
+
+
+def llenar_pool() -> int:
+    """Abrir las pool_size conexiones del worker para que la primera ráfaga no pague el connect"""
+    pool_size, _ = settings.pool_por_worker()
+    conexiones = []
+    try:
+        for _ in range(pool_size):
+            conexion = get_engine().connect()
+            conexiones.append(conexion)
+            conexion.execute(text("SELECT 1"))
+    finally:
+        for conexion in conexiones:
+            conexion.close()
+    return len(conexiones)
+
+
+def calentar() -> None:
+    """
+    Preparar el worker antes de aceptar tráfico: mappers configurados, pool lleno
+    y consultas de catálogos ya compiladas. Se llama desde el lifespan, que uvicorn
+    completa antes de empezar a aceptar conexiones.
+    """
+    # Importación diferida: los repositorios importan los modelos, que dependen de database
+    from app.repositories.tipos_evento_repository import TiposEventoRepository
+    from app.repositories.estados_evento_repository import EstadosEventoRepository
+    from app.repositories.estados_participante_repository import EstadosParticipanteRepository
+
+    inicio = time.perf_counter()
+    configure_mappers()
+    conexiones = llenar_pool()
+    db = SessionLocal()
+    try:
+        # Deja las sentencias en la caché de compilación de SQLAlchemy
+        catalogos = sum(
+            len(repo(db).get_all())
+            for repo in (TiposEventoRepository, EstadosEventoRepository, EstadosParticipanteRepository)
+        )
+    finally:
+        db.close()
+    logger.info(
+        f"Worker caliente en {(time.perf_counter() - inicio) * 1000:.0f} ms: "
+        f"{conexiones} conexiones, {catalogos} filas de catálogos"
+    )
@@ -0,0 +1,93 @@
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+
+class ConflictoVersion(Exception):
+    """La fila existe pero ya no tiene la versión que leyó el cliente"""
+
+    def __init__(self, version_actual: int):
+        super().__init__(f"Versión actual: {version_actual}")
+        self.version_actual = version_actual
+
+
+def etag(version: int) -> str:
+    """ETag de una fila versionada"""
+    return f'"{version}"'
+
+
+def version_de_if_match(if_match: str) -> int:
+    """
+    Versión esperada a partir de un If-Match (`"3"` o `W/"3"`; solo la primera
+    etiqueta). Una etiqueta que no es una versión devuelve 0, que nunca coincide.
+    """
+    etiqueta = if_match.split(",")[0].strip()
+    if etiqueta.startswith("W/"):
+        etiqueta = etiqueta[2:]
+    try:
+        return int(etiqueta.strip('"'))
+    except ValueError:
+        return 0
+
+
+def version_esperada(if_match: Optional[str], version: Optional[int]) -> Tuple[Optional[int], int]:
+    """
+    Versión contra la que condicionar un UPDATE y el código a devolver si no coincide:
+    If-Match tiene prioridad (412); si no, el campo `version` del cuerpo (409).
+    Sin ninguno de los dos (o con `If-Match: *`) la actualización es incondicional.
+    """
+    if if_match is not None:
+        if if_match.strip() == "*":
+            return None, status.HTTP_412_PRECONDITION_FAILED
+        return version_de_if_match(if_match), status.HTTP_412_PRECONDITION_FAILED
+    return version, status.HTTP_409_CONFLICT
+
+
+def conflicto_version(error: ConflictoVersion, codigo: int) -> HTTPException:
+    """HTTPException para una versión vieja, con la versión actual como ETag"""
+    return HTTPException(
+        status_code=codigo,
+        detail=f"El recurso fue modificado por otra petición (versión actual {error.version_actual})",
+        headers={"ETag": etag(error.version_actual)}
+    )
+
+
+def actualizar_condicional(
+    db: Session, modelo, id: Any, valores: dict, version: Optional[int] = None, opciones: Sequence = ()
+):
+    """
+    UPDATE ... SET valores, version = version + 1 WHERE id = :id [AND version = :v]
+    RETURNING ..., sin leer la fila antes. Si el modelo tiene eliminado_en solo
+    actualiza filas vivas; si no tiene columna version (catálogos) la
+    actualización es incondicional y no sube versión. `opciones` carga relaciones
+    de la fila devuelta (selectinload: joinedload no aplica a un UPDATE). No
+    confirma la transacción.
+
+    Devuelve la fila actualizada o None si no existe; ConflictoVersion si existe
+    con otra versión.
+    """
+    versionado = "version" in modelo.__table__.c
+    condiciones = [modelo.id == id]
+    if hasattr(modelo, "eliminado_en"):
+        condiciones.append(modelo.eliminado_en.is_(None))
+    if not versionado:
+        if not valores:
+            return db.execute(select(modelo).where(*condiciones).options(*opciones)).scalar_one_or_none()
+        version = None
+    else:
+        valores = {**valores, "version": modelo.version + 1}
+    sentencia = update(modelo).where(
+        *condiciones, *([modelo.version == version] if version is not None else [])
+    ).values(**valores).returning(modelo).options(*opciones).execution_options(
+        synchronize_session=False, populate_existing=True
+    )
+
+    fila = db.execute(sentencia).scalar_one_or_none()
+    if fila is None and version is not None:
+        # Solo en el camino de error: distinguir una fila inexistente de una versión vieja
+        version_actual = db.execute(select(modelo.version).where(*condiciones)).scalar()
+        if version_actual is not None:
+            raise ConflictoVersion(version_actual)
+    return fila
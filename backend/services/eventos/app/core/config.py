@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 
 class Settings(BaseSettings):
     # Database
@@ -15,7 +16,105 @@ class Settings(BaseSettings):
     secret_key: str
     access_token_expire_minutes: int = 30
     
+    # Outbox y change feed
+    outbox_enabled: bool = True
+    change_feed_enabled: bool = True
+    change_feed_poll_interval: float = 5.0
+    change_feed_batch_size: int = 100
+    
+    # Instrumentación SQL por solicitud (Server-Timing y detección de N+1)
+    sql_instrumentacion_enabled: bool = True
+    sql_repeticiones_umbral: int = 10
+    server_timing_enabled: bool = True
+    metrics_enabled: bool = True
+    
+    # Consultas lentas: buffer circular y EXPLAIN ANALYZE muestreado (ajustable en /admin)
+    consultas_lentas_enabled: bool = True
+    consultas_lentas_umbral_ms: float = 200.0
+    consultas_lentas_muestreo_explain: float = 0.05
+    consultas_lentas_capacidad: int = 200
+    admin_token: Optional[str] = None
+    
+    # Archivado en frío de filas eliminadas (python -m app.commands.archivo)
+    archivo_dias: int = 90
+    archivo_lote: int = 1000
+    musicos_schema: str = "servicio_musicos"
+    
+    # Agenda de músicos: dos eventos a menos de esta distancia se marcan en conflicto
+    conflicto_ventana_horas: float = 4.0
+    participantes_lote_max: int = 200
+    
+    # Servidor de producción (python -m app.servidor): workers y pool de conexiones
+    workers: int = 1
+    # Presupuesto de conexiones a PostgreSQL entre todos los workers; si se indica,
+    # cada worker recibe conexiones_total // workers sin overflow (ver pool_por_worker)
+    db_conexiones_total: Optional[int] = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    # Llenar el pool y precargar catálogos antes de aceptar tráfico
+    calentar_al_iniciar: bool = True
+    
+    # Control de admisión: solicitudes en curso por clase de ruta y cola acotada (503 + Retry-After)
+    admision_enabled: bool = True
+    admision_limite_pesadas: int = 4
+    admision_limite_lecturas: int = 16
+    admision_limite_escrituras: int = 8
+    admision_cola: int = 32
+    admision_espera_max: float = 2.0
+    admision_retry_after: int = 1
+    # Modo adaptativo: reduce los límites si la latencia SQL promedio supera el objetivo
+    admision_adaptativo: bool = False
+    admision_latencia_objetivo_ms: float = 50.0
+    
+    # Idempotency-Key en las altas: respuestas guardadas para reproducir los reintentos
+    idempotencia_enabled: bool = True
+    idempotencia_ttl_horas: float = 24.0
+    
+    # Compresión negociada (gzip; br y zstd si están instalados brotli/zstandard)
+    compresion_enabled: bool = True
+    compresion_minimo_bytes: int = 1024
+    # Carga promedio por CPU a partir de la cual se usa el nivel de compresión más rápido
+    compresion_carga_alta: float = 0.75
+    # Respuestas en MessagePack con Accept: application/msgpack (requiere el paquete msgpack)
+    msgpack_enabled: bool = True
+    
+    # Trabajos en segundo plano (tabla `trabajos`): tareas por worker y sondeo de la cola
+    trabajos_enabled: bool = True
+    trabajos_workers: int = 2
+    trabajos_intervalo: float = 1.0
+    # Segundos en curso antes de que otro worker pueda retomar un trabajo
+    trabajos_visibilidad: float = 300.0
+    trabajos_max_intentos: int = 5
+    # Backoff exponencial entre intentos: base * 2^(intento - 1), hasta el máximo
+    trabajos_backoff_base: float = 5.0
+    trabajos_backoff_max: float = 900.0
+    
+    # Viabilidad del repertorio: lee canciones y requisitos del esquema de canciones
+    canciones_schema: str = "servicio_canciones"
+    # Segundos antes de recompilar el catálogo de requisitos (servicio_canciones no publica cambios)
+    repertorio_catalogo_ttl: float = 300.0
+    repertorio_cache_eventos: int = 256
+    
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+    def pool_por_worker(self) -> Tuple[int, int]:
+        """(pool_size, max_overflow) del engine de este worker"""
+        if not self.db_conexiones_total:
+            return self.db_pool_size, self.db_max_overflow
+        # Sin overflow: la suma de los pools nunca supera el presupuesto
+        return max(1, self.db_conexiones_total // max(1, self.workers)), 0
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Configuración del proceso, leída del entorno y del .env en el primer uso"""
+    return Settings()
+
+
+def __getattr__(nombre: str):
+    # `from app.core.config import settings` sigue funcionando: lee el entorno en ese momento
+    if nombre == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,223 @@
+"""
+Registro de consultas lentas con muestreo de EXPLAIN (ANALYZE, BUFFERS).
+
+Cada sentencia que supera el umbral se guarda (SQL, parámetros redactados,
+duración y método de repositorio que la emitió) en un buffer circular acotado.
+Una fracción de las SELECT lentas se vuelve a ejecutar con EXPLAIN ANALYZE en
+un hilo aparte, dentro de una transacción que se descarta, para no sumar
+latencia a la solicitud original. La configuración se cambia en caliente desde
+el endpoint de administración.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional
+from uuid import UUID
+import itertools
+import logging
+import queue
+import random
+import re
+import threading
+
+from sqlalchemy.engine import Engine
+
+from app.core import instrumentacion
+from app.core.config import settings
+from app.core.metricas import origen_actual
+
+logger = logging.getLogger(__name__)
+
+# Tiempo máximo de un EXPLAIN ANALYZE muestreado
+EXPLAIN_TIMEOUT_MS = 10_000
+
+# Lecturas que igual bloquean o modifican algo al ejecutarse: FOR UPDATE/SHARE
+# (SKIP LOCKED incluido), CTE con escrituras, advisory locks, NOTIFY y secuencias
+_EFECTOS = re.compile(
+    r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b"
+    r"|\b(INSERT|UPDATE|DELETE|MERGE)\b"
+    r"|\b(pg_advisory\w*|pg_notify|nextval|setval)\s*\(",
+    re.IGNORECASE
+)
+
+
+def redactar(valor: Any) -> Any:
+    """Parámetro apto para mostrarse: se conservan tipos y números, no el texto"""
+    if valor is None or isinstance(valor, (bool, int, float, Decimal)):
+        return valor
+    if isinstance(valor, (UUID, datetime)):
+        return str(valor)
+    if isinstance(valor, (list, tuple)):
+        return [redactar(v) for v in valor]
+    if isinstance(valor, dict):
+        return {k: redactar(v) for k, v in valor.items()}
+    if isinstance(valor, str):
+        return f"<str:{len(valor)}>"
+    return f"<{type(valor).__name__}>"
+
+
+@dataclass
+class ConsultaLenta:
+    id: int
+    sql: str
+    parametros: Any
+    duracion_ms: float
+    origen: str
+    registrada_en: datetime
+    plan: Optional[Any] = None
+    plan_error: Optional[str] = None
+    plan_pendiente: bool = False
+
+
+@dataclass
+class _Muestra:
+    consulta: ConsultaLenta
+    sql: str
+    parametros: Any = field(repr=False)
+
+
+class RegistroConsultasLentas:
+    """Buffer circular de consultas lentas; configurable en tiempo de ejecución"""
+
+    def __init__(self, habilitado: bool, umbral_ms: float, muestreo_explain: float, capacidad: int):
+        self.habilitado = habilitado
+        self.umbral_ms = umbral_ms
+        self.muestreo_explain = muestreo_explain
+        self._consultas: Deque[ConsultaLenta] = deque(maxlen=capacidad)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._engine: Optional[Engine] = None
+        self._pendientes: "queue.Queue[_Muestra]" = queue.Queue(maxsize=10)
+        self._worker: Optional[threading.Thread] = None
+        self._en_worker = threading.local()
+
+    # ---------- configuración ----------
+
+    @property
+    def capacidad(self) -> int:
+        return self._consultas.maxlen
+
+    def configurar(
+        self,
+        habilitado: Optional[bool] = None,
+        umbral_ms: Optional[float] = None,
+        muestreo_explain: Optional[float] = None,
+        capacidad: Optional[int] = None
+    ) -> None:
+        if habilitado is not None:
+            self.habilitado = habilitado
+        if umbral_ms is not None:
+            self.umbral_ms = umbral_ms
+        if muestreo_explain is not None:
+            self.muestreo_explain = muestreo_explain
+        if capacidad is not None and capacidad != self.capacidad:
+            with self._lock:
+                self._consultas = deque(self._consultas, maxlen=capacidad)
+        logger.info(
+            f"Consultas lentas: habilitado={self.habilitado} umbral={self.umbral_ms}ms "
+            f"muestreo_explain={self.muestreo_explain} capacidad={self.capacidad}"
+        )
+
+    def configuracion(self) -> Dict[str, Any]:
+        return {
+            "habilitado": self.habilitado,
+            "umbral_ms": self.umbral_ms,
+            "muestreo_explain": self.muestreo_explain,
+            "capacidad": self.capacidad,
+        }
+
+    # ---------- captura ----------
+
+    def instalar(self, engine: Engine) -> None:
+        self._engine = engine
+        instrumentacion.instalar(engine)
+        instrumentacion.al_ejecutar(self._observar)
+
+    def _observar(self, sql: str, parametros: Any, duracion: float) -> None:
+        # Camino caliente: la mayoría de las sentencias sale en la primera comparación
+        if not self.habilitado or duracion * 1000 < self.umbral_ms:
+            return
+        if getattr(self._en_worker, "activo", False):
+            return
+        consulta = ConsultaLenta(
+            id=next(self._ids),
+            sql=sql,
+            parametros=redactar(parametros),
+            duracion_ms=round(duracion * 1000, 3),
+            origen=origen_actual(),
+            registrada_en=datetime.now(timezone.utc)
+        )
+        if self._muestrear(sql, parametros):
+            consulta.plan_pendiente = True
+            try:
+                self._pendientes.put_nowait(_Muestra(consulta, sql, parametros))
+                self._iniciar_worker()
+            except queue.Full:
+                consulta.plan_pendiente = False
+        with self._lock:
+            self._consultas.append(consulta)
+        logger.warning(f"Consulta lenta ({consulta.duracion_ms:.1f} ms) en {consulta.origen}: {sql[:300]}")
+
+    def _muestrear(self, sql: str, parametros: Any) -> bool:
+        if self._engine is None or random.random() >= self.muestreo_explain:
+            return False
+        # EXPLAIN ANALYZE ejecuta la sentencia: solo lecturas, y no executemany
+        if isinstance(parametros, list):
+            return False
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return False
+        # Repetirlas desde otro hilo tomaría locks de verdad (o robaría filas con SKIP LOCKED)
+        return not _EFECTOS.search(sql)
+
+    # ---------- EXPLAIN fuera de banda ----------
+
+    def _iniciar_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="consultas-lentas-explain", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        self._en_worker.activo = True
+        while True:
+            muestra = self._pendientes.get()
+            try:
+                muestra.consulta.plan = self._explicar(muestra.sql, muestra.parametros)
+            except Exception as e:
+                muestra.consulta.plan_error = str(e).splitlines()[0][:500]
+                logger.debug(f"EXPLAIN de consulta lenta {muestra.consulta.id} falló: {e}")
+            finally:
+                muestra.consulta.plan_pendiente = False
+
+    def _explicar(self, sql: str, parametros: Any) -> Any:
+        with self._engine.connect() as conn:
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+            try:
+                return conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, parametros
+                ).scalar()
+            finally:
+                conn.rollback()
+
+    # ---------- lectura ----------
+
+    def consultas(self, limit: Optional[int] = None) -> List[ConsultaLenta]:
+        """Consultas registradas, de la más reciente a la más antigua"""
+        with self._lock:
+            consultas = list(reversed(self._consultas))
+        return consultas[:limit] if limit else consultas
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._consultas.clear()
+
+
+consultas_lentas = RegistroConsultasLentas(
+    habilitado=settings.consultas_lentas_enabled,
+    umbral_ms=settings.consultas_lentas_umbral_ms,
+    muestreo_explain=settings.consultas_lentas_muestreo_explain,
+    capacidad=settings.consultas_lentas_capacidad
+)
@@ -1,20 +1,97 @@
+from typing import Callable, List, Optional
+import logging
+import threading
+import time
+
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from .config import settings
+from sqlalchemy.orm import Session, sessionmaker
+from .config import get_settings
+from .metricas import QueuePoolMedido, registrar_pool
+
+logger = logging.getLogger(__name__)
+
+_engine: Optional[Engine] = None
+_al_crear: List[Callable[[Engine], None]] = []
+_candado = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Engine del proceso. Se crea en el primer uso y no al importar: crear el engine
+    importa el driver de PostgreSQL y el dialecto, que no hacen falta hasta la
+    primera consulta (ni en los comandos que no tocan la base).
+    """
+    global _engine
+    if _engine is None:
+        with _candado:
+            if _engine is None:
+                _engine = _crear_engine()
+    return _engine
+
+
+def _crear_engine() -> Engine:
+    inicio = time.perf_counter()
+    settings = get_settings()
+    # Tamaño del pool de este worker (derivado del presupuesto global si hay varios)
+    pool_size, max_overflow = settings.pool_por_worker()
+
+    # Crear engine con search_path configurado
+    engine = create_engine(
+        settings.database_url,
+        connect_args={
+            "options": f"-c search_path={settings.database_schema},public"
+        },
+        # Las tablas de los modelos no llevan esquema: se resuelve acá, no al importarlos
+        execution_options={"schema_translate_map": {None: settings.database_schema}},
+        poolclass=QueuePoolMedido,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout
+    )
+    registrar_pool(engine)
+    for instalar in _al_crear:
+        instalar(engine)
+    logger.info(f"Engine creado en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    return engine
+
+
+def al_crear_engine(instalar: Callable[[Engine], None]) -> None:
+    """Ejecutar `instalar(engine)` cuando se cree el engine, o ya si existe"""
+    with _candado:
+        if _engine is None:
+            _al_crear.append(instalar)
+            return
+    instalar(_engine)
+
+
+def cerrar_engine() -> None:
+    """Cerrar las conexiones del pool, si el engine llegó a crearse"""
+    if _engine is not None:
+        _engine.dispose()
+
+
+def __getattr__(nombre: str):
+    # Compatibilidad: `from app.core.database import engine` crea el engine al importarse
+    if nombre == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+class _Sesion(Session):
+    """Sesión que se liga al engine del proceso recién al ejecutar la primera sentencia"""
+
+    def get_bind(self, mapper=None, **kw):
+        if self.bind is None and kw.get("bind") is None:
+            self.bind = get_engine()
+        return super().get_bind(mapper, **kw)
 
-# Crear engine con search_path configurado
-engine = create_engine(
-    settings.database_url,
-    connect_args={
-        "options": f"-c search_path={settings.database_schema},public"
-    }
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=_Sesion, autocommit=False, autoflush=False)
 
-# Base para los modelos con schema específico
-metadata = MetaData(schema=settings.database_schema)
+# Base para los modelos: el esquema del servicio lo aplica el engine (schema_translate_map)
+metadata = MetaData()
 Base = declarative_base(metadata=metadata)
 
 # Dependency para obtener la sesión de DB
@@ -23,4 +100,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
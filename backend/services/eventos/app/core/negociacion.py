@@ -0,0 +1,276 @@
+"""
+Negociación de contenido: compresión de respuestas y MessagePack opcional.
+
+NegociacionMiddleware comprime con la mejor codificación que acepte el cliente
+(`Accept-Encoding`) entre las disponibles: zstd (paquete `zstandard`), br
+(paquete `brotli`) y gzip (siempre). Solo comprime tipos de texto, JSON y
+MessagePack por encima de `minimo_bytes`, y baja al nivel más rápido cuando la
+carga del host por CPU supera `carga_alta`. Las respuestas en streaming se
+comprimen por partes.
+
+Con el paquete `msgpack` instalado, un cliente que envía
+`Accept: application/msgpack` (llamadas entre servicios) recibe MessagePack en
+lugar de JSON: RespuestaNegociada es la clase de respuesta por defecto de la app
+y serializa según el formato que el middleware dejó en el contexto.
+"""
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+import os
+import time
+import zlib
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # opcional
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:  # opcional
+    msgpack = None
+
+MEDIA_MSGPACK = "application/msgpack"
+_ACEPTA_MSGPACK = (MEDIA_MSGPACK, "application/x-msgpack")
+_COMPRIMIBLES = ("text/", "application/json", MEDIA_MSGPACK, "application/javascript", "image/svg+xml")
+# Por encima de este tamaño se comprime en el threadpool para no bloquear el event loop
+_BLOQUE_THREADPOOL = 256 * 1024
+
+_formato: ContextVar[Optional[str]] = ContextVar("formato_respuesta", default=None)
+
+
+class _Gzip:
+    def __init__(self, nivel: int):
+        self._c = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._c.compress(datos)
+
+    def vaciar(self) -> bytes:
+        return self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self) -> bytes:
+        return self._c.flush()
+
+
+class _Brotli:
+    def __init__(self, nivel: int):
+        self._c = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._c.process(datos)
+
+    def vaciar(self) -> bytes:
+        return self._c.flush()
+
+    def terminar(self) -> bytes:
+        return self._c.finish()
+
+
+class _Zstd:
+    def __init__(self, nivel: int):
+        self._c = zstandard.ZstdCompressor(level=nivel).compressobj()
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._c.compress(datos)
+
+    def vaciar(self) -> bytes:
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def terminar(self) -> bytes:
+        return self._c.flush()
+
+
+# Codificación -> (compresor, nivel normal, nivel con el host cargado), en orden de preferencia
+CODIFICACIONES: Dict[str, Tuple[type, int, int]] = {
+    nombre: valores for nombre, valores, disponible in (
+        ("zstd", (_Zstd, 3, 1), zstandard is not None),
+        ("br", (_Brotli, 4, 1), brotli is not None),
+        ("gzip", (_Gzip, 6, 1), True),
+    ) if disponible
+}
+
+
+def elegir_codificacion(accept_encoding: str, disponibles: Sequence[str]) -> Optional[str]:
+    """Codificación con mayor q aceptada por el cliente; a igual q, la primera de `disponibles`"""
+    calidades: Dict[str, float] = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                calidad = float(parametros[2:])
+            except ValueError:
+                calidad = 0.0
+        if nombre:
+            calidades[nombre.strip()] = calidad
+    comodin = calidades.get("*", 0.0)
+    mejor, mejor_calidad = None, 0.0
+    for nombre in disponibles:
+        calidad = calidades.get(nombre, comodin)
+        if calidad > mejor_calidad:
+            mejor, mejor_calidad = nombre, calidad
+    return mejor
+
+
+class _Carga:
+    """¿Está cargado el host? Carga promedio por CPU, muestreada como mucho una vez por segundo"""
+
+    def __init__(self, umbral: float):
+        self.umbral = umbral
+        self._alta = False
+        self._muestreada = 0.0
+
+    def alta(self) -> bool:
+        ahora = time.monotonic()
+        if ahora - self._muestreada >= 1.0:
+            self._muestreada = ahora
+            try:
+                self._alta = os.getloadavg()[0] / (os.cpu_count() or 1) > self.umbral
+            except (AttributeError, OSError):
+                # Sin getloadavg (Windows) se usa siempre el nivel normal
+                self._alta = False
+        return self._alta
+
+
+def _comprimible(tipo: str) -> bool:
+    return tipo.startswith(_COMPRIMIBLES)
+
+
+def formato_respuesta() -> str:
+    """Tipo de medio con el que RespuestaNegociada renderiza la respuesta de esta solicitud"""
+    return _formato.get() or "application/json"
+
+
+class RespuestaNegociada(JSONResponse):
+    """JSON por defecto; MessagePack si la solicitud lo pidió (ver NegociacionMiddleware)"""
+
+    def render(self, content) -> bytes:
+        if _formato.get() == MEDIA_MSGPACK:
+            self.media_type = MEDIA_MSGPACK
+            return msgpack.packb(content, use_bin_type=True)
+        return super().render(content)
+
+
+class NegociacionMiddleware:
+    """Middleware ASGI de compresión y formato de respuesta (ver el docstring del módulo)"""
+
+    def __init__(self, app, comprimir: bool = True, minimo_bytes: int = 1024, carga_alta: float = 0.75,
+                 msgpack_enabled: bool = True):
+        self.app = app
+        self.comprimir = comprimir
+        self.minimo_bytes = minimo_bytes
+        self.carga = _Carga(carga_alta)
+        self.msgpack_enabled = msgpack_enabled and msgpack is not None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encabezados = Headers(scope=scope)
+        token = None
+        if self.msgpack_enabled and any(tipo in encabezados.get("accept", "") for tipo in _ACEPTA_MSGPACK):
+            token = _formato.set(MEDIA_MSGPACK)
+        try:
+            codificacion = None
+            if self.comprimir:
+                codificacion = elegir_codificacion(encabezados.get("accept-encoding", ""), tuple(CODIFICACIONES))
+            if codificacion is None:
+                await self.app(scope, receive, self._con_vary(send))
+            else:
+                await self.app(scope, receive, _EnvioComprimido(self, send, codificacion).enviar)
+        finally:
+            if token is not None:
+                _formato.reset(token)
+
+    def _con_vary(self, send):
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                self.agregar_vary(MutableHeaders(scope=message))
+            await send(message)
+        return enviar
+
+    def agregar_vary(self, encabezados: MutableHeaders) -> None:
+        if not _comprimible(encabezados.get("content-type", "")):
+            return
+        encabezados.add_vary_header("Accept-Encoding")
+        if self.msgpack_enabled:
+            encabezados.add_vary_header("Accept")
+
+    def compresor(self, codificacion: str):
+        clase, nivel, nivel_cargado = CODIFICACIONES[codificacion]
+        return clase(nivel_cargado if self.carga.alta() else nivel)
+
+
+class _EnvioComprimido:
+    """Envoltura de `send` para una respuesta: decide al ver el inicio y la primera parte del cuerpo"""
+
+    def __init__(self, middleware: NegociacionMiddleware, send, codificacion: str):
+        self.middleware = middleware
+        self.send = send
+        self.codificacion = codificacion
+        self.inicio = None
+        self.compresor = None
+        self.directo = False
+
+    async def enviar(self, message) -> None:
+        if message["type"] == "http.response.start":
+            encabezados = MutableHeaders(scope=message)
+            self.middleware.agregar_vary(encabezados)
+            self.directo = (
+                "content-encoding" in encabezados
+                or not _comprimible(encabezados.get("content-type", ""))
+                or message["status"] in (204, 304)
+            )
+            if self.directo:
+                await self.send(message)
+            else:
+                self.inicio = message
+            return
+        if message["type"] != "http.response.body" or self.directo:
+            await self.send(message)
+            return
+
+        cuerpo = message.get("body", b"")
+        mas = message.get("more_body", False)
+        if self.compresor is None and self.inicio is not None:
+            inicio, self.inicio = self.inicio, None
+            if not mas and len(cuerpo) < self.middleware.minimo_bytes:
+                # Respuesta completa y chica: no vale la pena comprimir
+                self.directo = True
+                await self.send(inicio)
+                await self.send(message)
+                return
+            self.compresor = self.middleware.compresor(self.codificacion)
+            encabezados = MutableHeaders(scope=inicio)
+            encabezados["content-encoding"] = self.codificacion
+            if not mas:
+                comprimido = await self._comprimir_todo(cuerpo)
+                encabezados["content-length"] = str(len(comprimido))
+                await self.send(inicio)
+                await self.send({"type": "http.response.body", "body": comprimido})
+                return
+            # Streaming: el tamaño final no se conoce
+            del encabezados["content-length"]
+            await self.send(inicio)
+
+        # Cada parte sale completa: sin vaciar, el compresor retiene el stream hasta el final
+        datos = self.compresor.comprimir(cuerpo) + (self.compresor.vaciar() if mas else self.compresor.terminar())
+        await self.send({"type": "http.response.body", "body": datos, "more_body": mas})
+
+    async def _comprimir_todo(self, cuerpo: bytes) -> bytes:
+        def comprimir():
+            return self.compresor.comprimir(cuerpo) + self.compresor.terminar()
+        if len(cuerpo) >= _BLOQUE_THREADPOOL:
+            return await run_in_threadpool(comprimir)
+        return comprimir()
@@ -0,0 +1,66 @@
+from enum import Enum
+from typing import List, Optional, Tuple
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+logger = logging.getLogger(__name__)
+
+
+class TotalMode(str, Enum):
+    """Cómo calcular el total de un listado paginado"""
+    exact = "exact"        # COUNT(*) OVER() en la misma consulta de la página
+    estimate = "estimate"  # Estimación del planner (EXPLAIN), sin recorrer la tabla
+    none = "none"          # Sin total
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) de una sentencia, con sus parámetros procesados por SQLAlchemy"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimar_total(query: Query) -> int:
+    """Filas estimadas por el planner para la consulta sin paginar"""
+    statement = query.enable_eagerloads(False).order_by(None).limit(None).offset(None).statement
+    plan = query.session.execute(_Explain(statement)).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginar(
+    query: Query, skip: int, limit: int, total_mode: TotalMode = TotalMode.exact
+) -> Tuple[List, Optional[int]]:
+    """
+    Obtener una página de `query` y su total según `total_mode`.
+
+    En modo exacto el total viaja en cada fila como COUNT(*) OVER(), calculado
+    antes de LIMIT/OFFSET: una sola consulta en lugar de página + count().
+    Solo una página vacía más allá del final necesita un count() aparte.
+    """
+    if total_mode == TotalMode.exact:
+        filas = query.add_columns(
+            func.count().over().label("total_filas")
+        ).offset(skip).limit(limit).all()
+        if filas:
+            return [fila[0] for fila in filas], filas[0][1]
+        total = 0 if skip == 0 else query.enable_eagerloads(False).order_by(None).count()
+        return [], total
+
+    items = query.offset(skip).limit(limit).all()
+    if total_mode == TotalMode.none:
+        return items, None
+    try:
+        return items, estimar_total(query)
+    except Exception as e:
+        logger.error(f"No se pudo estimar el total: {e}")
+        return items, None
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -19,11 +19,28 @@ class Evento(Base):
     creado_en = Column(DateTime(timezone=True), server_default=func.now())
     actualizado_en = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     eliminado_en = Column(DateTime(timezone=True))
+    # Concurrencia optimista: cada UPDATE condiciona sobre la versión leída y la incrementa
+    version = Column(BigInteger, nullable=False, default=1, server_default="1")
     
     # Relationships
     tipo = relationship("CatTiposEvento")
     estado = relationship("CatEstadosEvento")
     participantes = relationship("ParticipanteEvento", back_populates="evento")
+    # Read model de conteos; solo se carga cuando la consulta lo pide con joinedload
+    resumen_participantes = relationship("ResumenParticipantesEvento", uselist=False, lazy="noload")
+    
+    __table_args__ = (
+        # Rangos de fecha con filtros de tipo/estado y continuación keyset sin tocar el heap
+        Index(
+            "idx_eventos_fecha_presentacion", fecha_presentacion, id,
+            postgresql_include=["tipo_id", "estado_id"],
+            postgresql_where=eliminado_en.is_(None)
+        ),
+        Index("idx_eventos_estado", estado_id, postgresql_where=eliminado_en.is_(None)),
+        Index("idx_eventos_tipo", tipo_id, postgresql_where=eliminado_en.is_(None)),
+        # Candidatos del archivado en frío
+        Index("idx_eventos_eliminado_en", eliminado_en, postgresql_where=eliminado_en.isnot(None)),
+    )
 
 class ParticipanteEvento(Base):
     __tablename__ = "participantes_evento"
@@ -36,4 +53,43 @@ class ParticipanteEvento(Base):
     
     # Relationships
     evento = relationship("Evento", back_populates="participantes")
-    estado = relationship("CatEstadosParticipante")
\ No newline at end of file
+    estado = relationship("CatEstadosParticipante")
+
+class ResumenParticipantesEvento(Base):
+    __tablename__ = "resumen_participantes_evento"
+    
+    evento_id = Column(UUID(as_uuid=True), ForeignKey("eventos.id", ondelete="CASCADE"), primary_key=True)
+    conteos = Column(JSONB, nullable=False, default=dict)  # código de estado -> cantidad
+    total = Column(Integer, nullable=False, default=0)
+    version = Column(BigInteger, nullable=False, default=0)
+    actualizado_en = Column(DateTime(timezone=True), server_default=func.now())
+
+class EventoArchivado(Base):
+    """Evento eliminado movido fuera de `eventos` por el archivado en frío"""
+    __tablename__ = "eventos_archivo"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    nombre = Column(String(255), nullable=False)
+    descripcion = Column(Text)
+    tipo_id = Column(Integer, nullable=False)
+    lugar = Column(String(255))
+    fecha_presentacion = Column(DateTime(timezone=True), nullable=False)
+    estado_id = Column(Integer, nullable=False)
+    creado_por = Column(UUID(as_uuid=True), nullable=False)
+    creado_en = Column(DateTime(timezone=True))
+    actualizado_en = Column(DateTime(timezone=True))
+    eliminado_en = Column(DateTime(timezone=True), nullable=False)
+    version = Column(BigInteger, nullable=False, server_default="1")
+    archivado_en = Column(DateTime(timezone=True), server_default=func.now())
+
+class ParticipanteEventoArchivado(Base):
+    __tablename__ = "participantes_evento_archivo"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    evento_id = Column(
+        UUID(as_uuid=True), ForeignKey("eventos_archivo.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    musico_id = Column(UUID(as_uuid=True), nullable=False)
+    estado_id = Column(Integer, nullable=False)
+    unido_en = Column(DateTime(timezone=True))
+    archivado_en = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, SmallInteger, DateTime, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class RespuestaIdempotente(Base):
+    __tablename__ = "idempotencia"
+
+    clave = Column(String(255), primary_key=True)
+    # sha256 de método, ruta y cuerpo: una clave reutilizada con otra solicitud se rechaza
+    huella = Column(String(64), nullable=False)
+    # NULL mientras la solicitud original está en curso
+    estado_http = Column(SmallInteger)
+    encabezados = Column(JSONB, nullable=False, default=dict)
+    cuerpo = Column(LargeBinary)
+    creado_en = Column(DateTime(timezone=True), server_default=func.now())
+    expira_en = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, BigInteger, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class OutboxEvento(Base):
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    agregado = Column(String(50), nullable=False)
+    agregado_id = Column(String(64), nullable=False)
+    operacion = Column(String(20), nullable=False)
+    datos = Column(JSONB, nullable=False, default=dict)
+    creado_en = Column(DateTime(timezone=True), server_default=func.now())
+
+class OutboxOffset(Base):
+    __tablename__ = "outbox_offsets"
+
+    consumidor = Column(String(100), primary_key=True)
+    origen = Column(String(63), primary_key=True)
+    ultimo_id = Column(BigInteger, nullable=False, default=0)
+    actualizado_en = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
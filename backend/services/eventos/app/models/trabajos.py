@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, String, SmallInteger, Text, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class Trabajo(Base):
+    """Cola de trabajos en segundo plano (ver app/core/trabajos.py)"""
+    __tablename__ = "trabajos"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    tipo = Column(String(100), nullable=False)
+    datos = Column(JSONB, nullable=False, default=dict)
+    # Con clave, a lo sumo un trabajo pendiente por clave
+    clave = Column(String(255))
+    # pendiente, en_curso (hasta disponible_en) o fallido
+    estado = Column(String(20), nullable=False, default="pendiente")
+    intentos = Column(SmallInteger, nullable=False, default=0)
+    max_intentos = Column(SmallInteger, nullable=False, default=5)
+    disponible_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    ultimo_error = Column(Text)
+    creado_en = Column(DateTime(timezone=True), server_default=func.now())
+    actualizado_en = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Trabajos por tomar (pendientes y en curso con la visibilidad vencida)
+        Index("idx_trabajos_disponibles", disponible_en, postgresql_where=estado != "fallido"),
+        Index("uk_trabajos_clave_pendiente", clave, unique=True, postgresql_where=estado == "pendiente"),
+    )
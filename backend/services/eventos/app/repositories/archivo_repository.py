@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.outbox import record_change
+from app.models.eventos import Evento, ParticipanteEvento
+from app.core.metricas import medir_repositorio, tamano_lotes
+
+
+def _columnas(modelo) -> str:
+    return ", ".join(columna.name for columna in modelo.__table__.columns)
+
+
+@medir_repositorio
+class ArchivoEventosRepository:
+    """
+    Archivado en frío de eventos eliminados.
+
+    Los eventos eliminados hace tiempo (y sus participantes) pasan a
+    `eventos_archivo`/`participantes_evento_archivo`, de modo que las tablas
+    calientes y sus índices solo cargan con filas vivas o eliminadas recientemente.
+    """
+
+    __slots__ = ("db",)
+    
+    def __init__(self, db: Session):
+        self.db = db
+
+    def contar_pendientes(self, antes_de: datetime) -> int:
+        """Eventos eliminados antes de `antes_de` que aún no se archivaron"""
+        return self.db.execute(
+            text("SELECT count(*) FROM eventos WHERE eliminado_en < :antes_de"), {"antes_de": antes_de}
+        ).scalar()
+
+    def archivar_lote(self, antes_de: datetime, lote: int) -> int:
+        """
+        Mover un lote de eventos eliminados antes de `antes_de`, con sus
+        participantes, en una sola sentencia y confirmar.
+
+        El resumen de participantes de un evento eliminado ya no se lee: se borra
+        y se reconstruye al restaurar. SKIP LOCKED permite correr varios procesos
+        de archivado a la vez. Devuelve la cantidad de eventos archivados.
+        """
+        eventos = _columnas(Evento)
+        participantes = _columnas(ParticipanteEvento)
+        resultado = self.db.execute(text(f"""
+            WITH lote AS (
+                SELECT id FROM eventos
+                WHERE eliminado_en < :antes_de
+                ORDER BY eliminado_en
+                LIMIT :lote
+                FOR UPDATE SKIP LOCKED
+            ), participantes AS (
+                DELETE FROM participantes_evento WHERE evento_id IN (SELECT id FROM lote)
+                RETURNING {participantes}
+            ), participantes_archivados AS (
+                INSERT INTO participantes_evento_archivo ({participantes})
+                SELECT {participantes} FROM participantes
+            ), resumenes AS (
+                DELETE FROM resumen_participantes_evento WHERE evento_id IN (SELECT id FROM lote)
+            ), movidos AS (
+                DELETE FROM eventos WHERE id IN (SELECT id FROM lote)
+                RETURNING {eventos}
+            )
+            INSERT INTO eventos_archivo ({eventos}) SELECT {eventos} FROM movidos
+        """), {"antes_de": antes_de, "lote": lote})
+        self.db.commit()
+        tamano_lotes.labels("archivo_eventos").observe(resultado.rowcount)
+        return resultado.rowcount
+
+    def restaurar(self, evento_id: UUID) -> Optional[Evento]:
+        """
+        Devolver un evento archivado y sus participantes a las tablas vivas, ya sin
+        eliminar. No confirma: el llamador encola la reconstrucción de su resumen
+        en la misma transacción. Devuelve el evento con tipo y estado cargados, o
+        None si no está archivado.
+        """
+        eventos = [columna.name for columna in Evento.__table__.columns]
+        # La versión sube: un If-Match anterior al archivado ya no coincide
+        valores = {"eliminado_en": "NULL", "actualizado_en": "CURRENT_TIMESTAMP", "version": "version + 1"}
+        participantes = _columnas(ParticipanteEvento)
+        restaurado = self.db.execute(text(f"""
+            INSERT INTO eventos ({", ".join(eventos)})
+            SELECT {", ".join(valores.get(columna, columna) for columna in eventos)}
+            FROM eventos_archivo WHERE id = :evento_id
+            RETURNING id
+        """), {"evento_id": evento_id}).scalar()
+        if restaurado is None:
+            self.db.rollback()
+            return None
+        self.db.execute(text(f"""
+            INSERT INTO participantes_evento ({participantes})
+            SELECT {participantes} FROM participantes_evento_archivo WHERE evento_id = :evento_id
+        """), {"evento_id": evento_id})
+        # Los participantes archivados se borran en cascada
+        self.db.execute(text("DELETE FROM eventos_archivo WHERE id = :evento_id"), {"evento_id": evento_id})
+
+        evento = self.db.get(Evento, evento_id, options=[joinedload(Evento.tipo), joinedload(Evento.estado)])
+        record_change(self.db, "evento", "restaurado", evento)
+        return evento
@@ -2,9 +2,13 @@ from typing import List
 from sqlalchemy.orm import Session
 
 from app.models.catalogs import CatEstadosEvento
+from app.core.metricas import medir_repositorio
 
 
+@medir_repositorio
 class EstadosEventoRepository:
+    __slots__ = ("db",)
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -1,20 +1,29 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, Query, joinedload, selectinload
+from sqlalchemy import and_, func, tuple_
 from datetime import datetime
 
-from app.models.eventos import Evento, ParticipanteEvento
+from app.core.concurrencia import actualizar_condicional
+from app.core.contenedor import Dependencia
+from app.core.outbox import record_change
+from app.core.paginacion import TotalMode, paginar
+from app.core.proyeccion import Proyeccion
+from app.models.eventos import Evento
 from app.schemas.eventos import EventoCreate, EventoUpdate
 from app.repositories.tipos_evento_repository import TiposEventoRepository
 from app.repositories.estados_evento_repository import EstadosEventoRepository
+from app.core.metricas import medir_repositorio
 
 
+@medir_repositorio
 class EventosRepository:
+    # Catálogos: solo create/update los usan
+    tipos_repo = Dependencia(TiposEventoRepository)
+    estados_repo = Dependencia(EstadosEventoRepository)
+    
     def __init__(self, db: Session):
         self.db = db
-        self.tipos_repo = TiposEventoRepository(db)
-        self.estados_repo = EstadosEventoRepository(db)
     
     def create(self, evento_data: EventoCreate) -> Evento:
         """Crear nuevo evento"""
@@ -32,36 +41,93 @@ class EventosRepository:
         )
         
         self.db.add(db_evento)
+        self.db.flush()
+        record_change(self.db, "evento", "creado", db_evento)
         self.db.commit()
         self.db.refresh(db_evento)
         return db_evento
     
-    def get_by_id(self, evento_id: UUID) -> Optional[Evento]:
-        """Obtener evento por ID"""
-        return self.db.query(Evento).options(
-            joinedload(Evento.tipo),
-            joinedload(Evento.estado),
-            joinedload(Evento.participantes).joinedload(ParticipanteEvento.estado)
-        ).filter(
+    def get_by_id(self, evento_id: UUID, proyeccion: Optional[Proyeccion] = None) -> Optional[Evento]:
+        """
+        Obtener evento por ID con tipo, estado y resumen de participantes; con
+        `proyeccion`, solo las columnas y relaciones de la respuesta.
+        """
+        return self.db.query(Evento).options(*self._opciones(proyeccion)).filter(
             and_(Evento.id == evento_id, Evento.eliminado_en.is_(None))
         ).first()
     
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Evento]:
-        """Obtener lista de eventos"""
+    def exists(self, evento_id: UUID) -> bool:
+        """Verificar que el evento existe y no está eliminado sin cargar filas"""
+        return self.db.query(
+            self.db.query(Evento.id).filter(
+                and_(Evento.id == evento_id, Evento.eliminado_en.is_(None))
+            ).exists()
+        ).scalar()
+    
+    def lock_for_update(self, evento_id: UUID) -> Optional[Evento]:
+        """
+        Obtener solo el evento (con su estado) bloqueando la fila hasta el commit.
+        
+        FOR NO KEY UPDATE serializa las altas de participantes sobre el mismo
+        evento sin bloquear las verificaciones de FK de otras escrituras.
+        """
         return self.db.query(Evento).options(
-            joinedload(Evento.tipo),
             joinedload(Evento.estado)
         ).filter(
-            Evento.eliminado_en.is_(None)
-        ).offset(skip).limit(limit).all()
+            and_(Evento.id == evento_id, Evento.eliminado_en.is_(None))
+        ).with_for_update(of=Evento, key_share=True).first()
     
-    def update(self, evento_id: UUID, evento_data: EventoUpdate) -> Optional[Evento]:
-        """Actualizar evento"""
-        db_evento = self.get_by_id(evento_id)
-        if not db_evento:
-            return None
-        
-        update_data = evento_data.model_dump(exclude_unset=True)
+    def get_all(self, skip: int = 0, limit: int = 100) -> List[Evento]:
+        """Obtener lista de eventos"""
+        return self._listado_query().offset(skip).limit(limit).all()
+    
+    def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        tipo_id: Optional[int] = None,
+        estado_id: Optional[int] = None,
+        total_mode: TotalMode = TotalMode.exact,
+        proyeccion: Optional[Proyeccion] = None
+    ) -> Tuple[List[Evento], Optional[int]]:
+        """Obtener una página de eventos (opcionalmente por tipo o estado) con su total"""
+        return paginar(self._listado_query(tipo_id, estado_id, proyeccion), skip, limit, total_mode)
+    
+    @staticmethod
+    def _opciones(
+        proyeccion: Optional[Proyeccion], columnas_extra: Tuple[str, ...] = (), cargar=joinedload
+    ) -> list:
+        """
+        Carga de relaciones: todas, o solo las expandidas y las columnas pedidas por
+        la proyección. Las escrituras con RETURNING cargan con `selectinload`.
+        """
+        cargadores = {
+            "tipo": cargar(Evento.tipo),
+            "estado": cargar(Evento.estado),
+            "resumen_participantes": cargar(Evento.resumen_participantes),
+        }
+        if proyeccion is None:
+            return list(cargadores.values())
+        return proyeccion.opciones(Evento, cargadores, columnas_extra)
+    
+    def _listado_query(
+        self, tipo_id: Optional[int] = None, estado_id: Optional[int] = None, proyeccion: Optional[Proyeccion] = None
+    ) -> Query:
+        filtros = [Evento.eliminado_en.is_(None)]
+        if tipo_id is not None:
+            filtros.append(Evento.tipo_id == tipo_id)
+        if estado_id is not None:
+            filtros.append(Evento.estado_id == estado_id)
+        return self.db.query(Evento).options(*self._opciones(proyeccion)).filter(and_(*filtros))
+    
+    def update(self, evento_id: UUID, evento_data: EventoUpdate, version: Optional[int] = None) -> Optional[Evento]:
+        """
+        Actualizar evento con un solo UPDATE ... RETURNING, sin leerlo antes; la
+        fila vuelve con tipo, estado y resumen cargados para la respuesta.
+        Con `version` solo actualiza si sigue en esa versión (ConflictoVersion si no).
+        No confirma: el llamador arma la respuesta antes del commit, que expira la fila.
+        """
+        update_data = evento_data.model_dump(exclude={"version"}, exclude_unset=True)
         
         # Manejar cambio de tipo
         if "tipo_codigo" in update_data:
@@ -73,20 +139,22 @@ class EventosRepository:
             estado = self.estados_repo.get_by_codigo(update_data.pop("estado_codigo"))
             update_data["estado_id"] = estado.id
         
-        for field, value in update_data.items():
-            setattr(db_evento, field, value)
+        db_evento = actualizar_condicional(
+            self.db, Evento, evento_id, update_data, version, opciones=self._opciones(None, cargar=selectinload)
+        )
+        if not db_evento:
+            return None
         
-        self.db.commit()
-        self.db.refresh(db_evento)
+        record_change(self.db, "evento", "actualizado", db_evento)
         return db_evento
     
     def delete(self, evento_id: UUID) -> bool:
-        """Eliminar evento (soft delete)"""
-        db_evento = self.get_by_id(evento_id)
+        """Eliminar evento (soft delete) con un UPDATE condicional que sube su versión"""
+        db_evento = actualizar_condicional(self.db, Evento, evento_id, {"eliminado_en": datetime.utcnow()})
         if not db_evento:
             return False
         
-        db_evento.eliminado_en = datetime.utcnow()
+        record_change(self.db, "evento", "eliminado", db_evento)
         self.db.commit()
         return True
     
@@ -96,26 +164,77 @@ class EventosRepository:
             Evento.eliminado_en.is_(None)
         ).count()
     
+    def count_by_tipo(self, tipo_id: int) -> int:
+        """Contar eventos activos de un tipo"""
+        return self._listado_query(tipo_id=tipo_id).enable_eagerloads(False).count()
+    
+    def count_by_estado(self, estado_id: int) -> int:
+        """Contar eventos activos en un estado"""
+        return self._listado_query(estado_id=estado_id).enable_eagerloads(False).count()
+    
     def get_by_tipo(self, tipo_id: int, skip: int = 0, limit: int = 100) -> List[Evento]:
         """Obtener eventos por tipo"""
-        return self.db.query(Evento).options(
-            joinedload(Evento.tipo),
-            joinedload(Evento.estado)
-        ).filter(
-            and_(
-                Evento.tipo_id == tipo_id,
-                Evento.eliminado_en.is_(None)
-            )
-        ).offset(skip).limit(limit).all()
+        return self._listado_query(tipo_id=tipo_id).offset(skip).limit(limit).all()
     
     def get_by_estado(self, estado_id: int, skip: int = 0, limit: int = 100) -> List[Evento]:
         """Obtener eventos por estado"""
-        return self.db.query(Evento).options(
-            joinedload(Evento.tipo),
-            joinedload(Evento.estado)
-        ).filter(
-            and_(
-                Evento.estado_id == estado_id,
-                Evento.eliminado_en.is_(None)
-            )
-        ).offset(skip).limit(limit).all()
\ No newline at end of file
+        return self._listado_query(estado_id=estado_id).offset(skip).limit(limit).all()
+    
+    def search_query(
+        self,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        tipo_id: Optional[int] = None,
+        estado_id: Optional[int] = None,
+        despues_de: Optional[Tuple[datetime, UUID]] = None
+    ) -> Query:
+        """
+        Consulta de eventos activos en una ventana de fechas, en orden cronológico.
+        
+        Todos los filtros se resuelven sobre `idx_eventos_fecha_presentacion`
+        (fecha_presentacion, id) INCLUDE (tipo_id, estado_id) WHERE eliminado_en IS NULL,
+        y `despues_de` continúa desde la última fila de la página anterior (keyset).
+        """
+        filtros = [Evento.eliminado_en.is_(None)]
+        if desde is not None:
+            filtros.append(Evento.fecha_presentacion >= desde)
+        if hasta is not None:
+            filtros.append(Evento.fecha_presentacion < hasta)
+        if tipo_id is not None:
+            filtros.append(Evento.tipo_id == tipo_id)
+        if estado_id is not None:
+            filtros.append(Evento.estado_id == estado_id)
+        if despues_de is not None:
+            filtros.append(tuple_(Evento.fecha_presentacion, Evento.id) > tuple_(*despues_de))
+        
+        return self.db.query(Evento).filter(and_(*filtros)).order_by(
+            Evento.fecha_presentacion, Evento.id
+        )
+    
+    def search(
+        self,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        tipo_id: Optional[int] = None,
+        estado_id: Optional[int] = None,
+        despues_de: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 100,
+        proyeccion: Optional[Proyeccion] = None
+    ) -> List[Evento]:
+        """Obtener una página de eventos por rango de fechas, tipo y estado"""
+        # fecha_presentacion arma el cursor de la página siguiente aunque no se pida
+        return self.search_query(desde, hasta, tipo_id, estado_id, despues_de).options(
+            *self._opciones(proyeccion, columnas_extra=("fecha_presentacion",))
+        ).limit(limit).all()
+    
+    def count_search(
+        self,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        tipo_id: Optional[int] = None,
+        estado_id: Optional[int] = None
+    ) -> int:
+        """Contar eventos activos que cumplen los filtros (index-only scan)"""
+        return self.search_query(desde, hasta, tipo_id, estado_id).order_by(None).with_entities(
+            func.count(Evento.id)
+        ).scalar()
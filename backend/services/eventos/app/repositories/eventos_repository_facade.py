@@ -2,6 +2,7 @@ from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
 
+from app.core.contenedor import Dependencia
 from app.schemas.eventos import EventoCreate, EventoUpdate, ParticipanteEventoCreate, ParticipanteEventoUpdate
 from app.repositories.eventos_repository import EventosRepository
 from app.repositories.tipos_evento_repository import TiposEventoRepository
@@ -18,13 +19,14 @@ class EventosRepositoryFacade:
     Repositorio principal que coordina entre los diferentes repositorios especializados
     Mantiene compatibilidad con la interfaz anterior
     """
+    eventos_repo = Dependencia(EventosRepository)
+    tipos_repo = Dependencia(TiposEventoRepository)
+    estados_repo = Dependencia(EstadosEventoRepository)
+    participantes_repo = Dependencia(ParticipantesEventoRepository)
+    estados_participante_repo = Dependencia(EstadosParticipanteRepository)
+    
     def __init__(self, db: Session):
         self.db = db
-        self.eventos_repo = EventosRepository(db)
-        self.tipos_repo = TiposEventoRepository(db)
-        self.estados_repo = EstadosEventoRepository(db)
-        self.participantes_repo = ParticipantesEventoRepository(db)
-        self.estados_participante_repo = EstadosParticipanteRepository(db)
     
     # === Métodos de Eventos (delegados a EventosRepository) ===
     def create_evento(self, evento_data: EventoCreate) -> Evento:
@@ -37,7 +39,9 @@ class EventosRepositoryFacade:
         return self.eventos_repo.get_all(skip, limit)
     
     def update_evento(self, evento_id: UUID, evento_data: EventoUpdate) -> Optional[Evento]:
-        return self.eventos_repo.update(evento_id, evento_data)
+        db_evento = self.eventos_repo.update(evento_id, evento_data)
+        self.db.commit()
+        return db_evento
     
     def delete_evento(self, evento_id: UUID) -> bool:
         return self.eventos_repo.delete(evento_id)
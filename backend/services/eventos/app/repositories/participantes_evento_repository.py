@@ -1,17 +1,26 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from sqlalchemy.orm import Session, joinedload, contains_eager
 from sqlalchemy import and_
 
-from app.models.eventos import ParticipanteEvento
+from app.core.contenedor import Dependencia
+from app.core.outbox import record_change
+from app.models.eventos import Evento, ParticipanteEvento
+from app.models.catalogs import CatEstadosParticipante
 from app.schemas.eventos import ParticipanteEventoCreate, ParticipanteEventoUpdate
 from app.repositories.estados_participante_repository import EstadosParticipanteRepository
+from app.repositories.resumen_participantes_repository import ResumenParticipantesRepository
+from app.core.metricas import medir_repositorio
 
 
+@medir_repositorio
 class ParticipantesEventoRepository:
+    estados_repo = Dependencia(EstadosParticipanteRepository)
+    resumen_repo = Dependencia(ResumenParticipantesRepository)
+    
     def __init__(self, db: Session):
         self.db = db
-        self.estados_repo = EstadosParticipanteRepository(db)
     
     def create(self, evento_id: UUID, participante_data: ParticipanteEventoCreate) -> ParticipanteEvento:
         """Crear participante de evento"""
@@ -24,10 +33,49 @@ class ParticipantesEventoRepository:
         )
         
         self.db.add(db_participante)
+        self.db.flush()
+        self.resumen_repo.ajustar(evento_id, {estado.codigo: 1})
+        record_change(self.db, "participante", "creado", db_participante)
         self.db.commit()
         self.db.refresh(db_participante)
         return db_participante
 
+    def create_many(
+        self, evento_id: UUID, musico_ids: Iterable[UUID], estado_codigo: str
+    ) -> Tuple[List[ParticipanteEvento], List[UUID]]:
+        """Crear varios participantes en una transacción; omite los que ya lo son"""
+        estado = self.estados_repo.get_by_codigo(estado_codigo)
+        musico_ids = list(dict.fromkeys(musico_ids))
+        
+        existentes = {
+            musico_id for (musico_id,) in self.db.query(ParticipanteEvento.musico_id).filter(
+                and_(
+                    ParticipanteEvento.evento_id == evento_id,
+                    ParticipanteEvento.musico_id.in_(musico_ids)
+                )
+            )
+        }
+        nuevos = [
+            ParticipanteEvento(evento_id=evento_id, musico_id=musico_id, estado_id=estado.id)
+            for musico_id in musico_ids if musico_id not in existentes
+        ]
+        if not nuevos:
+            return [], [m for m in musico_ids if m in existentes]
+        
+        self.db.add_all(nuevos)
+        self.db.flush()
+        self.resumen_repo.ajustar(evento_id, {estado.codigo: len(nuevos)})
+        for db_participante in nuevos:
+            record_change(self.db, "participante", "creado", db_participante)
+        self.db.commit()
+        
+        creados = self.db.query(ParticipanteEvento).options(
+            joinedload(ParticipanteEvento.estado)
+        ).filter(
+            ParticipanteEvento.id.in_([p.id for p in nuevos])
+        ).all()
+        return creados, [m for m in musico_ids if m in existentes]
+
     def get_by_evento_and_musico(self, evento_id: UUID, musico_id: UUID) -> Optional[ParticipanteEvento]:
         """Obtener participante específico"""
         return self.db.query(ParticipanteEvento).options(
@@ -46,8 +94,13 @@ class ParticipantesEventoRepository:
             return None
         
         estado = self.estados_repo.get_by_codigo(participante_data.estado_codigo)
+        estado_anterior = db_participante.estado.codigo
         
         db_participante.estado_id = estado.id
+        self.db.flush()
+        if estado_anterior != estado.codigo:
+            self.resumen_repo.ajustar(evento_id, {estado_anterior: -1, estado.codigo: 1})
+        record_change(self.db, "participante", "actualizado", db_participante)
         self.db.commit()
         self.db.refresh(db_participante)
         return db_participante
@@ -60,6 +113,41 @@ class ParticipantesEventoRepository:
             ParticipanteEvento.evento_id == evento_id
         ).all()
     
+    def get_agenda(
+        self,
+        musico_ids: Iterable[UUID],
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[ParticipanteEvento]:
+        """
+        Participaciones no rechazadas de uno o varios músicos en eventos activos,
+        con su evento cargado y en orden cronológico (una sola consulta).
+        """
+        filtros = [
+            ParticipanteEvento.musico_id.in_(list(musico_ids)),
+            CatEstadosParticipante.codigo != "rechazado",
+            Evento.eliminado_en.is_(None)
+        ]
+        if desde is not None:
+            filtros.append(Evento.fecha_presentacion >= desde)
+        if hasta is not None:
+            filtros.append(Evento.fecha_presentacion <= hasta)
+        
+        query = self.db.query(ParticipanteEvento).join(
+            ParticipanteEvento.evento
+        ).join(
+            ParticipanteEvento.estado
+        ).options(
+            contains_eager(ParticipanteEvento.estado),
+            contains_eager(ParticipanteEvento.evento).joinedload(Evento.tipo),
+            contains_eager(ParticipanteEvento.evento).joinedload(Evento.estado)
+        ).filter(and_(*filtros)).order_by(Evento.fecha_presentacion, Evento.id)
+        
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+    
     def count_by_evento(self, evento_id: UUID) -> int:
         """Contar participantes de un evento"""
         return self.db.query(ParticipanteEvento).filter(
@@ -73,5 +161,7 @@ class ParticipantesEventoRepository:
             return False
         
         self.db.delete(db_participante)
+        self.resumen_repo.ajustar(evento_id, {db_participante.estado.codigo: -1})
+        record_change(self.db, "participante", "eliminado", db_participante)
         self.db.commit()
         return True
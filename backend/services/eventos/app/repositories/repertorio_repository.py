@@ -0,0 +1,80 @@
+from collections import defaultdict
+from typing import Dict, List
+from uuid import UUID
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metricas import medir_repositorio
+
+_IDENTIFICADOR = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def _esquema(nombre: str) -> str:
+    if not _IDENTIFICADOR.match(nombre):
+        raise ValueError(f"Esquema inválido: {nombre}")
+    return nombre
+
+
+@medir_repositorio
+class RepertorioRepository:
+    """
+    Lecturas para la viabilidad del repertorio: requisitos de canciones en el
+    esquema de canciones e instrumentos de los músicos en el de músicos. Solo lee.
+    """
+
+    __slots__ = ("db",)
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_requisitos(self) -> List:
+        """Un renglón por requisito de cada canción vigente (ordenados por título)"""
+        canciones = _esquema(settings.canciones_schema)
+        return self.db.execute(text(f"""
+            SELECT c.id AS cancion_id, c.titulo, rc.instrumento_id,
+                   COALESCE(rc.es_requerido, true) AS es_requerido,
+                   COALESCE(nh.orden, 0) AS nivel,
+                   ci.codigo AS instrumento, nh.codigo AS nivel_minimo
+            FROM {canciones}.canciones c
+            LEFT JOIN {canciones}.requisitos_cancion rc ON rc.cancion_id = c.id
+            LEFT JOIN {canciones}.cat_instrumentos ci ON ci.id = rc.instrumento_id
+            LEFT JOIN {canciones}.cat_niveles_habilidad nh ON nh.id = rc.nivel_minimo_id
+            WHERE c.eliminado_en IS NULL
+            ORDER BY c.titulo, c.id
+        """)).all()
+
+    def get_instrumentos_participantes(self, evento_id: UUID, estado_codigo: str) -> Dict[UUID, Dict[int, int]]:
+        """
+        Instrumentos de los participantes del evento en ese estado:
+        {musico_id: {instrumento_id: orden de su nivel}}. Un músico sin
+        instrumentos aparece con un diccionario vacío.
+        """
+        musicos = _esquema(settings.musicos_schema)
+        canciones = _esquema(settings.canciones_schema)
+        filas = self.db.execute(text(f"""
+            SELECT pe.musico_id, im.instrumento_id, COALESCE(nh.orden, 0) AS nivel
+            FROM participantes_evento pe
+            JOIN cat_estados_participante ep ON ep.id = pe.estado_id
+            LEFT JOIN {musicos}.instrumentos_musico im ON im.musico_id = pe.musico_id
+            LEFT JOIN {canciones}.cat_niveles_habilidad nh ON nh.id = im.nivel_id
+            WHERE pe.evento_id = :evento_id AND ep.codigo = :estado
+        """), {"evento_id": evento_id, "estado": estado_codigo}).all()
+
+        instrumentos: Dict[UUID, Dict[int, int]] = defaultdict(dict)
+        for fila in filas:
+            tocados = instrumentos[fila.musico_id]
+            if fila.instrumento_id is not None:
+                tocados[fila.instrumento_id] = fila.nivel
+        return dict(instrumentos)
+
+    def get_repertorio(self, evento_id: UUID) -> List[UUID]:
+        """Canciones asignadas al evento, en orden de repertorio"""
+        canciones = _esquema(settings.canciones_schema)
+        return self.db.execute(text(f"""
+            SELECT cancion_id FROM {canciones}.canciones_evento
+            WHERE evento_id = :evento_id
+            ORDER BY orden_en_repertorio NULLS LAST, agregado_en
+        """), {"evento_id": evento_id}).scalars().all()
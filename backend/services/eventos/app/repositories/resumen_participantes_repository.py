@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import UUID
+import json
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.eventos import ResumenParticipantesEvento
+from app.core.metricas import medir_repositorio
+
+
+@dataclass
+class InconsistenciaResumen:
+    """Diferencia entre el read model y los participantes reales de un evento"""
+    evento_id: UUID
+    conteos_resumen: Dict[str, int]
+    conteos_reales: Dict[str, int]
+
+
+# Conteos reales por evento y código de estado, para reconstruir y verificar
+# (plantilla para str.format: las llaves literales van duplicadas)
+_CONTEOS_REALES = """
+    SELECT e.id AS evento_id,
+           COALESCE(
+               jsonb_object_agg(c.codigo, c.cantidad) FILTER (WHERE c.codigo IS NOT NULL),
+               '{{}}'::jsonb
+           ) AS conteos,
+           COALESCE(SUM(c.cantidad), 0)::int AS total
+    FROM eventos e
+    LEFT JOIN (
+        SELECT pe.evento_id, ep.codigo, COUNT(*)::int AS cantidad
+        FROM participantes_evento pe
+        JOIN cat_estados_participante ep ON ep.id = pe.estado_id
+        GROUP BY pe.evento_id, ep.codigo
+    ) c ON c.evento_id = e.id
+    WHERE e.eliminado_en IS NULL {filtro}
+    GROUP BY e.id
+"""
+
+
+@medir_repositorio
+class ResumenParticipantesRepository:
+    """Mantiene `resumen_participantes_evento`: conteos por estado y total de cada evento"""
+
+    __slots__ = ("db",)
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ajustar(self, evento_id: UUID, deltas: Dict[str, int]) -> None:
+        """
+        Aplicar incrementos por código de estado en la transacción actual.
+
+        Un único UPSERT: la fila queda bloqueada hasta el commit, así que los
+        ajustes concurrentes sobre el mismo evento se serializan sin perder cuentas.
+        """
+        deltas = {codigo: delta for codigo, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        self.db.execute(text("""
+            INSERT INTO resumen_participantes_evento AS r (evento_id, conteos, total, version)
+            VALUES (:evento_id, CAST(:deltas AS jsonb), :total, 1)
+            ON CONFLICT (evento_id) DO UPDATE SET
+                conteos = (
+                    SELECT COALESCE(jsonb_object_agg(codigo, cantidad), '{}'::jsonb)
+                    FROM (
+                        SELECT codigo, SUM(cantidad)::int AS cantidad
+                        FROM (
+                            SELECT key AS codigo, value::int AS cantidad FROM jsonb_each_text(r.conteos)
+                            UNION ALL
+                            SELECT key, value::int FROM jsonb_each_text(CAST(:deltas AS jsonb))
+                        ) movimientos
+                        GROUP BY codigo
+                        HAVING SUM(cantidad) <> 0
+                    ) acumulado
+                ),
+                total = r.total + :total,
+                version = r.version + 1,
+                actualizado_en = CURRENT_TIMESTAMP
+        """), {
+            "evento_id": evento_id,
+            "deltas": json.dumps(deltas),
+            "total": sum(deltas.values())
+        })
+
+    def get_by_evento(self, evento_id: UUID) -> Optional[ResumenParticipantesEvento]:
+        """Obtener el resumen de un evento"""
+        return self.db.query(ResumenParticipantesEvento).filter(
+            ResumenParticipantesEvento.evento_id == evento_id
+        ).first()
+
+    def rebuild(self, evento_id: Optional[UUID] = None) -> int:
+        """Recalcular el resumen desde `participantes_evento` (todos o un evento)"""
+        filtro = "AND e.id = :evento_id" if evento_id else ""
+        resultado = self.db.execute(text(f"""
+            INSERT INTO resumen_participantes_evento AS r (evento_id, conteos, total, version)
+            SELECT evento_id, conteos, total, 1 FROM ({_CONTEOS_REALES.format(filtro=filtro)}) reales
+            ON CONFLICT (evento_id) DO UPDATE SET
+                conteos = EXCLUDED.conteos,
+                total = EXCLUDED.total,
+                version = r.version + 1,
+                actualizado_en = CURRENT_TIMESTAMP
+            WHERE r.conteos IS DISTINCT FROM EXCLUDED.conteos
+               OR r.total IS DISTINCT FROM EXCLUDED.total
+        """), {"evento_id": evento_id})
+        self.db.commit()
+        return resultado.rowcount
+
+    def verificar(self, evento_id: Optional[UUID] = None) -> List[InconsistenciaResumen]:
+        """Comparar el resumen con los conteos reales sin modificar nada"""
+        filtro = "AND e.id = :evento_id" if evento_id else ""
+        filas = self.db.execute(text(f"""
+            SELECT reales.evento_id,
+                   COALESCE(r.conteos, '{{}}'::jsonb) AS conteos_resumen,
+                   reales.conteos AS conteos_reales
+            FROM ({_CONTEOS_REALES.format(filtro=filtro)}) reales
+            LEFT JOIN resumen_participantes_evento r ON r.evento_id = reales.evento_id
+            WHERE COALESCE(r.conteos, '{{}}'::jsonb) IS DISTINCT FROM reales.conteos
+               OR COALESCE(r.total, 0) IS DISTINCT FROM reales.total
+        """), {"evento_id": evento_id}).all()
+        return [
+            InconsistenciaResumen(
+                evento_id=fila.evento_id,
+                conteos_resumen=fila.conteos_resumen,
+                conteos_reales=fila.conteos_reales
+            )
+            for fila in filas
+        ]
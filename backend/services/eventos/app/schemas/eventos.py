@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from uuid import UUID
 
@@ -33,6 +33,12 @@ class EventoUpdate(BaseModel):
     fecha_presentacion: Optional[datetime] = None
     tipo_codigo: Optional[str] = None
     estado_codigo: Optional[str] = None
+    version: Optional[int] = Field(None, ge=1, description="Versión leída; si ya cambió la actualización responde 409")
+
+class ResumenParticipantesResponse(BaseModel):
+    conteos: Dict[str, int] = {}  # código de estado de participante -> cantidad
+    total: int = 0
+    model_config = ConfigDict(from_attributes=True)
 
 class EventoResponse(EventoBase):
     id: UUID
@@ -42,6 +48,8 @@ class EventoResponse(EventoBase):
     creado_en: datetime
     actualizado_en: datetime
     eliminado_en: Optional[datetime] = None
+    version: int = 1
+    resumen_participantes: Optional[ResumenParticipantesResponse] = None
     model_config = ConfigDict(from_attributes=True)
 
 # Esquemas para participantes
@@ -52,17 +60,69 @@ class ParticipanteEventoCreate(BaseModel):
 class ParticipanteEventoUpdate(BaseModel):
     estado_codigo: str
 
+class ConflictoAgendaResponse(BaseModel):
+    evento_id: UUID
+    nombre: str
+    fecha_presentacion: datetime
+
 class ParticipanteEventoResponse(BaseModel):
     id: UUID
     evento_id: UUID
     musico_id: UUID
     estado: TipoEventoResponse
     unido_en: datetime
+    conflictos: List[ConflictoAgendaResponse] = []  # Solo al agregar: eventos cercanos del músico
     model_config = ConfigDict(from_attributes=True)
 
+class ParticipantesLoteCreate(BaseModel):
+    musico_ids: List[UUID] = Field(..., min_length=1)
+    estado_codigo: str = "invitado"
+
+class ParticipantesLoteResponse(BaseModel):
+    creados: List[ParticipanteEventoResponse]
+    omitidos: List[UUID]  # Músicos que ya eran participantes
+
+# Agenda de un músico
+class EventoAgendaResponse(BaseModel):
+    id: UUID
+    nombre: str
+    lugar: Optional[str] = None
+    fecha_presentacion: datetime
+    tipo: TipoEventoResponse
+    estado: TipoEventoResponse
+    estado_participacion: TipoEventoResponse
+    conflictos: List[UUID] = []  # Otros eventos de la agenda dentro de la ventana de conflicto
+
+class AgendaMusicoResponse(BaseModel):
+    musico_id: UUID
+    eventos: List[EventoAgendaResponse]
+
+# Viabilidad del repertorio
+class RolRepertorioResponse(BaseModel):
+    instrumento_id: int
+    instrumento: Optional[str] = None  # código en el catálogo de instrumentos
+    nivel_minimo: Optional[str] = None  # código de nivel de habilidad; None = cualquiera
+
+class ViabilidadCancionResponse(BaseModel):
+    cancion_id: UUID
+    titulo: str
+    viable: bool
+    # Requeridos sin músico confirmado que los cubra (o sin músico libre para tocarlos)
+    faltantes: List[RolRepertorioResponse] = []
+    opcionales_faltantes: List[RolRepertorioResponse] = []
+
+class ViabilidadRepertorioResponse(BaseModel):
+    evento_id: UUID
+    version_plantel: int  # versión del resumen de participantes usada para el cálculo
+    musicos_confirmados: int
+    evaluadas: int
+    viables: int
+    canciones: List[ViabilidadCancionResponse]
+
 # Respuestas con paginación
 class EventosListResponse(BaseModel):
     eventos: List[EventoResponse]
-    total: int
-    page: int
-    size: int
\ No newline at end of file
+    total: Optional[int] = None  # Aproximado con total_mode=estimate, ausente con total_mode=none
+    page: Optional[int] = None  # Ausente en las páginas pedidas con cursor
+    size: int
+    siguiente_cursor: Optional[str] = None  # Continuación keyset cuando se filtra por fechas
\ No newline at end of file
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from app.core.database import SessionLocal
+from app.models.eventos import Evento
+from app.repositories.eventos_repository import EventosRepository
+
+# Eventos por consulta al generar el feed; cada página se libera de la sesión al emitirse
+PAGINA_ICS = 500
+
+_ESTADOS_ICS = {
+    "planificacion": "TENTATIVE",
+    "cancelado": "CANCELLED",
+}
+
+
+def _fecha_ics(valor: datetime) -> str:
+    if valor.tzinfo is None:
+        valor = valor.replace(tzinfo=timezone.utc)
+    return valor.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _texto_ics(valor: str) -> str:
+    """Escapar texto según RFC 5545 (sección 3.3.11)"""
+    return (
+        valor.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _linea(nombre: str, valor: str) -> str:
+    """Línea de contenido plegada a 75 octetos, terminada en CRLF"""
+    linea = f"{nombre}:{valor}".encode("utf-8")
+    partes = []
+    limite = 75
+    while len(linea) > limite:
+        corte = limite
+        # No partir caracteres UTF-8 multibyte
+        while corte > 0 and (linea[corte] & 0xC0) == 0x80:
+            corte -= 1
+        partes.append(linea[:corte])
+        linea = linea[corte:]
+        limite = 74  # las continuaciones empiezan con un espacio
+    partes.append(linea)
+    return "\r\n ".join(parte.decode("utf-8") for parte in partes) + "\r\n"
+
+
+def _vevent(evento: Evento) -> str:
+    lineas = [
+        "BEGIN:VEVENT\r\n",
+        _linea("UID", f"{evento.id}@ensamble"),
+        _linea("DTSTAMP", _fecha_ics(evento.actualizado_en or evento.creado_en)),
+        _linea("DTSTART", _fecha_ics(evento.fecha_presentacion)),
+        _linea("SUMMARY", _texto_ics(evento.nombre)),
+        _linea("STATUS", _ESTADOS_ICS.get(evento.estado.codigo, "CONFIRMED")),
+        _linea("CATEGORIES", _texto_ics(evento.tipo.nombre)),
+    ]
+    if evento.lugar:
+        lineas.append(_linea("LOCATION", _texto_ics(evento.lugar)))
+    if evento.descripcion:
+        lineas.append(_linea("DESCRIPTION", _texto_ics(evento.descripcion)))
+    lineas.append("END:VEVENT\r\n")
+    return "".join(lineas)
+
+
+def generar_ics(
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    tipo_id: Optional[int] = None,
+    estado_id: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Feed iCalendar de los eventos de una ventana de fechas.
+
+    Recorre la ventana por páginas keyset con su propia sesión (la de la
+    solicitud se cierra antes de que termine el streaming), así que la memoria
+    no crece con el tamaño de la ventana.
+    """
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//Ensamble//Eventos//ES\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "X-WR-CALNAME:Ensamble\r\n"
+    )
+    db = SessionLocal()
+    try:
+        repo = EventosRepository(db)
+        despues_de = None
+        while True:
+            eventos = repo.search(
+                desde, hasta, tipo_id, estado_id, despues_de=despues_de, limit=PAGINA_ICS
+            )
+            if not eventos:
+                break
+            pagina = "".join(_vevent(evento) for evento in eventos)
+            despues_de = (eventos[-1].fecha_presentacion, eventos[-1].id)
+            ultima = len(eventos) < PAGINA_ICS
+            # Cerrar la transacción antes de emitir: un cliente lento no la deja abierta
+            db.rollback()
+            db.expunge_all()
+            yield pagina
+            if ultima:
+                break
+    finally:
+        db.close()
+    yield "END:VCALENDAR\r\n"
@@ -0,0 +1,52 @@
+from collections import defaultdict, deque
+from datetime import timedelta
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from app.models.eventos import Evento, ParticipanteEvento
+
+# Eventos que no ocupan la agenda de sus participantes
+ESTADOS_EVENTO_SIN_CONFLICTO = ("cancelado",)
+
+
+def ocupa_agenda(evento: Evento) -> bool:
+    return evento.estado.codigo not in ESTADOS_EVENTO_SIN_CONFLICTO
+
+
+def solapamientos(eventos: Iterable[Evento], ventana: timedelta) -> Dict[UUID, List[UUID]]:
+    """
+    Pares de eventos cuyas fechas están a menos de `ventana` entre sí (sort-and-sweep).
+
+    Recorre los eventos en orden cronológico manteniendo solo los que siguen
+    abiertos dentro de la ventana: O(n log n + k) para k solapamientos.
+    """
+    abiertos = deque()
+    resultado: Dict[UUID, List[UUID]] = defaultdict(list)
+    for evento in sorted(eventos, key=lambda e: e.fecha_presentacion):
+        if not ocupa_agenda(evento):
+            continue
+        while abiertos and evento.fecha_presentacion - abiertos[0].fecha_presentacion >= ventana:
+            abiertos.popleft()
+        for anterior in abiertos:
+            resultado[anterior.id].append(evento.id)
+            resultado[evento.id].append(anterior.id)
+        abiertos.append(evento)
+    return resultado
+
+
+def conflictos_por_musico(
+    evento: Evento,
+    participaciones: Iterable[ParticipanteEvento],
+    ventana: timedelta
+) -> Dict[UUID, List[Evento]]:
+    """Eventos de cada músico que caen dentro de la ventana de `evento`"""
+    resultado: Dict[UUID, List[Evento]] = defaultdict(list)
+    if not ocupa_agenda(evento):
+        return resultado
+    for participacion in participaciones:
+        otro = participacion.evento
+        if otro.id == evento.id or not ocupa_agenda(otro):
+            continue
+        if abs(otro.fecha_presentacion - evento.fecha_presentacion) < ventana:
+            resultado[participacion.musico_id].append(otro)
+    return resultado
@@ -1,30 +1,52 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from uuid import UUID
+from datetime import datetime, timedelta, timezone
+import base64
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
+from app.core.concurrencia import ConflictoVersion, conflicto_version, version_esperada
+from app.core.config import settings
+from app.core.contenedor import Dependencia
+from app.core.metricas import tamano_lotes
+from app.core.paginacion import TotalMode, estimar_total
+from app.core.proyeccion import Proyeccion
+from app.core.trabajos import encolar
 from app.repositories.eventos_repository import EventosRepository
+from app.repositories.archivo_repository import ArchivoEventosRepository
 from app.repositories.tipos_evento_repository import TiposEventoRepository
 from app.repositories.estados_evento_repository import EstadosEventoRepository
 from app.repositories.participantes_evento_repository import ParticipantesEventoRepository
 from app.repositories.estados_participante_repository import EstadosParticipanteRepository
+from app.repositories.resumen_participantes_repository import ResumenParticipantesRepository
+from app.repositories.repertorio_repository import RepertorioRepository
 from app.schemas.eventos import (
     EventoCreate, EventoUpdate, EventoResponse, 
     ParticipanteEventoCreate, ParticipanteEventoUpdate,
-    ParticipanteEventoResponse, TipoEventoResponse
+    ParticipanteEventoResponse, TipoEventoResponse, ResumenParticipantesResponse,
+    ConflictoAgendaResponse, ParticipantesLoteCreate, ParticipantesLoteResponse,
+    AgendaMusicoResponse, EventoAgendaResponse, RolRepertorioResponse,
+    ViabilidadCancionResponse, ViabilidadRepertorioResponse
 )
 from app.models.eventos import Evento, ParticipanteEvento
 from app.models.catalogs import CatEstadosParticipante
+from app.services.conflictos import conflictos_por_musico, solapamientos
+from app.services.repertorio import ESTADO_CONFIRMADO, Rol, evaluar, viabilidad_cache
+from app.services.trabajos import ARCHIVAR_ELIMINADOS, RECONSTRUIR_RESUMEN
 
 class EventosService:
+    # Repositorios especializados, construidos con la sesión de la solicitud al primer uso
+    eventos_repo = Dependencia(EventosRepository)
+    tipos_repo = Dependencia(TiposEventoRepository)
+    estados_repo = Dependencia(EstadosEventoRepository)
+    participantes_repo = Dependencia(ParticipantesEventoRepository)
+    estados_participante_repo = Dependencia(EstadosParticipanteRepository)
+    archivo_repo = Dependencia(ArchivoEventosRepository)
+    resumen_repo = Dependencia(ResumenParticipantesRepository)
+    repertorio_repo = Dependencia(RepertorioRepository)
+    
     def __init__(self, db: Session):
         self.db = db
-        # Inicializar todos los repositorios especializados
-        self.eventos_repo = EventosRepository(db)
-        self.tipos_repo = TiposEventoRepository(db)
-        self.estados_repo = EstadosEventoRepository(db)
-        self.participantes_repo = ParticipantesEventoRepository(db)
-        self.estados_participante_repo = EstadosParticipanteRepository(db)
     
     def create_evento(self, evento_data: EventoCreate) -> EventoResponse:
         """Crear un nuevo evento"""
@@ -42,37 +64,112 @@ class EventosService:
                 detail="Error interno del servidor"
             )
     
-    def get_evento(self, evento_id: UUID) -> EventoResponse:
-        """Obtener un evento por ID"""
-        db_evento = self.eventos_repo.get_by_id(evento_id)
+    def get_evento(self, evento_id: UUID, proyeccion: Optional[Proyeccion] = None) -> Union[EventoResponse, dict]:
+        """Obtener un evento por ID (solo los campos de `proyeccion`, si se indica)"""
+        db_evento = self.eventos_repo.get_by_id(evento_id, proyeccion)
         if not db_evento:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Evento no encontrado"
             )
+        if proyeccion is not None and not proyeccion.completa:
+            return self._evento_proyectado(db_evento, proyeccion)
         return self._evento_to_response(db_evento)
     
-    def get_eventos(self, skip: int = 0, limit: int = 100) -> Tuple[List[EventoResponse], int]:
-        """Obtener lista de eventos con paginación"""
+    def get_eventos(
+        self, skip: int = 0, limit: int = 100, total_mode: TotalMode = TotalMode.exact,
+        proyeccion: Optional[Proyeccion] = None
+    ) -> Tuple[List[Union[EventoResponse, dict]], Optional[int]]:
+        """Obtener lista de eventos con paginación (solo los campos de `proyeccion`, si se indica)"""
         if limit > 100:
             limit = 100
         
-        eventos = self.eventos_repo.get_all(skip=skip, limit=limit)
-        total = self.eventos_repo.count()
+        eventos, total = self.eventos_repo.get_page(
+            skip=skip, limit=limit, total_mode=total_mode, proyeccion=proyeccion
+        )
         
-        eventos_response = [self._evento_to_response(evento) for evento in eventos]
+        eventos_response = [self._evento_de_listado(evento, proyeccion) for evento in eventos]
         return eventos_response, total
     
-    def update_evento(self, evento_id: UUID, evento_data: EventoUpdate) -> EventoResponse:
-        """Actualizar un evento"""
+    def buscar_eventos(
+        self,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        tipo_codigo: Optional[str] = None,
+        estado_codigo: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        total_mode: TotalMode = TotalMode.exact,
+        proyeccion: Optional[Proyeccion] = None
+    ) -> Tuple[List[Union[EventoResponse, dict]], Optional[int], Optional[str]]:
+        """Obtener eventos por rango de fechas, tipo y estado con paginación keyset"""
+        if limit > 100:
+            limit = 100
+        
+        tipo_id, estado_id = self.resolver_filtros(desde, hasta, tipo_codigo, estado_codigo)
+        despues_de = self._decode_cursor(cursor) if cursor else None
+        
+        eventos = self.eventos_repo.search(
+            desde, hasta, tipo_id, estado_id, despues_de=despues_de, limit=limit, proyeccion=proyeccion
+        )
+        # El total es el de la ventana completa, no el restante después del cursor
+        if total_mode == TotalMode.exact:
+            total = self.eventos_repo.count_search(desde, hasta, tipo_id, estado_id)
+        elif total_mode == TotalMode.estimate:
+            total = estimar_total(self.eventos_repo.search_query(desde, hasta, tipo_id, estado_id))
+        else:
+            total = None
+        
+        siguiente_cursor = None
+        if len(eventos) == limit:
+            siguiente_cursor = self._encode_cursor(eventos[-1])
+        
+        eventos_response = [self._evento_de_listado(evento, proyeccion) for evento in eventos]
+        return eventos_response, total, siguiente_cursor
+    
+    def resolver_filtros(
+        self,
+        desde: Optional[datetime],
+        hasta: Optional[datetime],
+        tipo_codigo: Optional[str],
+        estado_codigo: Optional[str]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Validar la ventana de fechas y traducir códigos de catálogo a IDs"""
+        if desde and hasta and desde >= hasta:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'desde' debe ser anterior a 'hasta'"
+            )
+        try:
+            tipo_id = self.tipos_repo.get_by_codigo(tipo_codigo).id if tipo_codigo else None
+            estado_id = self.estados_repo.get_by_codigo(estado_codigo).id if estado_codigo else None
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        return tipo_id, estado_id
+    
+    def update_evento(self, evento_id: UUID, evento_data: EventoUpdate, if_match: Optional[str] = None) -> EventoResponse:
+        """
+        Actualizar un evento. Con If-Match (412) o `version` en el cuerpo (409)
+        falla si otra petición lo modificó antes.
+        """
+        version, codigo_conflicto = version_esperada(if_match, evento_data.version)
         try:
-            db_evento = self.eventos_repo.update(evento_id, evento_data)
+            db_evento = self.eventos_repo.update(evento_id, evento_data, version)
             if not db_evento:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Evento no encontrado"
                 )
-            return self._evento_to_response(db_evento)
+            # La respuesta sale de la fila devuelta por el UPDATE, antes de que el commit la expire
+            response = self._evento_to_response(db_evento)
+            self.db.commit()
+            return response
+        except ConflictoVersion as e:
+            self.db.rollback()
+            raise conflicto_version(e, codigo_conflicto)
         except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -88,10 +185,49 @@ class EventosService:
             )
         return {"message": "Evento eliminado correctamente"}
     
+    def restaurar_evento(self, evento_id: UUID) -> EventoResponse:
+        """
+        Devolver un evento archivado (y sus participantes) a las tablas vivas.
+        Su resumen de participantes se reconstruye en segundo plano, o en la
+        misma solicitud si los trabajos están deshabilitados.
+        """
+        db_evento = self.archivo_repo.restaurar(evento_id)
+        if not db_evento:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Evento archivado no encontrado"
+            )
+        response = self._evento_to_response(db_evento)
+        if settings.trabajos_enabled:
+            encolar(
+                self.db, RECONSTRUIR_RESUMEN, {"evento_id": evento_id},
+                clave=f"{RECONSTRUIR_RESUMEN}:{evento_id}"
+            )
+            self.db.commit()
+        else:
+            # Sin runner nadie consumiría el trabajo; rebuild confirma la restauración
+            self.resumen_repo.rebuild(evento_id)
+            resumen = self.resumen_repo.get_by_evento(evento_id)
+            if resumen is not None:
+                response.resumen_participantes = ResumenParticipantesResponse.model_validate(resumen)
+        return response
+    
+    def archivar_eliminados(self, dias: int, lote: int) -> Optional[int]:
+        """
+        Encolar el archivado de los eventos eliminados hace más de `dias` días, de a
+        `lote` eventos por trabajo. None si ya había un archivado pendiente.
+        """
+        antes_de = datetime.now(timezone.utc) - timedelta(days=dias)
+        trabajo_id = encolar(
+            self.db, ARCHIVAR_ELIMINADOS, {"antes_de": antes_de, "lote": lote}, clave=ARCHIVAR_ELIMINADOS
+        )
+        self.db.commit()
+        return trabajo_id
+    
     def add_participante(self, evento_id: UUID, participante_data: ParticipanteEventoCreate) -> ParticipanteEventoResponse:
         """Agregar un participante al evento"""
-        # Verificar que el evento existe
-        evento = self.eventos_repo.get_by_id(evento_id)
+        # Verificar que el evento existe y serializar altas concurrentes sobre él
+        evento = self.eventos_repo.lock_for_update(evento_id)
         if not evento:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -106,14 +242,86 @@ class EventosService:
                 detail="El músico ya es participante del evento"
             )
         
+        # Antes de crear: el commit expira las instancias de la agenda
+        conflictos = self._detectar_conflictos(evento, [participante_data.musico_id])
+        
         try:
             db_participante = self.participantes_repo.create(evento_id, participante_data)
-            return self._participante_to_response(db_participante)
+            return self._participante_to_response(
+                db_participante, conflictos.get(participante_data.musico_id, [])
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    def add_participantes_lote(self, evento_id: UUID, lote: ParticipantesLoteCreate) -> ParticipantesLoteResponse:
+        """Invitar varios músicos al evento en una transacción, marcando conflictos de agenda"""
+        if len(lote.musico_ids) > settings.participantes_lote_max:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Máximo {settings.participantes_lote_max} músicos por lote"
+            )
+        
+        evento = self.eventos_repo.lock_for_update(evento_id)
+        if not evento:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Evento no encontrado"
+            )
+        
+        conflictos = self._detectar_conflictos(evento, lote.musico_ids)
+        tamano_lotes.labels("participantes_lote").observe(len(lote.musico_ids))
+        
+        try:
+            creados, omitidos = self.participantes_repo.create_many(
+                evento_id, lote.musico_ids, lote.estado_codigo
+            )
         except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
+        
+        return ParticipantesLoteResponse(
+            creados=[
+                self._participante_to_response(p, conflictos.get(p.musico_id, []))
+                for p in creados
+            ],
+            omitidos=omitidos
+        )
+    
+    def get_agenda_musico(
+        self, musico_id: UUID, desde: Optional[datetime] = None, limit: int = 100
+    ) -> AgendaMusicoResponse:
+        """Próximos eventos de un músico, con los solapamientos dentro de su agenda"""
+        if limit > 100:
+            limit = 100
+        
+        participaciones = self.participantes_repo.get_agenda(
+            [musico_id], desde=desde or datetime.now(timezone.utc), limit=limit
+        )
+        solapados = solapamientos(
+            (p.evento for p in participaciones), self._ventana_conflicto()
+        )
+        
+        return AgendaMusicoResponse(
+            musico_id=musico_id,
+            eventos=[
+                EventoAgendaResponse(
+                    id=p.evento.id,
+                    nombre=p.evento.nombre,
+                    lugar=p.evento.lugar,
+                    fecha_presentacion=p.evento.fecha_presentacion,
+                    tipo=TipoEventoResponse.model_validate(p.evento.tipo),
+                    estado=TipoEventoResponse.model_validate(p.evento.estado),
+                    estado_participacion=TipoEventoResponse.model_validate(p.estado),
+                    conflictos=solapados.get(p.evento.id, [])
+                )
+                for p in participaciones
+            ]
+        )
     
     def update_participante(self, evento_id: UUID, musico_id: UUID, participante_data: ParticipanteEventoUpdate) -> ParticipanteEventoResponse:
         """Actualizar estado de un participante"""
@@ -127,8 +335,7 @@ class EventosService:
     
     def get_participantes_evento(self, evento_id: UUID) -> List[ParticipanteEventoResponse]:
         """Obtener todos los participantes de un evento"""
-        evento = self.eventos_repo.get_by_id(evento_id)
-        if not evento:
+        if not self.eventos_repo.exists(evento_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Evento no encontrado"
@@ -155,8 +362,7 @@ class EventosService:
     def remove_participante(self, evento_id: UUID, musico_id: UUID) -> dict:
         """Remover un participante del evento"""
         # Verificar que el evento existe
-        evento = self.eventos_repo.get_by_id(evento_id)
-        if not evento:
+        if not self.eventos_repo.exists(evento_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Evento no encontrado"
@@ -169,17 +375,19 @@ class EventosService:
             )
         return {"message": "Participante removido correctamente"}
     
-    def get_eventos_by_tipo(self, tipo_codigo: str, skip: int = 0, limit: int = 100) -> Tuple[List[EventoResponse], int]:
+    def get_eventos_by_tipo(
+        self, tipo_codigo: str, skip: int = 0, limit: int = 100,
+        total_mode: TotalMode = TotalMode.exact
+    ) -> Tuple[List[EventoResponse], Optional[int]]:
         """Obtener eventos filtrados por tipo"""
         if limit > 100:
             limit = 100
         
         try:
             tipo = self.tipos_repo.get_by_codigo(tipo_codigo)
-            eventos = self.eventos_repo.get_by_tipo(tipo.id, skip, limit)
-            total = len(eventos)  # Para optimizar, se podría agregar un método count_by_tipo
+            eventos, total = self.eventos_repo.get_page(skip, limit, tipo_id=tipo.id, total_mode=total_mode)
             
-            eventos_response = [self._evento_to_response(evento) for evento in eventos]
+            eventos_response = [self._evento_to_list_response(evento) for evento in eventos]
             return eventos_response, total
         except ValueError as e:
             raise HTTPException(
@@ -187,17 +395,19 @@ class EventosService:
                 detail=str(e)
             )
     
-    def get_eventos_by_estado(self, estado_codigo: str, skip: int = 0, limit: int = 100) -> Tuple[List[EventoResponse], int]:
+    def get_eventos_by_estado(
+        self, estado_codigo: str, skip: int = 0, limit: int = 100,
+        total_mode: TotalMode = TotalMode.exact
+    ) -> Tuple[List[EventoResponse], Optional[int]]:
         """Obtener eventos filtrados por estado"""
         if limit > 100:
             limit = 100
         
         try:
             estado = self.estados_repo.get_by_codigo(estado_codigo)
-            eventos = self.eventos_repo.get_by_estado(estado.id, skip, limit)
-            total = len(eventos)  # Para optimizar, se podría agregar un método count_by_estado
+            eventos, total = self.eventos_repo.get_page(skip, limit, estado_id=estado.id, total_mode=total_mode)
             
-            eventos_response = [self._evento_to_response(evento) for evento in eventos]
+            eventos_response = [self._evento_to_list_response(evento) for evento in eventos]
             return eventos_response, total
         except ValueError as e:
             raise HTTPException(
@@ -208,8 +418,7 @@ class EventosService:
     def get_participante_detail(self, evento_id: UUID, musico_id: UUID) -> ParticipanteEventoResponse:
         """Obtener detalles de un participante específico"""
         # Verificar que el evento existe
-        evento = self.eventos_repo.get_by_id(evento_id)
-        if not evento:
+        if not self.eventos_repo.exists(evento_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Evento no encontrado"
@@ -224,10 +433,152 @@ class EventosService:
         
         return self._participante_to_response(participante)
     
+    def get_viabilidad_repertorio(
+        self, evento_id: UUID, solo_repertorio: bool = False, solo_viables: bool = False
+    ) -> ViabilidadRepertorioResponse:
+        """
+        Canciones que pueden tocar los participantes confirmados del evento y roles
+        que faltan en las demás. Se evalúa todo el catálogo y el resultado queda en
+        caché por (evento, versión del plantel); `solo_repertorio` se limita a las
+        canciones asignadas al evento, en su orden.
+        """
+        if not self.eventos_repo.exists(evento_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Evento no encontrado"
+            )
+        
+        # La versión se lee antes que el plantel: si cambia en el medio, la
+        # entrada queda con una versión vieja y la próxima consulta recalcula
+        resumen = self.resumen_repo.get_by_evento(evento_id)
+        version = resumen.version if resumen else 0
+        catalogo = viabilidad_cache.catalogo(self.repertorio_repo.get_requisitos)
+        viabilidad = viabilidad_cache.obtener(evento_id, version, catalogo)
+        if viabilidad is None:
+            instrumentos = self.repertorio_repo.get_instrumentos_participantes(evento_id, ESTADO_CONFIRMADO)
+            viabilidad = evaluar(catalogo, instrumentos)
+            viabilidad_cache.guardar(evento_id, version, viabilidad)
+        
+        if solo_repertorio:
+            indices = [
+                catalogo.posiciones[cancion_id] for cancion_id in self.repertorio_repo.get_repertorio(evento_id)
+                if cancion_id in catalogo.posiciones
+            ]
+        else:
+            indices = range(len(catalogo.canciones))
+        
+        canciones = []
+        viables = 0
+        for i in indices:
+            viable = viabilidad.es_viable(i)
+            viables += viable
+            if solo_viables and not viable:
+                continue
+            canciones.append(ViabilidadCancionResponse(
+                cancion_id=catalogo.canciones[i],
+                titulo=catalogo.titulos[i],
+                viable=viable,
+                faltantes=[] if viable else [self._rol_to_response(rol) for rol in viabilidad.faltantes(i)],
+                opcionales_faltantes=[self._rol_to_response(rol) for rol in viabilidad.opcionales_faltantes(i)]
+            ))
+        
+        return ViabilidadRepertorioResponse(
+            evento_id=evento_id,
+            version_plantel=version,
+            musicos_confirmados=len(viabilidad.musicos),
+            evaluadas=len(indices),
+            viables=viables,
+            canciones=canciones
+        )
+    
+    @staticmethod
+    def _ventana_conflicto() -> timedelta:
+        return timedelta(hours=settings.conflicto_ventana_horas)
+    
+    def _detectar_conflictos(
+        self, evento: Evento, musico_ids: List[UUID]
+    ) -> Dict[UUID, List[ConflictoAgendaResponse]]:
+        """Eventos de cada músico cercanos a `evento`, con una sola consulta para todo el lote"""
+        ventana = self._ventana_conflicto()
+        participaciones = self.participantes_repo.get_agenda(
+            musico_ids,
+            desde=evento.fecha_presentacion - ventana,
+            hasta=evento.fecha_presentacion + ventana
+        )
+        return {
+            musico_id: [
+                ConflictoAgendaResponse(
+                    evento_id=otro.id,
+                    nombre=otro.nombre,
+                    fecha_presentacion=otro.fecha_presentacion
+                )
+                for otro in otros
+            ]
+            for musico_id, otros in conflictos_por_musico(evento, participaciones, ventana).items()
+        }
+    
+    @staticmethod
+    def _encode_cursor(evento: Evento) -> str:
+        """Cursor opaco con la clave de orden (fecha_presentacion, id) del último evento"""
+        clave = f"{evento.fecha_presentacion.isoformat()}|{evento.id}"
+        return base64.urlsafe_b64encode(clave.encode()).decode().rstrip("=")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+        """Recuperar la clave de orden de un cursor generado por _encode_cursor"""
+        try:
+            relleno = "=" * (-len(cursor) % 4)
+            fecha, evento_id = base64.urlsafe_b64decode(cursor + relleno).decode().split("|")
+            return datetime.fromisoformat(fecha), UUID(evento_id)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor inválido"
+            )
+    
     def _evento_to_response(self, evento: Evento) -> EventoResponse:
         """Convertir modelo a schema de respuesta"""
         return EventoResponse.model_validate(evento)
     
-    def _participante_to_response(self, participante: ParticipanteEvento) -> ParticipanteEventoResponse:
+    def _evento_to_list_response(self, evento: Evento) -> EventoResponse:
+        """Convertir evento de un listado incluyendo los conteos de participantes"""
+        response = self._evento_to_response(evento)
+        if response.resumen_participantes is None:
+            response.resumen_participantes = ResumenParticipantesResponse()
+        return response
+    
+    def _evento_de_listado(self, evento: Evento, proyeccion: Optional[Proyeccion]) -> Union[EventoResponse, dict]:
+        if proyeccion is None or proyeccion.completa:
+            return self._evento_to_list_response(evento)
+        return self._evento_proyectado(evento, proyeccion)
+    
+    @staticmethod
+    def _evento_proyectado(evento: Evento, proyeccion: Proyeccion) -> dict:
+        """Solo los campos y relaciones pedidos por la proyección; los conteos ausentes van en cero"""
+        return proyeccion.recortar(evento, {
+            "tipo": lambda e: TipoEventoResponse.model_validate(e.tipo),
+            "estado": lambda e: TipoEventoResponse.model_validate(e.estado),
+            "resumen_participantes": lambda e: (
+                ResumenParticipantesResponse.model_validate(e.resumen_participantes)
+                if e.resumen_participantes is not None else ResumenParticipantesResponse()
+            ),
+        })
+    
+    @staticmethod
+    def _rol_to_response(rol: Rol) -> RolRepertorioResponse:
+        return RolRepertorioResponse(
+            instrumento_id=rol.instrumento_id,
+            instrumento=rol.instrumento,
+            nivel_minimo=rol.nivel_minimo
+        )
+    
+    def _participante_to_response(
+        self,
+        participante: ParticipanteEvento,
+        conflictos: Optional[List[ConflictoAgendaResponse]] = None
+    ) -> ParticipanteEventoResponse:
         """Convertir modelo de participante a schema de respuesta"""
-        return ParticipanteEventoResponse.model_validate(participante)
\ No newline at end of file
+        response = ParticipanteEventoResponse.model_validate(participante)
+        if conflictos:
+            response.conflictos = conflictos
+        return response
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+Viabilidad del repertorio: qué canciones puede tocar el plantel confirmado de un evento.
+
+Los requisitos de todo el catálogo de canciones se compilan una vez en bits. Cada
+rol (instrumento, nivel mínimo) tiene una columna con un bit por canción que lo
+requiere, y cada canción el conjunto de bits de sus roles. El plantel se reduce
+al conjunto de roles que cubre algún músico confirmado, y la pasada sobre miles
+de canciones es un OR de las columnas de los roles sin cubrir: una operación
+entera por rol, no un recorrido por canción.
+
+Un músico no toca dos instrumentos a la vez: las canciones con varios roles
+requeridos que pasan el filtro se verifican además con un emparejamiento
+músico-rol, una vez por combinación de roles distinta del catálogo.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+import logging
+import threading
+import time
+
+from app.core.config import settings
+from app.core.metricas import registrar_cache
+
+logger = logging.getLogger(__name__)
+
+# Estado de participante que cuenta para el plantel
+ESTADO_CONFIRMADO = "confirmado"
+
+
+@dataclass(frozen=True)
+class Rol:
+    """Instrumento requerido y nivel mínimo (orden en cat_niveles_habilidad; 0 = cualquiera)"""
+    instrumento_id: int
+    nivel: int = 0
+    instrumento: Optional[str] = field(default=None, compare=False)
+    nivel_minimo: Optional[str] = field(default=None, compare=False)
+
+
+def _bits(valor: int) -> Iterator[int]:
+    """Posiciones de los bits encendidos, de menor a mayor"""
+    while valor:
+        bajo = valor & -valor
+        yield bajo.bit_length() - 1
+        valor ^= bajo
+
+
+class CatalogoRequisitos:
+    """
+    Requisitos de las canciones compilados en bits.
+
+    Recibe filas con cancion_id, titulo, instrumento_id, es_requerido, nivel,
+    instrumento y nivel_minimo (una por requisito, ordenadas por canción; una
+    canción sin requisitos llega con instrumento_id nulo).
+    """
+
+    def __init__(self, filas: Iterable):
+        self.canciones: List[UUID] = []
+        self.titulos: List[str] = []
+        self.roles: List[Rol] = []
+        # Por rol: canciones que lo requieren
+        self.columnas: List[int] = []
+        # Por canción: roles requeridos y opcionales
+        self.requeridos: List[int] = []
+        self.opcionales: List[int] = []
+        # Canciones con más de un rol requerido, agrupadas por combinación de roles
+        self.combinaciones: Dict[int, int] = {}
+        # Por instrumento: (nivel, bit del rol), para traducir lo que toca un músico
+        self._roles_por_instrumento: Dict[int, List[Tuple[int, int]]] = {}
+        # Canción -> posición de su bit
+        self.posiciones: Dict[UUID, int] = {}
+        indice_rol: Dict[Rol, int] = {}
+
+        for fila in filas:
+            i = self.posiciones.get(fila.cancion_id)
+            if i is None:
+                i = self.posiciones[fila.cancion_id] = len(self.canciones)
+                self.canciones.append(fila.cancion_id)
+                self.titulos.append(fila.titulo)
+                self.requeridos.append(0)
+                self.opcionales.append(0)
+            if fila.instrumento_id is None:
+                continue
+            rol = Rol(fila.instrumento_id, fila.nivel, fila.instrumento, fila.nivel_minimo)
+            bit = indice_rol.get(rol)
+            if bit is None:
+                bit = indice_rol[rol] = len(self.roles)
+                self.roles.append(rol)
+                self.columnas.append(0)
+                self._roles_por_instrumento.setdefault(rol.instrumento_id, []).append((rol.nivel, bit))
+            if fila.es_requerido:
+                self.requeridos[i] |= 1 << bit
+                self.columnas[bit] |= 1 << i
+            else:
+                self.opcionales[i] |= 1 << bit
+
+        for i, roles in enumerate(self.requeridos):
+            if roles & (roles - 1):
+                self.combinaciones[roles] = self.combinaciones.get(roles, 0) | 1 << i
+        self.todas = (1 << len(self.canciones)) - 1
+        self.cargado_en = time.monotonic()
+
+    def roles_de(self, instrumentos: Dict[int, int]) -> int:
+        """Roles que cubre un músico con {instrumento_id: orden de su nivel}"""
+        cubiertos = 0
+        for instrumento_id, nivel in instrumentos.items():
+            for nivel_minimo, bit in self._roles_por_instrumento.get(instrumento_id, ()):
+                if nivel >= nivel_minimo:
+                    cubiertos |= 1 << bit
+        return cubiertos
+
+    def lista_roles(self, bits: int) -> List[Rol]:
+        return [self.roles[bit] for bit in _bits(bits)]
+
+
+def _sin_musico(roles: int, musicos: List[int]) -> int:
+    """
+    Roles de una combinación que quedan sin músico en un emparejamiento máximo
+    (caminos aumentantes; las combinaciones tienen pocos roles).
+    """
+    candidatos = [bits & roles for bits in musicos if bits & roles]
+    asignado: Dict[int, int] = {}  # músico -> rol
+
+    def aumentar(rol: int, visitados: set) -> bool:
+        for musico, bits in enumerate(candidatos):
+            if bits >> rol & 1 and musico not in visitados:
+                visitados.add(musico)
+                if musico not in asignado or aumentar(asignado[musico], visitados):
+                    asignado[musico] = rol
+                    return True
+        return False
+
+    faltan = 0
+    for rol in _bits(roles):
+        if not aumentar(rol, set()):
+            faltan |= 1 << rol
+    return faltan
+
+
+@dataclass
+class Viabilidad:
+    """Resultado de evaluar un plantel contra el catálogo"""
+    catalogo: CatalogoRequisitos
+    musicos: FrozenSet[UUID]
+    cubiertos: int
+    inviables: int
+    # Combinación de roles -> roles sin músico, para las que fallaron el emparejamiento
+    sin_musico: Dict[int, int]
+
+    @property
+    def viables(self) -> int:
+        return self.catalogo.todas & ~self.inviables
+
+    def es_viable(self, indice: int) -> bool:
+        return not self.inviables >> indice & 1
+
+    def faltantes(self, indice: int) -> List[Rol]:
+        """Roles requeridos de la canción que el plantel no puede cubrir"""
+        roles = self.catalogo.requeridos[indice]
+        faltan = roles & ~self.cubiertos
+        return self.catalogo.lista_roles(faltan or self.sin_musico.get(roles, 0))
+
+    def opcionales_faltantes(self, indice: int) -> List[Rol]:
+        return self.catalogo.lista_roles(self.catalogo.opcionales[indice] & ~self.cubiertos)
+
+
+def evaluar(catalogo: CatalogoRequisitos, instrumentos: Dict[UUID, Dict[int, int]]) -> Viabilidad:
+    """Evaluar todas las canciones del catálogo para los músicos {musico_id: {instrumento_id: nivel}}"""
+    musicos = [catalogo.roles_de(tocados) for tocados in instrumentos.values()]
+    cubiertos = 0
+    for bits in musicos:
+        cubiertos |= bits
+
+    inviables = 0
+    for bit in _bits(((1 << len(catalogo.roles)) - 1) & ~cubiertos):
+        inviables |= catalogo.columnas[bit]
+
+    sin_musico = {}
+    for roles, canciones in catalogo.combinaciones.items():
+        if roles & ~cubiertos:
+            continue
+        faltan = _sin_musico(roles, musicos)
+        if faltan:
+            sin_musico[roles] = faltan
+            inviables |= canciones
+
+    return Viabilidad(catalogo, frozenset(instrumentos), cubiertos, inviables, sin_musico)
+
+
+@dataclass
+class _Entrada:
+    version: int
+    viabilidad: Viabilidad
+
+
+class ViabilidadCache:
+    """
+    Caché en proceso de la viabilidad por evento.
+
+    Cada entrada vale para una versión del plantel: la de
+    `resumen_participantes_evento`, que sube con cada alta, baja o cambio de estado
+    de un participante. Los cambios de instrumentos de un músico llegan por el
+    change feed y descartan los eventos donde participa. servicio_canciones no
+    publica cambios: el catálogo compilado se recarga cada `ttl` segundos y las
+    entradas calculadas con el anterior dejan de valer.
+    """
+
+    def __init__(self, capacidad: int = 256, ttl: float = 300.0):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[UUID, _Entrada]" = OrderedDict()
+        self._catalogo: Optional[CatalogoRequisitos] = None
+        self.hits = 0
+        self.misses = 0
+
+    def catalogo(self, cargar: Callable[[], Iterable]) -> CatalogoRequisitos:
+        """Catálogo compilado vigente; `cargar` devuelve las filas de requisitos"""
+        catalogo = self._catalogo
+        if catalogo is not None and time.monotonic() - catalogo.cargado_en < self.ttl:
+            return catalogo
+        with self._lock:
+            if self._catalogo is catalogo:
+                inicio = time.perf_counter()
+                self._catalogo = CatalogoRequisitos(cargar())
+                logger.info(
+                    f"Catálogo de requisitos compilado: {len(self._catalogo.canciones)} canciones, "
+                    f"{len(self._catalogo.roles)} roles en {(time.perf_counter() - inicio) * 1000:.1f} ms"
+                )
+            return self._catalogo
+
+    def obtener(self, evento_id: UUID, version: int, catalogo: CatalogoRequisitos) -> Optional[Viabilidad]:
+        with self._lock:
+            entrada = self._entradas.get(evento_id)
+            if entrada is None or entrada.version != version or entrada.viabilidad.catalogo is not catalogo:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(evento_id)
+            self.hits += 1
+            return entrada.viabilidad
+
+    def guardar(self, evento_id: UUID, version: int, viabilidad: Viabilidad) -> None:
+        with self._lock:
+            self._entradas[evento_id] = _Entrada(version, viabilidad)
+            self._entradas.move_to_end(evento_id)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+
+    def invalidar_musico(self, musico_id: UUID) -> None:
+        """Descartar los eventos en cuyo plantel está el músico"""
+        with self._lock:
+            for evento_id in [e for e, entrada in self._entradas.items() if musico_id in entrada.viabilidad.musicos]:
+                del self._entradas[evento_id]
+
+    def invalidate(self) -> None:
+        """Descartar todas las entradas y el catálogo compilado"""
+        with self._lock:
+            self._entradas.clear()
+            self._catalogo = None
+
+
+viabilidad_cache = ViabilidadCache(settings.repertorio_cache_eventos, settings.repertorio_catalogo_ttl)
+registrar_cache("viabilidad_repertorio", viabilidad_cache)
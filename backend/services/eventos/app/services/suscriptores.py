@@ -0,0 +1,77 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from uuid import UUID
+from sqlalchemy.orm import Session, joinedload
+import logging
+
+from app.core.config import settings
+from app.core.change_feed import Cambio, ChangeFeedDispatcher
+from app.core.outbox import record_change
+from app.models.eventos import Evento, ParticipanteEvento
+from app.repositories.estados_participante_repository import EstadosParticipanteRepository
+from app.repositories.resumen_participantes_repository import ResumenParticipantesRepository
+from app.services.repertorio import viabilidad_cache
+
+logger = logging.getLogger(__name__)
+
+
+def rechazar_participaciones_de_musico_eliminado(cambio: Cambio, db: Session) -> None:
+    """Un músico eliminado ya no puede presentarse: rechazar sus invitaciones a eventos futuros"""
+    if cambio.operacion != "eliminado":
+        return
+
+    rechazado = EstadosParticipanteRepository(db).get_by_codigo("rechazado")
+    participaciones = db.query(ParticipanteEvento).options(
+        joinedload(ParticipanteEvento.estado)
+    ).join(Evento).filter(
+        ParticipanteEvento.musico_id == UUID(cambio.agregado_id),
+        ParticipanteEvento.estado_id != rechazado.id,
+        Evento.fecha_presentacion >= datetime.now(timezone.utc),
+        Evento.eliminado_en.is_(None)
+    ).all()
+
+    deltas_por_evento = defaultdict(lambda: defaultdict(int))
+    for participante in participaciones:
+        deltas = deltas_por_evento[participante.evento_id]
+        deltas[participante.estado.codigo] -= 1
+        deltas[rechazado.codigo] += 1
+        participante.estado_id = rechazado.id
+
+    if participaciones:
+        db.flush()
+        # Mismo orden de bloqueos que las escrituras de participantes: las filas del
+        # resumen (por evento_id, siempre en el mismo orden) antes del lock del outbox
+        resumen_repo = ResumenParticipantesRepository(db)
+        for evento_id in sorted(deltas_por_evento):
+            resumen_repo.ajustar(evento_id, deltas_por_evento[evento_id])
+        for participante in participaciones:
+            record_change(db, "participante", "actualizado", participante)
+        logger.info(
+            f"Músico {cambio.agregado_id} eliminado: {len(participaciones)} participaciones rechazadas"
+        )
+
+
+def invalidar_viabilidad_repertorio(cambio: Cambio, db: Session) -> None:
+    """Un músico cambió sus instrumentos: descartar la viabilidad de los eventos donde participa"""
+    musico_id = cambio.datos.get("musico_id")
+    if musico_id:
+        viabilidad_cache.invalidar_musico(UUID(musico_id))
+    else:
+        viabilidad_cache.invalidate()
+
+
+def registrar_suscriptores(dispatcher: ChangeFeedDispatcher) -> None:
+    """Registrar los consumidores en proceso del servicio de eventos"""
+    dispatcher.subscribe(
+        "eventos.musicos_eliminados",
+        rechazar_participaciones_de_musico_eliminado,
+        origen=settings.musicos_schema,
+        agregados={"musico"}
+    )
+    dispatcher.subscribe(
+        "eventos.viabilidad_repertorio",
+        invalidar_viabilidad_repertorio,
+        origen=settings.musicos_schema,
+        agregados={"instrumento_musico"},
+        durable=False
+    )
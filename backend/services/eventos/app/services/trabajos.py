@@ -0,0 +1,35 @@
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy.orm import Session
+import logging
+
+from app.core.trabajos import TrabajosRunner, encolar
+from app.repositories.archivo_repository import ArchivoEventosRepository
+from app.repositories.resumen_participantes_repository import ResumenParticipantesRepository
+
+logger = logging.getLogger(__name__)
+
+# Tipos de trabajo del servicio de eventos
+ARCHIVAR_ELIMINADOS = "eventos.archivar_eliminados"
+RECONSTRUIR_RESUMEN = "eventos.reconstruir_resumen"
+
+
+def archivar_eliminados(datos: dict, db: Session) -> None:
+    """Archivar un lote de eventos eliminados; si quedan más, encolar el siguiente lote"""
+    antes_de = datetime.fromisoformat(datos["antes_de"])
+    archivados = ArchivoEventosRepository(db).archivar_lote(antes_de, datos["lote"])
+    logger.info(f"Archivado en segundo plano: {archivados} eventos eliminados antes de {antes_de:%Y-%m-%d}")
+    if archivados == datos["lote"]:
+        # Un lote por trabajo: los demás trabajos no esperan detrás de un archivado largo
+        encolar(db, ARCHIVAR_ELIMINADOS, datos, clave=ARCHIVAR_ELIMINADOS)
+
+
+def reconstruir_resumen(datos: dict, db: Session) -> None:
+    """Recalcular el resumen de participantes de un evento desde sus participantes"""
+    ResumenParticipantesRepository(db).rebuild(UUID(datos["evento_id"]))
+
+
+def registrar_trabajos(runner: TrabajosRunner) -> None:
+    """Registrar los tipos de trabajo en segundo plano del servicio de eventos"""
+    runner.registrar(ARCHIVAR_ELIMINADOS, archivar_eliminados)
+    runner.registrar(RECONSTRUIR_RESUMEN, reconstruir_resumen)
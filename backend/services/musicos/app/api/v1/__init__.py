@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from .musicos import router as musicos_router
 from .instrumentos import router as instrumentos_router
+from .admin import router as admin_router
 
 api_router = APIRouter()
 
@@ -14,4 +15,10 @@ api_router.include_router(
     instrumentos_router, 
     prefix="/musicos", 
     tags=["Instrumentos"]
+)
+
+api_router.include_router(
+    admin_router, 
+    prefix="/admin", 
+    tags=["Administración"]
 )
\ No newline at end of file
@@ -0,0 +1,102 @@
+import secrets
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.consultas_lentas import consultas_lentas
+from app.core.database import get_db
+from app.core import trabajos
+from app.api.v1.musicos import get_musicos_service
+from app.services.musicos_service import MusicosService
+from app.schemas.admin import (
+    ConsultasLentasConfig, ConsultasLentasConfigUpdate, ConsultasLentasResponse,
+    TrabajoEncoladoResponse, TrabajosResponse
+)
+from app.schemas.musicos import MusicoResponse
+
+
+def verificar_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Sin ADMIN_TOKEN configurado la administración solo está disponible en modo debug"""
+    if not settings.admin_token:
+        if not settings.debug:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Administración deshabilitada: configure ADMIN_TOKEN"
+            )
+        return
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de administración inválido"
+        )
+
+
+router = APIRouter(dependencies=[Depends(verificar_admin)])
+
+# ==================== CONSULTAS LENTAS ====================
+
+@router.get("/consultas-lentas", response_model=ConsultasLentasResponse)
+async def get_consultas_lentas(
+    limit: int = Query(50, ge=1, le=10000, description="Máximo de consultas a devolver")
+):
+    """Consultas lentas registradas, de la más reciente a la más antigua"""
+    return {
+        "config": consultas_lentas.configuracion(),
+        "consultas": consultas_lentas.consultas(limit)
+    }
+
+@router.put("/consultas-lentas/config", response_model=ConsultasLentasConfig)
+async def update_consultas_lentas_config(config: ConsultasLentasConfigUpdate):
+    """Cambiar umbral, muestreo de EXPLAIN o activar/desactivar el registro sin reiniciar"""
+    consultas_lentas.configurar(**config.model_dump(exclude_unset=True))
+    return consultas_lentas.configuracion()
+
+@router.delete("/consultas-lentas", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_consultas_lentas():
+    """Vaciar el buffer de consultas lentas"""
+    consultas_lentas.limpiar()
+
+# ==================== ARCHIVO EN FRÍO ====================
+
+@router.post("/archivo/archivar", response_model=TrabajoEncoladoResponse, status_code=status.HTTP_202_ACCEPTED)
+async def archivar_eliminados(
+    dias: int = Query(settings.archivo_dias, ge=0, description="Antigüedad mínima de la eliminación"),
+    lote: int = Query(settings.archivo_lote, ge=1, le=100000, description="Músicos por trabajo"),
+    service: MusicosService = Depends(get_musicos_service)
+):
+    """Archivar en segundo plano los músicos eliminados hace más de `dias` días (como app.commands.archivo)"""
+    return {"trabajo_id": service.archivar_eliminados(dias, lote)}
+
+@router.post("/archivo/musicos/{musico_id}/restaurar", response_model=MusicoResponse)
+async def restaurar_musico(
+    musico_id: UUID,
+    service: MusicosService = Depends(get_musicos_service)
+):
+    """Devolver un músico archivado a las tablas vivas; queda activo de nuevo"""
+    return service.restaurar_musico(musico_id)
+
+# ==================== TRABAJOS EN SEGUNDO PLANO ====================
+
+@router.get("/trabajos", response_model=TrabajosResponse)
+def get_trabajos(
+    limit: int = Query(50, ge=1, le=1000, description="Máximo de trabajos fallidos a devolver"),
+    db: Session = Depends(get_db)
+):
+    """Profundidad y atraso de la cola, y los últimos trabajos fallidos"""
+    return {**trabajos.estadisticas(db), "fallidos_recientes": trabajos.fallidos(db, limit)}
+
+@router.post("/trabajos/{trabajo_id}/reintentar", status_code=status.HTTP_204_NO_CONTENT)
+def reintentar_trabajo(trabajo_id: int, db: Session = Depends(get_db)):
+    """Devolver un trabajo fallido a la cola con los intentos en cero"""
+    try:
+        reintentado = trabajos.reintentar_fallido(db, trabajo_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not reintentado:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trabajo fallido no encontrado"
+        )
+    db.commit()
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, Query, status, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, Header, Query, Response, status, HTTPException
+from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
 
+from app.core.concurrencia import etag
 from app.core.database import get_db
 from app.services.musicos_service import MusicosService
 from app.schemas.musicos import (
@@ -103,10 +104,14 @@ async def get_instrumentos_musico(
 async def update_instrumento_musico(
     instrumento_id: UUID,
     instrumento_data: InstrumentoMusicoUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag leído; 412 si el instrumento cambió desde entonces"),
     service: MusicosService = Depends(get_musicos_service)
 ):
     """Actualizar un instrumento de músico"""
-    return service.update_instrumento_musico(instrumento_id, instrumento_data)
+    instrumento = service.update_instrumento_musico(instrumento_id, instrumento_data, if_match)
+    response.headers["ETag"] = etag(instrumento.version)
+    return instrumento
 
 @router.delete("/{musico_id}/instrumentos/{instrumento_id}", status_code=status.HTTP_200_OK)
 async def remove_instrumento(
@@ -1,17 +1,23 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.concurrencia import etag
 from app.core.database import get_db
+from app.core.paginacion import TotalMode
+from app.core.proyeccion import Proyeccion, proyeccion, responder
 from app.services.musicos_service import MusicosService
 from app.schemas.musicos import (
     MusicoCreate, MusicoUpdate, MusicoResponse, MusicosListResponse,
-    EstadoMusicoResponse
+    EstadoMusicoResponse, PerfilMusicoResponse, PerfilMusicoUpdate
 )
 
 router = APIRouter()
 
+# fields= y expand= en listado y detalle; sin ellos, la forma completa de MusicoResponse
+proyeccion_musico = proyeccion(MusicoResponse, relaciones=("estado", "instrumentos"))
+
 def get_musicos_service(db: Session = Depends(get_db)) -> MusicosService:
     return MusicosService(db)
 
@@ -30,17 +36,19 @@ async def get_musicos(
     skip: int = Query(0, ge=0, description="Elementos a omitir"),
     limit: int = Query(20, ge=1, le=100, description="Elementos por página"),
     activos_solo: bool = Query(True, description="Solo músicos activos"),
+    total_mode: TotalMode = Query(TotalMode.exact, description="exact, estimate (estadísticas del planner) o none"),
+    campos: Proyeccion = Depends(proyeccion_musico),
     service: MusicosService = Depends(get_musicos_service)
 ):
-    """Obtener lista de músicos con paginación"""
-    musicos, total = service.get_musicos(skip=skip, limit=limit, activos_solo=activos_solo)
-    
-    return MusicosListResponse(
-        musicos=musicos,
-        total=total,
-        page=(skip // limit) + 1,
-        size=len(musicos)
+    """Obtener lista de músicos con paginación (con `fields`/`expand`, solo esos campos)"""
+    musicos, total = service.get_musicos(
+        skip=skip, limit=limit, activos_solo=activos_solo, total_mode=total_mode, proyeccion=campos
     )
+    
+    pagina = dict(musicos=musicos, total=total, page=(skip // limit) + 1, size=len(musicos))
+    if not campos.completa:
+        return responder(pagina)
+    return MusicosListResponse(**pagina)
 
 @router.get("/search", response_model=List[MusicoResponse])
 async def search_musicos(
@@ -52,22 +60,64 @@ async def search_musicos(
     """Buscar músicos por nombre"""
     return service.search_musicos(nombre, skip=skip, limit=limit)
 
+@router.get("/lote", response_model=List[MusicoResponse])
+async def get_musicos_lote(
+    ids: List[UUID] = Query(..., description="IDs de músicos (se repite el parámetro)"),
+    service: MusicosService = Depends(get_musicos_service)
+):
+    """Obtener varios músicos por ID en una consulta (llamadas entre servicios; admite Accept: application/msgpack)"""
+    return service.get_musicos_lote(ids)
+
 @router.get("/{musico_id}", response_model=MusicoResponse)
 async def get_musico(
     musico_id: UUID,
+    response: Response,
+    campos: Proyeccion = Depends(proyeccion_musico),
     service: MusicosService = Depends(get_musicos_service)
 ):
-    """Obtener un músico específico por ID"""
-    return service.get_musico(musico_id)
+    """Obtener un músico específico por ID (ETag con su versión; con `fields`/`expand`, solo esos campos)"""
+    musico = service.get_musico(musico_id, proyeccion=campos)
+    if not campos.completa:
+        return responder(musico, {"ETag": etag(musico["version"])})
+    response.headers["ETag"] = etag(musico.version)
+    return musico
 
 @router.put("/{musico_id}", response_model=MusicoResponse)
 async def update_musico(
     musico_id: UUID,
     musico_data: MusicoUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag leído; 412 si el músico cambió desde entonces"),
     service: MusicosService = Depends(get_musicos_service)
 ):
     """Actualizar un músico existente"""
-    return service.update_musico(musico_id, musico_data)
+    musico = service.update_musico(musico_id, musico_data, if_match)
+    response.headers["ETag"] = etag(musico.version)
+    return musico
+
+@router.get("/{musico_id}/perfil", response_model=PerfilMusicoResponse)
+async def get_perfil_musico(
+    musico_id: UUID,
+    response: Response,
+    service: MusicosService = Depends(get_musicos_service)
+):
+    """Músico, sus instrumentos y los catálogos del formulario en una consulta (ETag con la versión del músico)"""
+    perfil = service.get_perfil(musico_id)
+    response.headers["ETag"] = etag(perfil.musico.version)
+    return perfil
+
+@router.put("/{musico_id}/perfil", response_model=MusicoResponse)
+async def update_perfil_musico(
+    musico_id: UUID,
+    cambios: PerfilMusicoUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag del perfil leído; 412 si el músico cambió desde entonces"),
+    service: MusicosService = Depends(get_musicos_service)
+):
+    """Actualizar el músico y agregar, modificar o eliminar sus instrumentos con un solo commit"""
+    musico = service.actualizar_perfil(musico_id, cambios, if_match)
+    response.headers["ETag"] = etag(musico.version)
+    return musico
 
 @router.delete("/{musico_id}", status_code=status.HTTP_200_OK)
 async def delete_musico(
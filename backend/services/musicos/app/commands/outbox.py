@@ -0,0 +1,40 @@
+"""
+Mantenimiento del outbox del change feed.
+
+Uso (desde backend/services/musicos):
+    python -m app.commands.outbox purge [--retencion-horas 24] [--lote 1000]
+
+`purge` borra en lotes (una transacción por lote) los cambios que ya procesaron
+todos los consumidores durables, según los offsets de `outbox_offsets` en todos
+los esquemas, y que tienen más de la retención. Pensado para correr
+periódicamente (cron).
+"""
+import argparse
+import logging
+import sys
+from datetime import timedelta
+
+from app.core.outbox import purgar_procesados
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mantenimiento del outbox del change feed")
+    parser.add_argument("accion", choices=["purge"])
+    parser.add_argument(
+        "--retencion-horas", type=float, default=24.0,
+        help="Conservar los cambios más recientes aunque ya se hayan procesado"
+    )
+    parser.add_argument("--lote", type=int, default=1000, help="Filas por transacción")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    borradas = purgar_procesados(timedelta(hours=args.retencion_horas), args.lote)
+    logger.info(f"Purga terminada: {borradas} cambios del outbox borrados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
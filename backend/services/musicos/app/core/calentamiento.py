@@ -0,0 +1,46 @@
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from .config import settings
+from .database import SessionLocal, get_engine
+from .catalog_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+
+def llenar_pool() -> int:
+    """Abrir las pool_size conexiones del worker para que la primera ráfaga no pague el connect"""
+    pool_size, _ = settings.pool_por_worker()
+    conexiones = []
+    try:
+        for _ in range(pool_size):
+            conexion = get_engine().connect()
+            conexiones.append(conexion)
+            conexion.execute(text("SELECT 1"))
+    finally:
+        for conexion in conexiones:
+            conexion.close()
+    return len(conexiones)
+
+
+def calentar() -> None:
+    """
+    Preparar el worker antes de aceptar tráfico: mappers configurados, pool lleno
+    y catálogo de instrumentos cargado. Se llama desde el lifespan, que uvicorn
+    completa antes de empezar a aceptar conexiones.
+    """
+    inicio = time.perf_counter()
+    configure_mappers()
+    conexiones = llenar_pool()
+    db = SessionLocal()
+    try:
+        instrumentos = catalog_cache.precargar(db)
+    finally:
+        db.close()
+    logger.info(
+        f"Worker caliente en {(time.perf_counter() - inicio) * 1000:.0f} ms: "
+        f"{conexiones} conexiones, {instrumentos} instrumentos en caché"
+    )
@@ -0,0 +1,71 @@
+from typing import Dict, List, Optional
+import logging
+import threading
+
+from sqlalchemy.orm import Session
+
+from app.core.metricas import registrar_cache
+from app.models.catalogos import CatInstrumentos
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogCache:
+    """
+    Caché en proceso del catálogo de instrumentos.
+
+    El catálogo es pequeño y cambia poco: se carga completo en la primera
+    consulta y se invalida con cada escritura local o con los cambios
+    `instrumento.*` que llegan por el change feed desde otros workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instrumentos: Optional[Dict[int, CatInstrumentos]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_instrumento(self, db: Session, instrumento_id: int) -> Optional[CatInstrumentos]:
+        """Obtener instrumento del catálogo sin consultar la base si ya está cargado"""
+        instrumentos = self._instrumentos
+        if instrumentos is None:
+            self.misses += 1
+            instrumentos = self._cargar(db)
+        else:
+            self.hits += 1
+        return instrumentos.get(instrumento_id)
+
+    def get_activos(self, db: Session) -> List[CatInstrumentos]:
+        """Instrumentos activos del catálogo en orden de presentación"""
+        instrumentos = self._instrumentos
+        if instrumentos is None:
+            self.misses += 1
+            instrumentos = self._cargar(db)
+        else:
+            self.hits += 1
+        activos = [instrumento for instrumento in instrumentos.values() if instrumento.activo]
+        return sorted(activos, key=lambda instrumento: (instrumento.orden, instrumento.nombre))
+
+    def precargar(self, db: Session) -> int:
+        """Cargar el catálogo antes de la primera solicitud; devuelve los instrumentos cargados"""
+        return len(self._cargar(db))
+
+    def invalidate(self) -> None:
+        """Descartar el catálogo cargado"""
+        with self._lock:
+            self._instrumentos = None
+        logger.debug("Caché de catálogo de instrumentos invalidada")
+
+    def _cargar(self, db: Session) -> Dict[int, CatInstrumentos]:
+        with self._lock:
+            if self._instrumentos is None:
+                filas = db.query(CatInstrumentos).all()
+                # Desacoplar de la sesión: las instancias se comparten entre solicitudes
+                for fila in filas:
+                    db.expunge(fila)
+                self._instrumentos = {fila.id: fila for fila in filas}
+            return self._instrumentos
+
+
+catalog_cache = CatalogCache()
+registrar_cache("catalogo_instrumentos", catalog_cache)
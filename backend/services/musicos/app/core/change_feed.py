@@ -0,0 +1,248 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional, Set
+import logging
+import re
+import select
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, get_engine
+from app.core.metricas import tamano_lotes
+from app.core.outbox import channel_for
+
+logger = logging.getLogger(__name__)
+
+_IDENTIFICADOR = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+@dataclass(frozen=True)
+class Cambio:
+    """Fila del outbox entregada a los suscriptores"""
+    id: int
+    origen: str
+    agregado: str
+    agregado_id: str
+    operacion: str
+    datos: dict
+    creado_en: Optional[datetime]
+
+    @property
+    def tipo(self) -> str:
+        return f"{self.agregado}.{self.operacion}"
+
+
+@dataclass
+class Suscriptor:
+    """
+    Consumidor en proceso del change feed.
+
+    Los suscriptores durables guardan su offset en `outbox_offsets` y reciben la
+    sesión de la transacción que avanza el offset (entrega at-least-once; las
+    actualizaciones de read models quedan atómicas con el offset). Los no
+    durables, como la invalidación de cachés, llevan el offset en memoria y
+    cada worker procesa todos los cambios desde su arranque.
+    """
+    nombre: str
+    origen: str
+    manejador: Callable[[Cambio, Session], None]
+    agregados: Optional[Set[str]] = None
+    durable: bool = True
+    ultimo_id: int = field(default=0, repr=False)
+
+    def acepta(self, cambio: Cambio) -> bool:
+        return self.agregados is None or cambio.agregado in self.agregados
+
+
+class ChangeFeedDispatcher:
+    """Publica los cambios del outbox a suscriptores en proceso vía LISTEN/NOTIFY"""
+
+    def __init__(self, poll_interval: float = 5.0, batch_size: int = 100):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._suscriptores: List[Suscriptor] = []
+        self._stop = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def subscribe(
+        self,
+        nombre: str,
+        manejador: Callable[[Cambio, Session], None],
+        origen: Optional[str] = None,
+        agregados: Optional[Set[str]] = None,
+        durable: bool = True
+    ) -> None:
+        """Registrar un suscriptor antes de iniciar el dispatcher"""
+        origen = origen or settings.database_schema
+        if not _IDENTIFICADOR.match(origen):
+            raise ValueError(f"Esquema de origen inválido: {origen}")
+        self._suscriptores.append(Suscriptor(
+            nombre=nombre,
+            origen=origen,
+            manejador=manejador,
+            agregados=set(agregados) if agregados else None,
+            durable=durable
+        ))
+
+    @property
+    def origenes(self) -> List[str]:
+        return sorted({s.origen for s in self._suscriptores})
+
+    def start(self) -> None:
+        """Iniciar el hilo de escucha"""
+        if not self._suscriptores or self._hilo:
+            return
+        self._inicializar_offsets_en_memoria()
+        self._stop.clear()
+        self._hilo = threading.Thread(target=self._run, name="change-feed", daemon=True)
+        self._hilo.start()
+        logger.info(f"Change feed escuchando: {', '.join(self.origenes)}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Detener el hilo de escucha"""
+        self._stop.set()
+        if self._hilo:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    # ==================== CICLO PRINCIPAL ====================
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            conexion = None
+            try:
+                conexion = self._escuchar()
+                # Procesar pendientes acumulados mientras no había escucha
+                self.dispatch_pending()
+                while not self._stop.is_set():
+                    listos, _, _ = select.select([conexion], [], [], self.poll_interval)
+                    if listos:
+                        conexion.poll()
+                        conexion.notifies.clear()
+                    # Con o sin aviso se despacha: el sondeo cubre avisos perdidos
+                    self.dispatch_pending()
+            except Exception as e:
+                logger.error(f"Error en change feed, reintentando: {e}")
+                self._stop.wait(self.poll_interval)
+            finally:
+                if conexion is not None:
+                    try:
+                        conexion.close()
+                    except Exception:
+                        pass
+
+    def _escuchar(self):
+        """Abrir una conexión dedicada (fuera del pool) con LISTEN sobre cada origen"""
+        raw = get_engine().raw_connection()
+        raw.detach()
+        conexion = raw.driver_connection
+        conexion.autocommit = True
+        with conexion.cursor() as cursor:
+            for origen in self.origenes:
+                cursor.execute(f'LISTEN "{channel_for(origen)}"')
+        return conexion
+
+    def _inicializar_offsets_en_memoria(self) -> None:
+        """Los suscriptores no durables empiezan en el último cambio existente"""
+        no_durables = [s for s in self._suscriptores if not s.durable]
+        if not no_durables:
+            return
+        db = SessionLocal()
+        try:
+            for suscriptor in no_durables:
+                suscriptor.ultimo_id = db.execute(
+                    text(f"SELECT COALESCE(MAX(id), 0) FROM {suscriptor.origen}.outbox")
+                ).scalar()
+        except Exception as e:
+            logger.error(f"No se pudo leer el último id del outbox: {e}")
+        finally:
+            db.close()
+
+    def dispatch_pending(self) -> None:
+        """Entregar a cada suscriptor los cambios posteriores a su offset"""
+        for suscriptor in self._suscriptores:
+            db = SessionLocal()
+            try:
+                while self._despachar_lote(db, suscriptor) == self.batch_size:
+                    pass
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Suscriptor '{suscriptor.nombre}' falló, se reintentará: {e}")
+            finally:
+                db.close()
+
+    def _despachar_lote(self, db: Session, suscriptor: Suscriptor) -> int:
+        if suscriptor.durable:
+            ultimo_id = self._bloquear_offset(db, suscriptor)
+            if ultimo_id is None:
+                # Otro worker tiene el offset bloqueado y está procesando
+                db.rollback()
+                return 0
+        else:
+            ultimo_id = suscriptor.ultimo_id
+
+        cambios = self._leer_cambios(db, suscriptor.origen, ultimo_id)
+        for cambio in cambios:
+            if suscriptor.acepta(cambio):
+                suscriptor.manejador(cambio, db)
+
+        if cambios:
+            tamano_lotes.labels("change_feed").observe(len(cambios))
+            nuevo_offset = cambios[-1].id
+            if suscriptor.durable:
+                db.execute(text("""
+                    UPDATE outbox_offsets
+                    SET ultimo_id = :ultimo_id, actualizado_en = CURRENT_TIMESTAMP
+                    WHERE consumidor = :consumidor AND origen = :origen
+                """), {
+                    "ultimo_id": nuevo_offset,
+                    "consumidor": suscriptor.nombre,
+                    "origen": suscriptor.origen
+                })
+            else:
+                suscriptor.ultimo_id = nuevo_offset
+        db.commit()
+        return len(cambios)
+
+    def _bloquear_offset(self, db: Session, suscriptor: Suscriptor) -> Optional[int]:
+        params = {"consumidor": suscriptor.nombre, "origen": suscriptor.origen}
+        db.execute(text("""
+            INSERT INTO outbox_offsets (consumidor, origen, ultimo_id)
+            VALUES (:consumidor, :origen, 0)
+            ON CONFLICT (consumidor, origen) DO NOTHING
+        """), params)
+        return db.execute(text("""
+            SELECT ultimo_id FROM outbox_offsets
+            WHERE consumidor = :consumidor AND origen = :origen
+            FOR UPDATE SKIP LOCKED
+        """), params).scalar()
+
+    def _leer_cambios(self, db: Session, origen: str, ultimo_id: int) -> List[Cambio]:
+        filas = db.execute(text(f"""
+            SELECT id, agregado, agregado_id, operacion, datos, creado_en
+            FROM {origen}.outbox
+            WHERE id > :ultimo_id
+            ORDER BY id
+            LIMIT :lote
+        """), {"ultimo_id": ultimo_id, "lote": self.batch_size}).all()
+        return [
+            Cambio(
+                id=fila.id,
+                origen=origen,
+                agregado=fila.agregado,
+                agregado_id=fila.agregado_id,
+                operacion=fila.operacion,
+                datos=fila.datos or {},
+                creado_en=fila.creado_en
+            )
+            for fila in filas
+        ]
+
+
+dispatcher = ChangeFeedDispatcher(
+    poll_interval=settings.change_feed_poll_interval,
+    batch_size=settings.change_feed_batch_size
+)
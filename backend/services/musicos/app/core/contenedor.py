@@ -0,0 +1,34 @@
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+
+class Dependencia:
+    """
+    Componente de un servicio o repositorio que se construye con la sesión del
+    dueño (`self.db`) la primera vez que se usa.
+
+    Reemplaza `self.x = Clase(db)` en `__init__`: una solicitud solo construye los
+    repositorios que toca su ruta. Es un descriptor sin `__set__`: el componente
+    queda en el `__dict__` de la instancia y los accesos siguientes no pasan por
+    acá. Los componentes sin estado no usan Dependencia: son singletons del
+    proceso asignados como atributo de clase.
+
+        class MusicosService:
+            musicos_repo = Dependencia(MusicosRepository)
+    """
+
+    __slots__ = ("fabrica", "nombre")
+
+    def __init__(self, fabrica: Callable[[Session], Any]):
+        self.fabrica = fabrica
+        self.nombre = None
+
+    def __set_name__(self, dueno, nombre: str) -> None:
+        self.nombre = nombre
+
+    def __get__(self, instancia, dueno=None):
+        if instancia is None:
+            return self
+        componente = instancia.__dict__[self.nombre] = self.fabrica(instancia.db)
+        return componente
@@ -1,22 +1,94 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, declarative_base
-from app.core.config import settings
+from typing import Callable, List, Optional
 import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from app.core.config import get_settings
+from app.core.metricas import QueuePoolMedido, registrar_pool
 
 logger = logging.getLogger(__name__)
 
-# Crear engine con configuración para PostgreSQL
-engine = create_engine(
-    settings.get_database_url(),
-    pool_pre_ping=True,
-    echo=settings.debug,
-    connect_args={
-        "options": f"-csearch_path={settings.database_schema}"
-    }
-)
+_engine: Optional[Engine] = None
+_al_crear: List[Callable[[Engine], None]] = []
+_candado = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Engine del proceso. Se crea en el primer uso y no al importar: crear el engine
+    importa el driver de PostgreSQL y el dialecto, que no hacen falta hasta la
+    primera consulta (ni en los comandos que no tocan la base).
+    """
+    global _engine
+    if _engine is None:
+        with _candado:
+            if _engine is None:
+                _engine = _crear_engine()
+    return _engine
+
+
+def _crear_engine() -> Engine:
+    inicio = time.perf_counter()
+    settings = get_settings()
+    # Tamaño del pool de este worker (derivado del presupuesto global si hay varios)
+    pool_size, max_overflow = settings.pool_por_worker()
+
+    # Crear engine con configuración para PostgreSQL
+    engine = create_engine(
+        settings.get_database_url(),
+        pool_pre_ping=True,
+        echo=settings.debug,
+        connect_args={
+            "options": f"-csearch_path={settings.database_schema}"
+        },
+        poolclass=QueuePoolMedido,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout
+    )
+    registrar_pool(engine)
+    for instalar in _al_crear:
+        instalar(engine)
+    logger.info(f"Engine creado en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    return engine
+
+
+def al_crear_engine(instalar: Callable[[Engine], None]) -> None:
+    """Ejecutar `instalar(engine)` cuando se cree el engine, o ya si existe"""
+    with _candado:
+        if _engine is None:
+            _al_crear.append(instalar)
+            return
+    instalar(_engine)
+
+
+def cerrar_engine() -> None:
+    """Cerrar las conexiones del pool, si el engine llegó a crearse"""
+    if _engine is not None:
+        _engine.dispose()
+
+
+def __getattr__(nombre: str):
+    # Compatibilidad: `from app.core.database import engine` crea el engine al importarse
+    if nombre == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+class _Sesion(Session):
+    """Sesión que se liga al engine del proceso recién al ejecutar la primera sentencia"""
+
+    def get_bind(self, mapper=None, **kw):
+        if self.bind is None and kw.get("bind") is None:
+            self.bind = get_engine()
+        return super().get_bind(mapper, **kw)
+
 
 # Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=_Sesion, autocommit=False, autoflush=False)
 
 # Base declarativa para modelos
 Base = declarative_base()
@@ -36,10 +108,10 @@ def get_db():
 def test_connection():
     """Función para verificar la conexión a la base de datos"""
     try:
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             result = connection.execute(text("SELECT 1"))
             logger.info("Conexión a base de datos exitosa")
             return True
     except Exception as e:
         logger.error(f"Error conectando a base de datos: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,151 @@
+from typing import Iterable, Optional, Tuple
+import hashlib
+import logging
+import math
+import threading
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metricas import Contador, registro
+from app.models.musicos import Musico
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar_email(email: str) -> str:
+    """Forma canónica de un email para unicidad y búsquedas (igual que lower(email) en la base)"""
+    return email.strip().lower()
+
+
+consultas_filtro = registro.registrar(Contador(
+    "email_filter_lookups_total",
+    "Verificaciones de email disponible por resultado del filtro de Bloom",
+    ("resultado",)
+))
+
+
+class FiltroEmails:
+    """
+    Filtro de Bloom por worker con los emails (normalizados) de los músicos vivos.
+
+    Responde "seguro libre" sin consultar la base; "quizá registrado" se confirma
+    con `MusicosRepository.get_by_email`. La unicidad la garantiza el índice único
+    sobre lower(email): un bit perdido solo cuesta un 409 por IntegrityError.
+
+    Se reconstruye al iniciar el worker y se actualiza con las altas y cambios de
+    email locales y con los cambios `musico.*` del change feed. Un filtro de Bloom
+    no admite bajas: los emails de músicos eliminados siguen marcados (cuestan una
+    consulta) hasta la próxima reconstrucción.
+    """
+
+    def __init__(self, capacidad: int, tasa_falsos_positivos: float):
+        self.capacidad = capacidad
+        self.tasa_objetivo = tasa_falsos_positivos
+        self._lock = threading.Lock()
+        # (bits, m, k) en una sola referencia: las lecturas sin lock ven un filtro completo
+        self._filtro: Optional[Tuple[bytearray, int, int]] = None
+        self.elementos = 0
+        self.libres = 0
+        self.falsos_positivos = 0
+
+    # ==================== CONSULTA ====================
+
+    def puede_existir(self, email: str) -> bool:
+        """False solo si el email seguro no está registrado; True si hay que consultar"""
+        filtro = self._filtro
+        if filtro is None:
+            consultas_filtro.labels("sin_filtro").inc()
+            return True
+        bits, m, k = filtro
+        for posicion in self._posiciones(normalizar_email(email), m, k):
+            if not bits[posicion >> 3] & (1 << (posicion & 7)):
+                self.libres += 1
+                consultas_filtro.labels("libre").inc()
+                return False
+        return True
+
+    def confirmar(self, encontrado: bool) -> None:
+        """Registrar el resultado de la consulta hecha tras un `puede_existir` positivo"""
+        if self._filtro is None:
+            return
+        if encontrado:
+            consultas_filtro.labels("registrado").inc()
+        else:
+            self.falsos_positivos += 1
+            consultas_filtro.labels("falso_positivo").inc()
+
+    # ==================== ACTUALIZACIÓN ====================
+
+    def agregar(self, email: str) -> None:
+        """Marcar un email como registrado (altas y cambios de email)"""
+        with self._lock:
+            if self._filtro is None:
+                return
+            self._cargar(*self._filtro, [email])
+            self.elementos += 1
+
+    def reconstruir(self, db: Session) -> int:
+        """Cargar todos los emails de músicos vivos en un filtro nuevo y reemplazar el actual"""
+        total = db.query(func.count(Musico.id)).filter(Musico.eliminado_en.is_(None)).scalar()
+        # Margen para las altas hasta la próxima reconstrucción sin degradar la tasa
+        m, k = self._dimensionar(max(self.capacidad, 2 * total))
+        bits = bytearray((m + 7) // 8)
+        emails = db.query(Musico.email).filter(
+            Musico.eliminado_en.is_(None)
+        ).execution_options(yield_per=10_000)
+        cargados = self._cargar(bits, m, k, (email for email, in emails))
+        with self._lock:
+            self._filtro, self.elementos = (bits, m, k), cargados
+        logger.info(f"Filtro de emails reconstruido: {cargados} emails, {m // 8 / 2**20:.1f} MB, {k} hashes")
+        return cargados
+
+    def tasa_estimada(self) -> float:
+        """Tasa de falsos positivos esperada con los elementos cargados: (1 - e^(-kn/m))^k"""
+        if self._filtro is None:
+            return 0.0
+        _, m, k = self._filtro
+        return (1 - math.exp(-k * self.elementos / m)) ** k
+
+    def tasa_observada(self) -> float:
+        """Falsos positivos sobre las verificaciones de emails no registrados"""
+        negativos = self.libres + self.falsos_positivos
+        return self.falsos_positivos / negativos if negativos else 0.0
+
+    def _cargar(self, bits: bytearray, m: int, k: int, emails: Iterable[str]) -> int:
+        cargados = 0
+        for email in emails:
+            for posicion in self._posiciones(normalizar_email(email), m, k):
+                bits[posicion >> 3] |= 1 << (posicion & 7)
+            cargados += 1
+        return cargados
+
+    def _dimensionar(self, n: int):
+        m = max(64, math.ceil(-n * math.log(self.tasa_objetivo) / math.log(2) ** 2))
+        k = max(1, round(m / n * math.log(2)))
+        return m, k
+
+    @staticmethod
+    def _posiciones(email: str, m: int, k: int):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de un solo digest
+        digest = hashlib.blake2b(email.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % m for i in range(k)]
+
+
+filtro_emails = FiltroEmails(settings.filtro_emails_capacidad, settings.filtro_emails_tasa_fp)
+
+
+def _colector_filtro():
+    return [
+        ("email_filter_false_positive_ratio", "gauge",
+         "Falsos positivos observados del filtro de emails", [({}, filtro_emails.tasa_observada())]),
+        ("email_filter_expected_false_positive_ratio", "gauge",
+         "Tasa de falsos positivos esperada por el llenado del filtro", [({}, filtro_emails.tasa_estimada())]),
+        ("email_filter_elements", "gauge", "Emails cargados en el filtro", [({}, filtro_emails.elementos)]),
+    ]
+
+
+registro.colector(_colector_filtro)
@@ -0,0 +1,228 @@
+"""
+Altas idempotentes con el encabezado `Idempotency-Key`.
+
+La primera solicitud con una clave la reclama en la tabla `idempotencia` (fila
+sin respuesta), se procesa normalmente y al terminar guarda estado, encabezados
+y cuerpo de la respuesta. Un reintento con la misma clave recibe esa respuesta
+tal cual, sin pasar por validaciones ni lógica de negocio, con el encabezado
+`Idempotent-Replayed: true`.
+
+El reclamo es una transacción corta serializada por un advisory lock de la
+clave: dos duplicados concurrentes no chocan con la clave primaria y el segundo
+recibe 409 con `Retry-After` mientras el primero sigue en curso. Una clave
+reutilizada con otra solicitud (otra huella) recibe 422; la huella incluye el
+formato negociado, porque el cuerpo guardado ya está renderizado (JSON o MessagePack). Las respuestas 5xx y
+las excepciones liberan la clave para que el reintento vuelva a procesarse.
+Una clave reclamada que nunca guardó respuesta se libera sola tras ABANDONO.
+Las filas vencen a las `ttl` horas (`python -m app.commands.idempotencia`).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence, Tuple
+import hashlib
+import json
+import logging
+import re
+
+from sqlalchemy import and_, delete, func, not_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import get_engine
+from app.core.negociacion import formato_respuesta
+from app.models.idempotencia import RespuestaIdempotente
+
+logger = logging.getLogger(__name__)
+
+# Espacio de los advisory locks de dos enteros, separado del de un bigint que usa el outbox
+ESPACIO_LOCK = 4501
+LARGO_MAXIMO_CLAVE = 255
+# Una clave reclamada sin respuesta tras este tiempo se considera abandonada
+# (worker reiniciado o solicitud cancelada antes de liberarla)
+ABANDONO = timedelta(minutes=2)
+# Encabezados de la respuesta original que se repiten al reproducirla
+ENCABEZADOS_GUARDADOS = ("content-type", "location", "etag")
+
+NUEVA = "nueva"
+
+
+def huella(metodo: str, ruta: str, consulta: bytes, cuerpo: bytes, formato: str = "application/json") -> str:
+    """sha256 de lo que identifica a la solicitud y del formato de su respuesta"""
+    resumen = hashlib.sha256()
+    for parte in (metodo.encode(), ruta.encode(), consulta, cuerpo, formato.encode()):
+        resumen.update(len(parte).to_bytes(8, "big"))
+        resumen.update(parte)
+    return resumen.hexdigest()
+
+
+def reclamar(clave: str, huella_solicitud: str, ttl: timedelta) -> Tuple[str, Optional[RespuestaIdempotente]]:
+    """
+    (NUEVA, None) si la clave quedó reclamada por esta solicitud; si no, ("existente", fila).
+    Una fila vencida o abandonada se reemplaza como si no existiera.
+    """
+    tabla = RespuestaIdempotente.__table__
+    with get_engine().begin() as conn:
+        conn.execute(
+            text("SELECT pg_advisory_xact_lock(:espacio, hashtext(:clave))"),
+            {"espacio": ESPACIO_LOCK, "clave": clave}
+        )
+        fila = conn.execute(
+            select(tabla).where(
+                tabla.c.clave == clave,
+                tabla.c.expira_en > func.now(),
+                not_(and_(tabla.c.estado_http.is_(None), tabla.c.creado_en < func.now() - ABANDONO))
+            )
+        ).first()
+        if fila is not None:
+            return "existente", fila
+        valores = {
+            "huella": huella_solicitud,
+            "estado_http": None,
+            "encabezados": {},
+            "cuerpo": None,
+            "creado_en": func.now(),
+            "expira_en": datetime.now(timezone.utc) + ttl,
+        }
+        conn.execute(
+            insert(tabla).values(clave=clave, **valores).on_conflict_do_update(
+                index_elements=[tabla.c.clave], set_=valores
+            )
+        )
+    return NUEVA, None
+
+
+def guardar(clave: str, estado_http: int, encabezados: dict, cuerpo: bytes) -> None:
+    tabla = RespuestaIdempotente.__table__
+    with get_engine().begin() as conn:
+        conn.execute(
+            update(tabla).where(tabla.c.clave == clave).values(
+                estado_http=estado_http, encabezados=encabezados, cuerpo=cuerpo
+            )
+        )
+
+
+def liberar(clave: str) -> None:
+    """Borrar una clave reclamada sin respuesta guardada"""
+    tabla = RespuestaIdempotente.__table__
+    with get_engine().begin() as conn:
+        conn.execute(delete(tabla).where(tabla.c.clave == clave, tabla.c.estado_http.is_(None)))
+
+
+def purgar_vencidas(lote: int = 1000) -> int:
+    """Borrar hasta `lote` respuestas vencidas; devuelve cuántas se borraron"""
+    tabla = RespuestaIdempotente.__table__
+    vencidas = select(tabla.c.clave).where(tabla.c.expira_en <= func.now()).limit(lote).scalar_subquery()
+    with get_engine().begin() as conn:
+        return conn.execute(delete(tabla).where(tabla.c.clave.in_(vencidas))).rowcount
+
+
+class IdempotenciaMiddleware:
+    """Middleware ASGI de `Idempotency-Key` para los POST de `rutas` (ver el docstring del módulo)"""
+
+    def __init__(self, app, rutas: Sequence[str], ttl_horas: float = 24.0):
+        self.app = app
+        self._rutas = re.compile("|".join(rutas))
+        self.ttl = timedelta(hours=ttl_horas)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not self._rutas.search(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        clave = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"idempotency-key"), None)
+        if clave is None:
+            await self.app(scope, receive, send)
+            return
+        clave = clave.strip()
+        if not clave or len(clave) > LARGO_MAXIMO_CLAVE:
+            await _responder(send, 400, {"detail": f"Idempotency-Key debe tener entre 1 y {LARGO_MAXIMO_CLAVE} caracteres"})
+            return
+
+        cuerpo = await _leer_cuerpo(receive)
+        huella_solicitud = huella(
+            scope["method"], scope["path"], scope.get("query_string", b""), cuerpo, formato_respuesta()
+        )
+        resultado, fila = await run_in_threadpool(reclamar, clave, huella_solicitud, self.ttl)
+
+        if resultado != NUEVA:
+            if fila.huella != huella_solicitud:
+                await _responder(send, 422, {"detail": "Idempotency-Key ya usada con otra solicitud"})
+            elif fila.estado_http is None:
+                await _responder(send, 409, {"detail": "La solicitud original con esta Idempotency-Key sigue en curso"},
+                                 [(b"retry-after", b"1")])
+            else:
+                await _reproducir(send, fila)
+            return
+
+        await self._procesar(scope, receive, send, clave, cuerpo)
+
+    async def _procesar(self, scope, receive, send, clave: str, cuerpo: bytes) -> None:
+        entregado = False
+
+        async def receive_con_cuerpo():
+            nonlocal entregado
+            if not entregado:
+                entregado = True
+                return {"type": "http.request", "body": cuerpo, "more_body": False}
+            return await receive()
+
+        respuesta = {"estado": 500, "encabezados": {}, "cuerpo": []}
+
+        async def send_guardando(message):
+            if message["type"] == "http.response.start":
+                respuesta["estado"] = message["status"]
+                respuesta["encabezados"] = {
+                    k.decode("latin-1"): v.decode("latin-1")
+                    for k, v in message.get("headers", []) if k.decode("latin-1").lower() in ENCABEZADOS_GUARDADOS
+                }
+            elif message["type"] == "http.response.body":
+                respuesta["cuerpo"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_con_cuerpo, send_guardando)
+        except Exception:
+            await run_in_threadpool(liberar, clave)
+            raise
+        if respuesta["estado"] >= 500:
+            await run_in_threadpool(liberar, clave)
+            return
+        try:
+            await run_in_threadpool(
+                guardar, clave, respuesta["estado"], respuesta["encabezados"], b"".join(respuesta["cuerpo"])
+            )
+        except Exception as e:
+            # La respuesta ya salió; sin guardarla, el reintento recibirá 409 hasta que la clave venza
+            logger.error(f"No se pudo guardar la respuesta de la Idempotency-Key {clave}: {e}")
+
+
+async def _leer_cuerpo(receive) -> bytes:
+    partes = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        partes.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(partes)
+
+
+async def _responder(send, estado: int, contenido: dict, encabezados=()) -> None:
+    cuerpo = json.dumps(contenido).encode()
+    await send({
+        "type": "http.response.start",
+        "status": estado,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(cuerpo)).encode()),
+                    *encabezados],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
+
+
+async def _reproducir(send, fila) -> None:
+    cuerpo = bytes(fila.cuerpo or b"")
+    encabezados = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in fila.encabezados.items()]
+    await send({
+        "type": "http.response.start",
+        "status": fila.estado_http,
+        "headers": encabezados + [(b"content-length", str(len(cuerpo)).encode()), (b"idempotent-replayed", b"true")],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
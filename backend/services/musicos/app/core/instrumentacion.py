@@ -0,0 +1,182 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_PARAMETRO = re.compile(r"%\(\w+\)s|%s|\?|:\w+|\$\d+")
+_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def forma_sentencia(sql: str) -> str:
+    """Forma normalizada de una sentencia: sin parámetros, literales ni listas IN expandidas"""
+    forma = _PARAMETRO.sub("?", sql)
+    forma = _LITERAL.sub("?", forma)
+    forma = _LISTA.sub("(?...)", forma)
+    return _ESPACIOS.sub(" ", forma).strip()
+
+
+@dataclass
+class EstadisticasSQL:
+    """Sentencias ejecutadas durante una solicitud (o un bloque medido)"""
+    ruta: str = ""
+    sentencias: int = 0
+    tiempo_db_ms: float = 0.0
+    formas: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def registrar(self, sql: str, duracion_ms: float) -> None:
+        forma = forma_sentencia(sql)
+        with self._lock:
+            self.sentencias += 1
+            self.tiempo_db_ms += duracion_ms
+            self.formas[forma] += 1
+
+    def repetidas(self, umbral: int) -> List[Tuple[str, int]]:
+        """Formas ejecutadas más de `umbral` veces (candidatas a N+1)"""
+        return [(forma, veces) for forma, veces in self.formas.most_common() if veces > umbral]
+
+
+_actual: ContextVar[Optional[EstadisticasSQL]] = ContextVar("estadisticas_sql", default=None)
+_observadores: List[Callable[[EstadisticasSQL], None]] = []
+_observadores_lock = threading.Lock()
+# Reciben (sql, parámetros, duración en segundos) de cada sentencia, haya o no solicitud medida
+_oyentes_sentencia: List[Callable[[str, Any, float], None]] = []
+
+
+def estadisticas_actuales() -> Optional[EstadisticasSQL]:
+    return _actual.get()
+
+
+def al_ejecutar(oyente: Callable[[str, Any, float], None]) -> None:
+    """Registrar una función que recibe sql, parámetros y duración (segundos) de cada sentencia"""
+    if oyente not in _oyentes_sentencia:
+        _oyentes_sentencia.append(oyente)
+
+
+def instalar(engine: Engine) -> None:
+    """Registrar los eventos de SQLAlchemy que alimentan las estadísticas por solicitud"""
+    if event.contains(engine, "before_cursor_execute", _antes):
+        return
+    event.listen(engine, "before_cursor_execute", _antes)
+    event.listen(engine, "after_cursor_execute", _despues)
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("inicio_consulta")
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    for oyente in _oyentes_sentencia:
+        oyente(statement, parameters, duracion)
+    estadisticas = _actual.get()
+    if estadisticas is not None:
+        estadisticas.registrar(statement, duracion * 1000)
+
+
+class InstrumentacionSQLMiddleware:
+    """
+    Middleware ASGI que mide las sentencias SQL de cada solicitud.
+
+    Agrega `Server-Timing` (tiempo de base de datos, número de consultas y
+    duración total) y registra un warning cuando una misma forma de sentencia
+    se repite más de `umbral_repeticiones` veces: el patrón típico de un N+1.
+    """
+
+    def __init__(self, app, umbral_repeticiones: int = 10, server_timing: bool = True):
+        self.app = app
+        self.umbral_repeticiones = umbral_repeticiones
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estadisticas = EstadisticasSQL(ruta=f"{scope['method']} {scope['path']}")
+        token = _actual.set(estadisticas)
+        inicio = time.perf_counter()
+
+        async def send_con_timing(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                total_ms = (time.perf_counter() - inicio) * 1000
+                valor = (
+                    f'db;dur={estadisticas.tiempo_db_ms:.1f};desc="{estadisticas.sentencias} consultas", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", valor.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_timing)
+        finally:
+            _actual.reset(token)
+            self._reportar(estadisticas)
+
+    def _reportar(self, estadisticas: EstadisticasSQL) -> None:
+        for forma, veces in estadisticas.repetidas(self.umbral_repeticiones):
+            logger.warning(
+                f"Posible N+1 en {estadisticas.ruta}: {veces} ejecuciones de la misma sentencia: {forma[:300]}"
+            )
+        logger.debug(
+            f"{estadisticas.ruta}: {estadisticas.sentencias} consultas, {estadisticas.tiempo_db_ms:.1f} ms en DB"
+        )
+        with _observadores_lock:
+            observadores = list(_observadores)
+        for observador in observadores:
+            observador(estadisticas)
+
+
+@contextmanager
+def presupuesto_consultas(
+    max_sentencias: int, max_repeticiones: Optional[int] = None
+) -> Iterator[List[EstadisticasSQL]]:
+    """
+    Fijar un presupuesto de consultas para pruebas.
+
+    Mide las llamadas directas dentro del bloque y cada solicitud completada por
+    el middleware mientras está activo (por ejemplo con TestClient); al salir
+    lanza AssertionError si alguna supera `max_sentencias` o repite una forma
+    de sentencia más de `max_repeticiones` veces.
+
+        with presupuesto_consultas(3):
+            client.get("/api/v1/musicos/")
+    """
+    medidas: List[EstadisticasSQL] = []
+    directas = EstadisticasSQL(ruta="bloque")
+    token = _actual.set(directas)
+    with _observadores_lock:
+        _observadores.append(medidas.append)
+    try:
+        yield medidas
+    finally:
+        _actual.reset(token)
+        with _observadores_lock:
+            _observadores.remove(medidas.append)
+
+    errores = []
+    for estadisticas in [directas] + medidas:
+        if estadisticas.sentencias > max_sentencias:
+            errores.append(f"{estadisticas.ruta}: {estadisticas.sentencias} consultas (máximo {max_sentencias})")
+        if max_repeticiones is not None:
+            for forma, veces in estadisticas.repetidas(max_repeticiones):
+                errores.append(f"{estadisticas.ruta}: {veces} repeticiones de {forma[:200]}")
+    if errores:
+        raise AssertionError("Presupuesto de consultas excedido:\n" + "\n".join(errores))
@@ -0,0 +1,360 @@
+"""
+Métricas en formato de texto de Prometheus, sin dependencias externas.
+
+Los contadores e histogramas se fragmentan por hilo: cada hilo escribe solo en
+su propio fragmento (sin locks en el camino caliente) y la exposición suma los
+fragmentos al momento del scrape. Los valores que ya existen en otros objetos
+(pool de conexiones, cachés) se leen con colectores registrados.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import inspect
+import threading
+import time
+
+from sqlalchemy.pool import QueuePool
+
+from app.core import instrumentacion
+
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_TAMANO = (1, 5, 10, 25, 50, 100, 200, 500, 1000)
+
+Muestra = Tuple[str, Dict[str, str], float]
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_etiquetas(etiquetas: Dict[str, str]) -> str:
+    if not etiquetas:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in etiquetas.items()) + "}"
+
+
+def _formatear_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+class _Fragmentos:
+    """Vector de valores con un fragmento por hilo"""
+
+    def __init__(self, tamano: int):
+        self._tamano = tamano
+        self._local = threading.local()
+        self._todos: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def propio(self) -> List[float]:
+        try:
+            return self._local.valores
+        except AttributeError:
+            valores = [0.0] * self._tamano
+            with self._lock:
+                self._todos.append(valores)
+            self._local.valores = valores
+            return valores
+
+    def sumar(self) -> List[float]:
+        with self._lock:
+            fragmentos = list(self._todos)
+        total = [0.0] * self._tamano
+        for valores in fragmentos:
+            for i, valor in enumerate(valores):
+                total[i] += valor
+        return total
+
+
+class _HijoContador:
+    def __init__(self):
+        self._f = _Fragmentos(1)
+
+    def inc(self, valor: float = 1.0) -> None:
+        self._f.propio()[0] += valor
+
+    def dec(self, valor: float = 1.0) -> None:
+        self._f.propio()[0] -= valor
+
+    def valor(self) -> float:
+        return self._f.sumar()[0]
+
+
+class _HijoHistograma:
+    def __init__(self, limites: Sequence[float]):
+        self._limites = limites
+        # cubetas (incluida +Inf), suma, cantidad
+        self._f = _Fragmentos(len(limites) + 3)
+
+    def observe(self, valor: float) -> None:
+        valores = self._f.propio()
+        valores[bisect_left(self._limites, valor)] += 1
+        valores[-2] += valor
+        valores[-1] += 1
+
+    def muestras(self, nombre: str, etiquetas: Dict[str, str]) -> Iterable[Muestra]:
+        valores = self._f.sumar()
+        acumulado = 0.0
+        for i, limite in enumerate(list(self._limites) + [float("inf")]):
+            acumulado += valores[i]
+            yield f"{nombre}_bucket", {**etiquetas, "le": _formatear_numero(limite)}, acumulado
+        yield f"{nombre}_sum", etiquetas, valores[-2]
+        yield f"{nombre}_count", etiquetas, valores[-1]
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._hijos: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *valores: str):
+        hijo = self._hijos.get(valores)
+        if hijo is None:
+            if len(valores) != len(self.etiquetas):
+                raise ValueError(f"{self.nombre} espera etiquetas {self.etiquetas}")
+            with self._lock:
+                hijo = self._hijos.setdefault(valores, self._nuevo_hijo())
+        return hijo
+
+    def _nuevo_hijo(self):
+        raise NotImplementedError
+
+    def muestras(self) -> Iterable[Muestra]:
+        for valores, hijo in list(self._hijos.items()):
+            etiquetas = dict(zip(self.etiquetas, valores))
+            yield from self._muestras_hijo(hijo, etiquetas)
+
+    def _muestras_hijo(self, hijo, etiquetas: Dict[str, str]) -> Iterable[Muestra]:
+        yield self.nombre, etiquetas, hijo.valor()
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def _nuevo_hijo(self):
+        return _HijoContador()
+
+    def inc(self, valor: float = 1.0) -> None:
+        self.labels().inc(valor)
+
+
+class Medidor(_Metrica):
+    """Gauge acumulativo (inc/dec); para valores leídos al momento usar un colector"""
+    tipo = "gauge"
+
+    def _nuevo_hijo(self):
+        return _HijoContador()
+
+    def inc(self, valor: float = 1.0) -> None:
+        self.labels().inc(valor)
+
+    def dec(self, valor: float = 1.0) -> None:
+        self.labels().dec(valor)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 limites: Sequence[float] = LIMITES_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(sorted(limites))
+
+    def _nuevo_hijo(self):
+        return _HijoHistograma(self.limites)
+
+    def observe(self, valor: float) -> None:
+        self.labels().observe(valor)
+
+    def _muestras_hijo(self, hijo, etiquetas: Dict[str, str]) -> Iterable[Muestra]:
+        return hijo.muestras(self.nombre, etiquetas)
+
+
+class Registro:
+    """Conjunto de métricas y colectores expuestos en /metrics"""
+
+    def __init__(self):
+        self._metricas: List[_Metrica] = []
+        # Colector: () -> [(nombre, tipo, ayuda, [(etiquetas, valor)])]
+        self._colectores: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        self._metricas.append(metrica)
+        return metrica
+
+    def colector(self, funcion: Callable) -> None:
+        self._colectores.append(funcion)
+
+    def exponer(self) -> str:
+        lineas: List[str] = []
+        for metrica in self._metricas:
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            for nombre, etiquetas, valor in metrica.muestras():
+                lineas.append(f"{nombre}{_formatear_etiquetas(etiquetas)} {_formatear_numero(valor)}")
+        for colector in self._colectores:
+            for nombre, tipo, ayuda, muestras in colector():
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+                for etiquetas, valor in muestras:
+                    lineas.append(f"{nombre}{_formatear_etiquetas(etiquetas)} {_formatear_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
+
+latencia_solicitudes = registro.registrar(Histograma(
+    "http_request_duration_seconds", "Latencia de solicitudes HTTP por ruta", ("metodo", "ruta")
+))
+solicitudes_en_curso = registro.registrar(Medidor(
+    "http_requests_in_flight", "Solicitudes HTTP en curso"
+))
+latencia_sentencias = registro.registrar(Histograma(
+    "db_statement_duration_seconds", "Latencia de sentencias SQL por método de repositorio", ("origen",)
+))
+espera_pool = registro.registrar(Histograma(
+    "db_pool_checkout_wait_seconds", "Espera para obtener una conexión del pool"
+))
+tamano_lotes = registro.registrar(Histograma(
+    "bulk_operation_size", "Elementos por operación en lote", ("operacion",), limites=LIMITES_TAMANO
+))
+
+
+# ==================== SENTENCIAS POR REPOSITORIO ====================
+
+_origen: ContextVar[str] = ContextVar("origen_sql", default="otro")
+
+
+def medir_repositorio(cls):
+    """
+    Decorador de clase: las sentencias emitidas dentro de los métodos públicos
+    se etiquetan con `Clase.metodo` en db_statement_duration_seconds.
+    """
+    for nombre, atributo in list(vars(cls).items()):
+        if nombre.startswith("_") or not inspect.isfunction(atributo) or getattr(atributo, "_medido", False):
+            continue
+        setattr(cls, nombre, _con_origen(atributo))
+    return cls
+
+
+def _con_origen(metodo):
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        token = _origen.set(f"{type(self).__name__}.{metodo.__name__}")
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            _origen.reset(token)
+    envoltura._medido = True
+    return envoltura
+
+
+def origen_actual() -> str:
+    """Método de repositorio que está ejecutando sentencias (`otro` fuera de uno)"""
+    return _origen.get()
+
+
+def _observar_sentencia(sql: str, parametros, duracion: float) -> None:
+    latencia_sentencias.labels(_origen.get()).observe(duracion)
+
+
+# ==================== POOL Y CACHÉS ====================
+
+class QueuePoolMedido(QueuePool):
+    """QueuePool que mide la espera de cada checkout"""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            espera_pool.observe(time.perf_counter() - inicio)
+
+
+def registrar_pool(engine) -> None:
+    """Exponer el estado del pool del engine en cada scrape"""
+    instrumentacion.instalar(engine)
+    instrumentacion.al_ejecutar(_observar_sentencia)
+
+    def colector():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return []
+        return [
+            ("db_pool_size", "gauge", "Conexiones persistentes del pool", [({}, pool.size())]),
+            ("db_pool_checked_out", "gauge", "Conexiones en uso", [({}, pool.checkedout())]),
+            ("db_pool_overflow", "gauge", "Conexiones por encima del tamaño del pool", [({}, max(pool.overflow(), 0))]),
+        ]
+    registro.colector(colector)
+
+
+_caches: Dict[str, object] = {}
+
+
+def registrar_cache(nombre: str, cache) -> None:
+    """Exponer aciertos y fallos de una caché con atributos `hits` y `misses`"""
+    if not _caches:
+        registro.colector(_colector_caches)
+    _caches[nombre] = cache
+
+
+def _colector_caches():
+    hits = [({"cache": nombre}, cache.hits) for nombre, cache in _caches.items()]
+    misses = [({"cache": nombre}, cache.misses) for nombre, cache in _caches.items()]
+    ratio = [
+        ({"cache": nombre}, cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else 0.0)
+        for nombre, cache in _caches.items()
+    ]
+    return [
+        ("cache_hits_total", "counter", "Aciertos de caché", hits),
+        ("cache_misses_total", "counter", "Fallos de caché", misses),
+        ("cache_hit_ratio", "gauge", "Proporción de aciertos de caché", ratio),
+    ]
+
+
+# ==================== MIDDLEWARE ====================
+
+class MetricasMiddleware:
+    """Middleware ASGI: solicitudes en curso y latencia por plantilla de ruta"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        en_curso = solicitudes_en_curso.labels()
+        en_curso.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            en_curso.dec()
+            # El router deja la ruta resuelta en el scope; la plantilla evita una serie por ID
+            ruta = scope.get("route")
+            latencia_solicitudes.labels(
+                scope["method"], getattr(ruta, "path", "sin_ruta")
+            ).observe(time.perf_counter() - inicio)
+
+
+def estado_pool(engine) -> Optional[Dict[str, int]]:
+    """Uso del pool y conexiones disponibles antes de agotarlo"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    en_uso = pool.checkedout()
+    if pool._max_overflow < 0:
+        # Overflow ilimitado: el pool nunca se agota
+        return {"en_uso": en_uso, "capacidad": -1, "disponibles": -1}
+    capacidad = pool.size() + pool._max_overflow
+    return {"en_uso": en_uso, "capacidad": capacidad, "disponibles": capacidad - en_uso}
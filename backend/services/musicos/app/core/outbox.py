@@ -0,0 +1,142 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Optional
+from uuid import UUID
+import logging
+import re
+
+from sqlalchemy import delete, inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_engine
+from app.models.outbox import OutboxEvento
+
+logger = logging.getLogger(__name__)
+
+
+def channel_for(schema: str) -> str:
+    """Canal LISTEN/NOTIFY asociado al outbox de un esquema"""
+    return f"{schema}_cambios"
+
+
+def _to_json(value: Any) -> Any:
+    """Convertir valores de columna a tipos serializables en JSONB"""
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def snapshot(obj: Any) -> dict:
+    """Columnas ya cargadas de una entidad, sin disparar consultas adicionales"""
+    state = inspect(obj)
+    loaded = state.dict
+    return {
+        attr.key: _to_json(loaded[attr.key])
+        for attr in state.mapper.column_attrs
+        if attr.key in loaded
+    }
+
+
+def record_change(
+    db: Session,
+    agregado: str,
+    operacion: str,
+    obj: Any = None,
+    agregado_id: Optional[Any] = None,
+    datos: Optional[dict] = None
+) -> None:
+    """
+    Registrar un cambio en el outbox dentro de la transacción actual.
+
+    No hace commit: la fila se confirma (o se descarta) junto con el cambio de
+    negocio. El advisory lock serializa las escrituras al outbox hasta el commit,
+    de modo que los ids se asignan en orden de confirmación y los consumidores
+    pueden avanzar su offset sin saltarse filas.
+
+    Es un solo lock por esquema: toda transacción que escribe en el servicio
+    espera, desde su record_change hasta el commit, a la que lo tomó antes. Las
+    escrituras del esquema no se confirman en paralelo; conviene llamarlo al
+    final de la transacción, después de los demás bloqueos.
+    """
+    if not settings.outbox_enabled:
+        return
+
+    if datos is None:
+        datos = snapshot(obj) if obj is not None else {}
+    if agregado_id is None:
+        agregado_id = datos.get("id")
+
+    canal = channel_for(settings.database_schema)
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:canal))"), {"canal": canal})
+    db.add(OutboxEvento(
+        agregado=agregado,
+        agregado_id=str(agregado_id),
+        operacion=operacion,
+        datos=datos
+    ))
+    db.flush()
+    # NOTIFY solo se entrega al hacer commit; Postgres deduplica avisos idénticos
+    db.execute(text("SELECT pg_notify(:canal, '')"), {"canal": canal})
+    logger.debug(f"Cambio registrado en outbox: {agregado}.{operacion} {agregado_id}")
+
+
+_IDENTIFICADOR = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def _offsets_durables(origen: str) -> list:
+    """
+    (esquema, consumidor, ultimo_id) de los consumidores durables del outbox de
+    `origen`, en todos los esquemas con tabla outbox_offsets. pg_catalog lista
+    las tablas aunque el rol no pueda leerlas: sin permiso la consulta falla en
+    vez de ignorar a un consumidor.
+    """
+    with get_engine().connect() as conn:
+        esquemas = conn.execute(text("""
+            SELECT n.nspname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relname = 'outbox_offsets' AND c.relkind IN ('r', 'p')
+            ORDER BY n.nspname
+        """)).scalars().all()
+        offsets = []
+        for esquema in esquemas:
+            if not _IDENTIFICADOR.match(esquema):
+                raise ValueError(f"Esquema inválido: {esquema}")
+            offsets.extend(
+                (esquema, fila.consumidor, fila.ultimo_id) for fila in conn.execute(text(f"""
+                    SELECT consumidor, ultimo_id FROM {esquema}.outbox_offsets WHERE origen = :origen
+                """), {"origen": origen})
+            )
+        return offsets
+
+
+def purgar_procesados(retencion: timedelta, lote: int = 1000) -> int:
+    """
+    Borrar del outbox del servicio las filas que ya procesaron todos los
+    consumidores durables (id <= MIN(ultimo_id)) y que tienen más de `retencion`.
+
+    La retención cubre a los consumidores no durables, que llevan el offset en
+    memoria, y a los durables que aún no registraron su offset. Un offset de un
+    consumidor que ya no existe detiene la purga: hay que borrar su fila de
+    outbox_offsets. Borra en lotes de `lote` filas, una transacción por lote.
+    """
+    offsets = _offsets_durables(settings.database_schema)
+    tabla = OutboxEvento.__table__
+    condiciones = [tabla.c.creado_en < datetime.now(timezone.utc) - retencion]
+    if offsets:
+        esquema, consumidor, limite = min(offsets, key=lambda offset: offset[2])
+        logger.info(
+            f"Outbox procesado hasta el id {limite} por todos los consumidores "
+            f"(el más atrasado: {esquema}.{consumidor})"
+        )
+        condiciones.append(tabla.c.id <= limite)
+
+    total = 0
+    while True:
+        procesadas = select(tabla.c.id).where(*condiciones).order_by(tabla.c.id).limit(lote).scalar_subquery()
+        with get_engine().begin() as conn:
+            borradas = conn.execute(delete(tabla).where(tabla.c.id.in_(procesadas))).rowcount
+        total += borradas
+        if borradas < lote:
+            return total
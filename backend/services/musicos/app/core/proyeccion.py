@@ -0,0 +1,89 @@
+"""
+Proyección de campos en listados y detalles: parámetros `fields` y `expand`.
+
+`fields` elige las columnas y relaciones de la respuesta (`id` y `version`
+siempre se incluyen) y `expand` agrega relaciones anidadas. Sin ninguno de los
+dos la respuesta tiene la forma completa documentada en OpenAPI; con alguno, la
+consulta carga solo esas columnas (`load_only`) y solo las relaciones pedidas, y
+la ruta responde un JSON con esos campos sin pasar por su response_model.
+
+    GET /musicos?fields=nombre,email&expand=estado
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+from app.core.negociacion import RespuestaNegociada
+
+# Campos de toda respuesta proyectada: identidad y versión para If-Match
+SIEMPRE = ("id", "version")
+
+
+@dataclass(frozen=True)
+class Proyeccion:
+    campos: Tuple[str, ...]
+    relaciones: FrozenSet[str]
+    # Sin fields ni expand: forma completa del response_model
+    completa: bool = False
+
+    def opciones(self, modelo, cargadores: Dict[str, object], columnas_extra: Sequence[str] = ()) -> list:
+        """Opciones de carga: las columnas pedidas (más `columnas_extra`) y los cargadores de las relaciones pedidas"""
+        opciones = [cargador for relacion, cargador in cargadores.items() if relacion in self.relaciones]
+        if not self.completa:
+            columnas = dict.fromkeys((*self.campos, *columnas_extra))
+            opciones.append(load_only(*(getattr(modelo, columna) for columna in columnas)))
+        return opciones
+
+    def recortar(self, objeto, relaciones: Dict[str, Callable]) -> dict:
+        """Diccionario con los campos pedidos de `objeto`; cada relación se convierte con su función"""
+        datos = {campo: getattr(objeto, campo) for campo in self.campos}
+        for relacion, convertir in relaciones.items():
+            if relacion in self.relaciones:
+                datos[relacion] = convertir(objeto)
+        return datos
+
+
+def proyeccion(esquema: Type[BaseModel], relaciones: Sequence[str]) -> Callable[..., Proyeccion]:
+    """Dependencia de FastAPI que lee `fields` y `expand` para respuestas con la forma de `esquema`"""
+    escalares = tuple(campo for campo in esquema.model_fields if campo not in relaciones)
+    disponibles = (*escalares, *relaciones)
+    completa = Proyeccion(escalares, frozenset(relaciones), completa=True)
+
+    def dependencia(
+        fields: Optional[str] = Query(
+            None, description=f"Campos de la respuesta separados por coma (id y version siempre): {', '.join(disponibles)}"
+        ),
+        expand: Optional[str] = Query(
+            None, description=f"Relaciones a incluir separadas por coma: {', '.join(relaciones)}"
+        ),
+    ) -> Proyeccion:
+        if fields is None and expand is None:
+            return completa
+        pedidos = set(_nombres(fields, disponibles, "fields")) if fields is not None else set(escalares)
+        pedidos.update(_nombres(expand, relaciones, "expand"))
+        return Proyeccion(
+            campos=tuple(campo for campo in escalares if campo in pedidos or campo in SIEMPRE),
+            relaciones=frozenset(relacion for relacion in relaciones if relacion in pedidos),
+        )
+
+    return dependencia
+
+
+def _nombres(valor: Optional[str], disponibles: Sequence[str], parametro: str) -> Tuple[str, ...]:
+    nombres = tuple(nombre.strip() for nombre in (valor or "").split(",") if nombre.strip())
+    desconocidos = [nombre for nombre in nombres if nombre not in disponibles]
+    if desconocidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{parametro} desconocidos: {', '.join(desconocidos)}. Disponibles: {', '.join(disponibles)}"
+        )
+    return nombres
+
+
+def responder(contenido, encabezados: Optional[Dict[str, str]] = None) -> RespuestaNegociada:
+    """Respuesta proyectada: no se valida contra el response_model de la ruta"""
+    return RespuestaNegociada(jsonable_encoder(contenido), headers=encabezados)
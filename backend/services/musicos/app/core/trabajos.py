@@ -0,0 +1,399 @@
+"""
+Trabajos en segundo plano: cola en la tabla `trabajos` consumida por un pool de
+tareas asyncio dentro de cada worker.
+
+`encolar(db, tipo, datos)` agrega el trabajo en la transacción del llamador, como
+el outbox: solo se ejecuta si la escritura que lo originó se confirma, y el
+commit despierta al pool del mismo proceso (los demás lo ven en su próximo
+sondeo). Con `clave`, un trabajo pendiente con la misma clave absorbe al nuevo
+(un solo recálculo pendiente por evento, por ejemplo).
+
+Cada tarea del pool toma el trabajo vencido más antiguo con
+`FOR UPDATE SKIP LOCKED`, lo marca en curso por `visibilidad` segundos y ejecuta
+su manejador en el threadpool con una sesión propia. El manejador corre en la
+misma transacción que borra la fila del trabajo: sus efectos y el borrado se
+confirman juntos, y mientras tanto el bloqueo oculta el trabajo a los demás
+workers. Si el manejador falla, el trabajo vuelve a la cola con backoff
+exponencial hasta `max_intentos` y después queda `fallido` para revisarlo en
+/api/v1/admin/trabajos. Si el proceso muere, el trabajo se vuelve a tomar
+cuando vence su visibilidad.
+
+Los manejadores reciben `(datos, db)` y no deben confirmar por su cuenta salvo
+que su trabajo sea idempotente: un commit propio también confirma el borrado
+del trabajo.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import random
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metricas import Contador, Histograma, registro
+
+logger = logging.getLogger(__name__)
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+FALLIDO = "fallido"
+
+# Marca en Session.info: la transacción encoló trabajos y su commit debe despertar al pool
+_ENCOLADOS = "trabajos_encolados"
+
+trabajos_procesados = registro.registrar(Contador(
+    "jobs_processed_total", "Trabajos en segundo plano terminados por tipo y resultado", ("tipo", "resultado")
+))
+duracion_trabajos = registro.registrar(Histograma(
+    "job_duration_seconds", "Duración de los trabajos en segundo plano", ("tipo",)
+))
+
+
+@dataclass(frozen=True)
+class Trabajo:
+    """Trabajo tomado de la cola por un worker"""
+    id: int
+    tipo: str
+    datos: dict
+    intentos: int
+    max_intentos: int
+    creado_en: Optional[datetime]
+
+
+@dataclass(frozen=True)
+class _Tipo:
+    manejador: Callable[[dict, Session], None]
+    max_intentos: int
+
+
+def encolar(
+    db: Session,
+    tipo: str,
+    datos: Optional[dict] = None,
+    clave: Optional[str] = None,
+    retraso: float = 0.0,
+    max_intentos: Optional[int] = None
+) -> Optional[int]:
+    """
+    Agregar un trabajo dentro de la transacción actual (no hace commit).
+    Devuelve su id, o None si ya había uno pendiente con la misma `clave`.
+    """
+    trabajo_id = db.execute(text("""
+        INSERT INTO trabajos (tipo, datos, clave, max_intentos, disponible_en)
+        VALUES (:tipo, CAST(:datos AS jsonb), :clave, :max_intentos,
+                CURRENT_TIMESTAMP + make_interval(secs => :retraso))
+        ON CONFLICT (clave) WHERE estado = 'pendiente' DO NOTHING
+        RETURNING id
+    """), {
+        "tipo": tipo,
+        # UUID y fechas como texto, igual que en el outbox
+        "datos": json.dumps(datos or {}, default=str),
+        "clave": clave,
+        "max_intentos": max_intentos or runner.max_intentos(tipo),
+        "retraso": retraso,
+    }).scalar()
+    db.info[_ENCOLADOS] = True
+    return trabajo_id
+
+
+@event.listens_for(Session, "after_commit")
+def _avisar_encolados(db: Session) -> None:
+    if db.info.pop(_ENCOLADOS, False):
+        runner.avisar()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_encolados(db: Session) -> None:
+    db.info.pop(_ENCOLADOS, None)
+
+
+def estadisticas(db: Session) -> Dict[str, float]:
+    """Trabajos por estado y atraso del pendiente vencido más antiguo, en segundos"""
+    fila = db.execute(text("""
+        SELECT count(*) FILTER (WHERE estado = 'pendiente') AS pendientes,
+               count(*) FILTER (WHERE estado = 'en_curso') AS en_curso,
+               count(*) FILTER (WHERE estado = 'fallido') AS fallidos,
+               COALESCE(EXTRACT(EPOCH FROM CURRENT_TIMESTAMP - min(disponible_en) FILTER (
+                   WHERE estado <> 'fallido' AND disponible_en <= CURRENT_TIMESTAMP
+               )), 0) AS atraso_segundos
+        FROM trabajos
+    """)).one()
+    return {
+        "pendientes": fila.pendientes,
+        "en_curso": fila.en_curso,
+        "fallidos": fila.fallidos,
+        "atraso_segundos": float(fila.atraso_segundos),
+    }
+
+
+def fallidos(db: Session, limit: int = 50) -> list:
+    """Trabajos fallidos, del más reciente al más antiguo"""
+    return db.execute(text("""
+        SELECT id, tipo, datos, intentos, ultimo_error, creado_en, actualizado_en
+        FROM trabajos
+        WHERE estado = 'fallido'
+        ORDER BY actualizado_en DESC
+        LIMIT :limit
+    """), {"limit": limit}).all()
+
+
+def reintentar_fallido(db: Session, trabajo_id: int) -> bool:
+    """
+    Devolver un trabajo fallido a la cola con los intentos en cero (no hace commit).
+    False si no hay un fallido con ese id; ValueError si ya hay uno pendiente con su clave.
+    """
+    reintentado = db.execute(text("""
+        UPDATE trabajos t
+        SET estado = 'pendiente', intentos = 0, disponible_en = CURRENT_TIMESTAMP,
+            actualizado_en = CURRENT_TIMESTAMP
+        WHERE t.id = :id AND t.estado = 'fallido'
+          AND NOT EXISTS (SELECT 1 FROM trabajos p WHERE p.clave = t.clave AND p.estado = 'pendiente')
+    """), {"id": trabajo_id}).rowcount > 0
+    if reintentado:
+        db.info[_ENCOLADOS] = True
+        return True
+    if db.execute(text("SELECT 1 FROM trabajos WHERE id = :id AND estado = 'fallido'"), {"id": trabajo_id}).first():
+        raise ValueError("Ya hay un trabajo pendiente con la misma clave")
+    return False
+
+
+class TrabajosRunner:
+    """Pool de tareas asyncio que consume la tabla `trabajos` (ver el docstring del módulo)"""
+
+    def __init__(self, workers: int = 2, intervalo: float = 1.0, visibilidad: float = 300.0,
+                 max_intentos: int = 5, backoff_base: float = 5.0, backoff_max: float = 900.0):
+        self.workers = workers
+        self.intervalo = intervalo
+        self.visibilidad = visibilidad
+        self.max_intentos_defecto = max_intentos
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._tipos: Dict[str, _Tipo] = {}
+        self._tareas: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._despertar: Optional[asyncio.Event] = None
+        self._detenido = False
+        # Última muestra de la cola para /metrics (sin consultar la base en cada scrape)
+        self._muestra: Optional[Dict[str, float]] = None
+        self._muestreada = 0.0
+        self._colector_registrado = False
+
+    def registrar(self, tipo: str, manejador: Callable[[dict, Session], None],
+                  max_intentos: Optional[int] = None) -> None:
+        """Registrar el manejador de un tipo de trabajo antes de iniciar el pool"""
+        self._tipos[tipo] = _Tipo(manejador, max_intentos or self.max_intentos_defecto)
+
+    def max_intentos(self, tipo: str) -> int:
+        registrado = self._tipos.get(tipo)
+        return registrado.max_intentos if registrado else self.max_intentos_defecto
+
+    async def iniciar(self) -> None:
+        """Crear las tareas del pool en el event loop actual"""
+        if not self._tipos or self._tareas:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._despertar = asyncio.Event()
+        self._detenido = False
+        if not self._colector_registrado:
+            registro.colector(self._colector)
+            self._colector_registrado = True
+        self._tareas = [
+            asyncio.create_task(self._trabajar(numero), name=f"trabajos-{numero}")
+            for numero in range(self.workers)
+        ]
+        logger.info(f"Trabajos en segundo plano: {self.workers} tareas para {', '.join(sorted(self._tipos))}")
+
+    async def detener(self, timeout: float = 10.0) -> None:
+        """Esperar a que terminen los trabajos en curso; los que no terminan vuelven a la cola al vencer su visibilidad"""
+        tareas, self._tareas = self._tareas, []
+        if not tareas:
+            return
+        self._detenido = True
+        self._despertar.set()
+        _, pendientes = await asyncio.wait(tareas, timeout=timeout)
+        for tarea in pendientes:
+            tarea.cancel()
+
+    def avisar(self) -> None:
+        """Hay trabajos nuevos: despertar al pool (seguro desde cualquier hilo)"""
+        if self._loop is not None and self._tareas and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._despertar.set)
+
+    def backoff(self, intentos: int) -> float:
+        """Espera antes del próximo intento: exponencial con tope y jitter para no reintentar en bloque"""
+        espera = min(self.backoff_base * 2 ** max(intentos - 1, 0), self.backoff_max)
+        return espera / 2 + random.uniform(0, espera / 2)
+
+    # ==================== CICLO DE CADA TAREA ====================
+
+    async def _trabajar(self, numero: int) -> None:
+        while not self._detenido:
+            espera = self.intervalo
+            try:
+                if numero == 0:
+                    await self._muestrear()
+                trabajo = await run_in_threadpool(self._tomar)
+                if trabajo is not None:
+                    await run_in_threadpool(self._ejecutar, trabajo)
+                    continue
+            except Exception as e:
+                logger.error(f"Error en la cola de trabajos, reintentando: {e}")
+                # Base caída: no insistir en cada intervalo
+                espera = max(self.intervalo * 5, 5.0)
+            if not self._detenido:
+                await self._esperar(espera)
+
+    async def _esperar(self, segundos: float) -> None:
+        try:
+            await asyncio.wait_for(self._despertar.wait(), segundos)
+        except asyncio.TimeoutError:
+            pass
+        self._despertar.clear()
+
+    def _tomar(self) -> Optional[Trabajo]:
+        """Marcar en curso el trabajo vencido más antiguo de los tipos registrados"""
+        db = SessionLocal()
+        try:
+            fila = db.execute(text("""
+                UPDATE trabajos
+                SET estado = 'en_curso', intentos = intentos + 1,
+                    disponible_en = CURRENT_TIMESTAMP + make_interval(secs => :visibilidad),
+                    actualizado_en = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT id FROM trabajos
+                    WHERE estado IN ('pendiente', 'en_curso')
+                      AND disponible_en <= CURRENT_TIMESTAMP
+                      AND tipo = ANY(:tipos)
+                    ORDER BY disponible_en
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, tipo, datos, intentos, max_intentos, creado_en
+            """), {"visibilidad": self.visibilidad, "tipos": list(self._tipos)}).first()
+            db.commit()
+        finally:
+            db.close()
+        if fila is None:
+            return None
+        return Trabajo(
+            id=fila.id,
+            tipo=fila.tipo,
+            datos=fila.datos or {},
+            intentos=fila.intentos,
+            max_intentos=fila.max_intentos,
+            creado_en=fila.creado_en
+        )
+
+    def _ejecutar(self, trabajo: Trabajo) -> None:
+        inicio = time.perf_counter()
+        db = SessionLocal()
+        try:
+            resultado = self._procesar(db, trabajo)
+        finally:
+            db.close()
+        trabajos_procesados.labels(trabajo.tipo, resultado).inc()
+        duracion_trabajos.labels(trabajo.tipo).observe(time.perf_counter() - inicio)
+
+    def _procesar(self, db: Session, trabajo: Trabajo) -> str:
+        try:
+            if trabajo.intentos > trabajo.max_intentos:
+                raise RuntimeError("La visibilidad venció en todos los intentos")
+            # Borrar primero: la fila queda bloqueada (SKIP LOCKED la oculta a los demás)
+            # y el borrado se confirma junto con los efectos del manejador.
+            # `intentos` descarta un intento viejo cuya visibilidad ya venció
+            propio = db.execute(
+                text("DELETE FROM trabajos WHERE id = :id AND intentos = :intentos RETURNING id"),
+                {"id": trabajo.id, "intentos": trabajo.intentos}
+            ).scalar()
+            if propio is None:
+                db.rollback()
+                return "perdido"
+            self._tipos[trabajo.tipo].manejador(trabajo.datos, db)
+            db.commit()
+            return "completado"
+        except Exception as e:
+            db.rollback()
+            try:
+                return self._reintentar(db, trabajo, e)
+            except Exception as error_cola:
+                db.rollback()
+                logger.error(f"Trabajo {trabajo.id} ({trabajo.tipo}): no se pudo reprogramar: {error_cola}")
+                return "error"
+
+    def _reintentar(self, db: Session, trabajo: Trabajo, error: Exception) -> str:
+        """Reprogramar con backoff, o marcar fallido si se agotaron los intentos"""
+        params = {"id": trabajo.id, "intentos": trabajo.intentos, "error": f"{type(error).__name__}: {error}"}
+        if trabajo.intentos >= trabajo.max_intentos:
+            db.execute(text("""
+                UPDATE trabajos
+                SET estado = 'fallido', ultimo_error = :error, actualizado_en = CURRENT_TIMESTAMP
+                WHERE id = :id AND intentos = :intentos
+            """), params)
+            db.commit()
+            logger.error(f"Trabajo {trabajo.id} ({trabajo.tipo}) fallido tras {trabajo.intentos} intentos: {error}")
+            return "fallido"
+
+        reprogramado = db.execute(text("""
+            UPDATE trabajos t
+            SET estado = 'pendiente', ultimo_error = :error, actualizado_en = CURRENT_TIMESTAMP,
+                disponible_en = CURRENT_TIMESTAMP + make_interval(secs => :retraso)
+            WHERE id = :id AND intentos = :intentos
+              AND (clave IS NULL OR NOT EXISTS (
+                  SELECT 1 FROM trabajos o WHERE o.clave = t.clave AND o.estado = 'pendiente'
+              ))
+        """), {**params, "retraso": self.backoff(trabajo.intentos)}).rowcount
+        if not reprogramado:
+            # Ya hay uno pendiente con la misma clave: ese intento cubre también a este
+            db.execute(
+                text("DELETE FROM trabajos WHERE id = :id AND intentos = :intentos AND clave IS NOT NULL"), params
+            )
+        db.commit()
+        logger.warning(f"Trabajo {trabajo.id} ({trabajo.tipo}) falló (intento {trabajo.intentos}), se reintentará: {error}")
+        return "reintento"
+
+    # ==================== MÉTRICAS ====================
+
+    async def _muestrear(self) -> None:
+        """Actualizar la muestra de la cola como mucho una vez cada 5 segundos"""
+        ahora = time.monotonic()
+        if ahora - self._muestreada < max(self.intervalo, 5.0):
+            return
+        self._muestreada = ahora
+
+        def leer():
+            db = SessionLocal()
+            try:
+                return estadisticas(db)
+            finally:
+                db.close()
+        self._muestra = await run_in_threadpool(leer)
+
+    def _colector(self):
+        muestra = self._muestra
+        if muestra is None:
+            return []
+        return [
+            ("jobs_queue_depth", "gauge", "Trabajos en la cola por estado",
+             [({"estado": estado}, muestra[clave]) for estado, clave in (
+                 (PENDIENTE, "pendientes"), (EN_CURSO, "en_curso"), (FALLIDO, "fallidos")
+             )]),
+            ("jobs_lag_seconds", "gauge", "Antigüedad del trabajo vencido más antiguo sin tomar",
+             [({}, muestra["atraso_segundos"])]),
+        ]
+
+
+runner = TrabajosRunner(
+    workers=settings.trabajos_workers,
+    intervalo=settings.trabajos_intervalo,
+    visibilidad=settings.trabajos_visibilidad,
+    max_intentos=settings.trabajos_max_intentos,
+    backoff_base=settings.trabajos_backoff_base,
+    backoff_max=settings.trabajos_backoff_max
+)
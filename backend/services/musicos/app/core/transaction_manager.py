@@ -5,9 +5,19 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Marca en Session.info mientras hay una unidad de trabajo abierta
+_UNIDAD_DE_TRABAJO = "unidad_de_trabajo"
+
+
+def en_unidad_de_trabajo(db: Session) -> bool:
+    """¿Las escrituras de los repositorios deben esperar el commit de la unidad de trabajo?"""
+    return db.info.get(_UNIDAD_DE_TRABAJO, False)
+
 class TransactionManager:
     """Manejo centralizado de transacciones para servicios"""
     
+    __slots__ = ("db",)
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -28,6 +38,20 @@ class TransactionManager:
             self.db.rollback()
             raise
     
+    @contextmanager
+    def unidad_de_trabajo(self):
+        """
+        Varias escrituras de repositorios con un solo commit al final: dentro del
+        bloque los repositorios solo hacen flush (ver BaseRepository._confirmar)
+        y cualquier error deshace todo.
+        """
+        self.db.info[_UNIDAD_DE_TRABAJO] = True
+        try:
+            with self.transaction():
+                yield self.db
+        finally:
+            self.db.info.pop(_UNIDAD_DE_TRABAJO, None)
+    
     @contextmanager
     def read_only_transaction(self):
         """Context manager para transacciones de solo lectura"""
@@ -1,8 +1,10 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from uuid import UUID
 from fastapi import HTTPException, status
 import logging
 
+from app.core.filtro_emails import filtro_emails
+
 logger = logging.getLogger(__name__)
 
 class ValidationService:
@@ -15,13 +17,10 @@ class ValidationService:
     MAX_LONGITUD_NOMBRE = 100
     DOMINIOS_EMAIL_PERMITIDOS = ["gmail.com", "hotmail.com", "outlook.com", "yahoo.com"]
     
-    def __init__(self, db):
-        self.db = db
-    
     def validate_musico_creation(self, email: str, musicos_repo) -> None:
         """Validar creación de músico"""
-        # Validar email único
-        if musicos_repo.get_by_email(email):
+        # Validar email único: el filtro descarta sin consultar los emails seguro libres
+        if self._email_registrado(email, musicos_repo):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="El email ya está registrado por otro músico"
@@ -37,14 +36,22 @@ class ValidationService:
     
     def validate_musico_update(self, musico_id: UUID, email: str, musicos_repo) -> None:
         """Validar actualización de músico"""
-        if email:
+        if email and filtro_emails.puede_existir(email):
             existing = musicos_repo.get_by_email(email)
+            filtro_emails.confirmar(existing is not None)
             if existing and existing.id != musico_id:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="El email ya está registrado por otro músico"
                 )
     
+    def _email_registrado(self, email: str, musicos_repo) -> bool:
+        if not filtro_emails.puede_existir(email):
+            return False
+        encontrado = musicos_repo.get_by_email(email) is not None
+        filtro_emails.confirmar(encontrado)
+        return encontrado
+    
     def validate_instrumento_assignment(
         self, 
         musico_id: UUID, 
@@ -88,6 +95,30 @@ class ValidationService:
                     detail=f"El músico no puede tener más de {self.MAX_INSTRUMENTOS_PRINCIPALES} instrumentos principales"
                 )
     
+    def validate_instrumentos_musico(self, instrumentos: List[Tuple[int, bool]]) -> None:
+        """
+        Validar el conjunto final de instrumentos de un músico, como (instrumento_id,
+        es_principal), con los mismos límites y errores que la asignación de a uno
+        """
+        instrumento_ids = [instrumento_id for instrumento_id, _ in instrumentos]
+        if len(set(instrumento_ids)) != len(instrumento_ids):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El músico ya tiene registrado este instrumento"
+            )
+        
+        if len(instrumentos) > self.MAX_INSTRUMENTOS_TOTAL:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El músico no puede tener más de {self.MAX_INSTRUMENTOS_TOTAL} instrumentos"
+            )
+        
+        if sum(1 for _, es_principal in instrumentos if es_principal) > self.MAX_INSTRUMENTOS_PRINCIPALES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El músico no puede tener más de {self.MAX_INSTRUMENTOS_PRINCIPALES} instrumentos principales"
+            )
+    
     def validate_instrumento_removal(
         self, 
         musico_id: UUID, 
@@ -124,3 +155,7 @@ class ValidationService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No se pueden procesar más de 50 elementos a la vez"
             )
+
+
+# Sin estado por solicitud: un solo validador por proceso
+validation_service = ValidationService()
@@ -1,13 +1,27 @@
+from app.core.arranque import arranque  # primero: mide también la importación de FastAPI y SQLAlchemy
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 import logging
 import sys
+import threading
 
 from app.core.config import settings
 from app.api.v1 import api_router
-from app.core.database import engine
+from app.core.database import SessionLocal, al_crear_engine, cerrar_engine, get_engine
+from app.core.change_feed import dispatcher
+from app.core.instrumentacion import InstrumentacionSQLMiddleware, instalar as instalar_instrumentacion
+from app.core.idempotencia import IdempotenciaMiddleware
+from app.core.admision import AdmisionMiddleware, PESADA, LECTURA, ESCRITURA
+from app.core.negociacion import NegociacionMiddleware, RespuestaNegociada
+from app.core.metricas import MetricasMiddleware, registro as registro_metricas, estado_pool
+from app.core.consultas_lentas import consultas_lentas
+from app.core.filtro_emails import filtro_emails
+from app.services.suscriptores import registrar_suscriptores
+from app.core.trabajos import runner as trabajos
+from app.services.trabajos import registrar_trabajos
 
 # Configurar logging
 logging.basicConfig(
@@ -20,21 +34,51 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+def reconstruir_filtro_emails() -> None:
+    """Cargar el filtro de emails sin demorar el arranque; mientras tanto se consulta la base"""
+    db = SessionLocal()
+    try:
+        filtro_emails.reconstruir(db)
+    except Exception as e:
+        logger.error(f"No se pudo cargar el filtro de emails: {e}")
+    finally:
+        db.close()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info(f"Iniciando {settings.project_name}")
     logger.info(f"Debug mode: {settings.debug}")
+    arranque.marcar("hasta el lifespan")
+
+    # Pool, mappers y catálogos listos antes de que uvicorn acepte conexiones.
+    # Sin base de datos el worker arranca igual: /health/ready responde 503 hasta que vuelva
+    if settings.calentar_al_iniciar:
+        from app.core.calentamiento import calentar
+        try:
+            calentar()
+        except Exception as e:
+            logger.error(f"Worker sin calentar, base de datos no disponible: {e}")
+        arranque.marcar("calentamiento")
     
-    # Verificar conexión a base de datos
-    try:
-        # Las tablas deben crearse manualmente con el script SQL
-        # Esta línea solo verifica la conexión
-        with engine.connect() as connection:
-            logger.info("Conexión a base de datos exitosa")
-    except Exception as e:
-        logger.error(f"Error conectando a base de datos: {e}")
-        raise
+    # Change feed: consumidores en proceso de los cambios del outbox
+    if settings.change_feed_enabled:
+        registrar_suscriptores(dispatcher)
+        dispatcher.start()
+        arranque.marcar("change feed")
+    
+    # Trabajos en segundo plano: pool de tareas en el event loop de este worker
+    if settings.trabajos_enabled:
+        registrar_trabajos(trabajos)
+        await trabajos.iniciar()
+        arranque.marcar("trabajos")
+    if settings.filtro_emails_enabled:
+        threading.Thread(target=reconstruir_filtro_emails, name="filtro-emails", daemon=True).start()
+    arranque.listo()
     yield
+    # uvicorn ya terminó las solicitudes en curso (SIGTERM) antes de llegar acá
+    await trabajos.detener()
+    dispatcher.stop()
+    cerrar_engine()
     logger.info("Cerrando aplicación")
 
 # Crear aplicación FastAPI
@@ -44,9 +88,49 @@ app = FastAPI(
     debug=settings.debug,
     docs_url="/swagger",  
     redoc_url="/redoc",   
-    lifespan=lifespan
+    lifespan=lifespan,
+    # JSON o MessagePack según lo negociado por NegociacionMiddleware
+    default_response_class=RespuestaNegociada
 )
 
+# Idempotency-Key en las altas: dentro de la admisión, los reintentos reproducidos también cuentan
+if settings.idempotencia_enabled:
+    app.add_middleware(
+        IdempotenciaMiddleware,
+        rutas=(
+            rf"^{settings.api_v1_str}/musicos/?$",
+            rf"^{settings.api_v1_str}/musicos/(?!catalogs/)[^/]+/instrumentos$",
+        ),
+        ttl_horas=settings.idempotencia_ttl_horas
+    )
+
+# Control de admisión: agregado antes que CORS para que los 503 lleven sus encabezados
+if settings.admision_enabled:
+    app.add_middleware(
+        AdmisionMiddleware,
+        limites={
+            PESADA: settings.admision_limite_pesadas,
+            LECTURA: settings.admision_limite_lecturas,
+            ESCRITURA: settings.admision_limite_escrituras,
+        },
+        cola=settings.admision_cola,
+        espera_max=settings.admision_espera_max,
+        retry_after=settings.admision_retry_after,
+        # Listado completo, búsqueda por texto y consulta por lote
+        rutas_pesadas=(
+            rf"^{settings.api_v1_str}/musicos/?$",
+            rf"^{settings.api_v1_str}/musicos/search$",
+            rf"^{settings.api_v1_str}/musicos/lote$",
+        ),
+        # Salud, métricas y administración nunca se descartan
+        exentas=("/health", "/metrics", f"{settings.api_v1_str}/admin"),
+        adaptativo=settings.admision_adaptativo,
+        latencia_objetivo_ms=settings.admision_latencia_objetivo_ms,
+        rutas_limitadas=(rf"^{settings.api_v1_str}/musicos/search$",),
+        tasa_por_cliente=settings.busqueda_por_segundo,
+        rafaga_por_cliente=settings.busqueda_rafaga,
+    )
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -54,8 +138,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # ETag: versión para If-Match; Retry-After e Idempotent-Replayed: reintentos de altas
+    expose_headers=["ETag", "Retry-After", "Idempotent-Replayed"],
 )
 
+# Compresión y MessagePack: por fuera de la idempotencia, que guarda los cuerpos sin comprimir
+if settings.compresion_enabled or settings.msgpack_enabled:
+    app.add_middleware(
+        NegociacionMiddleware,
+        comprimir=settings.compresion_enabled,
+        minimo_bytes=settings.compresion_minimo_bytes,
+        carga_alta=settings.compresion_carga_alta,
+        msgpack_enabled=settings.msgpack_enabled
+    )
+
+# Métricas de Prometheus: latencia por plantilla de ruta y solicitudes en curso
+if settings.metrics_enabled:
+    app.add_middleware(MetricasMiddleware)
+
+# Consultas lentas: siempre instaladas para poder activarlas en caliente desde /admin
+al_crear_engine(consultas_lentas.instalar)
+
+# Instrumentación SQL por solicitud: al agregarse último envuelve a todo lo demás
+if settings.sql_instrumentacion_enabled:
+    al_crear_engine(instalar_instrumentacion)
+    app.add_middleware(
+        InstrumentacionSQLMiddleware,
+        umbral_repeticiones=settings.sql_repeticiones_umbral,
+        server_timing=settings.server_timing_enabled
+    )
+
 # Incluir routers
 app.include_router(api_router, prefix=settings.api_v1_str)
 
@@ -77,6 +189,38 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/health/ready")
+def readiness_check():
+    """Lista para recibir tráfico: base de datos accesible y conexiones libres en el pool"""
+    engine = get_engine()
+    pool = estado_pool(engine)
+    if pool is not None and pool["disponibles"] == 0:
+        # Sin conexiones libres un SELECT 1 esperaría el pool_timeout completo
+        return JSONResponse(
+            status_code=503,
+            content={"status": "not_ready", "service": "Musicos-service", "detail": "Pool de conexiones agotado", "pool": pool}
+        )
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.error(f"Readiness: base de datos no disponible: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={"status": "not_ready", "service": "Musicos-service", "detail": "Base de datos no disponible", "pool": pool}
+        )
+    return {"status": "ready", "service": "Musicos-service", "pool": pool}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(
+        registro_metricas.exponer(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+arranque.marcar("importación y rutas")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
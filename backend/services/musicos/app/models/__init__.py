@@ -1,10 +1,11 @@
-from .musicos import Musico, InstrumentoMusico
-from .catalogos import CatEstadosMusico
+from .musicos import Musico, InstrumentoMusico, MusicoArchivado, InstrumentoMusicoArchivado
+from .catalogos import CatEstadosMusico, CatInstrumentos
 
 __all__ = [
     "Musico",
     "InstrumentoMusico", 
+    "MusicoArchivado",
+    "InstrumentoMusicoArchivado",
     "CatEstadosMusico",
-    "CatInstrumentos",
-    "CatNivelesHabilidad"
-]
\ No newline at end of file
+    "CatInstrumentos"
+]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Text, Integer, Date, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Text, Integer, BigInteger, Date, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -10,7 +10,7 @@ class Musico(Base):
     __tablename__ = "musicos"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    email = Column(String(255), unique=True, nullable=False, index=True)
+    email = Column(String(255), nullable=False)
     nombre = Column(String(255), nullable=False)
     telefono = Column(String(50))
     fecha_ingreso = Column(DateTime(timezone=True), default=func.now())
@@ -21,10 +21,21 @@ class Musico(Base):
     creado_en = Column(DateTime(timezone=True), default=func.now())
     actualizado_en = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
     eliminado_en = Column(DateTime(timezone=True))
+    # Concurrencia optimista: cada UPDATE condiciona sobre la versión leída y la incrementa
+    version = Column(BigInteger, nullable=False, default=1, server_default="1")
     
     # Relationships
     estado = relationship("CatEstadosMusico")
     instrumentos = relationship("InstrumentoMusico", back_populates="musico")
+    
+    __table_args__ = (
+        # Unicidad sin distinguir mayúsculas entre músicos vivos; también resuelve get_by_email
+        Index("uk_musicos_email", func.lower(email), unique=True, postgresql_where=eliminado_en.is_(None)),
+        # Las lecturas filtran eliminado_en IS NULL: los índices no cargan con las filas eliminadas
+        Index("idx_musicos_estado", estado_id, postgresql_where=eliminado_en.is_(None)),
+        # Candidatos del archivado en frío
+        Index("idx_musicos_eliminado_en", eliminado_en, postgresql_where=eliminado_en.isnot(None)),
+    )
 
 class InstrumentoMusico(Base):
     __tablename__ = "instrumentos_musico"
@@ -36,8 +47,41 @@ class InstrumentoMusico(Base):
     es_principal = Column(Boolean, default=False)
     fecha_inicio = Column(Date)
     notas = Column(Text)
+    version = Column(BigInteger, nullable=False, default=1, server_default="1")
     
     # Relationships
     musico = relationship("Musico", back_populates="instrumentos")
     # AGREGAR ESTAS RELACIONES NUEVAS (sin foreign key por ser esquemas diferentes):
     # Las relaciones se manejan manualmente en el service layer
+
+class MusicoArchivado(Base):
+    """Músico eliminado movido fuera de `musicos` por el archivado en frío"""
+    __tablename__ = "musicos_archivo"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    email = Column(String(255), nullable=False)
+    nombre = Column(String(255), nullable=False)
+    telefono = Column(String(50))
+    fecha_ingreso = Column(DateTime(timezone=True))
+    estado_id = Column(Integer, nullable=False)
+    url_foto_perfil = Column(Text)
+    creado_en = Column(DateTime(timezone=True))
+    actualizado_en = Column(DateTime(timezone=True))
+    eliminado_en = Column(DateTime(timezone=True), nullable=False)
+    version = Column(BigInteger, nullable=False, server_default="1")
+    archivado_en = Column(DateTime(timezone=True), server_default=func.now())
+
+class InstrumentoMusicoArchivado(Base):
+    __tablename__ = "instrumentos_musico_archivo"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    musico_id = Column(
+        UUID(as_uuid=True), ForeignKey("musicos_archivo.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    instrumento_id = Column(Integer, nullable=False)
+    nivel_id = Column(Integer, nullable=False)
+    es_principal = Column(Boolean, default=False)
+    fecha_inicio = Column(Date)
+    notas = Column(Text)
+    version = Column(BigInteger, nullable=False, server_default="1")
+    archivado_en = Column(DateTime(timezone=True), server_default=func.now())
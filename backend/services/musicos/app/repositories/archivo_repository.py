@@ -0,0 +1,110 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.filtro_emails import filtro_emails
+from app.core.outbox import record_change
+from app.models.musicos import InstrumentoMusico, Musico
+from app.core.metricas import medir_repositorio, tamano_lotes
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _columnas(modelo) -> str:
+    return ", ".join(columna.name for columna in modelo.__table__.columns)
+
+
+@medir_repositorio
+class ArchivoMusicosRepository:
+    """
+    Archivado en frío de músicos eliminados.
+
+    Los músicos eliminados hace tiempo (y sus instrumentos) pasan a
+    `musicos_archivo`/`instrumentos_musico_archivo`, de modo que la tabla caliente
+    y sus índices solo cargan con filas vivas o eliminadas recientemente.
+    """
+
+    __slots__ = ("db",)
+    
+    def __init__(self, db: Session):
+        self.db = db
+
+    def contar_pendientes(self, antes_de: datetime) -> int:
+        """Músicos eliminados antes de `antes_de` que aún no se archivaron"""
+        return self.db.execute(
+            text("SELECT count(*) FROM musicos WHERE eliminado_en < :antes_de"), {"antes_de": antes_de}
+        ).scalar()
+
+    def archivar_lote(self, antes_de: datetime, lote: int) -> int:
+        """
+        Mover un lote de músicos eliminados antes de `antes_de`, con sus
+        instrumentos, en una sola sentencia y confirmar.
+
+        SKIP LOCKED permite correr varios procesos de archivado a la vez sin que
+        se esperen entre sí. Devuelve la cantidad de músicos archivados.
+        """
+        musicos = _columnas(Musico)
+        instrumentos = _columnas(InstrumentoMusico)
+        resultado = self.db.execute(text(f"""
+            WITH lote AS (
+                SELECT id FROM musicos
+                WHERE eliminado_en < :antes_de
+                ORDER BY eliminado_en
+                LIMIT :lote
+                FOR UPDATE SKIP LOCKED
+            ), instrumentos AS (
+                DELETE FROM instrumentos_musico WHERE musico_id IN (SELECT id FROM lote)
+                RETURNING {instrumentos}
+            ), instrumentos_archivados AS (
+                INSERT INTO instrumentos_musico_archivo ({instrumentos})
+                SELECT {instrumentos} FROM instrumentos
+            ), movidos AS (
+                DELETE FROM musicos WHERE id IN (SELECT id FROM lote)
+                RETURNING {musicos}
+            )
+            INSERT INTO musicos_archivo ({musicos}) SELECT {musicos} FROM movidos
+        """), {"antes_de": antes_de, "lote": lote})
+        self.db.commit()
+        tamano_lotes.labels("archivo_musicos").observe(resultado.rowcount)
+        return resultado.rowcount
+
+    def restaurar(self, musico_id: UUID) -> bool:
+        """
+        Devolver un músico archivado y sus instrumentos a las tablas vivas, ya sin
+        eliminar. False si no está archivado; ValueError si su email volvió a usarse.
+        """
+        musicos = [columna.name for columna in Musico.__table__.columns]
+        # La versión sube: un If-Match anterior al archivado ya no coincide
+        valores = {"eliminado_en": "NULL", "actualizado_en": "CURRENT_TIMESTAMP", "version": "version + 1"}
+        instrumentos = _columnas(InstrumentoMusico)
+        try:
+            restaurado = self.db.execute(text(f"""
+                INSERT INTO musicos ({", ".join(musicos)})
+                SELECT {", ".join(valores.get(columna, columna) for columna in musicos)}
+                FROM musicos_archivo WHERE id = :musico_id
+                RETURNING id
+            """), {"musico_id": musico_id}).scalar()
+            if restaurado is None:
+                self.db.rollback()
+                return False
+            self.db.execute(text(f"""
+                INSERT INTO instrumentos_musico ({instrumentos})
+                SELECT {instrumentos} FROM instrumentos_musico_archivo WHERE musico_id = :musico_id
+            """), {"musico_id": musico_id})
+            # Los instrumentos archivados se borran en cascada
+            self.db.execute(text("DELETE FROM musicos_archivo WHERE id = :musico_id"), {"musico_id": musico_id})
+
+            musico = self.db.get(Musico, musico_id)
+            record_change(self.db, "musico", "restaurado", musico)
+            email = musico.email
+            self.db.commit()
+            filtro_emails.agregar(email)
+            return True
+        except IntegrityError as e:
+            self.db.rollback()
+            logger.warning(f"No se pudo restaurar el músico {musico_id}: {e}")
+            raise ValueError("Ya existe un músico con el email del músico archivado")
@@ -2,15 +2,26 @@ from typing import Generic, TypeVar, Type, List, Optional, Any
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from app.core.database import Base
+from app.core.concurrencia import actualizar_condicional
+from app.core.outbox import record_change
+from app.core.metricas import medir_repositorio
+from app.core.transaction_manager import en_unidad_de_trabajo
 import logging
 
 logger = logging.getLogger(__name__)
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+@medir_repositorio
 class BaseRepository(Generic[ModelType]):
     """Repository base con operaciones CRUD genéricas"""
     
+    # Un repositorio por solicitud y por tipo: sin __dict__
+    __slots__ = ("db", "model")
+    
+    # Nombre del agregado publicado en el outbox; None desactiva el registro de cambios
+    agregado: Optional[str] = None
+    
     def __init__(self, db: Session, model: Type[ModelType]):
         self.db = db
         self.model = model
@@ -63,7 +74,9 @@ class BaseRepository(Generic[ModelType]):
         try:
             db_obj = self.model(**obj_data)
             self.db.add(db_obj)
-            self.db.commit()
+            self.db.flush()
+            self._registrar_cambio("creado", db_obj)
+            self._confirmar()
             self.db.refresh(db_obj)
             return db_obj
         except SQLAlchemyError as e:
@@ -71,20 +84,23 @@ class BaseRepository(Generic[ModelType]):
             self.db.rollback()
             raise
     
-    def update(self, id: Any, obj_data: dict) -> Optional[ModelType]:
-        """Actualizar registro existente"""
+    def update(self, id: Any, obj_data: dict, version: Optional[int] = None) -> Optional[ModelType]:
+        """
+        Actualizar registro existente con un solo UPDATE ... RETURNING.
+        Con `version` solo actualiza si la fila sigue en esa versión (ConflictoVersion si no).
+        """
         try:
-            db_obj = self.get_by_id(id)
+            # Actualizar solo campos que no sean None
+            valores = {
+                field: value for field, value in obj_data.items()
+                if value is not None and hasattr(self.model, field)
+            }
+            db_obj = actualizar_condicional(self.db, self.model, id, valores, version)
             if not db_obj:
                 return None
             
-            # Actualizar solo campos que no sean None
-            for field, value in obj_data.items():
-                if value is not None and hasattr(db_obj, field):
-                    setattr(db_obj, field, value)
-            
-            self.db.commit()
-            self.db.refresh(db_obj)
+            self._registrar_cambio("actualizado", db_obj)
+            self._confirmar()
             return db_obj
         except SQLAlchemyError as e:
             logger.error(f"Error actualizando {self.model.__name__} {id}: {e}")
@@ -105,9 +121,22 @@ class BaseRepository(Generic[ModelType]):
             else:
                 self.db.delete(db_obj)
             
-            self.db.commit()
+            self._registrar_cambio("eliminado", db_obj)
+            self._confirmar()
             return True
         except SQLAlchemyError as e:
             logger.error(f"Error eliminando {self.model.__name__} {id}: {e}")
             self.db.rollback()
-            raise
\ No newline at end of file
+            raise
+    
+    def _confirmar(self) -> None:
+        """Commit de la escritura; dentro de una unidad de trabajo solo flush (el commit lo hace quien la abrió)"""
+        if en_unidad_de_trabajo(self.db):
+            self.db.flush()
+        else:
+            self.db.commit()
+    
+    def _registrar_cambio(self, operacion: str, db_obj: ModelType) -> None:
+        """Agregar el cambio al outbox en la misma transacción de la escritura"""
+        if self.agregado:
+            record_change(self.db, self.agregado, operacion, db_obj)
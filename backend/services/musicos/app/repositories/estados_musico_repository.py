@@ -2,11 +2,15 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from .base_repository import BaseRepository
 from app.models.catalogos import CatEstadosMusico
+from app.core.metricas import medir_repositorio
 import logging
 
 logger = logging.getLogger(__name__)
 
+@medir_repositorio
 class EstadosMusicoRepository(BaseRepository[CatEstadosMusico]):
+    __slots__ = ()
+    
     def __init__(self, db: Session):
         super().__init__(db, CatEstadosMusico)
     
@@ -5,13 +5,19 @@ from uuid import UUID
 from app.models.catalogos import CatInstrumentos
 
 from .base_repository import BaseRepository
+from app.core.outbox import record_change
 from app.models.musicos import InstrumentoMusico
 from app.schemas.musicos import InstrumentoMusicoCreate, InstrumentoMusicoUpdate
+from app.core.metricas import medir_repositorio
 import logging
 
 logger = logging.getLogger(__name__)
 
+@medir_repositorio
 class InstrumentosMusicoRepository(BaseRepository[InstrumentoMusico]):
+    __slots__ = ()
+    agregado = "instrumento_musico"
+    
     def __init__(self, db: Session):
         super().__init__(db, InstrumentoMusico)
     
@@ -85,11 +91,12 @@ class InstrumentosMusicoRepository(BaseRepository[InstrumentoMusico]):
             logger.error(f"Error verificando instrumento {instrumento_id} del músico {musico_id}: {e}")
             raise
     
-    def update(self, instrumento_id: UUID, instrumento_data: InstrumentoMusicoUpdate) -> Optional[InstrumentoMusico]:
-        """Actualizar un instrumento de músico"""
+    def update(self, instrumento_id: UUID, instrumento_data: InstrumentoMusicoUpdate,
+               version: Optional[int] = None) -> Optional[InstrumentoMusico]:
+        """Actualizar un instrumento de músico (condicionado a `version` si se indica)"""
         try:
-            update_data = instrumento_data.model_dump(exclude_unset=True)
-            return super().update(instrumento_id, update_data)
+            update_data = instrumento_data.model_dump(exclude={'version'}, exclude_unset=True)
+            return super().update(instrumento_id, update_data, version)
         except Exception as e:
             logger.error(f"Error actualizando instrumento {instrumento_id}: {e}")
             raise
@@ -100,6 +107,7 @@ class InstrumentosMusicoRepository(BaseRepository[InstrumentoMusico]):
             instrumento = self.get_by_musico_and_instrumento(musico_id, instrumento_id)
             if instrumento:
                 self.db.delete(instrumento)
+                record_change(self.db, self.agregado, "eliminado", instrumento)
                 self.db.commit()
                 return True
             return False
@@ -8,12 +8,18 @@ from app.schemas.musicos import (
 
 
 from .base_repository import BaseRepository
+from app.core.catalog_cache import catalog_cache
 from app.models.catalogos import CatInstrumentos
+from app.core.metricas import medir_repositorio
 import logging
 
 logger = logging.getLogger(__name__)
 
+@medir_repositorio
 class InstrumentosRepository(BaseRepository[CatInstrumentos]):
+    __slots__ = ()
+    agregado = "instrumento"
+    
     def __init__(self, db: Session):
         super().__init__(db, CatInstrumentos)
     
@@ -122,6 +128,7 @@ class InstrumentosRepository(BaseRepository[CatInstrumentos]):
                 return False
             
             instrumento.activo = False
+            self._registrar_cambio("eliminado", instrumento)
             self.db.commit()
             return True
         except Exception as e:
@@ -129,6 +136,11 @@ class InstrumentosRepository(BaseRepository[CatInstrumentos]):
             self.db.rollback()
             raise
     
+    def _registrar_cambio(self, operacion: str, db_obj: CatInstrumentos) -> None:
+        """Registrar el cambio e invalidar la caché local del catálogo"""
+        super()._registrar_cambio(operacion, db_obj)
+        catalog_cache.invalidate()
+    
     def get_familias_disponibles(self) -> List[str]:
         """Obtener lista de familias de instrumentos activos"""
         try:
@@ -1,16 +1,24 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, Query, joinedload
+from sqlalchemy import and_, func
 from uuid import UUID
 
 from .base_repository import BaseRepository
+from app.core.filtro_emails import filtro_emails, normalizar_email
+from app.core.paginacion import TotalMode, paginar
+from app.core.proyeccion import Proyeccion
 from app.models.musicos import Musico
 from app.schemas.musicos import MusicoCreate, MusicoUpdate
+from app.core.metricas import medir_repositorio
 import logging
 
 logger = logging.getLogger(__name__)
 
+@medir_repositorio
 class MusicosRepository(BaseRepository[Musico]):
+    __slots__ = ()
+    agregado = "musico"
+    
     def __init__(self, db: Session):
         super().__init__(db, Musico)
     
@@ -28,13 +36,15 @@ class MusicosRepository(BaseRepository[Musico]):
             musico_dict = musico_data.model_dump(exclude={'estado_codigo'})
             musico_dict['estado_id'] = estado.id
             
-            return super().create(musico_dict)
+            db_musico = super().create(musico_dict)
+            filtro_emails.agregar(db_musico.email)
+            return db_musico
         except Exception as e:
             logger.error(f"Error creando músico: {e}")
             raise
     
-    def update(self, musico_id: UUID, musico_data: MusicoUpdate) -> Optional[Musico]:
-        """Actualizar un músico existente"""
+    def update(self, musico_id: UUID, musico_data: MusicoUpdate, version: Optional[int] = None) -> Optional[Musico]:
+        """Actualizar un músico existente (condicionado a `version` si se indica)"""
         try:
             update_data = {}
             
@@ -50,11 +60,14 @@ class MusicosRepository(BaseRepository[Musico]):
                 update_data['estado_id'] = estado.id
             
             # Agregar otros campos para actualizar
-            for field, value in musico_data.model_dump(exclude={'estado_codigo'}, exclude_unset=True).items():
+            for field, value in musico_data.model_dump(exclude={'estado_codigo', 'version'}, exclude_unset=True).items():
                 if value is not None:
                     update_data[field] = value
             
-            return super().update(musico_id, update_data)
+            db_musico = super().update(musico_id, update_data, version)
+            if db_musico is not None and 'email' in update_data:
+                filtro_emails.agregar(db_musico.email)
+            return db_musico
         except Exception as e:
             logger.error(f"Error actualizando músico {musico_id}: {e}")
             raise
@@ -63,27 +76,34 @@ class MusicosRepository(BaseRepository[Musico]):
                                  activos_solo: bool = True) -> List[Musico]:
         """Obtener músicos con sus relaciones cargadas"""
         try:
-            query = self.db.query(Musico).options(
-                joinedload(Musico.estado),
-                joinedload(Musico.instrumentos)
-            )
-            
-            # Filtrar solo activos si se solicita
-            if activos_solo:
-                query = query.filter(Musico.eliminado_en.is_(None))
-            
-            return query.offset(skip).limit(limit).all()
+            return self._listado_query(activos_solo).offset(skip).limit(limit).all()
         except Exception as e:
             logger.error(f"Error obteniendo músicos con relaciones: {e}")
             raise
     
-    def get_by_id_with_relationships(self, musico_id: UUID) -> Optional[Musico]:
-        """Obtener músico por ID con relaciones"""
+    def get_page_with_relationships(self, skip: int = 0, limit: int = 100,
+                                    activos_solo: bool = True,
+                                    total_mode: TotalMode = TotalMode.exact,
+                                    proyeccion: Optional[Proyeccion] = None) -> Tuple[List[Musico], Optional[int]]:
+        """Obtener una página de músicos con relaciones y su total en la misma consulta"""
         try:
-            return self.db.query(Musico).options(
-                joinedload(Musico.estado),
-                joinedload(Musico.instrumentos)
-            ).filter(
+            return paginar(self._listado_query(activos_solo, proyeccion), skip, limit, total_mode)
+        except Exception as e:
+            logger.error(f"Error obteniendo página de músicos: {e}")
+            raise
+    
+    def _listado_query(self, activos_solo: bool, proyeccion: Optional[Proyeccion] = None) -> Query:
+        query = self.db.query(Musico).options(*self._opciones(proyeccion))
+        
+        # Filtrar solo activos si se solicita
+        if activos_solo:
+            query = query.filter(Musico.eliminado_en.is_(None))
+        return query
+    
+    def get_by_id_with_relationships(self, musico_id: UUID, proyeccion: Optional[Proyeccion] = None) -> Optional[Musico]:
+        """Obtener músico por ID con relaciones (solo las columnas y relaciones de `proyeccion`, si se indica)"""
+        try:
+            return self.db.query(Musico).options(*self._opciones(proyeccion)).filter(
                 and_(
                     Musico.id == musico_id,
                     Musico.eliminado_en.is_(None)
@@ -93,12 +113,33 @@ class MusicosRepository(BaseRepository[Musico]):
             logger.error(f"Error obteniendo músico {musico_id} con relaciones: {e}")
             raise
     
+    @staticmethod
+    def _opciones(proyeccion: Optional[Proyeccion]) -> list:
+        """Carga de relaciones: todas, o solo las expandidas y las columnas pedidas por la proyección"""
+        cargadores = {"estado": joinedload(Musico.estado), "instrumentos": joinedload(Musico.instrumentos)}
+        if proyeccion is None:
+            return list(cargadores.values())
+        return proyeccion.opciones(Musico, cargadores)
+    
+    def get_by_ids_with_relationships(self, musico_ids: List[UUID]) -> List[Musico]:
+        """Obtener músicos vivos por ID con relaciones, en una sola consulta"""
+        try:
+            return self.db.query(Musico).options(*self._opciones(None)).filter(
+                and_(
+                    Musico.id.in_(musico_ids),
+                    Musico.eliminado_en.is_(None)
+                )
+            ).all()
+        except Exception as e:
+            logger.error(f"Error obteniendo lote de {len(musico_ids)} músicos con relaciones: {e}")
+            raise
+    
     def get_by_email(self, email: str) -> Optional[Musico]:
-        """Obtener músico por email"""
+        """Obtener músico vivo por email sin distinguir mayúsculas (uk_musicos_email)"""
         try:
             return self.db.query(Musico).filter(
                 and_(
-                    Musico.email == email,
+                    func.lower(Musico.email) == normalizar_email(email),
                     Musico.eliminado_en.is_(None)
                 )
             ).first()
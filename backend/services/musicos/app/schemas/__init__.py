@@ -4,6 +4,9 @@ from .musicos import (
     EstadoMusicoResponse, InstrumentoResponse, NivelHabilidadResponse,
     InstrumentoCreate, InstrumentoUpdate
 )
+from .admin import (
+    ConsultasLentasConfig, ConsultasLentasConfigUpdate, ConsultaLentaResponse, ConsultasLentasResponse
+)
 
 __all__ = [
     "MusicoCreate", 
@@ -17,5 +20,9 @@ __all__ = [
     "InstrumentoResponse",
     "NivelHabilidadResponse",
     "InstrumentoCreate",
-    "InstrumentoUpdate"
+    "InstrumentoUpdate",
+    "ConsultasLentasConfig",
+    "ConsultasLentasConfigUpdate",
+    "ConsultaLentaResponse",
+    "ConsultasLentasResponse"
 ]
\ No newline at end of file
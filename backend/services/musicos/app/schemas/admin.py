@@ -0,0 +1,58 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List, Any
+from datetime import datetime
+
+
+class ConsultasLentasConfig(BaseModel):
+    habilitado: bool
+    umbral_ms: float
+    muestreo_explain: float
+    capacidad: int
+
+
+class ConsultasLentasConfigUpdate(BaseModel):
+    habilitado: Optional[bool] = None
+    umbral_ms: Optional[float] = Field(None, ge=0, description="Duración mínima para registrar una sentencia")
+    muestreo_explain: Optional[float] = Field(None, ge=0, le=1, description="Fracción de SELECT lentas con EXPLAIN ANALYZE")
+    capacidad: Optional[int] = Field(None, ge=1, le=10000, description="Tamaño del buffer circular")
+
+
+class ConsultaLentaResponse(BaseModel):
+    id: int
+    sql: str
+    parametros: Any = None  # Redactados: los textos se reemplazan por su longitud
+    duracion_ms: float
+    origen: str
+    registrada_en: datetime
+    plan: Optional[Any] = None
+    plan_error: Optional[str] = None
+    plan_pendiente: bool = False
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ConsultasLentasResponse(BaseModel):
+    config: ConsultasLentasConfig
+    consultas: List[ConsultaLentaResponse]
+
+
+class TrabajoFallidoResponse(BaseModel):
+    id: int
+    tipo: str
+    datos: Any = None
+    intentos: int
+    ultimo_error: Optional[str] = None
+    creado_en: Optional[datetime] = None
+    actualizado_en: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TrabajosResponse(BaseModel):
+    pendientes: int
+    en_curso: int
+    fallidos: int
+    atraso_segundos: float  # Antigüedad del trabajo vencido más antiguo sin tomar
+    fallidos_recientes: List[TrabajoFallidoResponse]
+
+
+class TrabajoEncoladoResponse(BaseModel):
+    trabajo_id: Optional[int] = None  # None: ya había uno pendiente con la misma clave
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime, date
 from uuid import UUID
 
@@ -69,11 +69,13 @@ class InstrumentoMusicoUpdate(BaseModel):
     es_principal: Optional[bool] = None
     fecha_inicio: Optional[date] = None
     notas: Optional[str] = None
+    version: Optional[int] = Field(None, ge=1, description="Versión leída; si ya cambió la actualización responde 409")
 
 
 class InstrumentoMusicoResponse(InstrumentoMusicoBase):
     id: UUID
     musico_id: UUID
+    version: int = 1
     instrumento: Optional[InstrumentoResponse] = None
     nivel: Optional[NivelHabilidadResponse] = None
     model_config = ConfigDict(from_attributes=True)
@@ -95,6 +97,7 @@ class MusicoUpdate(BaseModel):
     telefono: Optional[str] = Field(None, max_length=50)
     estado_codigo: Optional[str] = None
     url_foto_perfil: Optional[str] = None
+    version: Optional[int] = Field(None, ge=1, description="Versión leída; si ya cambió la actualización responde 409")
 
 
 class MusicoResponse(MusicoBase):
@@ -105,12 +108,26 @@ class MusicoResponse(MusicoBase):
     creado_en: datetime
     actualizado_en: Optional[datetime] = None
     eliminado_en: Optional[datetime] = None
+    version: int = 1
     model_config = ConfigDict(from_attributes=True)
 
+# Perfil del músico: lo que necesita el formulario de edición en una sola consulta
+class PerfilMusicoResponse(BaseModel):
+    musico: MusicoResponse
+    estados: List[EstadoMusicoResponse]
+    instrumentos_disponibles: List[InstrumentoResponse]
+
+class PerfilMusicoUpdate(BaseModel):
+    """Datos del músico y diferencia de sus instrumentos, aplicados con un solo commit"""
+    musico: MusicoUpdate = Field(default_factory=MusicoUpdate, description="version (o If-Match) protege el perfil completo")
+    agregar: List[InstrumentoMusicoCreate] = []
+    actualizar: Dict[UUID, InstrumentoMusicoUpdate] = Field(default_factory=dict, description="Por id de instrumento del músico")
+    eliminar: List[UUID] = Field(default_factory=list, description="Ids de instrumentos del músico")
+
 # Respuestas con paginación
 class MusicosListResponse(BaseModel):
     musicos: List[MusicoResponse]
-    total: int
+    total: Optional[int] = None  # Aproximado con total_mode=estimate, ausente con total_mode=none
     page: int
     size: int
 
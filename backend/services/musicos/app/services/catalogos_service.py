@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 import logging
 
+from app.core.contenedor import Dependencia
 from app.core.transaction_manager import TransactionManager
 from app.repositories.estados_musico_repository import EstadosMusicoRepository
 from app.repositories.instrumentos_repository import InstrumentosRepository
@@ -13,11 +14,12 @@ logger = logging.getLogger(__name__)
 class CatalogosService:
     """Servicio especializado para gestión de catálogos"""
     
+    transaction_manager = Dependencia(TransactionManager)
+    estados_repo = Dependencia(EstadosMusicoRepository)
+    instrumentos_repo = Dependencia(InstrumentosRepository)
+    
     def __init__(self, db: Session):
         self.db = db
-        self.transaction_manager = TransactionManager(db)
-        self.estados_repo = EstadosMusicoRepository(db)
-        self.instrumentos_repo = InstrumentosRepository(db)
     
     def get_estados_musico(self, activos_solo: bool = True) -> List[EstadoMusicoResponse]:
         """Obtener catálogo de estados de músico"""
@@ -4,8 +4,9 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 import logging
 
+from app.core.contenedor import Dependencia
 from app.core.transaction_manager import TransactionManager
-from app.core.validation_service import ValidationService
+from app.core.validation_service import validation_service
 from app.repositories.instrumentos_musico_repository import InstrumentosMusicoRepository
 from app.repositories.instrumentos_repository import InstrumentosRepository
 from app.schemas.musicos import (
@@ -17,12 +18,13 @@ logger = logging.getLogger(__name__)
 class InstrumentosService:
     """Servicio especializado para gestión de instrumentos de músicos"""
     
+    validation_service = validation_service
+    transaction_manager = Dependencia(TransactionManager)
+    instrumentos_repo = Dependencia(InstrumentosMusicoRepository)
+    catalogo_repo = Dependencia(InstrumentosRepository)
+    
     def __init__(self, db: Session):
         self.db = db
-        self.transaction_manager = TransactionManager(db)
-        self.validation_service = ValidationService(db)
-        self.instrumentos_repo = InstrumentosMusicoRepository(db)
-        self.catalogo_repo = InstrumentosRepository(db)
     
     def assign_instrumento_to_musico(
         self, 
@@ -1,21 +1,33 @@
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.repositories.instrumentos_repository import InstrumentosRepository
 from app.schemas.musicos import InstrumentoCreate, InstrumentoResponse, InstrumentoUpdate, NivelHabilidadResponse
 from fastapi import HTTPException, status
 
 # Importar nuevos componentes arquitectónicos
+from app.core.config import settings
+from app.core.contenedor import Dependencia
 from app.core.transaction_manager import TransactionManager
-from app.core.validation_service import ValidationService
+from app.core.validation_service import validation_service
+from app.core.catalog_cache import catalog_cache
+from app.core.concurrencia import ConflictoVersion, conflicto_version, version_esperada
+from app.core.outbox import record_change
+from app.core.paginacion import TotalMode
+from app.core.proyeccion import Proyeccion
+from app.core.trabajos import encolar
 from app.services.instrumentos_service import InstrumentosService
 from app.services.catalogos_service import CatalogosService
+from app.services.trabajos import ARCHIVAR_ELIMINADOS
 
 from app.repositories.musicos_repository import MusicosRepository
 from app.repositories.estados_musico_repository import EstadosMusicoRepository
 from app.repositories.instrumentos_musico_repository import InstrumentosMusicoRepository
+from app.repositories.archivo_repository import ArchivoMusicosRepository
 from app.schemas.musicos import (
-    MusicoCreate, MusicoUpdate, MusicoResponse,
+    MusicoCreate, MusicoUpdate, MusicoResponse, PerfilMusicoResponse, PerfilMusicoUpdate,
     InstrumentoMusicoCreate, InstrumentoMusicoUpdate, InstrumentoMusicoResponse,
     EstadoMusicoResponse
 )
@@ -26,22 +38,23 @@ import logging
 logger = logging.getLogger(__name__)
 
 class MusicosService:
+    # Componentes arquitectónicos centrales (la validación no tiene estado: singleton del proceso)
+    transaction_manager = Dependencia(TransactionManager)
+    validation_service = validation_service
+    
+    # Servicios especializados
+    instrumentos_service = Dependencia(InstrumentosService)
+    catalogos_service = Dependencia(CatalogosService)
+    
+    # Repositorios especializados: cada solicitud construye solo los que usa su ruta
+    musicos_repo = Dependencia(MusicosRepository)
+    estados_repo = Dependencia(EstadosMusicoRepository)
+    instrumentos_repo = Dependencia(InstrumentosMusicoRepository)
+    catalogo_instrumentos_repo = Dependencia(InstrumentosRepository)
+    archivo_repo = Dependencia(ArchivoMusicosRepository)
+    
     def __init__(self, db: Session):
         self.db = db
-        
-        # Componentes arquitectónicos centrales
-        self.transaction_manager = TransactionManager(db)
-        self.validation_service = ValidationService(db)
-        
-        # Servicios especializados
-        self.instrumentos_service = InstrumentosService(db)
-        self.catalogos_service = CatalogosService(db)
-        
-        # Repositorios especializados
-        self.musicos_repo = MusicosRepository(db)
-        self.estados_repo = EstadosMusicoRepository(db)
-        self.instrumentos_repo = InstrumentosMusicoRepository(db)
-        self.catalogo_instrumentos_repo = InstrumentosRepository(db)
 
     
     def create_musico(self, musico_data: MusicoCreate) -> MusicoResponse:
@@ -64,6 +77,13 @@ class MusicosService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
+        except IntegrityError as e:
+            self._conflicto_email(e)
+            logger.error(f"Error creando músico: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Datos de músico inválidos"
+            )
         except Exception as e:
             logger.error(f"Error creando músico: {e}")
             raise HTTPException(
@@ -71,29 +91,49 @@ class MusicosService:
                 detail="Error interno del servidor"
             )
     
-    def get_musico(self, musico_id: UUID) -> MusicoResponse:
-        """Obtener un músico por ID"""
-        db_musico = self.musicos_repo.get_by_id_with_relationships(musico_id)
+    def get_musico(self, musico_id: UUID, proyeccion: Optional[Proyeccion] = None) -> Union[MusicoResponse, dict]:
+        """Obtener un músico por ID (solo los campos de `proyeccion`, si se indica)"""
+        db_musico = self.musicos_repo.get_by_id_with_relationships(musico_id, proyeccion)
         if not db_musico:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Músico no encontrado"
             )
-        return self._musico_to_response(db_musico)
+        return self._musico_proyectado(db_musico, proyeccion)
     
-    def get_musicos(self, skip: int = 0, limit: int = 100, activos_solo: bool = True) -> Tuple[List[MusicoResponse], int]:
-        """Obtener lista de músicos con paginación"""
+    def get_musicos_lote(self, musico_ids: List[UUID]) -> List[MusicoResponse]:
+        """Obtener varios músicos por ID en el orden pedido; los inexistentes se omiten"""
+        musico_ids = list(dict.fromkeys(musico_ids))
+        if len(musico_ids) > settings.musicos_lote_max:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Se permiten hasta {settings.musicos_lote_max} ids por consulta"
+            )
+        if not musico_ids:
+            return []
+        por_id = {musico.id: musico for musico in self.musicos_repo.get_by_ids_with_relationships(musico_ids)}
+        return [self._musico_to_response(por_id[musico_id]) for musico_id in musico_ids if musico_id in por_id]
+    
+    def get_musicos(self, skip: int = 0, limit: int = 100, activos_solo: bool = True,
+                    total_mode: TotalMode = TotalMode.exact,
+                    proyeccion: Optional[Proyeccion] = None) -> Tuple[List[Union[MusicoResponse, dict]], Optional[int]]:
+        """Obtener lista de músicos con paginación (solo los campos de `proyeccion`, si se indica)"""
         if limit > 100:
             limit = 100
         
-        musicos = self.musicos_repo.get_all_with_relationships(skip=skip, limit=limit, activos_solo=activos_solo)
-        total = self.musicos_repo.count(filters={'eliminado_en': None} if activos_solo else None)
+        musicos, total = self.musicos_repo.get_page_with_relationships(
+            skip=skip, limit=limit, activos_solo=activos_solo, total_mode=total_mode, proyeccion=proyeccion
+        )
         
-        musicos_response = [self._musico_to_response(musico) for musico in musicos]
+        musicos_response = [self._musico_proyectado(musico, proyeccion) for musico in musicos]
         return musicos_response, total
     
-    def update_musico(self, musico_id: UUID, musico_data: MusicoUpdate) -> MusicoResponse:
-        """Actualizar un músico con validaciones y transacciones seguras"""
+    def update_musico(self, musico_id: UUID, musico_data: MusicoUpdate, if_match: Optional[str] = None) -> MusicoResponse:
+        """
+        Actualizar un músico con validaciones y transacciones seguras.
+        Con If-Match (412) o `version` en el cuerpo (409) falla si otra petición lo modificó antes.
+        """
+        version, codigo_conflicto = version_esperada(if_match, musico_data.version)
         try:
             # Validaciones de negocio centralizadas
             if musico_data.email:
@@ -103,7 +143,7 @@ class MusicosService:
             
             # Transacción segura con rollback automático
             with self.transaction_manager.transaction():
-                db_musico = self.musicos_repo.update(musico_id, musico_data)
+                db_musico = self.musicos_repo.update(musico_id, musico_data, version)
                 if not db_musico:
                     raise HTTPException(
                         status_code=status.HTTP_404_NOT_FOUND,
@@ -116,11 +156,134 @@ class MusicosService:
                 
         except HTTPException:
             raise
+        except ConflictoVersion as e:
+            raise conflicto_version(e, codigo_conflicto)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except IntegrityError as e:
+            self._conflicto_email(e)
+            raise
+    
+    def get_perfil(self, musico_id: UUID) -> PerfilMusicoResponse:
+        """Músico con sus instrumentos y los catálogos del formulario de edición"""
+        musico = self.get_musico(musico_id)
+        return PerfilMusicoResponse(
+            musico=musico,
+            estados=self.catalogos_service.get_estados_musico(),
+            instrumentos_disponibles=[
+                InstrumentoResponse.model_validate(instrumento)
+                for instrumento in catalog_cache.get_activos(self.db)
+            ]
+        )
+    
+    def actualizar_perfil(self, musico_id: UUID, cambios: PerfilMusicoUpdate,
+                          if_match: Optional[str] = None) -> MusicoResponse:
+        """
+        Aplicar los datos del músico y la diferencia de instrumentos en una unidad de trabajo.
+        La versión del músico (If-Match 412 o `musico.version` 409) protege el perfil completo:
+        toda actualización del perfil la incrementa aunque solo cambien instrumentos.
+        """
+        version, codigo_conflicto = version_esperada(if_match, cambios.musico.version)
+        eliminar = set(cambios.eliminar)
+        if eliminar & set(cambios.actualizar):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Un instrumento no puede actualizarse y eliminarse a la vez"
+            )
+        instrumentos_catalogo = [nuevo.instrumento_id for nuevo in cambios.agregar] + [
+            datos.instrumento_id for datos in cambios.actualizar.values() if datos.instrumento_id is not None
+        ]
+        for instrumento_id in instrumentos_catalogo:
+            instrumento = catalog_cache.get_instrumento(self.db, instrumento_id)
+            if instrumento is None or not instrumento.activo:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"El instrumento {instrumento_id} no existe o no está disponible"
+                )
+        
+        try:
+            if cambios.musico.email:
+                self.validation_service.validate_musico_update(
+                    musico_id, cambios.musico.email, self.musicos_repo
+                )
+            
+            with self.transaction_manager.unidad_de_trabajo():
+                # Primero el músico: bloquea la fila y verifica la versión del perfil
+                if not self.musicos_repo.update(musico_id, cambios.musico, version):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Músico no encontrado"
+                    )
+                
+                propios = {instrumento.id: instrumento for instrumento in self.instrumentos_repo.get_by_musico(musico_id)}
+                ajenos = (eliminar | set(cambios.actualizar)) - propios.keys()
+                if ajenos:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Instrumentos no encontrados para este músico: {', '.join(map(str, ajenos))}"
+                    )
+                
+                # Los límites valen para el conjunto resultante, antes de escribir nada
+                finales = []
+                for id_propio, instrumento in propios.items():
+                    if id_propio in eliminar:
+                        continue
+                    datos = cambios.actualizar.get(id_propio)
+                    finales.append((
+                        datos.instrumento_id if datos and datos.instrumento_id is not None else instrumento.instrumento_id,
+                        datos.es_principal if datos and datos.es_principal is not None else instrumento.es_principal
+                    ))
+                finales.extend((nuevo.instrumento_id, nuevo.es_principal) for nuevo in cambios.agregar)
+                self.validation_service.validate_instrumentos_musico(finales)
+                
+                # Eliminar antes de agregar: permite reemplazar un instrumento por el mismo en el mismo guardado
+                for instrumento_id in cambios.eliminar:
+                    self.instrumentos_repo.delete(instrumento_id)
+                for instrumento_id, datos in cambios.actualizar.items():
+                    try:
+                        self.instrumentos_repo.update(instrumento_id, datos, datos.version)
+                    except ConflictoVersion as e:
+                        raise HTTPException(
+                            status_code=status.HTTP_409_CONFLICT,
+                            detail=f"El instrumento {instrumento_id} fue modificado por otra petición (versión actual {e.version_actual})"
+                        )
+                for nuevo in cambios.agregar:
+                    self.instrumentos_repo.create(nuevo, musico_id)
+            
+            db_musico = self.musicos_repo.get_by_id_with_relationships(musico_id)
+            return self._musico_to_response(db_musico)
+            
+        except HTTPException:
+            raise
+        except ConflictoVersion as e:
+            raise conflicto_version(e, codigo_conflicto)
         except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
+        except IntegrityError as e:
+            self._conflicto_email(e)
+            if "uk_musico_instrumento" in str(e):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Este músico ya tiene registrado este instrumento. No se pueden tener instrumentos duplicados."
+                )
+            raise
+    
+    def _conflicto_email(self, error: IntegrityError) -> None:
+        """
+        La validación previa no ve altas concurrentes (ni bits perdidos del filtro):
+        el índice único sobre lower(email) decide y su violación es un 409.
+        """
+        if "uk_musicos_email" in str(error):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El email ya está registrado por otro músico"
+            )
     
     def delete_musico(self, musico_id: UUID) -> dict:
         """Eliminar un músico (soft delete)"""
@@ -131,6 +294,34 @@ class MusicosService:
             )
         return {"message": "Músico eliminado correctamente"}
     
+    def restaurar_musico(self, musico_id: UUID) -> MusicoResponse:
+        """Devolver un músico archivado (y sus instrumentos) a las tablas vivas"""
+        try:
+            restaurado = self.archivo_repo.restaurar(musico_id)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+        if not restaurado:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Músico archivado no encontrado"
+            )
+        return self.get_musico(musico_id)
+    
+    def archivar_eliminados(self, dias: int, lote: int) -> Optional[int]:
+        """
+        Encolar el archivado de los músicos eliminados hace más de `dias` días, de a
+        `lote` músicos por trabajo. None si ya había un archivado pendiente.
+        """
+        antes_de = datetime.now(timezone.utc) - timedelta(days=dias)
+        trabajo_id = encolar(
+            self.db, ARCHIVAR_ELIMINADOS, {"antes_de": antes_de, "lote": lote}, clave=ARCHIVAR_ELIMINADOS
+        )
+        self.db.commit()
+        return trabajo_id
+    
     def search_musicos(self, nombre: str, skip: int = 0, limit: int = 100) -> List[MusicoResponse]:
         """Buscar músicos por nombre"""
         if limit > 100:
@@ -176,6 +367,8 @@ class MusicosService:
             )
             
             self.db.add(db_instrumento)
+            self.db.flush()
+            record_change(self.db, "instrumento_musico", "creado", db_instrumento)
             self.db.commit()
             self.db.refresh(db_instrumento)
             
@@ -236,6 +429,7 @@ class MusicosService:
         try:
             # Eliminar el instrumento de la base de datos
             self.db.delete(instrumento_musico)
+            record_change(self.db, "instrumento_musico", "eliminado", instrumento_musico)
             self.db.commit()
             
             return {"message": "Instrumento eliminado correctamente"}
@@ -248,53 +442,28 @@ class MusicosService:
                 detail="Error interno del servidor"
             )
     
-    def update_instrumento_musico(self, instrumento_id: UUID, instrumento_data: InstrumentoMusicoUpdate) -> InstrumentoMusicoResponse:
-        """Actualizar un instrumento específico de un músico"""
+    def update_instrumento_musico(self, instrumento_id: UUID, instrumento_data: InstrumentoMusicoUpdate,
+                                  if_match: Optional[str] = None) -> InstrumentoMusicoResponse:
+        """
+        Actualizar un instrumento específico de un músico con un solo UPDATE condicional.
+        Un instrumento duplicado lo rechaza uk_musico_instrumento (409); una versión vieja, 412/409.
+        """
+        version, codigo_conflicto = version_esperada(if_match, instrumento_data.version)
         try:
-            # Buscar el instrumento directamente por su ID
-            from app.models.musicos import InstrumentoMusico
-            instrumento_musico = self.db.query(InstrumentoMusico).filter(InstrumentoMusico.id == instrumento_id).first()
-            
+            instrumento_musico = self.instrumentos_repo.update(instrumento_id, instrumento_data, version)
             if not instrumento_musico:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Instrumento no encontrado"
                 )
             
-            # Verificar si se intenta cambiar el instrumento_id y si ya existe esa combinación
-            if instrumento_data.instrumento_id is not None and instrumento_data.instrumento_id != instrumento_musico.instrumento_id:
-                # Verificar que no exista ya esta combinación músico-instrumento
-                existing = self.db.query(InstrumentoMusico).filter(
-                    InstrumentoMusico.musico_id == instrumento_musico.musico_id,
-                    InstrumentoMusico.instrumento_id == instrumento_data.instrumento_id,
-                    InstrumentoMusico.id != instrumento_id  # Excluir el instrumento actual
-                ).first()
-                
-                if existing:
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail="Este músico ya tiene registrado este instrumento. No se pueden tener instrumentos duplicados."
-                    )
-            
-            # Actualizar los campos que se proporcionan
-            if instrumento_data.instrumento_id is not None:
-                instrumento_musico.instrumento_id = instrumento_data.instrumento_id
-            if instrumento_data.nivel_id is not None:
-                instrumento_musico.nivel_id = instrumento_data.nivel_id
-            if instrumento_data.es_principal is not None:
-                instrumento_musico.es_principal = instrumento_data.es_principal
-            if instrumento_data.fecha_inicio is not None:
-                instrumento_musico.fecha_inicio = instrumento_data.fecha_inicio
-            if instrumento_data.notas is not None:
-                instrumento_musico.notas = instrumento_data.notas
-            
-            self.db.commit()
-            self.db.refresh(instrumento_musico)
-            
             return self._instrumento_to_response_with_details(instrumento_musico)
             
         except HTTPException:
             raise
+        except ConflictoVersion as e:
+            self.db.rollback()
+            raise conflicto_version(e, codigo_conflicto)
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error actualizando instrumento {instrumento_id}: {e}")
@@ -333,6 +502,15 @@ class MusicosService:
     
     # ==================== MÉTODOS PRIVADOS ====================
     
+    def _musico_proyectado(self, musico: Musico, proyeccion: Optional[Proyeccion]) -> Union[MusicoResponse, dict]:
+        """Respuesta completa, o solo los campos y relaciones pedidos por la proyección"""
+        if proyeccion is None or proyeccion.completa:
+            return self._musico_to_response(musico)
+        return proyeccion.recortar(musico, {
+            "estado": lambda m: EstadoMusicoResponse.model_validate(m.estado),
+            "instrumentos": lambda m: [self._instrumento_to_response_with_details(inst) for inst in m.instrumentos],
+        })
+    
     def _musico_to_response(self, musico: Musico) -> MusicoResponse:
         """Convertir modelo de músico a response schema"""
         instrumentos = [self._instrumento_to_response_with_details(inst) for inst in musico.instrumentos] if musico.instrumentos else []
@@ -348,7 +526,8 @@ class MusicosService:
             url_foto_perfil=musico.url_foto_perfil,
             creado_en=musico.creado_en,
             actualizado_en=musico.actualizado_en,
-            eliminado_en=musico.eliminado_en
+            eliminado_en=musico.eliminado_en,
+            version=musico.version
         )
     
     def _instrumento_to_response(self, instrumento: InstrumentoMusico) -> InstrumentoMusicoResponse:
@@ -360,8 +539,8 @@ class MusicosService:
         # Crear el response base con los datos del InstrumentoMusico
         response_data = InstrumentoMusicoResponse.model_validate(instrumento)
         
-        # Cargar información del instrumento desde el catálogo
-        instrumento_detalle = self.catalogo_instrumentos_repo.get_by_id(instrumento.instrumento_id)
+        # Cargar información del instrumento desde el catálogo (en caché)
+        instrumento_detalle = catalog_cache.get_instrumento(self.db, instrumento.instrumento_id)
         if instrumento_detalle:
             response_data.instrumento = InstrumentoResponse.model_validate(instrumento_detalle)
         
@@ -0,0 +1,35 @@
+from sqlalchemy.orm import Session
+import logging
+
+from app.core.catalog_cache import catalog_cache
+from app.core.filtro_emails import filtro_emails
+from app.core.change_feed import Cambio, ChangeFeedDispatcher
+
+logger = logging.getLogger(__name__)
+
+
+def invalidar_cache_catalogo(cambio: Cambio, db: Session) -> None:
+    """Un worker modificó el catálogo de instrumentos: descartar la copia local"""
+    catalog_cache.invalidate()
+
+
+def marcar_email_registrado(cambio: Cambio, db: Session) -> None:
+    """Altas y cambios de email hechos en otros workers: mantener el filtro local al día"""
+    if cambio.operacion in ("creado", "actualizado", "restaurado") and cambio.datos.get("email"):
+        filtro_emails.agregar(cambio.datos["email"])
+
+
+def registrar_suscriptores(dispatcher: ChangeFeedDispatcher) -> None:
+    """Registrar los consumidores en proceso del servicio de músicos"""
+    dispatcher.subscribe(
+        "musicos.cache_catalogo",
+        invalidar_cache_catalogo,
+        agregados={"instrumento"},
+        durable=False
+    )
+    dispatcher.subscribe(
+        "musicos.filtro_emails",
+        marcar_email_registrado,
+        agregados={"musico"},
+        durable=False
+    )
@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+import logging
+
+from app.core.trabajos import TrabajosRunner, encolar
+from app.repositories.archivo_repository import ArchivoMusicosRepository
+
+logger = logging.getLogger(__name__)
+
+# Tipos de trabajo del servicio de músicos
+ARCHIVAR_ELIMINADOS = "musicos.archivar_eliminados"
+
+
+def archivar_eliminados(datos: dict, db: Session) -> None:
+    """Archivar un lote de músicos eliminados; si quedan más, encolar el siguiente lote"""
+    antes_de = datetime.fromisoformat(datos["antes_de"])
+    archivados = ArchivoMusicosRepository(db).archivar_lote(antes_de, datos["lote"])
+    logger.info(f"Archivado en segundo plano: {archivados} músicos eliminados antes de {antes_de:%Y-%m-%d}")
+    if archivados == datos["lote"]:
+        # Un lote por trabajo: los demás trabajos no esperan detrás de un archivado largo
+        encolar(db, ARCHIVAR_ELIMINADOS, datos, clave=ARCHIVAR_ELIMINADOS)
+
+
+def registrar_trabajos(runner: TrabajosRunner) -> None:
+    """Registrar los tipos de trabajo en segundo plano del servicio de músicos"""
+    runner.registrar(ARCHIVAR_ELIMINADOS, archivar_eliminados)
@@ -0,0 +1,72 @@
+"""
+Perfil de producción del servicio: N workers de uvicorn con el presupuesto de
+conexiones a PostgreSQL repartido entre ellos.
+
+Cada worker importa la aplicación por su cuenta y la calienta en el lifespan
+(pool lleno, mappers, catálogos) antes de aceptar conexiones. Con SIGTERM deja
+de aceptar, termina las solicitudes en curso (hasta --drenado segundos) y cierra
+el engine.
+
+Uso (desde backend/services/musicos):
+    python -m app.servidor --workers 4 --conexiones 40
+"""
+import argparse
+import logging
+import os
+import sys
+
+import uvicorn
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.workers, help="Procesos worker")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--conexiones", type=int, default=settings.db_conexiones_total,
+                        help="Conexiones a PostgreSQL para todos los workers juntos")
+    parser.add_argument("--keep-alive", type=int, default=5, help="Segundos de keep-alive HTTP")
+    parser.add_argument("--backlog", type=int, default=2048, help="Cola de conexiones pendientes del socket")
+    parser.add_argument("--limite-concurrencia", type=int, help="Conexiones simultáneas por worker antes de responder 503")
+    parser.add_argument("--drenado", type=int, default=30, help="Segundos para terminar las solicitudes en curso tras SIGTERM")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+    if args.conexiones is not None and args.conexiones < args.workers:
+        parser.error("--conexiones debe alcanzar para al menos una conexión por worker")
+
+    # Los workers leen la configuración del entorno. Con --workers 1 uvicorn importa
+    # la app en este mismo proceso: descartar la configuración ya leída para los defaults
+    os.environ["WORKERS"] = str(args.workers)
+    if args.conexiones is not None:
+        os.environ["DB_CONEXIONES_TOTAL"] = str(args.conexiones)
+    get_settings.cache_clear()
+    pool_size, max_overflow = get_settings().pool_por_worker()
+    logger.info(
+        f"{args.workers} workers en {args.host}:{args.port}; "
+        f"pool por worker: {pool_size} + {max_overflow} de overflow"
+    )
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        limit_concurrency=args.limite_concurrencia,
+        timeout_graceful_shutdown=args.drenado,
+        proxy_headers=True,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
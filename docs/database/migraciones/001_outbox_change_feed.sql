@@ -0,0 +1,58 @@
+-- Migración 001: outbox transaccional y offsets de consumidores del change feed
+-- Las escrituras de cada servicio agregan una fila al outbox de su esquema en la
+-- misma transacción y emiten NOTIFY <esquema>_cambios al confirmar.
+
+-- =====================================================
+-- ESQUEMA: servicio_eventos
+-- =====================================================
+
+SET search_path TO servicio_eventos;
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id BIGSERIAL PRIMARY KEY,
+    agregado VARCHAR(50) NOT NULL,
+    agregado_id VARCHAR(64) NOT NULL,
+    operacion VARCHAR(20) NOT NULL,
+    datos JSONB NOT NULL DEFAULT '{}',
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS outbox_offsets (
+    consumidor VARCHAR(100) NOT NULL,
+    origen VARCHAR(63) NOT NULL,
+    ultimo_id BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (consumidor, origen)
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_creado_en ON outbox(creado_en);
+
+-- =====================================================
+-- ESQUEMA: servicio_musicos
+-- =====================================================
+
+SET search_path TO servicio_musicos;
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id BIGSERIAL PRIMARY KEY,
+    agregado VARCHAR(50) NOT NULL,
+    agregado_id VARCHAR(64) NOT NULL,
+    operacion VARCHAR(20) NOT NULL,
+    datos JSONB NOT NULL DEFAULT '{}',
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS outbox_offsets (
+    consumidor VARCHAR(100) NOT NULL,
+    origen VARCHAR(63) NOT NULL,
+    ultimo_id BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (consumidor, origen)
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_creado_en ON outbox(creado_en);
+
+COMMENT ON TABLE servicio_eventos.outbox IS 'Cambios confirmados del servicio de eventos para el change feed';
+COMMENT ON TABLE servicio_musicos.outbox IS 'Cambios confirmados del servicio de músicos para el change feed';
+COMMENT ON TABLE servicio_eventos.outbox_offsets IS 'Último cambio procesado por cada consumidor durable';
+COMMENT ON TABLE servicio_musicos.outbox_offsets IS 'Último cambio procesado por cada consumidor durable';
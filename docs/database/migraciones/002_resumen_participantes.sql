@@ -0,0 +1,33 @@
+-- Migración 002: read model de conteos de participantes por evento
+-- Se mantiene de forma incremental desde ParticipantesEventoRepository; para
+-- reconstruirlo o verificarlo: python -m app.commands.resumen_participantes rebuild|check
+
+SET search_path TO servicio_eventos;
+
+CREATE TABLE IF NOT EXISTS resumen_participantes_evento (
+    evento_id UUID PRIMARY KEY,
+    conteos JSONB NOT NULL DEFAULT '{}', -- código de estado de participante -> cantidad
+    total INTEGER NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_resumen_participantes_evento FOREIGN KEY (evento_id) REFERENCES eventos(id) ON DELETE CASCADE
+);
+
+-- Carga inicial desde los participantes existentes
+INSERT INTO resumen_participantes_evento (evento_id, conteos, total, version)
+SELECT e.id,
+       COALESCE(jsonb_object_agg(c.codigo, c.cantidad) FILTER (WHERE c.codigo IS NOT NULL), '{}'::jsonb),
+       COALESCE(SUM(c.cantidad), 0)::int,
+       1
+FROM eventos e
+LEFT JOIN (
+    SELECT pe.evento_id, ep.codigo, COUNT(*)::int AS cantidad
+    FROM participantes_evento pe
+    JOIN cat_estados_participante ep ON ep.id = pe.estado_id
+    GROUP BY pe.evento_id, ep.codigo
+) c ON c.evento_id = e.id
+WHERE e.eliminado_en IS NULL
+GROUP BY e.id
+ON CONFLICT (evento_id) DO NOTHING;
+
+COMMENT ON TABLE servicio_eventos.resumen_participantes_evento IS 'Conteos de participantes por estado para cada evento (read model)';
@@ -0,0 +1,18 @@
+-- Migración 003: índice de calendario para consultas por rango de fechas
+-- GET /eventos?desde=&hasta=&tipo=&estado= y /eventos/calendario.ics filtran y
+-- paginan (keyset) sobre (fecha_presentacion, id); con tipo_id y estado_id
+-- incluidos el plan es un index-only scan sobre los eventos activos.
+-- CREATE/DROP INDEX CONCURRENTLY no pueden ir dentro de una transacción.
+
+SET search_path TO servicio_eventos;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_eventos_calendario
+    ON eventos(fecha_presentacion, id) INCLUDE (tipo_id, estado_id)
+    WHERE eliminado_en IS NULL;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_eventos_fecha_presentacion;
+
+ALTER INDEX idx_eventos_calendario RENAME TO idx_eventos_fecha_presentacion;
+
+-- Mantener el mapa de visibilidad al día para que los index-only scans no consulten el heap
+VACUUM (ANALYZE) eventos;
@@ -0,0 +1,94 @@
+-- Migración 004: índices parciales sobre filas vivas y archivo en frío de eliminados
+-- Todas las lecturas filtran eliminado_en IS NULL; los índices de email, estado y
+-- tipo pasan a cubrir solo las filas vivas. Las tablas *_archivo reciben las filas
+-- eliminadas hace más de N días: python -m app.commands.archivo archivar
+-- CREATE/DROP INDEX CONCURRENTLY no pueden ir dentro de una transacción.
+
+-- ==================== servicio_musicos ====================
+
+SET search_path TO servicio_musicos;
+
+CREATE TABLE IF NOT EXISTS musicos_archivo (
+    id UUID PRIMARY KEY,
+    email VARCHAR(255) NOT NULL,
+    nombre VARCHAR(255) NOT NULL,
+    telefono VARCHAR(50),
+    fecha_ingreso TIMESTAMPTZ,
+    estado_id INTEGER NOT NULL,
+    url_foto_perfil TEXT,
+    creado_en TIMESTAMPTZ,
+    actualizado_en TIMESTAMPTZ,
+    eliminado_en TIMESTAMPTZ NOT NULL,
+    archivado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS instrumentos_musico_archivo (
+    id UUID PRIMARY KEY,
+    musico_id UUID NOT NULL,
+    instrumento_id INTEGER NOT NULL,
+    nivel_id INTEGER NOT NULL,
+    es_principal BOOLEAN DEFAULT false,
+    fecha_inicio DATE,
+    notas TEXT,
+    archivado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_instrumentos_musico_archivo FOREIGN KEY (musico_id) REFERENCES musicos_archivo(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_instrumentos_musico_archivo_musico ON instrumentos_musico_archivo(musico_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_musicos_eliminado_en
+    ON musicos(eliminado_en) WHERE eliminado_en IS NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_musicos_email_vivos ON musicos(email) WHERE eliminado_en IS NULL;
+DROP INDEX CONCURRENTLY IF EXISTS idx_musicos_email;
+ALTER INDEX idx_musicos_email_vivos RENAME TO idx_musicos_email;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_musicos_estado_vivos ON musicos(estado_id) WHERE eliminado_en IS NULL;
+DROP INDEX CONCURRENTLY IF EXISTS idx_musicos_estado;
+ALTER INDEX idx_musicos_estado_vivos RENAME TO idx_musicos_estado;
+
+COMMENT ON TABLE servicio_musicos.musicos_archivo IS 'Músicos eliminados movidos fuera de la tabla caliente (restaurables)';
+
+-- ==================== servicio_eventos ====================
+
+SET search_path TO servicio_eventos;
+
+CREATE TABLE IF NOT EXISTS eventos_archivo (
+    id UUID PRIMARY KEY,
+    nombre VARCHAR(255) NOT NULL,
+    descripcion TEXT,
+    tipo_id INTEGER NOT NULL,
+    lugar VARCHAR(255),
+    fecha_presentacion TIMESTAMPTZ NOT NULL,
+    estado_id INTEGER NOT NULL,
+    creado_por UUID NOT NULL,
+    creado_en TIMESTAMPTZ,
+    actualizado_en TIMESTAMPTZ,
+    eliminado_en TIMESTAMPTZ NOT NULL,
+    archivado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS participantes_evento_archivo (
+    id UUID PRIMARY KEY,
+    evento_id UUID NOT NULL,
+    musico_id UUID NOT NULL,
+    estado_id INTEGER NOT NULL,
+    unido_en TIMESTAMPTZ,
+    archivado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_participantes_evento_archivo FOREIGN KEY (evento_id) REFERENCES eventos_archivo(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_participantes_evento_archivo_evento ON participantes_evento_archivo(evento_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_eventos_eliminado_en
+    ON eventos(eliminado_en) WHERE eliminado_en IS NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_eventos_estado_vivos ON eventos(estado_id) WHERE eliminado_en IS NULL;
+DROP INDEX CONCURRENTLY IF EXISTS idx_eventos_estado;
+ALTER INDEX idx_eventos_estado_vivos RENAME TO idx_eventos_estado;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_eventos_tipo_vivos ON eventos(tipo_id) WHERE eliminado_en IS NULL;
+DROP INDEX CONCURRENTLY IF EXISTS idx_eventos_tipo;
+ALTER INDEX idx_eventos_tipo_vivos RENAME TO idx_eventos_tipo;
+
+COMMENT ON TABLE servicio_eventos.eventos_archivo IS 'Eventos eliminados movidos fuera de la tabla caliente (restaurables)';
@@ -0,0 +1,19 @@
+-- Migración 005: unicidad de email sin distinguir mayúsculas
+-- `Foo@gmail.com` y `foo@gmail.com` pasaban como emails distintos. El índice único
+-- sobre lower(email) entre músicos vivos reemplaza a la restricción UNIQUE(email)
+-- (que además impedía volver a registrar el email de un músico eliminado) y al
+-- índice idx_musicos_email: get_by_email compara lower(email).
+-- CREATE/DROP INDEX CONCURRENTLY no pueden ir dentro de una transacción.
+--
+-- Si la creación del índice falla por duplicados, listarlos y resolverlos antes:
+--   SELECT lower(email), array_agg(id) FROM servicio_musicos.musicos
+--   WHERE eliminado_en IS NULL GROUP BY 1 HAVING count(*) > 1;
+
+SET search_path TO servicio_musicos;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uk_musicos_email
+    ON musicos(lower(email)) WHERE eliminado_en IS NULL;
+
+ALTER TABLE musicos DROP CONSTRAINT IF EXISTS musicos_email_key;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_musicos_email;
@@ -0,0 +1,22 @@
+-- Migración 006: columna version para concurrencia optimista
+-- Las actualizaciones de músicos, instrumentos de músico y eventos se compilan a
+-- UPDATE ... WHERE id = :id AND version = :v RETURNING ... y suben la versión;
+-- la API la expone como ETag y la compara con If-Match (412) o con el campo
+-- `version` del cuerpo (409). Las tablas *_archivo la conservan al archivar.
+-- ADD COLUMN con un DEFAULT constante no reescribe la tabla (PostgreSQL 11+).
+
+-- ==================== servicio_musicos ====================
+
+SET search_path TO servicio_musicos;
+
+ALTER TABLE musicos ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+ALTER TABLE instrumentos_musico ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+ALTER TABLE musicos_archivo ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+ALTER TABLE instrumentos_musico_archivo ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+
+-- ==================== servicio_eventos ====================
+
+SET search_path TO servicio_eventos;
+
+ALTER TABLE eventos ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+ALTER TABLE eventos_archivo ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
@@ -0,0 +1,35 @@
+-- Migración 007: respuestas guardadas por Idempotency-Key
+-- Los POST de altas con el encabezado Idempotency-Key reclaman la clave (fila sin
+-- estado_http), se procesan y guardan su respuesta; los reintentos con la misma
+-- clave la reciben sin volver a ejecutar la lógica de negocio. Las filas vencen
+-- en expira_en (python -m app.commands.idempotencia las purga).
+
+-- ==================== servicio_musicos ====================
+
+SET search_path TO servicio_musicos;
+
+CREATE TABLE IF NOT EXISTS idempotencia (
+    clave VARCHAR(255) PRIMARY KEY,
+    huella VARCHAR(64) NOT NULL,
+    estado_http SMALLINT,
+    encabezados JSONB NOT NULL DEFAULT '{}',
+    cuerpo BYTEA,
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    expira_en TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_idempotencia_expira_en ON idempotencia(expira_en);
+
+-- ==================== servicio_eventos ====================
+
+SET search_path TO servicio_eventos;
+
+CREATE TABLE IF NOT EXISTS idempotencia (
+    clave VARCHAR(255) PRIMARY KEY,
+    huella VARCHAR(64) NOT NULL,
+    estado_http SMALLINT,
+    encabezados JSONB NOT NULL DEFAULT '{}',
+    cuerpo BYTEA,
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    expira_en TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_idempotencia_expira_en ON idempotencia(expira_en);
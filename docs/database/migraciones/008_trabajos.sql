@@ -0,0 +1,45 @@
+-- Migración 008: cola de trabajos en segundo plano
+-- Los servicios encolan trabajo diferido (archivado, recálculo del resumen de
+-- participantes) en la transacción de la escritura; un pool de tareas en cada
+-- worker los toma con FOR UPDATE SKIP LOCKED. Los trabajos completados se
+-- borran; los que agotan sus intentos quedan con estado 'fallido'.
+
+-- ==================== servicio_musicos ====================
+
+SET search_path TO servicio_musicos;
+
+CREATE TABLE IF NOT EXISTS trabajos (
+    id BIGSERIAL PRIMARY KEY,
+    tipo VARCHAR(100) NOT NULL,
+    datos JSONB NOT NULL DEFAULT '{}',
+    clave VARCHAR(255),
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    intentos SMALLINT NOT NULL DEFAULT 0,
+    max_intentos SMALLINT NOT NULL DEFAULT 5,
+    disponible_en TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_error TEXT,
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_trabajos_disponibles ON trabajos(disponible_en) WHERE estado <> 'fallido';
+CREATE UNIQUE INDEX IF NOT EXISTS uk_trabajos_clave_pendiente ON trabajos(clave) WHERE estado = 'pendiente';
+
+-- ==================== servicio_eventos ====================
+
+SET search_path TO servicio_eventos;
+
+CREATE TABLE IF NOT EXISTS trabajos (
+    id BIGSERIAL PRIMARY KEY,
+    tipo VARCHAR(100) NOT NULL,
+    datos JSONB NOT NULL DEFAULT '{}',
+    clave VARCHAR(255),
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    intentos SMALLINT NOT NULL DEFAULT 0,
+    max_intentos SMALLINT NOT NULL DEFAULT 5,
+    disponible_en TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_error TEXT,
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_trabajos_disponibles ON trabajos(disponible_en) WHERE estado <> 'fallido';
+CREATE UNIQUE INDEX IF NOT EXISTS uk_trabajos_clave_pendiente ON trabajos(clave) WHERE estado = 'pendiente';
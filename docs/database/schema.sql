@@ -66,6 +66,7 @@ CREATE TABLE eventos (
     creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     eliminado_en TIMESTAMPTZ,
+    version BIGINT NOT NULL DEFAULT 1, -- concurrencia optimista: UPDATE ... WHERE version = :v
     CONSTRAINT fk_evento_tipo FOREIGN KEY (tipo_id) REFERENCES cat_tipos_evento(id),
     CONSTRAINT fk_evento_estado FOREIGN KEY (estado_id) REFERENCES cat_estados_evento(id)
 );
@@ -82,6 +83,88 @@ CREATE TABLE participantes_evento (
     CONSTRAINT uk_evento_musico UNIQUE(evento_id, musico_id)
 );
 
+-- Read model: conteos de participantes por estado de cada evento
+CREATE TABLE resumen_participantes_evento (
+    evento_id UUID PRIMARY KEY,
+    conteos JSONB NOT NULL DEFAULT '{}', -- código de estado de participante -> cantidad
+    total INTEGER NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_resumen_participantes_evento FOREIGN KEY (evento_id) REFERENCES eventos(id) ON DELETE CASCADE
+);
+
+-- Outbox transaccional para el change feed (NOTIFY servicio_eventos_cambios)
+CREATE TABLE outbox (
+    id BIGSERIAL PRIMARY KEY,
+    agregado VARCHAR(50) NOT NULL,
+    agregado_id VARCHAR(64) NOT NULL,
+    operacion VARCHAR(20) NOT NULL,
+    datos JSONB NOT NULL DEFAULT '{}',
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Offsets de los consumidores durables del change feed
+CREATE TABLE outbox_offsets (
+    consumidor VARCHAR(100) NOT NULL,
+    origen VARCHAR(63) NOT NULL,
+    ultimo_id BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (consumidor, origen)
+);
+
+-- Respuestas guardadas por Idempotency-Key (estado_http NULL: solicitud original en curso)
+CREATE TABLE idempotencia (
+    clave VARCHAR(255) PRIMARY KEY,
+    huella VARCHAR(64) NOT NULL,
+    estado_http SMALLINT,
+    encabezados JSONB NOT NULL DEFAULT '{}',
+    cuerpo BYTEA,
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    expira_en TIMESTAMPTZ NOT NULL
+);
+
+-- Cola de trabajos en segundo plano (completados se borran; estado 'fallido' al agotar intentos)
+CREATE TABLE trabajos (
+    id BIGSERIAL PRIMARY KEY,
+    tipo VARCHAR(100) NOT NULL,
+    datos JSONB NOT NULL DEFAULT '{}',
+    clave VARCHAR(255),
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    intentos SMALLINT NOT NULL DEFAULT 0,
+    max_intentos SMALLINT NOT NULL DEFAULT 5,
+    disponible_en TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_error TEXT,
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Archivo en frío de eventos eliminados hace más de N días (python -m app.commands.archivo)
+CREATE TABLE eventos_archivo (
+    id UUID PRIMARY KEY,
+    nombre VARCHAR(255) NOT NULL,
+    descripcion TEXT,
+    tipo_id INTEGER NOT NULL,
+    lugar VARCHAR(255),
+    fecha_presentacion TIMESTAMPTZ NOT NULL,
+    estado_id INTEGER NOT NULL,
+    creado_por UUID NOT NULL,
+    creado_en TIMESTAMPTZ,
+    actualizado_en TIMESTAMPTZ,
+    eliminado_en TIMESTAMPTZ NOT NULL,
+    version BIGINT NOT NULL DEFAULT 1,
+    archivado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE participantes_evento_archivo (
+    id UUID PRIMARY KEY,
+    evento_id UUID NOT NULL,
+    musico_id UUID NOT NULL,
+    estado_id INTEGER NOT NULL,
+    unido_en TIMESTAMPTZ,
+    archivado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_participantes_evento_archivo FOREIGN KEY (evento_id) REFERENCES eventos_archivo(id) ON DELETE CASCADE
+);
+
 -- Datos iniciales para catálogos
 INSERT INTO cat_tipos_evento (codigo, nombre, descripcion, orden) VALUES
     ('concierto', 'Concierto', 'Presentación musical en vivo', 1),
@@ -101,11 +184,20 @@ INSERT INTO cat_estados_participante (codigo, nombre, descripcion, orden) VALUES
     ('rechazado', 'Rechazado', 'Invitación rechazada', 3);
 
 -- Índices para servicio de eventos
-CREATE INDEX idx_eventos_fecha_presentacion ON eventos(fecha_presentacion);
-CREATE INDEX idx_eventos_estado ON eventos(estado_id);
-CREATE INDEX idx_eventos_tipo ON eventos(tipo_id);
+-- Rangos de fecha (con filtros de tipo/estado y paginación keyset) como index-only scans
+CREATE INDEX idx_eventos_fecha_presentacion ON eventos(fecha_presentacion, id) INCLUDE (tipo_id, estado_id) WHERE eliminado_en IS NULL;
+-- Las lecturas filtran eliminado_en IS NULL: los índices parciales no cargan con las filas eliminadas
+CREATE INDEX idx_eventos_estado ON eventos(estado_id) WHERE eliminado_en IS NULL;
+CREATE INDEX idx_eventos_tipo ON eventos(tipo_id) WHERE eliminado_en IS NULL;
+-- Candidatos del archivado en frío
+CREATE INDEX idx_eventos_eliminado_en ON eventos(eliminado_en) WHERE eliminado_en IS NOT NULL;
 CREATE INDEX idx_participantes_evento_evento ON participantes_evento(evento_id);
 CREATE INDEX idx_participantes_evento_musico ON participantes_evento(musico_id);
+CREATE INDEX idx_participantes_evento_archivo_evento ON participantes_evento_archivo(evento_id);
+CREATE INDEX idx_outbox_creado_en ON outbox(creado_en);
+CREATE INDEX idx_idempotencia_expira_en ON idempotencia(expira_en);
+CREATE INDEX idx_trabajos_disponibles ON trabajos(disponible_en) WHERE estado <> 'fallido';
+CREATE UNIQUE INDEX uk_trabajos_clave_pendiente ON trabajos(clave) WHERE estado = 'pendiente';
 
 -- =====================================================
 -- ESQUEMA: servicio_canciones
@@ -348,7 +440,7 @@ CREATE TABLE cat_estados_musico (
 -- Tabla de músicos
 CREATE TABLE musicos (
     id UUID PRIMARY KEY DEFAULT public.uuid_generate_v4(),
-    email VARCHAR(255) NOT NULL UNIQUE,
+    email VARCHAR(255) NOT NULL, -- único sin distinguir mayúsculas entre músicos vivos (uk_musicos_email)
     nombre VARCHAR(255) NOT NULL,
     telefono VARCHAR(50),
     fecha_ingreso TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
@@ -357,6 +449,7 @@ CREATE TABLE musicos (
     creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     eliminado_en TIMESTAMPTZ,
+    version BIGINT NOT NULL DEFAULT 1, -- concurrencia optimista: UPDATE ... WHERE version = :v
     CONSTRAINT fk_musico_estado FOREIGN KEY (estado_id) REFERENCES cat_estados_musico(id)
 );
 
@@ -369,6 +462,7 @@ CREATE TABLE instrumentos_musico (
     es_principal BOOLEAN DEFAULT false,
     fecha_inicio DATE,
     notas TEXT,
+    version BIGINT NOT NULL DEFAULT 1,
     CONSTRAINT fk_instrumentos_musico FOREIGN KEY (musico_id) REFERENCES musicos(id) ON DELETE CASCADE,
     CONSTRAINT uk_musico_instrumento UNIQUE(musico_id, instrumento_id)
 );
@@ -384,6 +478,80 @@ CREATE TABLE cat_instrumentos (
     orden INTEGER DEFAULT 1
 );
 
+-- Outbox transaccional para el change feed (NOTIFY servicio_musicos_cambios)
+CREATE TABLE outbox (
+    id BIGSERIAL PRIMARY KEY,
+    agregado VARCHAR(50) NOT NULL,
+    agregado_id VARCHAR(64) NOT NULL,
+    operacion VARCHAR(20) NOT NULL,
+    datos JSONB NOT NULL DEFAULT '{}',
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Offsets de los consumidores durables del change feed
+CREATE TABLE outbox_offsets (
+    consumidor VARCHAR(100) NOT NULL,
+    origen VARCHAR(63) NOT NULL,
+    ultimo_id BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (consumidor, origen)
+);
+
+-- Respuestas guardadas por Idempotency-Key (estado_http NULL: solicitud original en curso)
+CREATE TABLE idempotencia (
+    clave VARCHAR(255) PRIMARY KEY,
+    huella VARCHAR(64) NOT NULL,
+    estado_http SMALLINT,
+    encabezados JSONB NOT NULL DEFAULT '{}',
+    cuerpo BYTEA,
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    expira_en TIMESTAMPTZ NOT NULL
+);
+
+-- Cola de trabajos en segundo plano (completados se borran; estado 'fallido' al agotar intentos)
+CREATE TABLE trabajos (
+    id BIGSERIAL PRIMARY KEY,
+    tipo VARCHAR(100) NOT NULL,
+    datos JSONB NOT NULL DEFAULT '{}',
+    clave VARCHAR(255),
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    intentos SMALLINT NOT NULL DEFAULT 0,
+    max_intentos SMALLINT NOT NULL DEFAULT 5,
+    disponible_en TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_error TEXT,
+    creado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    actualizado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Archivo en frío de músicos eliminados hace más de N días (python -m app.commands.archivo)
+CREATE TABLE musicos_archivo (
+    id UUID PRIMARY KEY,
+    email VARCHAR(255) NOT NULL,
+    nombre VARCHAR(255) NOT NULL,
+    telefono VARCHAR(50),
+    fecha_ingreso TIMESTAMPTZ,
+    estado_id INTEGER NOT NULL,
+    url_foto_perfil TEXT,
+    creado_en TIMESTAMPTZ,
+    actualizado_en TIMESTAMPTZ,
+    eliminado_en TIMESTAMPTZ NOT NULL,
+    version BIGINT NOT NULL DEFAULT 1,
+    archivado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE instrumentos_musico_archivo (
+    id UUID PRIMARY KEY,
+    musico_id UUID NOT NULL,
+    instrumento_id INTEGER NOT NULL,
+    nivel_id INTEGER NOT NULL,
+    es_principal BOOLEAN DEFAULT false,
+    fecha_inicio DATE,
+    notas TEXT,
+    version BIGINT NOT NULL DEFAULT 1,
+    archivado_en TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_instrumentos_musico_archivo FOREIGN KEY (musico_id) REFERENCES musicos_archivo(id) ON DELETE CASCADE
+);
+
 
 -- Datos iniciales para catálogos
 INSERT INTO cat_estados_musico (codigo, nombre, descripcion, orden) VALUES
@@ -392,9 +560,18 @@ INSERT INTO cat_estados_musico (codigo, nombre, descripcion, orden) VALUES
     ('retirado', 'Retirado', 'Ya no forma parte de la banda', 3);
 
 -- Índices para servicio de músicos
-CREATE INDEX idx_musicos_email ON musicos(email);
-CREATE INDEX idx_musicos_estado ON musicos(estado_id);
+-- Unicidad de email sin distinguir mayúsculas entre músicos vivos; también resuelve get_by_email
+CREATE UNIQUE INDEX uk_musicos_email ON musicos(lower(email)) WHERE eliminado_en IS NULL;
+-- Las lecturas filtran eliminado_en IS NULL: los índices parciales no cargan con las filas eliminadas
+CREATE INDEX idx_musicos_estado ON musicos(estado_id) WHERE eliminado_en IS NULL;
+-- Candidatos del archivado en frío
+CREATE INDEX idx_musicos_eliminado_en ON musicos(eliminado_en) WHERE eliminado_en IS NOT NULL;
 CREATE INDEX idx_instrumentos_musico ON instrumentos_musico(musico_id);
+CREATE INDEX idx_instrumentos_musico_archivo_musico ON instrumentos_musico_archivo(musico_id);
+CREATE INDEX idx_outbox_creado_en ON outbox(creado_en);
+CREATE INDEX idx_idempotencia_expira_en ON idempotencia(expira_en);
+CREATE INDEX idx_trabajos_disponibles ON trabajos(disponible_en) WHERE estado <> 'fallido';
+CREATE UNIQUE INDEX uk_trabajos_clave_pendiente ON trabajos(clave) WHERE estado = 'pendiente';
 
 -- =====================================================
 -- ESQUEMA: servicio_disponibilidad
@@ -618,6 +795,13 @@ COMMENT ON TABLE servicio_ensayos.cat_estados_asistencia IS 'Catálogo de estado
 
 -- Comentarios para tablas principales
 COMMENT ON TABLE servicio_eventos.eventos IS 'Tabla principal de eventos musicales';
+COMMENT ON TABLE servicio_eventos.resumen_participantes_evento IS 'Conteos de participantes por estado para cada evento (read model)';
+COMMENT ON TABLE servicio_eventos.outbox IS 'Cambios confirmados del servicio de eventos para el change feed';
+COMMENT ON TABLE servicio_musicos.outbox IS 'Cambios confirmados del servicio de músicos para el change feed';
+COMMENT ON TABLE servicio_eventos.idempotencia IS 'Respuestas de altas reproducibles por Idempotency-Key';
+COMMENT ON TABLE servicio_musicos.idempotencia IS 'Respuestas de altas reproducibles por Idempotency-Key';
+COMMENT ON TABLE servicio_eventos.eventos_archivo IS 'Eventos eliminados movidos fuera de la tabla caliente (restaurables)';
+COMMENT ON TABLE servicio_musicos.musicos_archivo IS 'Músicos eliminados movidos fuera de la tabla caliente (restaurables)';
 COMMENT ON TABLE servicio_canciones.canciones IS 'Catálogo de canciones disponibles';
 COMMENT ON TABLE servicio_canciones.requisitos_cancion IS 'Instrumentos/roles requeridos para tocar cada canción';
 COMMENT ON TABLE servicio_ensayos.ensayos IS 'Ensayos programados para cada evento';
@@ -103,14 +103,15 @@ export class DashboardComponent implements OnInit {
 
   ngOnInit(): void {
     this.loadDashboardData();
+    this.loadProximosEventos();
     this.initChart();
   }
 
   loadDashboardData(): void {
-    this.eventosService.getEventos(0, 50).subscribe({
+    // Las estadísticas solo usan la fecha y el estado de cada evento
+    this.eventosService.getEventos(0, 50, ['fecha_presentacion', 'estado']).subscribe({
       next: (response) => {
         this.calculateStats(response.eventos);
-        this.proximosEventosList = this.getProximosEventos(response.eventos);
         this.loading = false;
       },
       error: (error) => {
@@ -120,6 +121,17 @@ export class DashboardComponent implements OnInit {
     });
   }
 
+  loadProximosEventos(): void {
+    this.eventosService.buscarEventos({ desde: new Date().toISOString(), limit: 10 }).subscribe({
+      next: (response) => {
+        this.proximosEventosList = this.getProximosEventos(response.eventos);
+      },
+      error: (error) => {
+        console.error('Error loading upcoming events:', error);
+      }
+    });
+  }
+
   calculateStats(eventos: Evento[]): void {
     const now = new Date();
     const thirtyDaysFromNow = new Date(now.getTime() + (30 * 24 * 60 * 60 * 1000));
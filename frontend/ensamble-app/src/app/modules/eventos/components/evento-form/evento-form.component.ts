@@ -51,6 +51,7 @@ export class EventoFormComponent implements OnInit {
   eventoForm: FormGroup;
   isEdit = false;
   eventoId: string | null = null;
+  eventoVersion?: number;
   submitting = false;
   loadingEvento = false;
 
@@ -146,6 +147,7 @@ export class EventoFormComponent implements OnInit {
   }
 
   populateForm(evento: Evento): void {
+    this.eventoVersion = evento.version;
     this.eventoForm.patchValue({
       nombre: evento.nombre,
       descripcion: evento.descripcion,
@@ -214,7 +216,9 @@ export class EventoFormComponent implements OnInit {
       tipo_codigo: formValue.tipo_codigo,
       estado_codigo: formValue.estado_codigo,
       lugar: formValue.lugar || undefined,
-      fecha_presentacion: formValue.fecha_presentacion.toISOString()
+      fecha_presentacion: formValue.fecha_presentacion.toISOString(),
+      // El backend rechaza con 409 si otra edición cambió el evento desde que se cargó
+      version: this.eventoVersion
     };
 
     this.eventosService.updateEvento(this.eventoId, eventoData).subscribe({
@@ -229,12 +233,21 @@ export class EventoFormComponent implements OnInit {
       },
       error: (error) => {
         console.error('Error updating evento:', error);
+        this.submitting = false;
+        if (error.status === 409) {
+          this.messageService.add({
+            severity: 'warn',
+            summary: 'Conflicto de edición',
+            detail: 'El evento fue modificado por otra persona. Se recargaron sus datos.'
+          });
+          this.loadEvento();
+          return;
+        }
         this.messageService.add({
           severity: 'error',
           summary: 'Error',
           detail: 'Error al actualizar el evento'
         });
-        this.submitting = false;
       }
     });
   }
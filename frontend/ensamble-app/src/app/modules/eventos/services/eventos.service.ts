@@ -8,12 +8,18 @@ import {
   EventoCreate,
   EventoUpdate,
   EventosListResponse,
+  EventosFiltro,
   ParticipanteEvento,
   ParticipanteEventoCreate,
   ParticipanteEventoUpdate,
+  ParticipantesLoteCreate,
+  ParticipantesLoteResponse,
+  AgendaMusico,
+  ViabilidadRepertorio,
   TipoEvento,
   EstadoEvento
 } from '../../../shared/interfaces/eventos.interface';
+import { idempotente, reintentarAlta } from '../../../shared/utils/idempotencia';
 
 @Injectable({
   providedIn: 'root'
@@ -29,13 +35,29 @@ export class EventosService {
   // ==================== EVENTOS ====================
 
   createEvento(evento: EventoCreate): Observable<Evento> {
-    return this.http.post<Evento>(this.baseUrl, evento);
+    return this.http.post<Evento>(this.baseUrl, evento, idempotente()).pipe(reintentarAlta());
   }
 
-  getEventos(skip: number = 0, limit: number = 20): Observable<EventosListResponse> {
-    const params = new HttpParams()
+  // fields: solo esas columnas y relaciones de cada evento (id y version siempre vienen)
+  getEventos(skip: number = 0, limit: number = 20, fields?: string[]): Observable<EventosListResponse> {
+    let params = new HttpParams()
       .set('skip', skip.toString())
       .set('limit', limit.toString());
+    if (fields) {
+      params = params.set('fields', fields.join(','));
+    }
+    
+    return this.http.get<EventosListResponse>(this.baseUrl, { params });
+  }
+
+  // Eventos en orden cronológico filtrados en el servidor; paginar con siguiente_cursor
+  buscarEventos(filtro: EventosFiltro): Observable<EventosListResponse> {
+    let params = new HttpParams();
+    Object.entries(filtro).forEach(([clave, valor]) => {
+      if (valor !== undefined && valor !== null && valor !== '') {
+        params = params.set(clave, valor.toString());
+      }
+    });
     
     return this.http.get<EventosListResponse>(this.baseUrl, { params });
   }
@@ -55,7 +77,17 @@ export class EventosService {
   // ==================== PARTICIPANTES ====================
 
   addParticipante(eventoId: string, participante: ParticipanteEventoCreate): Observable<ParticipanteEvento> {
-    return this.http.post<ParticipanteEvento>(`${this.baseUrl}/${eventoId}/participantes`, participante);
+    return this.http.post<ParticipanteEvento>(`${this.baseUrl}/${eventoId}/participantes`, participante, idempotente())
+      .pipe(reintentarAlta());
+  }
+
+  addParticipantesLote(eventoId: string, lote: ParticipantesLoteCreate): Observable<ParticipantesLoteResponse> {
+    return this.http.post<ParticipantesLoteResponse>(`${this.baseUrl}/${eventoId}/participantes/lote`, lote, idempotente())
+      .pipe(reintentarAlta());
+  }
+
+  getAgendaMusico(musicoId: string): Observable<AgendaMusico> {
+    return this.http.get<AgendaMusico>(`${this.baseUrl}/por-musico/${musicoId}`);
   }
 
   getParticipantes(eventoId: string): Observable<ParticipanteEvento[]> {
@@ -73,6 +105,18 @@ export class EventosService {
     );
   }
 
+  // Canciones que puede tocar el plantel confirmado y roles que faltan en las demás
+  getViabilidadRepertorio(
+    eventoId: string,
+    soloRepertorio: boolean = false,
+    soloViables: boolean = false
+  ): Observable<ViabilidadRepertorio> {
+    const params = new HttpParams()
+      .set('solo_repertorio', soloRepertorio.toString())
+      .set('solo_viables', soloViables.toString());
+    return this.http.get<ViabilidadRepertorio>(`${this.baseUrl}/${eventoId}/repertorio/viabilidad`, { params });
+  }
+
   // ==================== CATÁLOGOS ====================
 
   getTiposEvento(): Observable<TipoEvento[]> {
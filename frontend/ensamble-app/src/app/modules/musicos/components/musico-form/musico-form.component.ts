@@ -32,7 +32,7 @@ import {
   NivelHabilidad,
   InstrumentoMusico,
   InstrumentoMusicoCreate,
-  InstrumentoMusicoUpdate
+  PerfilMusicoUpdate
 } from '../../../../shared/interfaces/musicos.interface';
 import { SelectModule } from 'primeng/select';
 import { DatePicker } from "primeng/datepicker";
@@ -83,6 +83,9 @@ export class MusicoFormComponent implements OnInit {
   instrumentos: Instrumento[] = [];
   nivelesHabilidad: NivelHabilidad[] = [];
   currentMusico: Musico | null = null;
+  // Instrumentos tal como llegaron del servidor: base del diff que se guarda con el músico
+  private instrumentosOriginales: InstrumentoMusico[] = [];
+  private nuevosInstrumentos = 0;
   
   // Dialog de instrumentos
   showInstrumentoDialog = false;
@@ -93,8 +96,6 @@ export class MusicoFormComponent implements OnInit {
   ngOnInit(): void {
     this.initForm();
     this.initInstrumentoForm();
-    this.loadEstados();
-    this.loadInstrumentos();
     this.loadNivelesHabilidad();
     
     // Verificar si estamos en modo edición
@@ -102,7 +103,11 @@ export class MusicoFormComponent implements OnInit {
     this.isEditMode = !!this.musicoId;
 
     if (this.isEditMode && this.musicoId) {
+      // El perfil ya trae los catálogos
       this.loadMusico(this.musicoId);
+    } else {
+      this.loadEstados();
+      this.loadInstrumentos();
     }
   }
 
@@ -171,10 +176,13 @@ export class MusicoFormComponent implements OnInit {
 
   loadMusico(id: string): void {
     this.loading = true;
-    this.musicosService.getMusico(id).subscribe({
-      next: (musico) => {
-        this.currentMusico = musico;
-        this.populateForm(musico);
+    this.musicosService.getPerfil(id).subscribe({
+      next: (perfil) => {
+        this.estados = perfil.estados;
+        this.instrumentos = perfil.instrumentos_disponibles;
+        this.currentMusico = perfil.musico;
+        this.instrumentosOriginales = [...perfil.musico.instrumentos];
+        this.populateForm(perfil.musico);
         this.loading = false;
       },
       error: (error) => {
@@ -262,10 +270,13 @@ export class MusicoFormComponent implements OnInit {
       email: formData.email,
       telefono: formData.telefono || undefined,
       estado_codigo: formData.estado_codigo,
-      url_foto_perfil: formData.url_foto_perfil || undefined
+      url_foto_perfil: formData.url_foto_perfil || undefined,
+      // El backend rechaza con 409 si otra edición cambió el músico desde que se cargó
+      version: this.currentMusico?.version
     };
 
-    this.musicosService.updateMusico(this.musicoId!, musicoData).subscribe({
+    // Músico y cambios de instrumentos en una sola petición y una sola transacción
+    this.musicosService.updatePerfil(this.musicoId!, this.perfilUpdate(musicoData)).subscribe({
       next: (musico) => {
         this.loading = false;
         this.messageService.add({
@@ -280,15 +291,67 @@ export class MusicoFormComponent implements OnInit {
       error: (error) => {
         this.loading = false;
         console.error('Error updating musico:', error);
+        if (error.status === 409 && error.headers?.get('ETag')) {
+          // Conflicto de versión (el backend devuelve la versión actual como ETag)
+          this.conflictoVersion('El músico fue modificado por otra persona. Se recargaron sus datos.');
+          return;
+        }
         this.messageService.add({
           severity: 'error',
           summary: 'Error',
-          detail: 'No se pudo actualizar el músico'
+          detail: error.status === 409 ? (error.error?.detail || 'No se pudo actualizar el músico') : 'No se pudo actualizar el músico'
         });
       }
     });
   }
 
+  /**
+   * Diferencia entre los instrumentos cargados y los editados en el formulario
+   */
+  private perfilUpdate(musico: MusicoUpdate): PerfilMusicoUpdate {
+    const actuales = this.currentMusico?.instrumentos || [];
+    const perfil: PerfilMusicoUpdate = { musico, agregar: [], actualizar: {}, eliminar: [] };
+
+    this.instrumentosOriginales
+      .filter(original => !actuales.some(inst => inst.id === original.id))
+      .forEach(original => perfil.eliminar.push(original.id));
+
+    actuales.forEach(inst => {
+      const original = this.instrumentosOriginales.find(o => o.id === inst.id);
+      const datos: InstrumentoMusicoCreate = {
+        instrumento_id: inst.instrumento_id,
+        nivel_id: inst.nivel_id,
+        es_principal: inst.es_principal,
+        fecha_inicio: inst.fecha_inicio || undefined,
+        notas: inst.notas || undefined
+      };
+      if (!original) {
+        perfil.agregar.push(datos);
+      } else if (
+        original.instrumento_id !== inst.instrumento_id ||
+        original.nivel_id !== inst.nivel_id ||
+        original.es_principal !== inst.es_principal ||
+        (original.fecha_inicio || undefined) !== datos.fecha_inicio ||
+        (original.notas || undefined) !== datos.notas
+      ) {
+        perfil.actualizar[inst.id] = { ...datos, version: original.version };
+      }
+    });
+    return perfil;
+  }
+
+  /**
+   * Otra edición ganó la carrera: recargar el músico (y sus versiones) en lugar de pisarla
+   */
+  private conflictoVersion(detalle: string): void {
+    this.messageService.add({
+      severity: 'warn',
+      summary: 'Conflicto de edición',
+      detail: detalle
+    });
+    this.loadMusico(this.musicoId!);
+  }
+
   onCancel(): void {
     if (this.isEditMode && this.musicoId) {
       this.router.navigate(['/musicos/detalle', this.musicoId]);
@@ -372,65 +435,26 @@ export class MusicoFormComponent implements OnInit {
         notas: formData.notas || undefined
       };
 
+      // Los cambios se guardan junto con el músico (ver perfilUpdate)
+      const instrumentos = this.currentMusico!.instrumentos;
       if (this.isEditingInstrumento && this.currentInstrumento) {
-        // Actualizar instrumento existente
-        this.musicosService.updateInstrumentoMusico(
-          this.musicoId,
-          this.currentInstrumento.id,
-          instrumentoData
-        ).subscribe({
-          next: () => {
-            this.messageService.add({
-              severity: 'success',
-              summary: 'Éxito',
-              detail: 'Instrumento actualizado correctamente'
-            });
-            this.loadMusico(this.musicoId!);
-            this.showInstrumentoDialog = false;
-          },
-          error: (error) => {
-            console.error('Error updating instrumento:', error);
-            let errorMessage = 'No se pudo actualizar el instrumento';
-            
-            if (error.status === 409) {
-              errorMessage = error.error?.detail || 'Este músico ya tiene este instrumento registrado';
-            }
-            
-            this.messageService.add({
-              severity: 'error',
-              summary: 'Error',
-              detail: errorMessage
-            });
-          }
-        });
+        const editado = this.currentInstrumento;
+        this.currentMusico!.instrumentos = instrumentos.map(inst =>
+          inst.id === editado.id ? { ...inst, ...instrumentoData } : inst
+        );
       } else {
-        // Crear nuevo instrumento
-        this.musicosService.addInstrumentoToMusico(this.musicoId, instrumentoData).subscribe({
-          next: () => {
-            this.messageService.add({
-              severity: 'success',
-              summary: 'Éxito',
-              detail: 'Instrumento agregado correctamente'
-            });
-            this.loadMusico(this.musicoId!);
-            this.showInstrumentoDialog = false;
-          },
-          error: (error) => {
-            console.error('Error adding instrumento:', error);
-            let errorMessage = 'No se pudo agregar el instrumento';
-            
-            if (error.status === 409) {
-              errorMessage = error.error?.detail || 'Este músico ya tiene este instrumento registrado';
-            }
-            
-            this.messageService.add({
-              severity: 'error',
-              summary: 'Error',
-              detail: errorMessage
-            });
+        this.currentMusico!.instrumentos = [
+          ...instrumentos,
+          {
+            ...instrumentoData,
+            es_principal: instrumentoData.es_principal || false,
+            id: `nuevo-${++this.nuevosInstrumentos}`,
+            musico_id: this.musicoId,
+            version: 1
           }
-        });
+        ];
       }
+      this.showInstrumentoDialog = false;
     }
   }
 
@@ -440,25 +464,9 @@ export class MusicoFormComponent implements OnInit {
       header: 'Confirmar Eliminación',
       icon: 'pi pi-exclamation-triangle',
       accept: () => {
-        if (this.musicoId) {
-          this.musicosService.removeInstrumentoFromMusico(this.musicoId, instrumento.id).subscribe({
-            next: () => {
-              this.messageService.add({
-                severity: 'success',
-                summary: 'Éxito',
-                detail: 'Instrumento eliminado correctamente'
-              });
-              this.loadMusico(this.musicoId!);
-            },
-            error: (error) => {
-              console.error('Error deleting instrumento:', error);
-              this.messageService.add({
-                severity: 'error',
-                summary: 'Error',
-                detail: 'No se pudo eliminar el instrumento'
-              });
-            }
-          });
+        // Se elimina al guardar el músico (ver perfilUpdate)
+        if (this.currentMusico) {
+          this.currentMusico.instrumentos = this.currentMusico.instrumentos.filter(inst => inst.id !== instrumento.id);
         }
       }
     });
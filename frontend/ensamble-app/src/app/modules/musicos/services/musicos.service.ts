@@ -14,8 +14,11 @@ import {
   NivelHabilidad,
   InstrumentoMusico,
   InstrumentoMusicoCreate,
-  InstrumentoMusicoUpdate
+  InstrumentoMusicoUpdate,
+  PerfilMusico,
+  PerfilMusicoUpdate
 } from '../../../shared/interfaces/musicos.interface';
+import { idempotente, reintentarAlta } from '../../../shared/utils/idempotencia';
 
 @Injectable({
   providedIn: 'root'
@@ -62,7 +65,7 @@ export class MusicosService {
    * Crear un nuevo músico
    */
   createMusico(musicoData: MusicoCreate): Observable<Musico> {
-    return this.http.post<Musico>(this.baseUrl, musicoData);
+    return this.http.post<Musico>(this.baseUrl, musicoData, idempotente()).pipe(reintentarAlta());
   }
 
   /**
@@ -72,6 +75,20 @@ export class MusicosService {
     return this.http.put<Musico>(`${this.baseUrl}/${id}`, musicoData);
   }
 
+  /**
+   * Obtener músico, instrumentos y catálogos del formulario en una sola consulta
+   */
+  getPerfil(id: string): Observable<PerfilMusico> {
+    return this.http.get<PerfilMusico>(`${this.baseUrl}/${id}/perfil`);
+  }
+
+  /**
+   * Guardar datos del músico y cambios de instrumentos en una sola transacción
+   */
+  updatePerfil(id: string, perfil: PerfilMusicoUpdate): Observable<Musico> {
+    return this.http.put<Musico>(`${this.baseUrl}/${id}/perfil`, perfil);
+  }
+
   /**
    * Eliminar un músico (soft delete)
    */
@@ -110,7 +127,9 @@ export class MusicosService {
    * Agregar un instrumento a un músico
    */
   addInstrumentoToMusico(musicoId: string, instrumentoData: InstrumentoMusicoCreate): Observable<InstrumentoMusico> {
-    return this.http.post<InstrumentoMusico>(`${environment.microservices.musicos}/api/v1/musicos/${musicoId}/instrumentos`, instrumentoData);
+    return this.http.post<InstrumentoMusico>(
+      `${environment.microservices.musicos}/api/v1/musicos/${musicoId}/instrumentos`, instrumentoData, idempotente()
+    ).pipe(reintentarAlta());
   }
 
   /**
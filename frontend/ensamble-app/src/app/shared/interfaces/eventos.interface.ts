@@ -30,6 +30,7 @@ export interface EventoUpdate {
   fecha_presentacion?: string;
   tipo_codigo?: string;
   estado_codigo?: string;
+  version?: number; // Versión leída: 409 si otra edición la cambió
 }
 
 export interface Evento extends EventoBase {
@@ -40,6 +41,7 @@ export interface Evento extends EventoBase {
   creado_en: string;
   actualizado_en: string;
   eliminado_en?: string;
+  version: number;
 }
 
 export interface ParticipanteEventoCreate {
@@ -51,12 +53,68 @@ export interface ParticipanteEventoUpdate {
   estado_codigo: string;
 }
 
+export interface ConflictoAgenda {
+  evento_id: string;
+  nombre: string;
+  fecha_presentacion: string;
+}
+
 export interface ParticipanteEvento {
   id: string;
   evento_id: string;
   musico_id: string;
   estado: EstadoParticipante;
   unido_en: string;
+  conflictos?: ConflictoAgenda[];
+}
+
+export interface ParticipantesLoteCreate {
+  musico_ids: string[];
+  estado_codigo?: string;
+}
+
+export interface ParticipantesLoteResponse {
+  creados: ParticipanteEvento[];
+  omitidos: string[];
+}
+
+export interface EventoAgenda {
+  id: string;
+  nombre: string;
+  lugar?: string;
+  fecha_presentacion: string;
+  tipo: TipoEvento;
+  estado: EstadoEvento;
+  estado_participacion: EstadoParticipante;
+  conflictos: string[];
+}
+
+export interface AgendaMusico {
+  musico_id: string;
+  eventos: EventoAgenda[];
+}
+
+export interface RolRepertorio {
+  instrumento_id: number;
+  instrumento?: string;
+  nivel_minimo?: string;
+}
+
+export interface ViabilidadCancion {
+  cancion_id: string;
+  titulo: string;
+  viable: boolean;
+  faltantes: RolRepertorio[];
+  opcionales_faltantes: RolRepertorio[];
+}
+
+export interface ViabilidadRepertorio {
+  evento_id: string;
+  version_plantel: number;
+  musicos_confirmados: number;
+  evaluadas: number;
+  viables: number;
+  canciones: ViabilidadCancion[];
 }
 
 export interface EventosListResponse {
@@ -64,6 +122,16 @@ export interface EventosListResponse {
   total: number;
   page: number;
   size: number;
+  siguiente_cursor?: string;
+}
+
+export interface EventosFiltro {
+  desde?: string;
+  hasta?: string;
+  tipo?: string;
+  estado?: string;
+  cursor?: string;
+  limit?: number;
 }
 
 export interface ApiResponse<T> {
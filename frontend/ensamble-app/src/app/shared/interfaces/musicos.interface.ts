@@ -38,6 +38,7 @@ export interface InstrumentoMusico {
   notas?: string;
   instrumento?: Instrumento;
   nivel?: NivelHabilidad;
+  version: number;
 }
 
 export interface Musico {
@@ -52,6 +53,7 @@ export interface Musico {
   creado_en: string;
   actualizado_en?: string;
   eliminado_en?: string;
+  version: number;
 }
 
 export interface MusicoCreate {
@@ -69,6 +71,7 @@ export interface MusicoUpdate {
   telefono?: string;
   estado_codigo?: string;
   url_foto_perfil?: string;
+  version?: number; // Versión leída: 409 si otra edición la cambió
 }
 
 export interface MusicosListResponse {
@@ -92,4 +95,20 @@ export interface InstrumentoMusicoUpdate {
   es_principal?: boolean;
   fecha_inicio?: string;
   notas?: string;
+  version?: number; // Versión leída: 409 si otra edición la cambió
+}
+
+// Perfil para el formulario de edición: músico y catálogos en una sola consulta
+export interface PerfilMusico {
+  musico: Musico;
+  estados: EstadoMusico[];
+  instrumentos_disponibles: Instrumento[];
+}
+
+// Datos del músico y diferencia de instrumentos, guardados con un solo commit
+export interface PerfilMusicoUpdate {
+  musico: MusicoUpdate; // version protege el perfil completo
+  agregar: InstrumentoMusicoCreate[];
+  actualizar: { [instrumentoMusicoId: string]: InstrumentoMusicoUpdate };
+  eliminar: string[];
 }
@@ -0,0 +1,31 @@
+// src/app/shared/utils/idempotencia.ts
+import { HttpErrorResponse, HttpHeaders } from '@angular/common/http';
+import { MonoTypeOperatorFunction, retry, throwError, timer } from 'rxjs';
+
+/**
+ * Opciones de un alta idempotente: una clave nueva por operación. Los reintentos
+ * de la misma suscripción reenvían la misma clave y el backend responde con la
+ * respuesta original en lugar de volver a crear el recurso.
+ */
+export function idempotente(): { headers: HttpHeaders } {
+  return { headers: new HttpHeaders({ 'Idempotency-Key': crypto.randomUUID() }) };
+}
+
+/**
+ * Reintentar un alta idempotente ante fallas de red, 502/503/504 o el 409 con
+ * Retry-After que indica que la solicitud original sigue en curso.
+ */
+export function reintentarAlta<T>(intentos: number = 2): MonoTypeOperatorFunction<T> {
+  return retry({
+    count: intentos,
+    delay: (error: HttpErrorResponse, intento: number) =>
+      esReintentable(error) ? timer(500 * intento) : throwError(() => error)
+  });
+}
+
+function esReintentable(error: HttpErrorResponse): boolean {
+  if (error.status === 409) {
+    return error.headers?.has('Retry-After') ?? false;
+  }
+  return [0, 502, 503, 504].includes(error.status);
+}